@@ -0,0 +1,287 @@
+"""Parallel per-user streak and completion statistics
+
+Computes statistics for every user and stores them in User_Stats
+(database/migrations/010_user_stats.sql). Users are split into User_ID ranges
+(shards) holding about the same number of habits. Each shard is read with
+streaming queries and computed in its own worker process, with all of its
+completions handled as NumPy arrays at once. The parent process writes each
+shard's results back in one bulk transaction, so the database only ever sees
+one writer. Shards share nothing, so the job scales with the number of cores
+until the database becomes the bottleneck.
+
+Usage (from backend/main.py/dataaccess, DB_CONNECTION_STRING taken from .env):
+    python analytics.py
+    python analytics.py --workers 8 --shards 64
+    python analytics.py --connection sqlite:///habit_tracker.db --today 2025-06-30
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:  # imported as dataaccess.analytics (tests)
+    from .data_access import HabitDatabase, _as_date, connection_string_from_env
+    from .streaks import FREQUENCIES, normalize_frequency, period_index, periods_from_days
+except ImportError:  # run from inside dataaccess/ (python analytics.py)
+    from data_access import HabitDatabase, _as_date, connection_string_from_env
+    from streaks import FREQUENCIES, normalize_frequency, period_index, periods_from_days
+
+STATS_COLUMNS = ("User_ID", "Habits", "Completions", "Active_Streaks", "Best_Current_Streak", "Longest_Streak",
+                 "Completion_Rate_30d")
+WINDOW_DAYS = 30  # Completion_Rate_30d covers the periods of the last 30 days, today included
+_EPOCH = date(1970, 1, 1)
+
+
+def plan_shards(db: HabitDatabase, shards: int) -> List[Tuple[int, int]]:
+    """
+    Split the users into contiguous User_ID ranges of about the same number of habits
+
+    Returns:
+        List of (first User_ID, last User_ID) ranges covering every user with habits
+    """
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT User_ID, COUNT(*) FROM Habits GROUP BY User_ID ORDER BY User_ID")
+        counts = [tuple(row) for row in cursor.fetchall()]
+    if not counts:
+        return []
+    total = sum(count for _, count in counts)
+    target = total / max(1, min(shards, len(counts)))
+    starts = [counts[0][0]]
+    running = 0
+    for user_id, count in counts:
+        if running >= target * len(starts):
+            starts.append(user_id)
+        running += count
+    # each range runs up to the next one's start, so users without habits are covered too
+    return [(start, following - 1) for start, following in zip(starts, starts[1:])] + [(starts[-1], counts[-1][0])]
+
+
+def compute_shard_stats(habits, logs, today: date) -> List[tuple]:
+    """
+    Per-user statistics for one shard, vectorized over all of its habits
+
+    Args:
+        habits: (Habit_ID, User_ID, Frequency) rows
+        logs: (Habit_IDs, days since 1970-01-01) arrays of the completed logs, in any order
+        today: Day streaks and the 30-day window are judged against
+
+    Returns:
+        List of tuples in STATS_COLUMNS order, one per user, by User_ID
+    """
+    import numpy as np  # only needed for batch jobs
+
+    habits = sorted(habits)
+    if not habits:
+        return []
+    habit_ids = np.array([row[0] for row in habits], dtype=np.int64)
+    users, user_index = np.unique(np.array([row[1] for row in habits], dtype=np.int64), return_inverse=True)
+    codes = np.array([FREQUENCIES.index(normalize_frequency(row[2])) for row in habits], dtype=np.int64)
+    count = habit_ids.size
+
+    # The current period and the first period of the 30-day window, per habit
+    today_periods = np.array([period_index(name, today) for name in FREQUENCIES], dtype=np.int64)[codes]
+    window_start = today - timedelta(days=WINDOW_DAYS - 1)
+    window_firsts = np.array([period_index(name, window_start) for name in FREQUENCIES], dtype=np.int64)[codes]
+
+    log_habits, log_days = (np.asarray(column, dtype=np.int64) for column in logs)
+    habit_index = np.searchsorted(habit_ids, log_habits)
+    known = (habit_index < count) & (habit_ids[np.minimum(habit_index, count - 1)] == log_habits)
+    habit_index, log_days = habit_index[known], log_days[known]
+    completions = np.bincount(habit_index, minlength=count)
+
+    # Each log's period in its habit's frequency, then one entry per (habit, period), sorted
+    periods = np.empty_like(log_days)
+    log_codes = codes[habit_index]
+    for code, name in enumerate(FREQUENCIES):
+        mask = log_codes == code
+        periods[mask] = periods_from_days(name, log_days[mask])
+    base = periods.min() if periods.size else 0
+    keys = np.unique((habit_index << 32) | (periods - base))  # 1-D sort instead of a row-wise unique
+    pair_habits, pair_periods = keys >> 32, (keys & 0xFFFFFFFF) + base
+
+    # Runs of consecutive periods: a run starts at a new habit or a gap other than 1
+    starts = np.ones(pair_habits.size, dtype=bool)
+    starts[1:] = (np.diff(pair_habits) != 0) | (np.diff(pair_periods) != 1)
+    run_ids = np.cumsum(starts) - 1
+    run_lengths = np.bincount(run_ids)
+    run_habits = pair_habits[starts]
+    longest = np.zeros(count, dtype=np.int64)
+    np.maximum.at(longest, run_habits, run_lengths)
+
+    # The last run of each habit is its current streak unless a whole period was missed since
+    is_last = np.ones(run_habits.size, dtype=bool)
+    is_last[:-1] = run_habits[1:] != run_habits[:-1]
+    last_periods = np.full(count, np.iinfo(np.int64).min // 2, dtype=np.int64)
+    last_periods[pair_habits] = pair_periods  # sorted, so the newest period wins
+    current = np.zeros(count, dtype=np.int64)
+    current[run_habits[is_last]] = run_lengths[is_last]
+    current[today_periods - last_periods > 1] = 0
+
+    in_window = (pair_periods >= window_firsts[pair_habits]) & (pair_periods <= today_periods[pair_habits])
+    window_done = np.bincount(pair_habits[in_window], minlength=count)
+    window_total = today_periods - window_firsts + 1
+
+    per_user = len(users)
+    best_current = np.zeros(per_user, dtype=np.int64)
+    best_longest = np.zeros(per_user, dtype=np.int64)
+    np.maximum.at(best_current, user_index, current)
+    np.maximum.at(best_longest, user_index, longest)
+    habit_counts = np.bincount(user_index, minlength=per_user)
+    user_completions = np.bincount(user_index, weights=completions, minlength=per_user)
+    active = np.bincount(user_index, weights=current > 0, minlength=per_user)
+    rates = np.bincount(user_index, weights=window_done, minlength=per_user) / np.bincount(
+        user_index, weights=window_total, minlength=per_user)
+    return [
+        (int(users[i]), int(habit_counts[i]), int(user_completions[i]), int(active[i]), int(best_current[i]),
+         int(best_longest[i]), round(float(rates[i]), 4))
+        for i in range(per_user)
+    ]
+
+
+def run_shard(connection_string: str, first_user: int, last_user: int, today: date) -> Dict[str, Any]:
+    """
+    Fetch and compute one shard; runs in a worker process with its own connection
+
+    Returns:
+        Dict: "rows" (STATS_COLUMNS tuples), "habits", "logs", "fetch_seconds", "compute_seconds"
+    """
+    db = HabitDatabase(connection_string, pool_max_size=1)
+    try:
+        return compute_shard(db, first_user, last_user, today)
+    finally:
+        db.close()
+
+
+def compute_shard(db: HabitDatabase, first_user: int, last_user: int, today: date) -> Dict[str, Any]:
+    """
+    Fetch and compute one shard through an open database
+
+    Returns:
+        Dict: "rows" (STATS_COLUMNS tuples), "habits", "logs", "fetch_seconds", "compute_seconds"
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    habits = list(db._stream(
+        "SELECT Habit_ID, User_ID, Frequency FROM Habits WHERE User_ID BETWEEN ? AND ?",
+        (first_user, last_user), 5000,
+    ))
+    rows = db._stream("""
+        SELECT l.Habit_ID, l.Log_Date FROM Habit_Logs l JOIN Habits h ON h.Habit_ID = l.Habit_ID
+        WHERE h.User_ID BETWEEN ? AND ? AND l.Habit_Status = 1
+    """, (first_user, last_user), 5000)
+    # streamed straight into two flat arrays, never a list of row tuples
+    log_habits, log_days = [], []
+    for row in rows:
+        log_habits.append(row[0])
+        log_days.append(_as_date(row[1]).toordinal())
+    log_habits = np.array(log_habits, dtype=np.int64)
+    log_days = np.array(log_days, dtype=np.int64) - _EPOCH.toordinal()
+    fetched = time.perf_counter()
+    stats = compute_shard_stats(habits, (log_habits, log_days), today)
+    return {
+        "rows": stats,
+        "habits": len(habits),
+        "logs": int(log_days.size),
+        "fetch_seconds": fetched - started,
+        "compute_seconds": time.perf_counter() - fetched,
+    }
+
+
+def run_analytics(db: HabitDatabase, workers: Optional[int] = None, shards: Optional[int] = None,
+                  today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Recompute User_Stats for every user
+
+    Args:
+        db: Database to read and write (its connection string is handed to the workers;
+            an in-memory SQLite database is always read in this process, through db)
+        workers: Worker processes (defaults to the number of cores); 1 runs in this process
+        shards: User_ID ranges to split the work into (defaults to 4 per worker, so
+            a slow shard does not leave the other workers idle at the end)
+        today: Day the statistics are judged against (defaults to today)
+
+    Returns:
+        Dict: "users", "habits", "logs", "seconds", and "shards", a list of
+        per-shard {"first_user", "last_user", "users", "habits", "logs",
+        "fetch_seconds", "compute_seconds"}
+    """
+    workers = workers or os.cpu_count() or 1
+    if getattr(db.engine, "is_memory", False):
+        workers = 1  # a worker opening the connection string would get a new, empty database
+    today = today or date.today()
+    started = time.perf_counter()
+    ranges = plan_shards(db, shards or workers * 4)
+    print(f"⏳ Computing statistics in {len(ranges)} shards on {workers} worker(s)")
+
+    summary: Dict[str, Any] = {"users": 0, "habits": 0, "logs": 0, "shards": []}
+    _clear_unplanned(db, ranges)
+    if workers == 1:
+        results = ((shard, compute_shard(db, *shard, today)) for shard in ranges)
+        _collect(db, results, len(ranges), summary)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_shard, db.connection_string, *shard, today): shard for shard in ranges}
+            _collect(db, ((futures[future], future.result()) for future in as_completed(futures)), len(ranges), summary)
+
+    summary["seconds"] = time.perf_counter() - started
+    busy = sum(shard["fetch_seconds"] + shard["compute_seconds"] for shard in summary["shards"])
+    print(f"✅ Statistics for {summary['users']:,} users ({summary['habits']:,} habits, {summary['logs']:,} logs) "
+          f"in {summary['seconds']:.1f}s, {busy / summary['seconds'] if summary['seconds'] else 0:.1f}x parallel")
+    return summary
+
+
+def _clear_unplanned(db: HabitDatabase, ranges: List[Tuple[int, int]]) -> None:
+    """Delete User_Stats rows no shard will rewrite (users outside the planned ranges, or all when nobody has habits)"""
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        if ranges:
+            cursor.execute("DELETE FROM User_Stats WHERE User_ID < ? OR User_ID > ?", (ranges[0][0], ranges[-1][1]))
+        else:
+            cursor.execute("DELETE FROM User_Stats")
+        conn.commit()
+
+
+def _collect(db: HabitDatabase, results, total: int, summary: Dict[str, Any]) -> None:
+    """Write each finished shard back in one transaction and report progress"""
+    insert = f"INSERT INTO User_Stats ({', '.join(STATS_COLUMNS)}) VALUES ({', '.join('?' for _ in STATS_COLUMNS)})"
+    for done, ((first_user, last_user), result) in enumerate(results, start=1):
+        with db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM User_Stats WHERE User_ID BETWEEN ? AND ?", (first_user, last_user))
+            if result["rows"]:
+                db.engine.executemany(cursor, insert, result["rows"])
+            conn.commit()
+        shard = {"first_user": first_user, "last_user": last_user, "users": len(result["rows"]),
+                 **{key: result[key] for key in ("habits", "logs", "fetch_seconds", "compute_seconds")}}
+        summary["shards"].append(shard)
+        summary["users"] += shard["users"]
+        summary["habits"] += shard["habits"]
+        summary["logs"] += shard["logs"]
+        print(f"⏳ Shard {done}/{total} (users {first_user}-{last_user}): {shard['users']:,} users, "
+              f"{shard['logs']:,} logs, fetch {shard['fetch_seconds']:.2f}s, compute {shard['compute_seconds']:.2f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute per-user streak and completion statistics")
+    parser.add_argument("--connection", help="Connection string (defaults to DB_CONNECTION_STRING)")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to the number of cores)")
+    parser.add_argument("--shards", type=int, help="User_ID ranges (defaults to 4 per worker)")
+    parser.add_argument("--today", type=date.fromisoformat, help="Judge streaks as of this day (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    db = HabitDatabase(args.connection or connection_string_from_env())
+    try:
+        run_analytics(db, workers=args.workers, shards=args.shards, today=args.today)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,243 @@
 """Main application file for the Habit Tracker app."""
 
 import os
-from dotenv import load_dotenv
+import time
+
+STARTED = time.perf_counter()  # taken before the UI toolkit loads, for the time-to-first-window report
+
 import customtkinter as ctk
 from tkinter import ttk
 from tkinter import messagebox
-from data_access import HabitDatabase
+from data_access import HabitDatabase, connection_string_from_env, habit_sort_key
+from background import BackgroundExecutor
+from journal import OfflineHabitDatabase, WriteJournal
+from engines import CONFLICT, NOT_FOUND
+from virtual_list import VirtualTreeview, is_placeholder
 
-load_dotenv()
-connection_string = os.getenv("DB_CONNECTION_STRING")
-if connection_string is None:
-    raise ValueError("Database connection string must not be None. Check your .env file.")
-
-db = HabitDatabase(connection_string)
+IMPORTED = time.perf_counter()
+SYNC_POLL_MS = 2000  # how often the title shows how many offline changes are still waiting
+REMINDER_POLL_MS = 60000  # how often newly due habits are looked for (e.g. after midnight)
 
 
 # --- Main Application Window ---
 class App(ctk.CTk):
-    def __init__(self, connection_string, user_id=1):
+    def __init__(self, connection_string, user_id=1, journal_path=None):
         super().__init__()
+        self.startup_times = {"imports": IMPORTED - STARTED}  # seconds, see report_startup()
+        # Connections open in the background while the splash screen is up
         self.db = HabitDatabase(connection_string)
+        if journal_path:
+            # Edits are saved to a local journal and synced in the background, so they
+            # never wait on (or get lost to) a slow or unreachable server
+            self.db = OfflineHabitDatabase(self.db, WriteJournal(journal_path))
+            self.after(SYNC_POLL_MS, self.check_sync)
         self.user_id = user_id
+        self.reminded = None  # Habit_IDs already shown as due, None until the first check
         self.title("Habit Tracker")
         self.geometry("800x600")
 
-        # Frames
-        self.frames = {}
-        self.frames["main"] = MainScreen(self, self.show_add_habit, self.show_view_habits)
-        self.frames["add"] = AddHabitFrame(self, self.show_main, self.show_view_habits, self.db, self.user_id)
-        self.frames["view"] = ViewHabitsFrame(self, self.show_amend_habit, self.show_main, self.db, self.user_id)
+        # Database calls run on worker threads so the window never freezes
+        self.executor = BackgroundExecutor(self, on_busy_change=self.set_busy)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Busy indicator, shown while a database call is running
+        self.busy_bar = ctk.CTkProgressBar(
+            self,
+            mode="indeterminate",
+            height=6,
+            progress_color="#87A988",
+            fg_color="#FFFFFF"
+        )
+
+        # Frames are built the first time they are shown; only the splash screen exists up front
+        self.frame_builders = {
+            "main": lambda: MainScreen(self, self.show_add_habit, self.show_view_habits),
+            "add": lambda: AddHabitFrame(self, self.show_main, self.show_view_habits, self.db, self.user_id, self.executor),
+            "view": lambda: ViewHabitsFrame(self, self.show_amend_habit, self.show_main, self.db, self.user_id, self.executor),
+        }
+        self.frames = {"splash": SplashScreen(self, self.warm_up_database)}
         self.frames["amend"] = None  # Created as needed
-        self.show_main()
-        
+        self.frames["splash"].pack(expand=True, fill="both")
+        self.bind("<Map>", self.on_first_map, add="+")
+        self.warm_up_database()
+
     # ---- Functions ----
 
+    def get_frame(self, name):
+        frame = self.frames.get(name)
+        if frame is None:
+            frame = self.frames[name] = self.frame_builders[name]()
+        return frame
+
     def show_main(self):
         self.hide_all_frames()
-        self.frames["main"].pack(expand=True, fill="both")
+        self.get_frame("main").pack(expand=True, fill="both")
+        self.executor.submit(
+            "due", self.db.get_due_habits, self.user_id, on_success=lambda habits: self.on_due_habits(habits, remind=False)
+        )
 
     def show_add_habit(self):
         self.hide_all_frames()
-        self.frames["add"].pack(expand=True, fill="both")
+        self.get_frame("add").pack(expand=True, fill="both")
 
     def show_view_habits(self):
         self.hide_all_frames()
-        self.frames["view"].load_habits()
+        self.get_frame("view").load_habits()
         self.frames["view"].pack(expand=True, fill="both")
 
     def show_amend_habit(self, habit_data):
         self.hide_all_frames()
-        self.frames["amend"] = AmendHabitFrame(self, habit_data, self.show_view_habits, self.db, self.user_id)
+        if self.frames["amend"] is not None:
+            self.frames["amend"].destroy()
+        self.frames["amend"] = AmendHabitFrame(self, habit_data, self.show_view_habits, self.db, self.user_id, self.executor)
         self.frames["amend"].pack(expand=True, fill="both")
 
     def hide_all_frames(self):
+        # Navigating away makes any in-flight habit list load stale
+        self.executor.cancel("load")
         for frame in self.frames.values():
             if frame is not None:
                 frame.pack_forget()
 
+    def set_busy(self, busy):
+        if busy:
+            self.busy_bar.pack(side="top", fill="x")
+            self.busy_bar.start()
+        else:
+            self.busy_bar.stop()
+            self.busy_bar.pack_forget()
+
+    # ---- Startup ----
+
+    def warm_up_database(self):
+        started = time.perf_counter()
+        self.frames["splash"].set_status("Connecting to your habits...")
+        self.executor.submit(
+            None,
+            self.db.warm_up,
+            on_success=lambda _: self.on_database_ready(time.perf_counter() - started),
+            on_error=self.on_database_error
+        )
+
+    def on_database_ready(self, seconds):
+        self.startup_times["database"] = seconds
+        self.report_startup()
+        self.frames["splash"].destroy()
+        del self.frames["splash"]
+        self.show_main()
+        self.after(REMINDER_POLL_MS, self.check_reminders)
+
+    def on_database_error(self, error):
+        print(f"❌ Could not connect to the database: {error}")
+        if isinstance(self.db, OfflineHabitDatabase):
+            # Edits can still be made; they are synced once the server is back
+            print("⚠️ Working offline")
+            self.on_database_ready(0.0)
+            return
+        self.frames["splash"].set_status("Could not connect to the database.", retry=True)
+
+    def on_first_map(self, event):
+        if event.widget is not self or "first_window" in self.startup_times:
+            return
+        self.startup_times["first_window"] = time.perf_counter() - STARTED
+        self.report_startup()
+
+    def report_startup(self):
+        # Printed once both the window is up and the database is ready
+        if "first_window" in self.startup_times and "database" in self.startup_times:
+            times = self.startup_times
+            print(f"⏱️ Startup: first window after {times['first_window'] * 1000:.0f} ms "
+                  f"(imports {times['imports'] * 1000:.0f} ms), database ready after {times['database'] * 1000:.0f} ms")
+
+    # ---- Reminders ----
+
+    def check_reminders(self):
+        self.executor.submit("reminders", self.db.get_due_habits, self.user_id, on_success=self.on_due_habits)
+        self.after(REMINDER_POLL_MS, self.check_reminders)
+
+    def on_due_habits(self, habits, remind=True):
+        if self.frames.get("main") is not None:
+            self.frames["main"].show_due(habits)
+        new = [habit[1] for habit in habits if self.reminded is not None and habit[0] not in self.reminded]
+        self.reminded = {habit[0] for habit in habits}
+        if remind and new:
+            messagebox.showinfo("Habits due", "Time for: " + ", ".join(new))
+
+    # ---- Offline sync ----
+
+    def check_sync(self):
+        pending = self.db.pending_count()
+        self.title(f"Habit Tracker ({pending} changes waiting to sync)" if pending else "Habit Tracker")
+        failed = self.db.failed_writes()
+        if failed:
+            self.db.journal.clear_failures()
+            conflicts = sum(1 for entry in failed if entry["error"] in (CONFLICT, NOT_FOUND))
+            reasons = []
+            if conflicts:
+                reasons.append(f"{conflicts} because the habit was changed or deleted somewhere else in the meantime")
+            if len(failed) > conflicts:
+                reasons.append(f"{len(failed) - conflicts} because the database refused the data")
+            messagebox.showwarning(
+                "Changes not saved",
+                f"{len(failed)} change(s) made offline could not be saved: " + "; ".join(reasons) + "."
+            )
+        self.after(SYNC_POLL_MS, self.check_sync)
+
+    def on_close(self):
+        self.executor.shutdown()
+        self.db.close()
+        self.destroy()
+
+# --- Splash Screen ---
+class SplashScreen(ctk.CTkFrame):
+    def __init__(self, master, retry_callback):
+        super().__init__(master)
+        self.configure(fg_color="#FFFFFF")
+
+        # Overlay
+        overlay = ctk.CTkFrame(
+            self,
+            fg_color="#FFFFFF",
+            corner_radius=20)
+        overlay.pack(expand=True, fill="both", padx=20, pady=20)
+
+        # ---- Widgets ----
+        title_label = ctk.CTkLabel(
+            overlay,
+            text="Habit Tracker",
+            font=("Inter", 40, "bold"),
+            text_color="#87A988"
+        )
+        title_label.pack(pady=(160, 10), padx=10)
+
+        self.status_label = ctk.CTkLabel(
+            overlay,
+            text="",
+            font=("Inter", 20, "italic"),
+            text_color="#6C8B6B"
+        )
+        self.status_label.pack(pady=10, padx=10)
+
+        # Retry Button, only shown when the connection failed
+        self.retry_btn = ctk.CTkButton(
+            overlay,
+            command=retry_callback,
+            text="Try Again",
+            text_color="#FFFFFF",
+            font=("Inter", 20),
+            height=40,
+            width=180,
+            fg_color="#87A988",
+            hover_color="#6C8B6B",
+        )
+
+    def set_status(self, text, retry=False):
+        self.status_label.configure(text=text)
+        if retry:
+            self.retry_btn.pack(pady=20, padx=20)
+        else:
+            self.retry_btn.pack_forget()
+
 # --- Main Screen ---
 class MainScreen(ctk.CTkFrame):
     def __init__(self, master, show_add_habit_callback, show_view_habits_callback):
@@ -123,13 +304,43 @@ class MainScreen(ctk.CTkFrame):
             hover_color="#6C8B6B",
         ).pack(pady=10, padx=20)
 
+        # Due Habits Label, filled in by App.on_due_habits
+        self.due_label = ctk.CTkLabel(
+            overlay,
+            text="",
+            font=("Inter", 18),
+            text_color="#6C8B6B",
+            wraplength=600
+        )
+        self.due_label.pack(pady=20, padx=10)
+
+    def show_due(self, habits):
+        if habits:
+            self.due_label.configure(text="Due now: " + ", ".join(habit[1] for habit in habits))
+        else:
+            self.due_label.configure(text="Nothing due right now 🎉")
+
     
 # ---- View Habits Frame ---
+ALL_CATEGORIES = "All Categories"
+ALL_FREQUENCIES = "All Frequencies"
+SEARCH_DELAY_MS = 250  # typing pause before the search runs
+SEARCH_LIMIT = 200  # best matches shown for a search
+
 class ViewHabitsFrame(ctk.CTkFrame):
-    def __init__(self, master, show_amend_callback, show_main_callback, db, user_id):
+    # (Treeview column, heading, database column it sorts by)
+    COLUMNS = [
+        ("Name", "Habit Name", "Habit_Name_"),
+        ("Description", "Description", "Description_"),
+        ("Category", "Category", "Category"),
+        ("Frequency", "Frequency", "Frequency"),
+    ]
+
+    def __init__(self, master, show_amend_callback, show_main_callback, db, user_id, executor):
         super().__init__(master)
         self.db = db
         self.user_id = user_id
+        self.executor = executor
         self.show_amend_callback = show_amend_callback
         self.show_main_callback = show_main_callback
         self.configure(fg_color="#FFFFFF")
@@ -156,27 +367,70 @@ class ViewHabitsFrame(ctk.CTkFrame):
             font=("Inter", 20, "italic"),
             text_color="#6C8B6B"
         ).pack(pady=10, padx=40)
+
+        # ---- Sorting and Filters ----
+        # Sorting and filtering run in the database; only the visible pages are fetched
+        self.sort_by = "Habit_ID"
+        self.descending = False
+        self.filters = {"category": None, "frequency": None, "search": None}
+        self.search_results = []  # ranked matches of the current search, paged from memory
+        self.search_job = None
+
+        filter_bar = ctk.CTkFrame(overlay, fg_color="#FFFFFF")
+        filter_bar.pack(fill="x", padx=20)
+        self.category_filter = ctk.CTkOptionMenu(
+            filter_bar,
+            values=[ALL_CATEGORIES],
+            command=lambda _: self.apply_filters(),
+            fg_color="#6C8B6B",
+            text_color="#FFFFFF",
+            button_color="#6C8B6B",
+            button_hover_color="#87A988",
+            font=("Inter", 18, "italic")
+        )
+        self.category_filter.pack(side="left", padx=(0, 10))
+        self.frequency_filter = ctk.CTkOptionMenu(
+            filter_bar,
+            values=[ALL_FREQUENCIES, "Daily", "Weekly", "Monthly", "Yearly"],
+            command=lambda _: self.apply_filters(),
+            fg_color="#6C8B6B",
+            text_color="#FFFFFF",
+            button_color="#6C8B6B",
+            button_hover_color="#87A988",
+            font=("Inter", 18, "italic")
+        )
+        self.frequency_filter.pack(side="left", padx=(0, 10))
+        self.search_entry = ctk.CTkEntry(filter_bar, placeholder_text="Search habits and notes", font=("Inter", 18, "italic"))
+        self.search_entry.configure(
+            fg_color="#FFFFFF",
+            border_color="#6C8B6B",
+            text_color="#000000",
+            placeholder_text_color="#757575"
+        )
+        self.search_entry.bind("<KeyRelease>", self.schedule_search)
+        self.search_entry.bind("<Return>", lambda event: self.apply_filters())
+        self.search_entry.pack(side="left", expand=True, fill="x")
         
         # ---- Treeview Setup ----
-        self.tree = ttk.Treeview(overlay, columns=("Name", "Description", "Category", "Frequency"),
-        show="headings")
-        
         style= ttk.Style()
         style.configure("Treeview", background="#FFFFFF", foreground="#000000", font=("Inter", 20))
         rowheight = 50
         style.configure("Treeview", rowheight=rowheight)
+
+        # Only the rows in view exist as Treeview items; pages are fetched as the user scrolls
+        self.habit_list = VirtualTreeview(
+            overlay,
+            columns=[(column, heading) for column, heading, _ in self.COLUMNS],
+            count=self.count_habits,
+            fetch_page=self.fetch_habits,
+            executor=executor,
+            row_height=rowheight,
+            cursor=lambda habit: habit_sort_key(habit, self.sort_by),
+            on_heading=self.sort_by_column
+        )
+        self.tree = self.habit_list.tree
         self.tree.bind("<Double-1>", self.on_double_click)
-        
-        # ---- Treeview Columns ----
-        self.tree.heading("Name", text="Habit Name")
-        self.tree.heading("Description", text="Description")
-        self.tree.heading("Category", text="Category")
-        self.tree.heading("Frequency", text="Frequency")
-        self.tree.column("Name", anchor="center", stretch=True)
-        self.tree.column("Description", anchor="center", stretch=True)
-        self.tree.column("Category", anchor="center", stretch=True)
-        self.tree.column("Frequency", anchor="center", stretch=True)
-        self.tree.pack(expand=True, fill="both", padx=20, pady=20)
+        self.habit_list.pack(expand=True, fill="both", padx=20, pady=20)
         
         # ---- Widgets ----
         
@@ -206,29 +460,92 @@ class ViewHabitsFrame(ctk.CTkFrame):
     
     # View Habits
     def load_habits(self):
-        self.tree.delete(*self.tree.get_children())
-        for habit in self.db.get_user_habits(user_id=self.user_id):  # habit[0] is the habit_id
-            self.tree.insert("", "end", iid=habit[0], values=habit[1:5])  # habit[1:5] are the habit details (name, description, category, frequency)   
+        # Count and page fetches run on worker threads; rows already shown stay until replaced
+        self.habit_list.refresh()
+        self.executor.submit(None, self.db.get_habit_categories, self.user_id, on_success=self.show_categories)
+
+    def show_categories(self, categories):
+        self.category_filter.configure(values=[ALL_CATEGORIES] + categories)
+        if self.filters["category"] not in categories:
+            self.category_filter.set(ALL_CATEGORIES)
+
+    # Sorting and filtering
+    def sort_by_column(self, column):
+        # Clicking the sorted column again flips the direction
+        sort_by = next(sort_by for name, _, sort_by in self.COLUMNS if name == column)
+        if sort_by == self.sort_by:
+            self.descending = not self.descending
+        else:
+            self.sort_by = sort_by
+            self.descending = False
+        for name, heading, column_sort in self.COLUMNS:
+            arrow = (" ▼" if self.descending else " ▲") if column_sort == self.sort_by else ""
+            self.tree.heading(name, text=heading + arrow)
+        self.habit_list.refresh(to_top=True)
+
+    def schedule_search(self, event):
+        # Debounce: only search once typing pauses, not on every key
+        if event.keysym == "Return":
+            return
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY_MS, self.apply_filters)
+
+    def apply_filters(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+        category = self.category_filter.get()
+        frequency = self.frequency_filter.get()
+        search = self.search_entry.get().strip()
+        filters = {
+            "category": None if category == ALL_CATEGORIES else category,
+            "frequency": None if frequency == ALL_FREQUENCIES else frequency,
+            "search": search or None,
+        }
+        if filters == self.filters:  # e.g. an arrow key in the search box
+            return
+        self.filters = filters  # replaced as a whole: worker threads read it while fetching pages
+        self.habit_list.refresh(to_top=True)
+
+    # These two run on worker threads for the habit list
+    def count_habits(self):
+        filters = self.filters
+        if filters["search"]:
+            # A search is ranked by relevance; its best matches are kept for fetch_habits to page through
+            self.search_results = self.db.search_habits(
+                self.user_id, filters["search"], filters["category"], filters["frequency"], limit=SEARCH_LIMIT
+            )
+            return len(self.search_results)
+        return self.db.count_user_habits(self.user_id, **filters)
+
+    def fetch_habits(self, limit, offset, after):
+        if self.filters["search"]:
+            results = self.search_results
+            if after is not None:
+                offset = next((i + 1 for i, habit in enumerate(results) if habit[0] == after[1]), len(results))
+            return results[offset:offset + limit]
+        return self.db.query_user_habits(
+            self.user_id, **self.filters, sort_by=self.sort_by, descending=self.descending,
+            after=after, limit=limit, offset=offset
+        )
 
     # DOUBLE CLICK TO AMEND HABIT
     def on_double_click(self, event):
-    selected = self.tree.selection()8
-    print(f"[DEBUG] Selected items: {selected}")  # Print what is selected
-    if selected:
-        habit_id = selected[0]
-        print(f"[DEBUG] Selected habit_id: {habit_id}")  # Print the habit_id
-        values = self.tree.item(habit_id, "values")
-        print(f"[DEBUG] Treeview values for selected habit: {values}")  # Print the values tuple
-        habit_data = (habit_id,) + values  # type: ignore
-        print(f"[DEBUG] habit_data passed to show_amend_callback: {habit_data}")  # Print the final tuple
-        self.show_amend_callback(habit_data)
+        selected = self.tree.selection()
+        if selected and not is_placeholder(selected[0]):
+            habit_id = selected[0]
+            values = self.tree.item(habit_id, "values")
+            habit_data = (habit_id,) + values  # type: ignore
+            self.show_amend_callback(habit_data)
 
 # --- Add Habit Frame ---
 class AddHabitFrame(ctk.CTkFrame):
-    def __init__(self, master, show_main_callback, show_view_habits_callback, db, user_id):
+    def __init__(self, master, show_main_callback, show_view_habits_callback, db, user_id, executor):
         super().__init__(master)
         self.db = db
         self.user_id = user_id
+        self.executor = executor
         self.show_main_callback = show_main_callback
         self.show_view_habits_callback = show_view_habits_callback
         
@@ -363,13 +680,18 @@ class AddHabitFrame(ctk.CTkFrame):
             return
         
         
-        success = self.db.add_habit(
+        self.executor.submit(
+            None,
+            self.db.add_habit,
             user_id=user_id,
             habit_name=name,
             description=desc,
             category=category,
-            frequency=frequency
+            frequency=frequency,
+            on_success=self.on_habit_saved
         )
+
+    def on_habit_saved(self, success):
         if success:
             messagebox.showinfo("Success", "Habit added successfully.")
             self.show_view_habits_callback()
@@ -378,10 +700,11 @@ class AddHabitFrame(ctk.CTkFrame):
 
 # --- Amend Habit Frame ---
 class AmendHabitFrame(ctk.CTkFrame):
-    def __init__(self, master, habit_data, show_view_habits_callback, db, user_id):
+    def __init__(self, master, habit_data, show_view_habits_callback, db, user_id, executor):
         super().__init__(master)
         self.db = db
         self.user_id = user_id
+        self.executor = executor
         self.configure(fg_color="#FFFFFF")
         
         self.habit_id = habit_data[0]
@@ -540,14 +863,19 @@ class AmendHabitFrame(ctk.CTkFrame):
         if not frequency or frequency == "Frequency":
             messagebox.showerror("Error", "Please select a frequency.")
             return
-        success = self.db.update_habit(
+        self.executor.submit(
+            None,
+            self.db.update_habit,
             habit_id=self.habit_id,
             user_id=user_id,
             habit_name=name,
             description=desc,
             category=category,
-            frequency=frequency
+            frequency=frequency,
+            on_success=self.on_habit_updated
         )
+
+    def on_habit_updated(self, success):
         if success:
             messagebox.showinfo("Success", "Habit updated successfully.")
             self.show_view_habits_callback()
@@ -557,18 +885,18 @@ class AmendHabitFrame(ctk.CTkFrame):
     def delete_habit(self):
         answer = messagebox.askyesno("Delete Habit", "Are you sure you want to delete this habit?")
         if answer:
-            if self.db.delete_habit(self.habit_id):
-                messagebox.showinfo("Success", "Habit deleted successfully.")
-                self.show_view_habits_callback()
-            else:
-                messagebox.showerror("Error", "Failed to delete habit. Please try again.")
+            self.executor.submit(None, self.db.delete_habit, self.habit_id, on_success=self.on_habit_deleted)
+
+    def on_habit_deleted(self, success):
+        if success:
+            messagebox.showinfo("Success", "Habit deleted successfully.")
+            self.show_view_habits_callback()
+        else:
+            messagebox.showerror("Error", "Failed to delete habit. Please try again.")
 
 #--- Main Application Entry Point ---
 if __name__ == "__main__":
-    load_dotenv()
-    connection_string = os.getenv("DB_CONNECTION_STRING")
-    if not connection_string:
-        raise ValueError("DB_CONNECTION_STRING environment variable is not set.")
     # For now, user_id is 1; replace with login logic as needed
-    app = App(connection_string, user_id=1)
+    # Set HABIT_JOURNAL (e.g. in .env) to a file path to keep working while the server is unreachable
+    app = App(connection_string_from_env(), user_id=1, journal_path=os.getenv("HABIT_JOURNAL"))
     app.mainloop()
\ No newline at end of file
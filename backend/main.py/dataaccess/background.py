@@ -0,0 +1,117 @@
+"""Runs HabitDatabase calls off the Tk main thread and hands results back to it"""
+
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundExecutor:
+    def __init__(self, root, max_workers: int = 2, poll_ms: int = 16,
+                 on_busy_change: Optional[Callable[[bool], None]] = None):
+        """
+        Dispatch blocking calls to worker threads and deliver results via root.after()
+
+        Tk widgets may only be touched from the main thread, so workers never
+        call back directly: finished futures are queued and drained by a
+        poller that only runs (every poll_ms, ~60 fps) while work is pending.
+
+        Args:
+            root: Any Tk widget, used for after() scheduling
+            max_workers: Worker threads for database calls
+            poll_ms: How often finished results are checked while busy
+            on_busy_change: Called on the main thread with True/False as work starts/stops
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self.on_busy_change = on_busy_change
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="habit-db")
+        self._done: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._generations: Dict[str, int] = {}  # channel -> id of the newest request
+        self._futures: Dict[str, Future] = {}
+        self._pending = 0
+        self._polling = False
+
+    def submit(self, channel: Optional[str], fn: Callable, *args,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None, **kwargs) -> Future:
+        """
+        Run fn(*args, **kwargs) on a worker thread
+
+        Only the newest request on a channel is delivered: submitting again,
+        or calling cancel(channel), turns any earlier request into a stale
+        one whose result is dropped. Writes should pass channel=None so they
+        are never cancelled and their result is always delivered.
+
+        Args:
+            channel: Name grouping requests that supersede each other (e.g. "load"), or None
+            fn: Blocking callable, typically a HabitDatabase method
+            on_success: Called on the main thread with fn's return value
+            on_error: Called on the main thread with the exception fn raised
+        """
+        generation = None
+        if channel is not None:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+            previous = self._futures.get(channel)
+            if previous is not None:
+                previous.cancel()  # only succeeds if it has not started yet
+
+        future = self._executor.submit(fn, *args, **kwargs)
+        if channel is not None:
+            self._futures[channel] = future
+        future.add_done_callback(
+            lambda done: self._done.put((channel, generation, done, on_success, on_error))
+        )
+        self._pending += 1
+        if self._pending == 1 and self.on_busy_change is not None:
+            self.on_busy_change(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def cancel(self, channel: str) -> None:
+        """Drop the result of any outstanding request on a channel"""
+        self._generations[channel] = self._generations.get(channel, 0) + 1
+        future = self._futures.pop(channel, None)
+        if future is not None:
+            future.cancel()
+
+    def is_busy(self) -> bool:
+        return self._pending > 0
+
+    def shutdown(self) -> None:
+        """Stop accepting work; queued writes still finish before the process exits"""
+        for channel in list(self._generations):
+            self.cancel(channel)
+        self._executor.shutdown(wait=False)
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                channel, generation, future, on_success, on_error = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if channel is not None:
+                if self._futures.get(channel) is future:
+                    del self._futures[channel]
+                if generation != self._generations.get(channel):
+                    continue  # stale: the user has moved on
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is None:
+                if on_success is not None:
+                    on_success(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"❌ Background database call failed: {error}")
+
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+            if self.on_busy_change is not None:
+                self.on_busy_change(False)
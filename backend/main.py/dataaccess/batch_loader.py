@@ -0,0 +1,107 @@
+"""DataLoader-style batching of per-user habit lookups into HabitDatabase.get_habits_for_users calls"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional
+
+try:  # imported as dataaccess.batch_loader (tests)
+    from .data_access import IN_CHUNK_SIZE, HabitDatabase
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from data_access import IN_CHUNK_SIZE, HabitDatabase
+
+
+class HabitLoader:
+    def __init__(self, db: HabitDatabase, window: float = 0.005, max_batch: int = IN_CHUNK_SIZE):
+        """
+        Merge habit lookups made at about the same time into one batched query
+
+        Each load() call waits up to window seconds for others to join; then
+        every user requested in that window is fetched with a single
+        get_habits_for_users call. A user asked for again while its batch is
+        still waiting or running shares the same result instead of being
+        fetched twice. Safe to call from any number of threads, e.g. the
+        workers rendering an admin dashboard one user at a time.
+
+        Args:
+            db: HabitDatabase the batches are read from
+            window: Seconds a new batch stays open for more requests
+            max_batch: A batch is sent as soon as it holds this many users
+        """
+        self.db = db
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._waiting: Dict[int, Future] = {}  # users of the batch still open
+        self._running: Dict[int, Future] = {}  # users of batches being fetched
+        self._timer: Optional[threading.Timer] = None
+        self.requests = 0
+        self.deduplicated = 0
+        self.batches = 0
+
+    def load(self, user_id: int) -> "Future[List[tuple]]":
+        """Ask for a user's habits; the Future resolves to get_user_habits-style rows"""
+        with self._lock:
+            self.requests += 1
+            future = self._waiting.get(user_id) or self._running.get(user_id)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            future = self._waiting[user_id] = Future()
+            if len(self._waiting) >= self.max_batch:
+                batch = self._take_batch()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.window, self._run_open_batch)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch is not None:
+            self._fetch(batch)
+        return future
+
+    def get(self, user_id: int, timeout: Optional[float] = None) -> List[tuple]:
+        """Blocking load(): a user's habits, batched with whatever else is requested meanwhile"""
+        return self.load(user_id).result(timeout)
+
+    def get_many(self, user_ids: Iterable[int], timeout: Optional[float] = None) -> Dict[int, List[tuple]]:
+        """Habits of several users, grouped per user"""
+        futures = {user_id: self.load(user_id) for user_id in user_ids}
+        return {user_id: future.result(timeout) for user_id, future in futures.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests made, requests answered by another request's fetch, and queries sent"""
+        with self._lock:
+            return {"requests": self.requests, "deduplicated": self.deduplicated, "batches": self.batches}
+
+    def _take_batch(self) -> Dict[int, Future]:
+        """Close the open batch (lock held)"""
+        batch = self._waiting
+        self._waiting = {}
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._running.update(batch)
+        self.batches += 1
+        return batch
+
+    def _run_open_batch(self) -> None:
+        with self._lock:
+            batch = self._take_batch() if self._waiting else None
+        if batch:
+            self._fetch(batch)
+
+    def _fetch(self, batch: Dict[int, Future]) -> None:
+        try:
+            habits = self.db.get_habits_for_users(list(batch))
+        except Exception as e:
+            habits = None
+            error = e
+        with self._lock:
+            for user_id in batch:
+                if self._running.get(user_id) is batch[user_id]:
+                    del self._running[user_id]
+        for user_id, future in batch.items():
+            if habits is None:
+                future.set_exception(error)
+            else:
+                future.set_result(habits.get(user_id, []))  # get_habits_for_users returns {} on errors
@@ -0,0 +1,390 @@
+"""Benchmark suite for HabitDatabase
+
+Builds a synthetic dataset for each requested size, then calls every public
+HabitDatabase method repeatedly and records throughput and p50/p99 latency.
+Results are written as JSON so runs from different releases can be compared.
+
+Usage (from backend/main.py/dataaccess):
+    python benchmark.py                                   # default sizes, throwaway SQLite files
+    python benchmark.py --sizes 100x10x30 1000x10x90 --iterations 500 --output results.json
+    python benchmark.py --baseline old_results.json       # exit code 1 if anything got slower
+    python benchmark.py --connection "DRIVER={...};SERVER=...;DATABASE=BenchDB;..."   # writes to that database!
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+try:  # imported as dataaccess.benchmark (tests)
+    from .analytics import run_analytics
+    from .cache import HabitCache
+    from .data_access import HabitDatabase
+    from .metrics import QueryMetrics
+    from .synthetic import SyntheticDataset, parse_size
+except ImportError:  # run from inside dataaccess/ (python benchmark.py)
+    from analytics import run_analytics
+    from cache import HabitCache
+    from data_access import HabitDatabase
+    from metrics import QueryMetrics
+    from synthetic import SyntheticDataset, parse_size
+
+DEFAULT_SIZES = ("10x10x30", "100x10x30", "1000x10x30")
+BATCH_SIZE = 50  # rows per call for the batch methods
+# Housekeeping methods that are not part of the workload
+NOT_BENCHMARKED = {"warm_up", "pool_stats", "cache_stats", "metrics_snapshot", "close"}
+
+
+class BenchContext:
+    """Everything a benchmark case needs: the database, the loaded ids and a seeded RNG"""
+
+    def __init__(self, db: HabitDatabase, dataset: SyntheticDataset, user_ids: List[int], habit_ids: List[int]):
+        self.db = db
+        self.dataset = dataset
+        self.user_ids = user_ids
+        self.habit_ids = habit_ids
+        self.rng = random.Random(dataset.seed)
+        self._future_days = 0
+
+    def user(self) -> int:
+        return self.rng.choice(self.user_ids)
+
+    def habit(self) -> int:
+        return self.rng.choice(self.habit_ids)
+
+    def future_day(self):
+        """A day after every loaded log, different on every call, so new logs never collide"""
+        self._future_days += 1
+        return self.dataset.end_date + timedelta(days=self._future_days)
+
+    def logged_day(self):
+        """A day inside the loaded log window, so upserts land on logged days as well as gaps"""
+        return self.dataset.start_date + timedelta(days=self.rng.randrange(self.dataset.log_window))
+
+    def new_habits(self, count: int) -> List[int]:
+        """Create throwaway habits (untimed) for the update/delete cases"""
+        ids, _ = self.db.add_habits([(self.user(), "Bench target", "", "Health", "Daily")] * count)
+        return ids
+
+
+class Case:
+    def __init__(self, method: str, run: Callable[[BenchContext, Any], Any],
+                 setup: Optional[Callable[[BenchContext, int], List[Any]]] = None,
+                 rows_per_call: int = 1, max_calls: Optional[int] = None):
+        """
+        One benchmarked HabitDatabase method
+
+        Args:
+            method: HabitDatabase method name (results are keyed by it)
+            run: Called once per timed call with the context and that call's argument
+            setup: Untimed; returns one argument per call (defaults to None for every call)
+            rows_per_call: Rows written/read per call, for rows_per_sec
+            max_calls: Cap on calls for expensive methods
+        """
+        self.method = method
+        self.run = run
+        self.setup = setup
+        self.rows_per_call = rows_per_call
+        self.max_calls = max_calls
+
+
+def _habit_rows(ctx: BenchContext, count: int) -> List[tuple]:
+    return [(ctx.user(), "Bench habit", "Created by benchmark", "Fitness", "Weekly") for _ in range(count)]
+
+
+def _log_rows(ctx: BenchContext, count: int) -> List[tuple]:
+    day = ctx.future_day()
+    return [(habit_id, day) for habit_id in ctx.rng.sample(ctx.habit_ids, min(count, len(ctx.habit_ids)))]
+
+
+def _upsert_rows(ctx: BenchContext, count: int) -> List[tuple]:
+    """Logs on already-logged days and gaps alike, half of them marked not done"""
+    return [(ctx.habit(), ctx.logged_day(), ctx.rng.random() < 0.5) for _ in range(count)]
+
+
+def _journal_writes(ctx: BenchContext, count: int) -> List[dict]:
+    """Queued writes as the offline journal sends them: a mix of adds and updates"""
+    writes = []
+    for habit_id in ctx.new_habits(count // 2):
+        writes.append({"write_key": str(uuid.uuid4()), "operation": "add", "user_id": ctx.user(),
+                       "habit_name": "Bench offline habit", "description": "", "category": "Health", "frequency": "Daily"})
+        writes.append({"write_key": str(uuid.uuid4()), "operation": "update", "habit_id": habit_id,
+                       "category": "Work", "expected_version": 1})
+    return writes
+
+
+def _computed_stats(ctx: BenchContext, count: int) -> List[None]:
+    """Run the analytics job once (untimed) so the statistics reads find rows"""
+    run_analytics(ctx.db, workers=1, today=ctx.dataset.end_date)
+    return [None] * count
+
+
+CASES = [
+    # writes
+    Case("add_habit", lambda ctx, _: ctx.db.add_habit(ctx.user(), "Bench habit", "", "Health", "Daily")),
+    Case("add_habits", lambda ctx, rows: ctx.db.add_habits(rows),
+         setup=lambda ctx, n: [_habit_rows(ctx, BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    Case("update_habit", lambda ctx, habit_id: ctx.db.update_habit(habit_id, 0, "Renamed", "", "Health", "Daily"),
+         setup=lambda ctx, n: ctx.new_habits(n)),
+    Case("update_habit_returning", lambda ctx, habit_id: ctx.db.update_habit_returning(habit_id, category="Work"),
+         setup=lambda ctx, n: ctx.new_habits(n)),
+    Case("update_habits", lambda ctx, ids: ctx.db.update_habits([{"habit_id": i, "category": "Work"} for i in ids]),
+         setup=lambda ctx, n: [ctx.new_habits(BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    Case("delete_habit", lambda ctx, habit_id: ctx.db.delete_habit(habit_id),
+         setup=lambda ctx, n: ctx.new_habits(n)),
+    Case("delete_habit_returning", lambda ctx, habit_id: ctx.db.delete_habit_returning(habit_id),
+         setup=lambda ctx, n: ctx.new_habits(n)),
+    Case("delete_habits", lambda ctx, ids: ctx.db.delete_habits(ids),
+         setup=lambda ctx, n: [ctx.new_habits(BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    Case("apply_writes", lambda ctx, writes: ctx.db.apply_writes(writes),
+         setup=lambda ctx, n: [_journal_writes(ctx, BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    Case("log_completion", lambda ctx, _: ctx.db.log_completion(ctx.habit(), ctx.future_day())),
+    Case("bulk_log", lambda ctx, rows: ctx.db.bulk_log(rows),
+         setup=lambda ctx, n: [_log_rows(ctx, BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    Case("upsert_log", lambda ctx, _: ctx.db.upsert_log(ctx.habit(), ctx.logged_day(), ctx.rng.random() < 0.5)),
+    Case("bulk_upsert_logs", lambda ctx, rows: ctx.db.bulk_upsert_logs(rows),
+         setup=lambda ctx, n: [_upsert_rows(ctx, BATCH_SIZE) for _ in range(n)], rows_per_call=BATCH_SIZE),
+    # reads
+    Case("get_user_habits", lambda ctx, _: ctx.db.get_user_habits(ctx.user())),
+    Case("get_habits_for_users", lambda ctx, _: ctx.db.get_habits_for_users(
+        ctx.rng.sample(ctx.user_ids, min(BATCH_SIZE, len(ctx.user_ids))))),
+    Case("get_habit_by_id", lambda ctx, _: ctx.db.get_habit_by_id(ctx.habit())),
+    Case("get_habits_by_category", lambda ctx, _: ctx.db.get_habits_by_category(ctx.user(), "Health")),
+    Case("iter_user_habits", lambda ctx, _: list(ctx.db.iter_user_habits(ctx.user()))),
+    Case("iter_habits_by_category", lambda ctx, _: list(ctx.db.iter_habits_by_category(ctx.user(), "Health"))),
+    Case("get_user_habits_page", lambda ctx, _: ctx.db.get_user_habits_page(ctx.user(), None, 20)),
+    Case("iter_user_habits_pages", lambda ctx, _: list(ctx.db.iter_user_habits_pages(ctx.user(), page_size=5))),
+    Case("count_user_habits", lambda ctx, _: ctx.db.count_user_habits(ctx.user())),
+    Case("query_user_habits", lambda ctx, _: ctx.db.query_user_habits(ctx.user(), category="Health", sort_by="Habit_Name_",
+                                                                     limit=20)),
+    Case("get_habit_categories", lambda ctx, _: ctx.db.get_habit_categories(ctx.user())),
+    Case("search_habits", lambda ctx, _: ctx.db.search_habits(ctx.user(), "wa")),
+    Case("get_logs", lambda ctx, _: ctx.db.get_logs(ctx.habit())),
+    Case("get_logs_page", lambda ctx, _: ctx.db.get_logs_page(ctx.habit(), None, 20)),
+    Case("count_logs", lambda ctx, _: ctx.db.count_logs(ctx.habit())),
+    Case("get_streak", lambda ctx, _: ctx.db.get_streak(ctx.habit())),
+    Case("get_habit_versions",
+         lambda ctx, _: ctx.db.get_habit_versions(ctx.rng.sample(ctx.habit_ids, min(20, len(ctx.habit_ids))))),
+    Case("get_user_streaks", lambda ctx, _: ctx.db.get_user_streaks(ctx.user())),
+    Case("get_heatmap", lambda ctx, _: ctx.db.get_heatmap(ctx.habit(), ctx.dataset.end_date.year)),
+    Case("get_completion_rate", lambda ctx, _: ctx.db.get_completion_rate(
+        ctx.habit(), ctx.dataset.end_date - timedelta(days=90), ctx.dataset.end_date)),
+    Case("get_done_habits", lambda ctx, _: ctx.db.get_done_habits(ctx.user(), ctx.dataset.end_date)),
+    # completion rollups
+    Case("get_habit_rollup", lambda ctx, _: ctx.db.get_habit_rollup(ctx.habit(), "week")),
+    Case("get_category_rollup", lambda ctx, _: ctx.db.get_category_rollup(ctx.user(), "month")),
+    Case("get_user_rollup", lambda ctx, _: ctx.db.get_user_rollup(
+        ctx.user(), "day", ctx.dataset.end_date - timedelta(days=30), ctx.dataset.end_date)),
+    Case("get_user_stats", lambda ctx, _: ctx.db.get_user_stats(ctx.user()), setup=_computed_stats),
+    # due-habit scheduler (the first call builds it for every user)
+    Case("get_due_habits", lambda ctx, _: ctx.db.get_due_habits(ctx.user(), ctx.dataset.end_date)),
+    Case("get_all_due_habits", lambda ctx, _: ctx.db.get_all_due_habits(ctx.dataset.end_date)),
+    # batch jobs
+    Case("recompute_streaks", lambda ctx, _: ctx.db.recompute_streaks(), max_calls=3),
+    Case("rebuild_calendars", lambda ctx, _: ctx.db.rebuild_calendars(), max_calls=3),
+    Case("rebuild_rollups", lambda ctx, _: ctx.db.rebuild_rollups(), max_calls=3),
+]
+
+
+def uncovered_methods() -> List[str]:
+    """Public HabitDatabase methods without a benchmark case (kept empty by test_benchmark.py)"""
+    covered = {case.method for case in CASES} | NOT_BENCHMARKED
+    return sorted(
+        name for name in dir(HabitDatabase)
+        if not name.startswith("_") and callable(getattr(HabitDatabase, name)) and name not in covered
+    )
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(durations: List[float], rows_per_call: int = 1) -> Dict[str, Any]:
+    """Throughput and latency figures (milliseconds) for a list of call durations in seconds"""
+    ordered = sorted(durations)
+    total = sum(ordered)
+    return {
+        "calls": len(ordered),
+        "rows_per_call": rows_per_call,
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+        "rows_per_sec": len(ordered) * rows_per_call / total if total else 0.0,
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+    }
+
+
+def load_dataset(db: HabitDatabase, dataset: SyntheticDataset) -> Dict[str, Any]:
+    """Insert the dataset through the bulk paths and time each table"""
+    load: Dict[str, Any] = {}
+
+    started = time.perf_counter()
+    with db._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(User_ID), 0) FROM Users")
+        last_user_id = cursor.fetchone()[0]
+        db.engine.executemany(cursor, "INSERT INTO Users (First_Name, Email) VALUES (?, ?)", list(dataset.user_rows()))
+        cursor.execute("SELECT User_ID FROM Users WHERE User_ID > ? ORDER BY User_ID", (last_user_id,))
+        user_ids = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+    load["users"] = _load_figures(dataset.users, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    habit_ids, _ = db.add_habits(dataset.habit_rows(user_ids))
+    habit_ids = [habit_id for habit_id in habit_ids if habit_id is not None]
+    load["habits"] = _load_figures(len(habit_ids), time.perf_counter() - started)
+
+    started = time.perf_counter()
+    inserted, _ = db.bulk_log(dataset.log_rows(habit_ids))
+    load["logs"] = _load_figures(inserted, time.perf_counter() - started)
+    return {"figures": load, "user_ids": user_ids, "habit_ids": habit_ids}
+
+
+def _load_figures(rows: int, seconds: float) -> Dict[str, Any]:
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
+
+
+def run_size(dataset: SyntheticDataset, iterations: int, connection_string: Optional[str] = None,
+             cache: bool = False, cases: Optional[List[Case]] = None, metrics: bool = False) -> Dict[str, Any]:
+    """
+    Load one dataset into a fresh database and benchmark every case against it
+
+    Args:
+        dataset: Synthetic dataset to load
+        iterations: Timed calls per method
+        connection_string: Database to use (defaults to a throwaway SQLite file)
+        cache: Whether HabitDatabase runs with a HabitCache
+        cases: Cases to run (defaults to CASES)
+        metrics: Run with QueryMetrics and add its per-method connect/execute/fetch split to the results
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        db = HabitDatabase(
+            connection_string or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+            cache=HabitCache() if cache else None,
+            metrics=QueryMetrics(slow_query_threshold=None) if metrics else None,
+        )
+        try:
+            with open(os.devnull, "w") as quiet, redirect_stdout(quiet):  # the methods print on every call
+                loaded = load_dataset(db, dataset)
+                ctx = BenchContext(db, dataset, loaded["user_ids"], loaded["habit_ids"])
+                methods = {}
+                for case in cases if cases is not None else CASES:
+                    calls = min(iterations, case.max_calls or iterations)
+                    arguments = case.setup(ctx, calls) if case.setup else [None] * calls
+                    durations = []
+                    for argument in arguments:
+                        started = time.perf_counter()
+                        case.run(ctx, argument)
+                        durations.append(time.perf_counter() - started)
+                    methods[case.method] = summarize(durations, case.rows_per_call)
+            query_metrics = db.metrics_snapshot().get("methods", {})
+        finally:
+            db.close()
+    return {
+        "size": {
+            "users": dataset.users,
+            "habits_per_user": dataset.habits_per_user,
+            "logs_per_habit": dataset.logs_per_habit,
+            "category_skew": dataset.category_skew,
+        },
+        "engine": type(db.engine).__name__,
+        "cache": cache,
+        "load": loaded["figures"],
+        "methods": methods,
+        "query_metrics": query_metrics,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[str]:
+    """
+    List methods whose p50 latency grew by more than threshold against a baseline results file
+
+    Runs are matched on their size; sizes only present in one file are ignored.
+    """
+    regressions = []
+    old_runs = {json.dumps(run["size"], sort_keys=True): run for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        old_run = old_runs.get(json.dumps(run["size"], sort_keys=True))
+        if old_run is None:
+            continue
+        for method, figures in run["methods"].items():
+            old = old_run["methods"].get(method)
+            if old and old["p50_ms"] > 0 and figures["p50_ms"] > old["p50_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{_size_label(run['size'])} {method}: p50 {old['p50_ms']:.3f} ms -> {figures['p50_ms']:.3f} ms"
+                )
+    return regressions
+
+
+def _size_label(size: Dict[str, Any]) -> str:
+    return f"{size['users']}x{size['habits_per_user']}x{size['logs_per_habit']}"
+
+
+def print_report(run: Dict[str, Any]) -> None:
+    print(f"\n=== {_size_label(run['size'])} ({run['engine']}, cache={'on' if run['cache'] else 'off'}) ===")
+    for table, figures in run["load"].items():
+        print(f"load {table:<8} {figures['rows']:>10} rows  {figures['rows_per_sec']:>12,.0f} rows/s")
+    print(f"{'method':<26}{'ops/s':>12}{'rows/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+    for method, figures in run["methods"].items():
+        print(f"{method:<26}{figures['ops_per_sec']:>12,.0f}{figures['rows_per_sec']:>12,.0f}"
+              f"{figures['p50_ms']:>10.3f}{figures['p99_ms']:>10.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark HabitDatabase on synthetic data")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), help="USERSxHABITSxLOGS per run")
+    parser.add_argument("--category-skew", type=float, default=1.0, help="Zipf exponent for category popularity")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per method")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="Run HabitDatabase with a HabitCache")
+    parser.add_argument("--metrics", action="store_true", help="Also record connect/execute/fetch timings")
+    parser.add_argument("--connection", help="Connection string to benchmark (default: throwaway SQLite files)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "runs": [],
+    }
+    for size in args.sizes:
+        users, habits, logs = parse_size(size)
+        dataset = SyntheticDataset(users, habits, logs, category_skew=args.category_skew, seed=args.seed)
+        run = run_size(dataset, args.iterations, args.connection, args.cache, metrics=args.metrics)
+        results["runs"].append(run)
+        print_report(run)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"❌ Slower than baseline: {line}")
+        if regressions:
+            return 1
+        print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
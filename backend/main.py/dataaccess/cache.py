@@ -0,0 +1,195 @@
+"""Read-through cache of each user's habits for HabitDatabase"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+HabitRow = Tuple[Any, ...]
+
+
+class _UserEntry:
+    __slots__ = ("habits", "loaded_at", "size")
+
+    def __init__(self, habits: Dict[int, HabitRow], loaded_at: float, size: int):
+        self.habits = habits  # Habit_ID -> row, in the order the database returned them
+        self.loaded_at = loaded_at
+        self.size = size
+
+
+class HabitCache:
+    def __init__(self, ttl: float = 60.0, max_users: int = 1000, max_bytes: int = 32 * 1024 * 1024):
+        """
+        Cache of complete per-user habit lists with LRU eviction
+
+        Args:
+            ttl: Seconds a user's habits are served before being reloaded
+            max_users: Most users kept at once
+            max_bytes: Approximate memory budget for all cached rows
+        """
+        self.ttl = ttl
+        self.max_users = max_users
+        self.max_bytes = max_bytes
+        self._users: "OrderedDict[int, _UserEntry]" = OrderedDict()  # least recently used first
+        self._owners: Dict[int, int] = {}  # Habit_ID -> User_ID for every cached habit
+        self._bytes = 0
+        self._writes = 0  # bumped by every patch/invalidation, see load_token()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # === READS ===
+
+    def get_user_habits(self, user_id: int) -> Optional[List[HabitRow]]:
+        """Return the user's cached habits, or None on a miss"""
+        with self._lock:
+            entry = self._warm_entry(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(entry.habits.values())
+
+    def get_habit(self, habit_id: int) -> Tuple[bool, Optional[HabitRow]]:
+        """Return (hit, row); a hit needs the habit's owner to be cached"""
+        with self._lock:
+            user_id = self._owners.get(habit_id)
+            entry = self._warm_entry(user_id) if user_id is not None else None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entry.habits.get(habit_id)
+
+    def get_habits_by_category(self, user_id: int, category: str) -> Optional[List[HabitRow]]:
+        """Filter the user's cached habits by category, or None on a miss"""
+        with self._lock:
+            entry = self._warm_entry(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [row for row in entry.habits.values() if row[3] == category]
+
+    # === WRITES ===
+
+    def load_token(self) -> int:
+        """Take before querying the database; pass to put_user_habits afterwards"""
+        with self._lock:
+            return self._writes
+
+    def put_user_habits(self, user_id: int, habits: Iterable[HabitRow], token: Optional[int] = None) -> None:
+        """
+        Store a freshly loaded, complete habit list for a user
+
+        If any write was applied since load_token() was taken the rows may
+        already be stale, so they are not cached.
+        """
+        rows = {row[0]: row for row in habits}
+        entry = _UserEntry(rows, time.monotonic(), sum(_row_size(row) for row in rows.values()))
+        with self._lock:
+            if token is not None and token != self._writes:
+                return
+            self._drop(user_id)
+            self._users[user_id] = entry
+            self._bytes += entry.size
+            for habit_id in rows:
+                self._owners[habit_id] = user_id
+            self._evict()
+
+    def add_habit(self, user_id: int, row: HabitRow) -> None:
+        """Patch a newly created habit into its owner's list if that list is cached"""
+        with self._lock:
+            self._writes += 1
+            entry = self._users.get(user_id)
+            if entry is not None:
+                self._store(user_id, entry, row)
+
+    def update_habit(self, row: HabitRow) -> None:
+        """Patch an updated habit into its owner's list if that list is cached"""
+        with self._lock:
+            self._writes += 1
+            user_id = self._owners.get(row[0])
+            entry = self._users.get(user_id) if user_id is not None else None
+            if entry is not None:
+                self._store(user_id, entry, row)
+
+    def remove_habit(self, habit_id: int) -> None:
+        """Remove a deleted habit from its owner's list"""
+        with self._lock:
+            self._writes += 1
+            user_id = self._owners.pop(habit_id, None)
+            entry = self._users.get(user_id) if user_id is not None else None
+            if entry is not None and habit_id in entry.habits:
+                size = _row_size(entry.habits.pop(habit_id))
+                entry.size -= size
+                self._bytes -= size
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forget a user's habits so the next read reloads them"""
+        with self._lock:
+            self._writes += 1
+            self._drop(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._writes += 1
+            self._users.clear()
+            self._owners.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current occupancy"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "users": len(self._users),
+                "bytes": self._bytes,
+            }
+
+    # === INTERNALS (lock held) ===
+
+    def _warm_entry(self, user_id: int) -> Optional[_UserEntry]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.loaded_at > self.ttl:
+            self._drop(user_id)
+            return None
+        self._users.move_to_end(user_id)
+        return entry
+
+    def _store(self, user_id: int, entry: _UserEntry, row: HabitRow) -> None:
+        old = entry.habits.get(row[0])
+        size = _row_size(row) - (_row_size(old) if old is not None else 0)
+        entry.habits[row[0]] = row
+        entry.size += size
+        self._bytes += size
+        self._owners[row[0]] = user_id
+        self._evict()
+
+    def _drop(self, user_id: int) -> None:
+        entry = self._users.pop(user_id, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for habit_id in entry.habits:
+            if self._owners.get(habit_id) == user_id:
+                del self._owners[habit_id]
+
+    def _evict(self) -> None:
+        while self._users and (len(self._users) > self.max_users or self._bytes > self.max_bytes):
+            user_id = next(iter(self._users))
+            self._drop(user_id)
+            self.evictions += 1
+
+
+def _row_size(row: HabitRow) -> int:
+    """Rough memory footprint of one cached row"""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
@@ -0,0 +1,130 @@
+"""Bitset completion calendars: one bit per habit period, one blob per habit-year
+
+Periods are the streaks.py period numbers for the habit's Frequency. A
+habit-year holds the periods that start in that calendar year (its days, the
+weeks whose Monday falls in it, its months, or the year itself), so a Daily
+habit's year is 46 bytes instead of up to 366 Habit_Logs rows, and heatmaps,
+completion rates and "done this period?" checks are bit operations.
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:  # imported as dataaccess.calendar_bits (tests)
+    from .streaks import normalize_frequency, period_index
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from streaks import normalize_frequency, period_index
+
+_EPOCH = date(1970, 1, 1)
+
+
+def period_start(frequency: Optional[str], period: int) -> date:
+    """First day of a period number (inverse of streaks.period_index)"""
+    frequency = normalize_frequency(frequency)
+    if frequency == "Daily":
+        return _EPOCH + timedelta(days=period)
+    if frequency == "Weekly":
+        return _EPOCH + timedelta(days=period * 7 - 3)  # weeks start on Monday 1969-12-29
+    if frequency == "Monthly":
+        return date(1970 + period // 12, period % 12 + 1, 1)
+    return date(1970 + period, 1, 1)
+
+
+def period_year(frequency: Optional[str], period: int) -> int:
+    """Calendar year whose blob holds a period (the year the period starts in)"""
+    return period_start(frequency, period).year
+
+
+def year_periods(frequency: Optional[str], year: int) -> Tuple[int, int]:
+    """(first period number, number of periods) stored in one habit-year"""
+    first = period_index(frequency, date(year, 1, 1))
+    if period_start(frequency, first).year < year:  # a week that began in December
+        first += 1
+    following = period_index(frequency, date(year + 1, 1, 1))
+    if period_start(frequency, following).year <= year:
+        following += 1
+    return first, following - first
+
+
+class CompletionBitmap:
+    __slots__ = ("frequency", "year", "first", "size", "bits")
+
+    def __init__(self, frequency: Optional[str], year: int, blob: Optional[bytes] = None):
+        """
+        Completed periods of one habit in one year, bit i being period first + i
+
+        Args:
+            frequency: The habit's Frequency
+            year: Calendar year
+            blob: Stored bytes (Habit_Calendar.Bits), or None for an empty year
+        """
+        self.frequency = normalize_frequency(frequency)
+        self.year = year
+        self.first, self.size = year_periods(self.frequency, year)
+        length = (self.size + 7) // 8
+        self.bits = bytearray(blob[:length] if blob else b"").ljust(length, b"\0")
+
+    def set(self, period: int, done: bool = True) -> None:
+        offset = self._offset(period)
+        if done:
+            self.bits[offset >> 3] |= 1 << (offset & 7)
+        else:
+            self.bits[offset >> 3] &= ~(1 << (offset & 7))
+
+    def get(self, period: int) -> bool:
+        offset = period - self.first
+        if not 0 <= offset < self.size:
+            return False
+        return bool(self.bits[offset >> 3] >> (offset & 7) & 1)
+
+    def is_done(self, day: date) -> bool:
+        """True if the period containing day was completed"""
+        return self.get(period_index(self.frequency, day))
+
+    def count(self, first: Optional[int] = None, last: Optional[int] = None) -> int:
+        """Completed periods numbered first..last (the whole year by default)"""
+        start = max(0, (first if first is not None else self.first) - self.first)
+        stop = min(self.size, (last if last is not None else self.first + self.size - 1) - self.first + 1)
+        if stop <= start:
+            return 0
+        value = int.from_bytes(self.bits, "little") >> start
+        return (value & ((1 << (stop - start)) - 1)).bit_count()
+
+    def days(self) -> List[Tuple[date, bool]]:
+        """(first day of period, completed) for every period of the year, e.g. for a heatmap"""
+        value = int.from_bytes(self.bits, "little")
+        return [(period_start(self.frequency, self.first + i), bool(value >> i & 1)) for i in range(self.size)]
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+    def _offset(self, period: int) -> int:
+        offset = period - self.first
+        if not 0 <= offset < self.size:
+            raise ValueError(f"period {period} is not in {self.year}")
+        return offset
+
+
+def build_calendars(frequency: Optional[str], completed_dates: Iterable[date]) -> Dict[int, CompletionBitmap]:
+    """Bitmaps per year from a habit's completed log dates"""
+    calendars: Dict[int, CompletionBitmap] = {}
+    for day in completed_dates:
+        period = period_index(frequency, day)
+        year = period_year(frequency, period)
+        if year not in calendars:
+            calendars[year] = CompletionBitmap(frequency, year)
+        calendars[year].set(period)
+    return calendars
+
+
+def completion_rate(frequency: Optional[str], calendars: Dict[int, CompletionBitmap], start: date, end: date) -> float:
+    """Share of the periods from start to end (inclusive) that were completed"""
+    first, last = period_index(frequency, start), period_index(frequency, end)
+    if last < first:
+        return 0.0
+    done = sum(
+        calendars[year].count(first, last)
+        for year in range(period_year(frequency, first), period_year(frequency, last) + 1)
+        if year in calendars
+    )
+    return done / (last - first + 1)
@@ -1,31 +1,163 @@
 """Data Access Layer for Habit Tracker Database"""
 
-import pyodbc
-from datetime import datetime
-from typing import List, Tuple, Optional
-from dotenv import load_dotenv
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import chain, groupby, islice
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Set, Tuple, Optional
 import os
+import threading
+import time
 
-load_dotenv()  # Loads variables from .env
+try:  # imported as dataaccess.data_access (tests)
+    from .cache import HabitCache
+    from .calendar_bits import CompletionBitmap, build_calendars, completion_rate, period_start, period_year
+    from .engines import ADDED, CONFLICT, DELETED, HABIT_COLUMNS, NOT_FOUND, UNCHANGED, UPDATED, create_engine
+    from .metrics import InstrumentedConnection, QueryMetrics, caller_method
+    from .pool import ConnectionPool, PoolTimeout
+    from .rollups import GRAINS, ROLLUP_COUNTERS, ROLLUP_TABLES, grain_period, grain_start, rollup_deltas
+    from .scheduler import DueScheduler
+    from .search import InvertedIndex, build_index, tokenize
+    from .streaks import StreakState, advance, compute_streaks, current_streak, period_index
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from cache import HabitCache
+    from calendar_bits import CompletionBitmap, build_calendars, completion_rate, period_start, period_year
+    from engines import ADDED, CONFLICT, DELETED, HABIT_COLUMNS, NOT_FOUND, UNCHANGED, UPDATED, create_engine
+    from metrics import InstrumentedConnection, QueryMetrics, caller_method
+    from pool import ConnectionPool, PoolTimeout
+    from rollups import GRAINS, ROLLUP_COUNTERS, ROLLUP_TABLES, grain_period, grain_start, rollup_deltas
+    from scheduler import DueScheduler
+    from search import InvertedIndex, build_index, tokenize
+    from streaks import StreakState, advance, compute_streaks, current_streak, period_index
 
-# Load the connection string from environment variables
-connection_string = os.getenv("DB_CONNECTION_STRING")
-if connection_string is None:
-    raise ValueError("DB_CONNECTION_STRING environment variable is not set.")
-print("Loaded connection string:", connection_string)  # For debugging
+HABIT_FIELDS = ("user_id", "habit_name", "description", "category", "frequency")
+HABIT_SELECT = "Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt FROM Habits"
+LOG_COLUMNS = "Log_ID, Habit_ID, Log_Date, Habit_Status, Note, logged_At"
+LOG_INSERT = "INSERT INTO Habit_Logs (Habit_ID, Log_Date, Habit_Status, Note) VALUES (?, ?, ?, ?)"
+STREAK_SELECT = """
+    SELECT h.Habit_ID, h.Frequency, s.Current_Streak, s.Longest_Streak, s.Last_Period
+    FROM Habits h LEFT JOIN Habit_Streaks s ON s.Habit_ID = h.Habit_ID
+"""
+CALENDAR_INSERT = "INSERT INTO Habit_Calendar (Habit_ID, Calendar_Year, Bits) VALUES (?, ?, ?)"
+# Per-user rollups summed from Habit_Rollup, for rebuilds and habits that moved or went away
+ROLLUP_FROM_HABITS = {
+    "Category_Rollup": """
+        INSERT INTO Category_Rollup (User_ID, Category, Grain, Period, Completed, Logged)
+        SELECT h.User_ID, COALESCE(h.Category, ''), r.Grain, r.Period, SUM(r.Completed), SUM(r.Logged)
+        FROM Habit_Rollup r JOIN Habits h ON h.Habit_ID = r.Habit_ID{filter}
+        GROUP BY h.User_ID, COALESCE(h.Category, ''), r.Grain, r.Period
+    """,
+    "User_Rollup": """
+        INSERT INTO User_Rollup (User_ID, Grain, Period, Completed, Logged)
+        SELECT h.User_ID, r.Grain, r.Period, SUM(r.Completed), SUM(r.Logged)
+        FROM Habit_Rollup r JOIN Habits h ON h.Habit_ID = r.Habit_ID{filter}
+        GROUP BY h.User_ID, r.Grain, r.Period
+    """,
+}
+# bulk_upsert_logs count of rows replaced by a later row for the same habit and day, never sent
+SUPERSEDED = "superseded"
+IN_CHUNK_SIZE = 1000  # SQL Server allows at most 2100 parameters per statement
+# Column widths from database/create_table.sql, checked up front so one bad row
+# is reported on its own instead of failing a whole bulk chunk
+HABIT_FIELD_LIMITS = {"habit_name": 100, "category": 50, "frequency": 20}
+# Columns query_user_habits may sort by; only these names ever reach the SQL text
+SORTABLE_HABIT_COLUMNS = HABIT_COLUMNS
 
 class HabitDatabase:
-    def __init__(self, connection_string: str):
-        """Initialize the database connection"""
+    def __init__(
+        self,
+        connection_string: str,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_idle_timeout: float = 300.0,
+        pool_checkout_timeout: float = 30.0,
+        cache: Optional[HabitCache] = None,
+        metrics: Optional[QueryMetrics] = None,
+    ):
+        """
+        Initialize the storage engine and its connection pool
+
+        The engine is picked from the connection string: 'sqlite:///habits.db'
+        uses embedded SQLite, anything else is an ODBC string for SQL Server.
+        Connections are opened lazily on first use; call warm_up() to open
+        pool_min_size of them up front.
+
+        Args:
+            connection_string: ODBC connection string or sqlite:/// URL
+            pool_min_size: Connections kept open while idle
+            pool_max_size: Maximum number of simultaneous connections
+            pool_idle_timeout: Seconds before an extra idle connection is closed
+            pool_checkout_timeout: Seconds to wait for a free connection
+            cache: Optional HabitCache serving repeat reads of a user's habits
+            metrics: Optional QueryMetrics recording per-method query timings and slow queries
+        """
         self.connection_string = connection_string
-    
+        self.engine = create_engine(connection_string)
+        self.pool = ConnectionPool(
+            self._connect,
+            min_size=pool_min_size,
+            max_size=pool_max_size,
+            idle_timeout=pool_idle_timeout,
+            checkout_timeout=pool_checkout_timeout,
+            ping=self.engine.ping,
+        )
+        self.cache = cache
+        self.metrics = metrics
+        # In-process search index, only built (on the first search) when the
+        # database has no full-text index; the write methods keep it current
+        self.search_index: Optional[InvertedIndex] = None
+        self._full_text: Optional[bool] = None  # whether the database can search itself, checked once
+        self._search_lock = threading.Lock()
+        # Due-habit scheduler, built on the first due-habit query and kept
+        # current by the write methods from then on
+        self.scheduler: Optional[DueScheduler] = None
+        self._scheduler_lock = threading.Lock()
+
+    def _connect(self):
+        """Private method to open a brand-new database connection"""
+        return self.engine.connect()
+
+    @contextmanager
     def _get_connection(self):
-        """Private method to get database connection"""
-        return pyodbc.connect(self.connection_string)
+        """Private method to borrow a pooled database connection"""
+        if self.metrics is None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+
+        method = caller_method(self)
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            self.metrics.record(method, "connect", time.perf_counter() - started)
+            instrumented = InstrumentedConnection(conn, self.metrics, method)
+            try:
+                yield instrumented
+            finally:
+                instrumented.finish()
+
+    def warm_up(self) -> None:
+        """Open pool_min_size connections ahead of the first query"""
+        self.pool.warm_up()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool counters (checkouts, waits, creations, ...)"""
+        return self.pool.stats()
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.pool.close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters (empty when caching is off)"""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """Return query timings per method (empty when metrics are off), see QueryMetrics"""
+        return self.metrics.snapshot() if self.metrics is not None else {}
     
     # === HABIT MANAGEMENT FUNCTIONS ===
 
-    def add_habit(self, user_id: int, habit_name: str, description: str, category: str, frequency: str) -> bool:
+    def add_habit(self, user_id: int, habit_name: str, description: str, category: str, frequency: str,
+                  start_date: Optional[date] = None) -> bool:
         """
         Add a new habit to the database
 
@@ -35,50 +167,220 @@ class HabitDatabase:
             description: Description of what the habit involves
             category: Category (e.g., 'Health', 'Productivity', 'Personal')
             frequency: How often ('Daily', 'Weekly', 'Monthly')
+            start_date: First day the habit is due (defaults to today)
 
         Returns:
             bool: True if successful, False if error
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
 
-            # Insert new habit
-            cursor.execute("""
-                INSERT INTO Habits (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, habit_name, description, category, frequency, datetime.now()))
+                # Insert new habit
+                start_date = _as_date(start_date or date.today())
+                habit = self.engine.insert_habit(
+                    cursor, (user_id, habit_name, description, category, frequency, datetime.now(), start_date)
+                )
 
-            conn.commit()
+                conn.commit()
+            if self.cache is not None:
+                self.cache.add_habit(user_id, habit)
+            if self.search_index is not None:
+                self.search_index.add_habit(user_id, habit[0], habit_name, description)
+            if self.scheduler is not None:
+                self.scheduler.add(habit[0], user_id, frequency, start_date)
             print(f"✅ Successfully added habit: {habit_name}")
             return True
 
-        except pyodbc.Error as e:
+        except self.engine.Error as e:
             print(f"❌ Error adding habit: {e}")
             return False
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return False
-        finally:
-            if 'conn' in locals():
-                conn.close()
                 
+    def add_habits(self, rows: Iterable, chunk_size: int = 1000) -> Tuple[List[Optional[int]], List[Tuple[int, str]]]:
+        """
+        Add many habits at once, one transaction per chunk
+
+        Args:
+            rows: Any iterable (it is streamed, not loaded) of tuples in add_habit
+                argument order (user_id, habit_name, description, category, frequency)
+                or dicts keyed by those names (plus an optional 'start_date');
+                StartDate defaults to today
+            chunk_size: Rows sent to the database per transaction
+
+        Returns:
+            Tuple: (habit_ids, failures) where habit_ids lines up with the input
+            rows (None for a failed row) and failures is a list of
+            (row_index, error message); if the database cannot be reached
+            part-way, the rows not yet added are reported as failures
+        """
+        habit_ids: List[Optional[int]] = []
+        failures: List[Tuple[int, str]] = []
+        row_iter = enumerate(rows)
+        added = 0
+        unreachable: Optional[Exception] = None
+
+        while unreachable is None:
+            chunk = list(islice(row_iter, chunk_size))
+            if not chunk:
+                break
+
+            # Validate in Python first so bad rows never reach the database
+            valid = []
+            for index, row in chunk:
+                habit_ids.append(None)
+                try:
+                    valid.append((index, self._habit_row_values(row)))
+                except (TypeError, ValueError) as e:
+                    failures.append((index, str(e)))
+            if not valid:
+                continue
+
+            if self.cache is not None:
+                for user_id in {values[0] for _, values in valid}:
+                    self.cache.invalidate_user(user_id)
+
+            try:
+                with self._get_connection() as conn:
+                    cursor = conn.cursor()
+                    new_ids = self.engine.insert_habits(cursor, [values for _, values in valid])
+                    conn.commit()
+                for (index, values), habit_id in zip(valid, new_ids):
+                    habit_ids[index] = habit_id
+                    if self.search_index is not None:
+                        self.search_index.add_habit(values[0], habit_id, values[1], values[2])
+                    if self.scheduler is not None:
+                        self.scheduler.add(habit_id, values[0], values[4], values[6])
+                added += len(new_ids)
+            except self.engine.data_errors:
+                # Something in this chunk was rejected by the database; retry the
+                # chunk one row at a time to isolate the failing rows
+                for position, (index, values) in enumerate(valid):
+                    try:
+                        with self._get_connection() as conn:
+                            cursor = conn.cursor()
+                            habit_ids[index] = self.engine.insert_habits(cursor, [values])[0]
+                            conn.commit()
+                        if self.search_index is not None:
+                            self.search_index.add_habit(values[0], habit_ids[index], values[1], values[2])
+                        if self.scheduler is not None:
+                            self.scheduler.add(habit_ids[index], values[0], values[4], values[6])
+                        added += 1
+                    except self.engine.data_errors as e:
+                        failures.append((index, str(e)))
+                    except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                        unreachable = e
+                        failures += [(index, str(e)) for index, _ in valid[position:]]
+                        break
+            except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                # The database or the pool is not usable; retrying row by row would only fail again
+                unreachable = e
+                failures += [(index, str(e)) for index, _ in valid]
+
+        if unreachable is not None:
+            for index, _ in row_iter:
+                habit_ids.append(None)
+                failures.append((index, str(unreachable)))
+            print(f"❌ Stopped adding habits: {unreachable}")
+        failures.sort()
+        print(f"✅ Bulk added {added} habits ({len(failures)} failed)")
+        return habit_ids, failures
+
+    @staticmethod
+    def _habit_row_values(row) -> Tuple[int, str, str, str, str, datetime, date]:
+        """Private helper that turns one add_habits row into INSERT parameters"""
+        start_date = None
+        if isinstance(row, Mapping):
+            values = [row.get(field) for field in HABIT_FIELDS]
+            start_date = row.get("start_date")
+        else:
+            values = list(row)
+            if len(values) != len(HABIT_FIELDS):
+                raise ValueError(f"expected {len(HABIT_FIELDS)} values, got {len(values)}")
+        fields = dict(zip(HABIT_FIELDS, values))
+        if not isinstance(fields["user_id"], int):
+            raise TypeError("user_id must be an integer")
+        if not fields["habit_name"]:
+            raise ValueError("habit_name cannot be empty")
+        for field, limit in HABIT_FIELD_LIMITS.items():
+            if fields[field] is not None and len(fields[field]) > limit:
+                raise ValueError(f"{field} is longer than {limit} characters")
+        return tuple(values) + (datetime.now(), _as_date(start_date or date.today()))
+
     def get_user_habits(self, user_id: int) -> List[Tuple[int, str, str, str, str, datetime]]:
+        if self.cache is not None:
+            cached = self.cache.get_user_habits(user_id)
+            if cached is not None:
+                return cached
+            token = self.cache.load_token()
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt FROM Habits WHERE User_ID = ?",
-                (user_id,)
-            )
-            habits = cursor.fetchall()
-            return [tuple(row) for row in habits]
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt FROM Habits WHERE User_ID = ?",
+                    (user_id,)
+                )
+                habits = cursor.fetchall()
+            habits = [tuple(row) for row in habits]
+            if self.cache is not None:
+                self.cache.put_user_habits(user_id, habits, token)
+            return habits
         except Exception as e:
             print(f"❌ Error fetching habits: {e}")
             return []  # Always return a list
-        finally:
-            if 'conn' in locals():
-                conn.close()
+
+    def get_habits_for_users(self, user_ids: Iterable[int]) -> Dict[int, List[Tuple[int, str, str, str, str, datetime]]]:
+        """
+        Get the habits of many users in a few queries, e.g. for reports across users
+
+        Users already in the cache are served from it; the rest are fetched
+        IN_CHUNK_SIZE users per query on one connection, so the cost grows
+        with the number of chunks rather than the number of users. See
+        batch_loader.HabitLoader for merging requests from several threads.
+
+        Args:
+            user_ids: User IDs (duplicates are fetched once)
+
+        Returns:
+            Dict: User_ID -> habits in get_user_habits form, with an entry
+            (possibly empty) for every requested user; {} on error
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        result: Dict[int, List[Tuple[int, str, str, str, str, datetime]]] = {}
+        missing = user_ids
+        if self.cache is not None:
+            missing = []
+            for user_id in user_ids:
+                cached = self.cache.get_user_habits(user_id)
+                if cached is not None:
+                    result[user_id] = cached
+                else:
+                    missing.append(user_id)
+            token = self.cache.load_token()
+        if not missing:
+            return result
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for chunk in _chunks(missing, IN_CHUNK_SIZE):
+                    for user_id in chunk:
+                        result[user_id] = []
+                    cursor.execute(f"""
+                        SELECT User_ID, {HABIT_SELECT}
+                        WHERE User_ID IN ({', '.join('?' for _ in chunk)})
+                        ORDER BY User_ID, Habit_ID
+                    """, chunk)
+                    for row in cursor.fetchall():
+                        result[row[0]].append(tuple(row[1:]))
+            if self.cache is not None:
+                for user_id in missing:
+                    self.cache.put_user_habits(user_id, result[user_id], token)
+            return result
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habits for {len(user_ids)} users: {e}")
+            return {}
 
     def get_habit_by_id(self, habit_id: int) -> Optional[Tuple[int, str, str, str, str, datetime]]:
         """
@@ -91,33 +393,38 @@ class HabitDatabase:
             Optional[Tuple]: Habit details or None if not found
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt 
-                FROM Habits WHERE Habit_ID = ?
-            """, (habit_id,))
-            
-            habit = cursor.fetchone()
+            if self.cache is not None:
+                hit, habit = self.cache.get_habit(habit_id)
+            else:
+                hit = False
+            if not hit:
+                with self._get_connection() as conn:
+                    habit = self._fetch_habit(conn.cursor(), habit_id)
             if habit:
-                return tuple(habit) # Convert to tuple for consistency 
+                return habit
             else:
                 print(f"❌ Habit with ID {habit_id} not found")
             
             return None
         
-        except pyodbc.Error as e:
+        except self.engine.Error as e:
             print(f"❌ Error fetching habit: {e}")
             return None
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return None
-        finally:
-            if 'conn' in locals():
-                conn.close()
+
+    def _fetch_habit(self, cursor, habit_id: int) -> Optional[Tuple[int, str, str, str, str, datetime]]:
+        """Private helper that reads one habit on an already borrowed connection"""
+        cursor.execute("""
+            SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt 
+            FROM Habits WHERE Habit_ID = ?
+        """, (habit_id,))
+        habit = cursor.fetchone()
+        return tuple(habit) if habit else None # Convert to tuple for consistency 
                 
-    def update_habit(self, habit_id: int, user_id: int, habit_name: str, description: str, category: str, frequency: str) -> bool:
+    def update_habit(self, habit_id: int, user_id: int, habit_name: str, description: str, category: str, frequency: str,
+                     expected_version: Optional[int] = None) -> bool:
         """
         Update an existing habit
 
@@ -128,71 +435,144 @@ class HabitDatabase:
             description: New description of the habit
             category: New category of the habit
             frequency: New frequency of the habit
+            expected_version: Row_Version the caller last saw; the update is
+                refused if someone else changed the habit since (None skips the check)
 
         Returns:
             bool: True if successful, False if error
         """
         
         try:
-            #first check if the habit exists
-            existing_habit = self.get_habit_by_id(habit_id)
-            if not existing_habit:
-                print(f"❌ Habit with ID {habit_id} does not exist")
-                return False#
-            
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Build dynamic update query
-            update_fields = []
-            values = []
-            
-            if habit_name is not None:
-                update_fields.append("Habit_Name_ = ?")
-                values.append(habit_name)
-            if description is not None:
-                update_fields.append("Description_ = ?")
-                values.append(description)
-            if category is not None:
-                update_fields.append("Category = ?")
-                values.append(category)
-            if frequency is not None:
-                update_fields.append("Frequency = ?")
-                values.append(frequency)
-            
-            if not update_fields:
-                print("❌ No fields to update")
-                return False
-            
-            # add habit ID to values for WHERE clause 
-            values.append(habit_id)
-            
-            query = f"""
-                UPDATE Habits 
-                SET {', '.join(update_fields)} 
-                WHERE Habit_ID = ?
-            """
-            cursor.execute(query, values)
-            
-            if cursor.rowcount > 0:
-                conn.commit()
+            status, _ = self.update_habit_returning(
+                habit_id, habit_name, description, category, frequency, expected_version=expected_version
+            )
+            if status == UPDATED:
                 print(f"✅ Successfully updated habit with ID {habit_id}")
                 return True
+            elif status == CONFLICT:
+                print(f"❌ Habit with ID {habit_id} was changed by someone else")
             else:
-                return False
+                print(f"❌ Habit with ID {habit_id} does not exist")
+            return False
 
-        except pyodbc.Error as e:
+        except self.engine.Error as e:
             print(f"❌ Error updating habit: {e}")  
             return False
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return False
-        finally:
-            if 'conn' in locals():
-                conn.close()
+
+    def update_habit_returning(self, habit_id: int, habit_name: Optional[str] = None, description: Optional[str] = None,
+                               category: Optional[str] = None, frequency: Optional[str] = None,
+                               expected_version: Optional[int] = None) -> Tuple[str, Optional[tuple]]:
+        """
+        Update a habit in one statement and return the updated row
+
+        Args:
+            habit_id: ID of the habit to update
+            habit_name, description, category, frequency: New values (None leaves a column alone)
+            expected_version: Row_Version for optimistic concurrency, or None
+
+        Returns:
+            Tuple: (UPDATED, row with Row_Version appended), (NOT_FOUND, None)
+            or (CONFLICT, None); database errors are raised
+        """
+        habit_id = int(habit_id)  # Treeview iids arrive as strings; the cache and scheduler are keyed by int
+        update_fields, values = self._build_habit_set_clause(habit_name, description, category, frequency)
+        if not update_fields:
+            raise ValueError("No fields to update")
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            before = self._habit_rollup_totals(cursor, habit_id) if category is not None else None
+            status, row = self.engine.update_habit_row(cursor, habit_id, update_fields, values, expected_version)
+            if status == UPDATED:
+                if frequency is not None:
+                    self._on_frequency_changed(cursor, habit_id, frequency)  # periods are counted differently now
+                if category is not None:
+                    self._on_category_changed(cursor, habit_id, before)
+                conn.commit()
+        if status == UPDATED and self.cache is not None:
+            self.cache.update_habit(row[:-1])
+        if status == UPDATED and self.search_index is not None:
+            self.search_index.update_habit(row[0], row[1], row[2])
+        if status == UPDATED and frequency is not None:
+            self._reschedule([habit_id])
+        return status, row
+
+    def update_habits(self, changes: Iterable[Mapping[str, Any]], atomic: bool = False) -> List[Tuple[str, Optional[tuple]]]:
+        """
+        Update many habits in one transaction
+
+        Args:
+            changes: Dicts with 'habit_id' plus any of 'habit_name', 'description',
+                'category', 'frequency' and 'expected_version'
+            atomic: If True, any NOT_FOUND/CONFLICT rolls the whole batch back
+
+        Returns:
+            List of (status, row) in the same order as changes; database errors are raised
+        """
+        results = []
+        rescheduled = []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for change in changes:
+                update_fields, values = self._build_habit_set_clause(
+                    change.get("habit_name"), change.get("description"), change.get("category"), change.get("frequency")
+                )
+                if not update_fields:
+                    raise ValueError(f"No fields to update for habit {change['habit_id']}")
+                before = self._habit_rollup_totals(cursor, change["habit_id"]) if change.get("category") is not None else None
+                status, row = self.engine.update_habit_row(
+                    cursor, change["habit_id"], update_fields, values, change.get("expected_version")
+                )
+                if status == UPDATED and change.get("frequency") is not None:
+                    self._on_frequency_changed(cursor, change["habit_id"], change["frequency"])
+                    rescheduled.append(change["habit_id"])
+                if status == UPDATED and change.get("category") is not None:
+                    self._on_category_changed(cursor, change["habit_id"], before)
+                results.append((status, row))
+            if atomic and any(status != UPDATED for status, _ in results):
+                conn.rollback()
+                print("❌ Batch update rolled back: some habits were missing or changed")
+                return [(status, None) for status, _ in results]
+            conn.commit()
+        if self.cache is not None:
+            for status, row in results:
+                if status == UPDATED:
+                    self.cache.update_habit(row[:-1])
+        if self.search_index is not None:
+            for status, row in results:
+                if status == UPDATED:
+                    self.search_index.update_habit(row[0], row[1], row[2])
+        self._reschedule(rescheduled)
+        print(f"✅ Batch updated {sum(status == UPDATED for status, _ in results)} habits")
+        return results
+
+    @staticmethod
+    def _build_habit_set_clause(habit_name: Optional[str], description: Optional[str], category: Optional[str],
+                                frequency: Optional[str]) -> Tuple[List[str], List[Any]]:
+        """Private helper that builds the dynamic SET clause shared by the update methods"""
+        # Build dynamic update query
+        update_fields = []
+        values = []
+        
+        if habit_name is not None:
+            update_fields.append("Habit_Name_ = ?")
+            values.append(habit_name)
+        if description is not None:
+            update_fields.append("Description_ = ?")
+            values.append(description)
+        if category is not None:
+            update_fields.append("Category = ?")
+            values.append(category)
+        if frequency is not None:
+            update_fields.append("Frequency = ?")
+            values.append(frequency)
+        
+        return update_fields, values
 
             
-    def delete_habit(self, habit_id: int) -> bool:
+    def delete_habit(self, habit_id: int, expected_version: Optional[int] = None) -> bool:
         """
         
         Delete a habit by its ID
@@ -200,42 +580,226 @@ class HabitDatabase:
 
         Args:
             habit_id (int):the unique identifier of the habit to delete
+            expected_version (int): optional Row_Version; the delete is refused if the habit changed since
 
         Returns:
             bool: returns true if the habit was successful and false if there was an error or if the habit does not exist 
         """
         try:
-            
-            # first check if the habit exists
-            
-            existing_habit = self.get_habit_by_id(habit_id)
-            if not existing_habit:
-                print(f"❌ Habit with ID {habit_id} does not exist")
-                return False
-            
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Delete the habit
-            cursor.execute("DELETE FROM Habits WHERE Habit_ID = ?", (habit_id,))
-            
-            if cursor.rowcount > 0:
-                conn.commit()
+            status, _ = self.delete_habit_returning(habit_id, expected_version=expected_version)
+            if status == DELETED:
                 print(f"✅ Successfully deleted habit with ID {habit_id}")
                 return True 
+            elif status == CONFLICT:
+                print(f"❌ Habit with ID {habit_id} was changed by someone else")
             else:
                 print(f"❌ Habit with ID {habit_id} not found")
-                return False
+            return False
             
-        except pyodbc.Error as e:   
+        except self.engine.Error as e:   
             print(f"❌ Error deleting habit: {e}")
             return False
         except Exception as e:  
             print(f"❌ Unexpected error: {e}")
             return False
-        finally:
-            if 'conn' in locals():
-                conn.close()
+
+    def delete_habit_returning(self, habit_id: int, expected_version: Optional[int] = None) -> Tuple[str, Optional[tuple]]:
+        """
+        Delete a habit in one statement and return the deleted row
+
+        Returns:
+            Tuple: (DELETED, row with Row_Version appended), (NOT_FOUND, None)
+            or (CONFLICT, None); database errors are raised
+        """
+        habit_id = int(habit_id)  # Treeview iids arrive as strings; the cache and scheduler are keyed by int
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            before = self._habit_rollup_totals(cursor, habit_id)
+            status, row = self.engine.delete_habit_row(cursor, habit_id, expected_version)
+            if status == DELETED:
+                self._on_habits_deleted(cursor, [before])
+                conn.commit()
+        if status == DELETED and self.cache is not None:
+            self.cache.remove_habit(habit_id)
+        if status == DELETED and self.search_index is not None:
+            self.search_index.remove_habit(habit_id)
+        if status == DELETED and self.scheduler is not None:
+            self.scheduler.remove(habit_id)
+        return status, row
+
+    def delete_habits(self, habits: Iterable, atomic: bool = False) -> List[Tuple[str, Optional[tuple]]]:
+        """
+        Delete many habits in one transaction
+
+        Args:
+            habits: Habit IDs, or (habit_id, expected_version) pairs
+            atomic: If True, any NOT_FOUND/CONFLICT rolls the whole batch back
+
+        Returns:
+            List of (status, row) in the same order as habits; database errors are raised
+        """
+        results = []
+        deleted = []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            for habit in habits:
+                habit_id, expected_version = habit if isinstance(habit, tuple) else (habit, None)
+                habit_id = int(habit_id)
+                before = self._habit_rollup_totals(cursor, habit_id)
+                results.append(self.engine.delete_habit_row(cursor, habit_id, expected_version))
+                if results[-1][0] == DELETED:
+                    deleted.append(before)
+            if atomic and any(status != DELETED for status, _ in results):
+                conn.rollback()
+                print("❌ Batch delete rolled back: some habits were missing or changed")
+                return [(status, None) for status, _ in results]
+            self._on_habits_deleted(cursor, deleted)
+            conn.commit()
+        if self.cache is not None:
+            for status, row in results:
+                if status == DELETED:
+                    self.cache.remove_habit(row[0])
+        if self.search_index is not None:
+            for status, row in results:
+                if status == DELETED:
+                    self.search_index.remove_habit(row[0])
+        if self.scheduler is not None:
+            for status, row in results:
+                if status == DELETED:
+                    self.scheduler.remove(row[0])
+        print(f"✅ Batch deleted {sum(status == DELETED for status, _ in results)} habits")
+        return results
+
+    # === JOURNALED WRITES ===
+
+    def apply_writes(self, writes: Sequence[Mapping[str, Any]]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """
+        Apply a batch of queued habit writes in one transaction, each at most once
+
+        Used by the offline journal (journal.py). Every write carries a
+        unique write_key and its outcome is stored in Applied_Writes in the
+        same transaction, so a batch resent after a lost acknowledgement is
+        answered from there instead of being written twice.
+
+        Args:
+            writes: Dicts with 'write_key', 'operation' ('add', 'update' or 'delete'),
+                'user_id' (adds) or 'habit_id' (updates/deletes), any of 'habit_name',
+                'description', 'category', 'frequency', and 'expected_version'
+                (Row_Version the edit was based on, None skips the check)
+
+        Returns:
+            List of (outcome, habit_id, row_version) in the same order as writes,
+            outcome being ADDED, UPDATED, DELETED, NOT_FOUND or CONFLICT;
+            errors are raised and then nothing is applied
+        """
+        writes = list(writes)
+        results: List[Tuple[str, Optional[int], Optional[int]]] = []
+        added, updated, deleted, rescheduled = [], [], [], []
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            outcomes: Dict[str, Tuple[str, Optional[int], Optional[int]]] = {}
+            for chunk in _chunks([write["write_key"] for write in writes], IN_CHUNK_SIZE):
+                cursor.execute(f"""
+                    SELECT Write_Key, Outcome, Habit_ID, Row_Version FROM Applied_Writes
+                    WHERE Write_Key IN ({', '.join('?' for _ in chunk)})
+                """, chunk)
+                outcomes.update((row[0], tuple(row[1:])) for row in cursor.fetchall())
+            replayed = len(outcomes)
+
+            new_outcomes = []
+            for write in writes:
+                key = write["write_key"]
+                if key in outcomes:
+                    results.append(outcomes[key])
+                    continue
+                operation = write["operation"]
+                if operation == "add":
+                    values = self._habit_row_values(write)
+                    row = self.engine.insert_habit(cursor, values)
+                    outcome = (ADDED, row[0], 1)
+                    added.append((write["user_id"], row, values[6]))
+                elif operation == "update":
+                    update_fields, values = self._build_habit_set_clause(
+                        write.get("habit_name"), write.get("description"), write.get("category"), write.get("frequency")
+                    )
+                    if not update_fields:
+                        raise ValueError(f"No fields to update for habit {write['habit_id']}")
+                    before = self._habit_rollup_totals(cursor, write["habit_id"]) if write.get("category") is not None else None
+                    status, row = self.engine.update_habit_row(
+                        cursor, write["habit_id"], update_fields, values, write.get("expected_version")
+                    )
+                    if status == UPDATED:
+                        if write.get("frequency") is not None:
+                            self._on_frequency_changed(cursor, write["habit_id"], write["frequency"])
+                            rescheduled.append(write["habit_id"])
+                        if write.get("category") is not None:
+                            self._on_category_changed(cursor, write["habit_id"], before)
+                        updated.append(row)
+                    outcome = (status, write["habit_id"], row[-1] if row else None)
+                elif operation == "delete":
+                    before = self._habit_rollup_totals(cursor, write["habit_id"])
+                    status, row = self.engine.delete_habit_row(cursor, write["habit_id"], write.get("expected_version"))
+                    if status == DELETED:
+                        self._on_habits_deleted(cursor, [before])
+                        deleted.append(row[0])
+                    outcome = (status, write["habit_id"], None)
+                else:
+                    raise ValueError(f"Unknown write operation {operation!r}")
+                outcomes[key] = outcome
+                new_outcomes.append((key,) + outcome)
+                results.append(outcome)
+            if new_outcomes:
+                self.engine.executemany(
+                    cursor,
+                    "INSERT INTO Applied_Writes (Write_Key, Outcome, Habit_ID, Row_Version) VALUES (?, ?, ?, ?)",
+                    new_outcomes,
+                )
+            conn.commit()
+
+        for user_id, row, start_date in added:
+            if self.cache is not None:
+                self.cache.add_habit(user_id, row)
+            if self.search_index is not None:
+                self.search_index.add_habit(user_id, row[0], row[1], row[2])
+            if self.scheduler is not None:
+                self.scheduler.add(row[0], user_id, row[4], start_date)
+        for row in updated:
+            if self.cache is not None:
+                self.cache.update_habit(row[:-1])
+            if self.search_index is not None:
+                self.search_index.update_habit(row[0], row[1], row[2])
+        for habit_id in deleted:
+            if self.cache is not None:
+                self.cache.remove_habit(habit_id)
+            if self.search_index is not None:
+                self.search_index.remove_habit(habit_id)
+            if self.scheduler is not None:
+                self.scheduler.remove(habit_id)
+        self._reschedule(rescheduled)
+        print(f"✅ Applied {len(new_outcomes)} journaled writes ({replayed} already applied)")
+        return results
+
+    def get_habit_versions(self, habit_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Current Row_Version of each habit, for edits checked with expected_version
+
+        Returns:
+            Dict: Habit_ID -> Row_Version (missing habits are left out; {} on error)
+        """
+        versions: Dict[int, int] = {}
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                for chunk in _chunks(list(dict.fromkeys(habit_ids)), IN_CHUNK_SIZE):
+                    cursor.execute(
+                        f"SELECT Habit_ID, Row_Version FROM Habits WHERE Habit_ID IN ({', '.join('?' for _ in chunk)})",
+                        chunk,
+                    )
+                    versions.update((row[0], row[1]) for row in cursor.fetchall())
+            return versions
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habit versions: {e}")
+            return {}
                 
     def get_habits_by_category(self, user_id: int, category: str) -> List[Tuple[int, str, str, str, str, datetime]]:
         """
@@ -248,33 +812,1353 @@ class HabitDatabase:
         Returns:
             List of habits in the specified category
         """
+        if self.cache is not None:
+            cached = self.cache.get_habits_by_category(user_id, category)
+            if cached is not None:
+                return cached
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt 
-                FROM Habits 
-                WHERE User_ID = ? AND Category = ?
-            """, (user_id, category))
-            
-            habits = cursor.fetchall()
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT Habit_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt 
+                    FROM Habits 
+                    WHERE User_ID = ? AND Category = ?
+                """, (user_id, category))
+                
+                habits = cursor.fetchall()
             return [tuple(row) for row in habits]
         
-        except pyodbc.Error as e:
+        except self.engine.Error as e:
             print(f"❌ Error fetching habits by category: {e}")
             return []
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
             return []
-        finally:
-            if 'conn' in locals():
-                conn.close()  
 
-# Instantiate the database object after the class definition
-db = HabitDatabase(connection_string)
+    # === STREAMING / PAGINATED READS ===
+
+    def iter_user_habits(self, user_id: int, arraysize: int = 500) -> Iterator[Tuple[int, str, str, str, str, datetime]]:
+        """
+        Stream a user's habits ordered by Habit_ID without building a list
+
+        Rows are pulled from the driver arraysize at a time. The pooled
+        connection is held until the generator is exhausted or closed, so
+        use get_user_habits_page for long-running consumers.
+
+        Args:
+            user_id: ID of the user
+            arraysize: Rows fetched per fetchmany call
+
+        Yields:
+            Habit tuples, same shape as get_user_habits
+        """
+        yield from self._stream(
+            f"SELECT {HABIT_SELECT} WHERE User_ID = ? ORDER BY Habit_ID", (user_id,), arraysize
+        )
+
+    def iter_habits_by_category(self, user_id: int, category: str,
+                                arraysize: int = 500) -> Iterator[Tuple[int, str, str, str, str, datetime]]:
+        """Stream a user's habits in one category, see iter_user_habits"""
+        yield from self._stream(
+            f"SELECT {HABIT_SELECT} WHERE User_ID = ? AND Category = ? ORDER BY Habit_ID", (user_id, category), arraysize
+        )
+
+    def get_user_habits_page(self, user_id: int, after_habit_id: Optional[int] = None, limit: int = 100,
+                             category: Optional[str] = None, offset: int = 0) -> List[Tuple[int, str, str, str, str, datetime]]:
+        """
+        Get one page of a user's habits using keyset pagination
+
+        Pages are ordered by Habit_ID; pass the last Habit_ID of a page as
+        after_habit_id to get the next one. Each page is an index seek on
+        (User_ID, Habit_ID), so deep pages cost the same as the first.
+
+        Args:
+            user_id: ID of the user
+            after_habit_id: Return habits with a larger Habit_ID (None for the first page)
+            limit: Maximum habits in the page
+            category: Optional category filter
+            offset: Habits to skip, for jumping to a position (e.g. dragging a
+                scrollbar); its cost grows with the offset, so page forward
+                with after_habit_id whenever the previous page is known
+
+        Returns:
+            List of habits; shorter than limit on the last page
+        """
+        where = "User_ID = ?"
+        params: List[Any] = [user_id]
+        if after_habit_id is not None:
+            where += " AND Habit_ID > ?"
+            params.append(after_habit_id)
+        if category is not None:
+            where += " AND Category = ?"
+            params.append(category)
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    self.engine.limit_query(f"{HABIT_SELECT} WHERE {where} ORDER BY Habit_ID", limit, offset), params
+                )
+                habits = cursor.fetchall()
+            return [tuple(row) for row in habits]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habit page: {e}")
+            return []
+
+    def count_user_habits(self, user_id: int, category: Optional[str] = None, frequency: Optional[str] = None,
+                          search: Optional[str] = None) -> int:
+        """Count a user's habits matching the query_user_habits filters, e.g. to size a scrollbar"""
+        where, params = self._habit_filter(user_id, category, frequency, search)
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"SELECT COUNT(*) FROM Habits WHERE {where}", params)
+                return cursor.fetchone()[0]
+        except self.engine.Error as e:
+            print(f"❌ Error counting habits: {e}")
+            return 0
+
+    def iter_user_habits_pages(self, user_id: int, page_size: int = 500,
+                               category: Optional[str] = None) -> Iterator[List[Tuple[int, str, str, str, str, datetime]]]:
+        """Yield successive keyset pages; a connection is only borrowed while each page loads"""
+        after_habit_id = None
+        while True:
+            page = self.get_user_habits_page(user_id, after_habit_id, page_size, category)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after_habit_id = page[-1][0]
+
+    # === SORTED / FILTERED READS ===
+
+    def query_user_habits(self, user_id: int, category: Optional[str] = None, frequency: Optional[str] = None,
+                          search: Optional[str] = None, sort_by: str = "Habit_ID", descending: bool = False,
+                          after: Optional[Tuple[Any, int]] = None, limit: int = 100,
+                          offset: int = 0) -> List[Tuple[int, str, str, str, str, datetime]]:
+        """
+        Get one page of a user's habits filtered and sorted by the database
+
+        Filtering and ordering happen in SQL (served by IX_Habits_User_Category_Frequency
+        for category/frequency filters), so only the requested page reaches Python.
+
+        Args:
+            user_id: ID of the user
+            category: Only habits in this category (None for all)
+            frequency: Only habits with this frequency (None for all)
+            search: Only habits whose name or description contains this text
+            sort_by: Column to sort by, one of SORTABLE_HABIT_COLUMNS; ties are broken by Habit_ID
+            descending: Sort largest first
+            after: habit_sort_key() of the last row of the previous page (None for the first page)
+            limit: Maximum habits in the page
+            offset: Habits to skip, for jumping to a position (see get_user_habits_page)
+
+        Returns:
+            List of habits, same shape as get_user_habits; [] if sort_by is not allowed
+        """
+        if sort_by not in SORTABLE_HABIT_COLUMNS:
+            print(f"❌ Cannot sort habits by {sort_by!r}")
+            return []
+        where, params = self._habit_filter(user_id, category, frequency, search)
+        if after is not None:
+            seek, seek_params = self._habit_seek(sort_by, descending, after)
+            where += f" AND ({seek})"
+            params += seek_params
+        direction = " DESC" if descending else ""
+        order_by = f"{sort_by}{direction}, Habit_ID{direction}" if sort_by != "Habit_ID" else f"Habit_ID{direction}"
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    self.engine.limit_query(f"{HABIT_SELECT} WHERE {where} ORDER BY {order_by}", limit, offset), params
+                )
+                habits = cursor.fetchall()
+            return [tuple(row) for row in habits]
+        except self.engine.Error as e:
+            print(f"❌ Error querying habits: {e}")
+            return []
+
+    def get_habit_categories(self, user_id: int) -> List[str]:
+        """Distinct categories of a user's habits, for filter choices"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT DISTINCT Category FROM Habits WHERE User_ID = ? AND Category IS NOT NULL ORDER BY Category",
+                    (user_id,)
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habit categories: {e}")
+            return []
+
+    @staticmethod
+    def _habit_filter(user_id: int, category: Optional[str], frequency: Optional[str],
+                      search: Optional[str]) -> Tuple[str, List[Any]]:
+        """Private helper that builds the WHERE clause shared by query_user_habits and count_user_habits"""
+        where = "User_ID = ?"
+        params: List[Any] = [user_id]
+        if category is not None:
+            where += " AND Category = ?"
+            params.append(category)
+        if frequency is not None:
+            where += " AND Frequency = ?"
+            params.append(frequency)
+        if search:
+            where += " AND (Habit_Name_ LIKE ? ESCAPE '\\' OR Description_ LIKE ? ESCAPE '\\')"
+            pattern = f"%{_escape_like(search)}%"
+            params += [pattern, pattern]
+        return where, params
+
+    @staticmethod
+    def _habit_seek(sort_by: str, descending: bool, after: Tuple[Any, int]) -> Tuple[str, List[Any]]:
+        """
+        Private helper for keyset paging on (sort_by, Habit_ID)
+
+        NULLs sort first ascending and last descending on both engines, and
+        never compare equal, so a NULL sort value gets its own predicate.
+        """
+        value, habit_id = after
+        if sort_by == "Habit_ID":
+            return ("Habit_ID < ?" if descending else "Habit_ID > ?"), [habit_id]
+        if descending:
+            if value is None:
+                return f"{sort_by} IS NULL AND Habit_ID < ?", [habit_id]
+            return f"{sort_by} < ? OR {sort_by} IS NULL OR ({sort_by} = ? AND Habit_ID < ?)", [value, value, habit_id]
+        if value is None:
+            return f"{sort_by} IS NOT NULL OR ({sort_by} IS NULL AND Habit_ID > ?)", [habit_id]
+        return f"{sort_by} > ? OR ({sort_by} = ? AND Habit_ID > ?)", [value, value, habit_id]
+
+    def _stream(self, query: str, params: tuple, arraysize: int) -> Iterator[tuple]:
+        """Private helper that runs a query and yields rows fetchmany() at a time"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = arraysize
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(arraysize)
+                if not rows:
+                    break
+                for row in rows:
+                    yield tuple(row)
+
+    # === SEARCH ===
+
+    def search_habits(self, user_id: int, query: str, category: Optional[str] = None, frequency: Optional[str] = None,
+                      limit: int = 50) -> List[Tuple[int, str, str, str, str, datetime, float]]:
+        """
+        Find a user's habits by the words in their name, description or log notes
+
+        Uses the database's full-text index (SQLite FTS5, SQL Server full-text
+        from database/migrations/006_full_text_search.sql) when there is one,
+        otherwise an in-process InvertedIndex built on the first call. Every
+        word must match; the last one also matches as a prefix, for search as
+        you type.
+
+        Args:
+            user_id: ID of the user
+            query: Words to look for
+            category: Only habits in this category (None for all)
+            frequency: Only habits with this frequency (None for all)
+            limit: Maximum habits returned
+
+        Returns:
+            Habits, same shape as get_user_habits plus a relevance score
+            (higher is better), best match first; [] for a query without words
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        where, params = self._habit_filter(user_id, category, frequency, None)
+        try:
+            if self._has_full_text():
+                sql, match_params = self.engine.full_text_search_sql(terms, where, limit)
+                with self._get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(sql, match_params + params)
+                    rows = cursor.fetchall()
+                return [tuple(row[:-1]) + (float(row[-1]),) for row in rows]
+
+            ranked = self._get_search_index().search(user_id, query, limit=None)
+            results = []
+            for chunk in _chunks(ranked, IN_CHUNK_SIZE):
+                scores = dict(chunk)
+                with self._get_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        f"SELECT {HABIT_SELECT} WHERE {where} AND Habit_ID IN ({', '.join('?' for _ in chunk)})",
+                        params + list(scores),
+                    )
+                    habits = {row[0]: tuple(row) for row in cursor.fetchall()}
+                results += [habits[habit_id] + (score,) for habit_id, score in chunk if habit_id in habits]
+                if len(results) >= limit:
+                    break
+            return results[:limit]
+        except self.engine.Error as e:
+            print(f"❌ Error searching habits: {e}")
+            return []
+
+    def _has_full_text(self) -> bool:
+        """Private helper that checks once whether the database has full-text indexes"""
+        if self._full_text is None:
+            with self._get_connection() as conn:
+                self._full_text = self.engine.has_full_text(conn.cursor())
+        return self._full_text
+
+    def _get_search_index(self) -> InvertedIndex:
+        """
+        Private helper that builds the in-process search index on first use
+
+        The index lock is held while loading, so writes that commit meanwhile
+        wait and are applied on top of what was loaded.
+        """
+        with self._search_lock:
+            if self.search_index is None:
+                index = InvertedIndex()
+                with index.lock:
+                    self.search_index = index
+                    try:
+                        build_index(
+                            self._stream("SELECT Habit_ID, User_ID, Habit_Name_, Description_ FROM Habits", (), 5000),
+                            self._stream("SELECT Habit_ID, Log_Date, Note FROM Habit_Logs WHERE Note IS NOT NULL", (), 5000),
+                            index,
+                        )
+                    except Exception:
+                        self.search_index = None
+                        raise
+                print(f"✅ Built search index of {len(index)} habit texts")
+            return self.search_index
+
+    # === HABIT LOG FUNCTIONS ===
+
+    def log_completion(self, habit_id: int, log_date: Optional[date] = None, status: bool = True,
+                       note: Optional[str] = None) -> bool:
+        """
+        Record a habit as done (or explicitly not done) on a day
+
+        Args:
+            habit_id: ID of the habit being logged
+            log_date: Day being logged (defaults to today)
+            status: True if the habit was completed, False if not
+            note: Optional note for the day
+
+        Returns:
+            bool: True if successful, False if error (including a second log for the same day)
+        """
+        try:
+            values = self._log_row_values((habit_id, log_date or date.today(), status, note))
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(LOG_INSERT, values)
+                self._on_logs_written(cursor, [values[:2] + (None, values[2])])
+                conn.commit()
+            if self.search_index is not None:
+                self.search_index.add_note(values[0], values[1], values[3])
+            self._schedule_logs([values[:2] + (None, values[2])])
+            print(f"✅ Logged habit {habit_id} for {values[1]}")
+            return True
+
+        except self.engine.Error as e:
+            print(f"❌ Error logging habit: {e}")
+            return False
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return False
+
+    def bulk_log(self, rows: Iterable, chunk_size: int = 5000) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Append many habit logs, one executemany and transaction per chunk
+
+        Args:
+            rows: Any iterable (it is streamed) of (habit_id, log_date, status, note)
+                tuples or dicts with those keys; status defaults to True
+            chunk_size: Rows sent to the database per transaction
+
+        Returns:
+            Tuple: (rows inserted, failures) where failures is a list of
+            (row_index, error message); if the database cannot be reached
+            part-way, the rows not yet logged are reported as failures
+        """
+        inserted = 0
+        failures: List[Tuple[int, str]] = []
+        row_iter = enumerate(rows)
+        unreachable: Optional[Exception] = None
+
+        while unreachable is None:
+            chunk = list(islice(row_iter, chunk_size))
+            if not chunk:
+                break
+
+            valid = []
+            for index, row in chunk:
+                try:
+                    valid.append((index, self._log_row_values(row)))
+                except (TypeError, ValueError) as e:
+                    failures.append((index, str(e)))
+            if not valid:
+                continue
+
+            try:
+                with self._get_connection() as conn:
+                    cursor = conn.cursor()
+                    self.engine.executemany(cursor, LOG_INSERT, [values for _, values in valid])
+                    changes = [values[:2] + (None, values[2]) for _, values in valid]
+                    self._on_logs_written(cursor, changes)
+                    conn.commit()
+                if self.search_index is not None:
+                    for _, values in valid:
+                        self.search_index.add_note(values[0], values[1], values[3])
+                self._schedule_logs(changes)
+                inserted += len(valid)
+            except self.engine.data_errors:
+                # e.g. a day that is already logged; retry row by row to isolate it
+                for position, (index, values) in enumerate(valid):
+                    try:
+                        with self._get_connection() as conn:
+                            cursor = conn.cursor()
+                            cursor.execute(LOG_INSERT, values)
+                            self._on_logs_written(cursor, [values[:2] + (None, values[2])])
+                            conn.commit()
+                        if self.search_index is not None:
+                            self.search_index.add_note(values[0], values[1], values[3])
+                        self._schedule_logs([values[:2] + (None, values[2])])
+                        inserted += 1
+                    except self.engine.data_errors as e:
+                        failures.append((index, str(e)))
+                    except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                        unreachable = e
+                        failures += [(index, str(e)) for index, _ in valid[position:]]
+                        break
+            except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                # The database or the pool is not usable; retrying row by row would only fail again
+                unreachable = e
+                failures += [(index, str(e)) for index, _ in valid]
+
+        if unreachable is not None:
+            failures += [(index, str(unreachable)) for index, _ in row_iter]
+            print(f"❌ Stopped logging habits: {unreachable}")
+        failures.sort()
+        print(f"✅ Bulk logged {inserted} habit logs ({len(failures)} failed)")
+        return inserted, failures
+
+    def upsert_log(self, habit_id: int, log_date: Optional[date] = None, status: bool = True,
+                   note: Optional[str] = None) -> Optional[str]:
+        """
+        Record a habit's status for a day, replacing whatever was logged for that day
+
+        Safe to repeat: sending the same log again changes nothing.
+
+        Args:
+            habit_id: ID of the habit being logged
+            log_date: Day being logged (defaults to today)
+            status: True if the habit was completed, False if not
+            note: Optional note for the day (replaces the old note)
+
+        Returns:
+            Optional[str]: ADDED, UPDATED or UNCHANGED; None if error
+        """
+        try:
+            values = self._log_row_values((habit_id, log_date or date.today(), status, note))
+            outcome = self._write_log_upserts([values])[0]
+            print(f"✅ Upserted habit {habit_id} log for {values[1]} ({outcome})")
+            return outcome
+
+        except self.engine.Error as e:
+            print(f"❌ Error upserting habit log: {e}")
+            return None
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+            return None
+
+    def bulk_upsert_logs(self, rows: Iterable, chunk_size: int = 5000) -> Tuple[Dict[str, int], List[Tuple[int, str]]]:
+        """
+        Insert or update many habit logs, one statement batch and transaction per chunk
+
+        Days already logged are updated instead of failing, so a batch that is
+        resent after a timeout or crash can simply be applied again.
+
+        Args:
+            rows: Any iterable (it is streamed) of (habit_id, log_date, status, note)
+                tuples or dicts with those keys; status defaults to True
+            chunk_size: Rows sent to the database per transaction
+
+        Returns:
+            Tuple: ({ADDED: n, UPDATED: n, UNCHANGED: n, SUPERSEDED: n}, failures)
+            where SUPERSEDED counts rows dropped because a later row in the same
+            chunk sets the same habit and day, and failures is a list of
+            (row_index, error message); if the database cannot be reached
+            part-way, the rows not yet written are reported as failures
+        """
+        counts = {ADDED: 0, UPDATED: 0, UNCHANGED: 0, SUPERSEDED: 0}
+        failures: List[Tuple[int, str]] = []
+        row_iter = enumerate(rows)
+        unreachable: Optional[Exception] = None
+
+        while unreachable is None:
+            chunk = list(islice(row_iter, chunk_size))
+            if not chunk:
+                break
+
+            latest: Dict[Tuple[int, date], Tuple[int, tuple]] = {}
+            for index, row in chunk:
+                try:
+                    values = self._log_row_values(row)
+                except (TypeError, ValueError) as e:
+                    failures.append((index, str(e)))
+                    continue
+                if values[:2] in latest:
+                    counts[SUPERSEDED] += 1  # the later row wins; this one is never sent
+                latest[values[:2]] = (index, values)
+            if not latest:
+                continue
+            valid = sorted(latest.values(), key=lambda item: item[1][:2])  # key order keeps lock order stable
+
+            try:
+                for outcome in self._write_log_upserts([values for _, values in valid]):
+                    counts[outcome] += 1
+            except self.engine.data_errors:
+                # e.g. a habit that does not exist; retry row by row to isolate it
+                for position, (index, values) in enumerate(valid):
+                    try:
+                        counts[self._write_log_upserts([values])[0]] += 1
+                    except self.engine.data_errors as e:
+                        failures.append((index, str(e)))
+                    except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                        unreachable = e
+                        failures += [(index, str(e)) for index, _ in valid[position:]]
+                        break
+            except (self.engine.Error, PoolTimeout, RuntimeError) as e:
+                # The database or the pool is not usable; retrying row by row would only fail again
+                unreachable = e
+                failures += [(index, str(e)) for index, _ in valid]
+
+        if unreachable is not None:
+            failures += [(index, str(unreachable)) for index, _ in row_iter]
+            print(f"❌ Stopped upserting habit logs: {unreachable}")
+        failures.sort()
+        print(f"✅ Upserted habit logs: {counts[ADDED]} added, {counts[UPDATED]} updated, "
+              f"{counts[UNCHANGED]} unchanged, {counts[SUPERSEDED]} superseded ({len(failures)} failed)")
+        return counts, failures
+
+    def _write_log_upserts(self, rows: List[Tuple[int, date, bool, Optional[str]]]) -> List[str]:
+        """Private helper upserting logs (one per habit and day) in one transaction; returns each row's outcome"""
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            results = self.engine.upsert_logs(cursor, rows)
+            written = [values for values, (outcome, _) in zip(rows, results) if outcome != UNCHANGED]
+            changes = [values[:2] + (old_status, values[2])
+                       for values, (outcome, old_status) in zip(rows, results) if outcome != UNCHANGED]
+            if changes:
+                self._on_logs_written(cursor, changes)
+            conn.commit()
+        if self.search_index is not None:
+            for values in written:
+                self.search_index.add_note(values[0], values[1], values[3])
+        self._schedule_logs(changes)
+        return [outcome for outcome, _ in results]
+
+    def get_logs(self, habit_id: int,
+                 date_range: Optional[Tuple[Optional[date], Optional[date]]] = None) -> List[Tuple[int, int, date, bool, str, datetime]]:
+        """
+        Get a habit's logs in date order
+
+        Args:
+            habit_id: ID of the habit
+            date_range: Optional inclusive (start, end); either end may be None
+
+        Returns:
+            List of (Log_ID, Habit_ID, Log_Date, Habit_Status, Note, logged_At)
+        """
+        where = "Habit_ID = ?"
+        params: List[Any] = [habit_id]
+        start, end = date_range or (None, None)
+        if start is not None:
+            where += " AND Log_Date >= ?"
+            params.append(_as_date(start))
+        if end is not None:
+            where += " AND Log_Date <= ?"
+            params.append(_as_date(end))
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                # Range scan on UX_Habit_Logs_Habit_Date
+                cursor.execute(f"SELECT {LOG_COLUMNS} FROM Habit_Logs WHERE {where} ORDER BY Log_Date", params)
+                logs = cursor.fetchall()
+            return [(row[0], row[1], row[2], bool(row[3]), row[4], row[5]) for row in logs]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habit logs: {e}")
+            return []
+
+    def get_logs_page(self, habit_id: int, after_log_date: Optional[date] = None, limit: int = 100,
+                      offset: int = 0) -> List[Tuple[int, int, date, bool, str, datetime]]:
+        """
+        Get one page of a habit's logs in date order using keyset pagination
+
+        Args:
+            habit_id: ID of the habit
+            after_log_date: Return logs after this date (None for the first page)
+            limit: Maximum logs in the page
+            offset: Logs to skip, for jumping to a position (see get_user_habits_page)
+
+        Returns:
+            List of (Log_ID, Habit_ID, Log_Date, Habit_Status, Note, logged_At)
+        """
+        where = "Habit_ID = ?"
+        params: List[Any] = [habit_id]
+        if after_log_date is not None:
+            where += " AND Log_Date > ?"
+            params.append(_as_date(after_log_date))
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    self.engine.limit_query(f"{LOG_COLUMNS} FROM Habit_Logs WHERE {where} ORDER BY Log_Date", limit, offset),
+                    params,
+                )
+                logs = cursor.fetchall()
+            return [(row[0], row[1], row[2], bool(row[3]), row[4], row[5]) for row in logs]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching habit log page: {e}")
+            return []
+
+    def count_logs(self, habit_id: int) -> int:
+        """Count a habit's logs"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM Habit_Logs WHERE Habit_ID = ?", (habit_id,))
+                return cursor.fetchone()[0]
+        except self.engine.Error as e:
+            print(f"❌ Error counting habit logs: {e}")
+            return 0
+
+    @staticmethod
+    def _log_row_values(row) -> Tuple[int, date, bool, Optional[str]]:
+        """Private helper that turns one log row into INSERT parameters"""
+        if isinstance(row, Mapping):
+            habit_id, log_date = row.get("habit_id"), row.get("log_date")
+            status, note = row.get("status", True), row.get("note")
+        else:
+            values = list(row)
+            if not 2 <= len(values) <= 4:
+                raise ValueError(f"expected (habit_id, log_date, status, note), got {len(values)} values")
+            values += [True, None][len(values) - 2:]
+            habit_id, log_date, status, note = values
+        if not isinstance(habit_id, int):
+            raise TypeError("habit_id must be an integer")
+        if log_date is None:
+            raise ValueError("log_date is required")
+        return habit_id, _as_date(log_date), bool(status), note
+
+    # === STREAK FUNCTIONS ===
+
+    def get_streak(self, habit_id: int, today: Optional[date] = None) -> Optional[Tuple[int, int]]:
+        """
+        Get a habit's current and longest streak from the stored streak state
+
+        Args:
+            habit_id: ID of the habit
+            today: Day the current streak is judged against (defaults to today)
+
+        Returns:
+            Optional[Tuple]: (current, longest) in periods of the habit's frequency, or None if the habit does not exist
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                states = self._load_streak_states(cursor, [habit_id])
+            if habit_id not in states:
+                return None
+            frequency, state = states[habit_id]
+            return current_streak(frequency, state, today), state.longest
+        except self.engine.Error as e:
+            print(f"❌ Error fetching streak: {e}")
+            return None
+
+    def get_user_streaks(self, user_id: int, today: Optional[date] = None) -> Dict[int, Tuple[int, int]]:
+        """Get (current, longest) streaks for every habit of a user in one query"""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"{STREAK_SELECT} WHERE h.User_ID = ?", (user_id,))
+                rows = cursor.fetchall()
+            streaks = {}
+            for habit_id, frequency, current, longest, last_period in rows:
+                state = StreakState(current or 0, longest or 0, last_period)
+                streaks[habit_id] = (current_streak(frequency, state, today), state.longest)
+            return streaks
+        except self.engine.Error as e:
+            print(f"❌ Error fetching streaks: {e}")
+            return {}
+
+    def recompute_streaks(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Rebuild streak state from the full log history (for backfills and migrations)
+
+        Logs are streamed in (Habit_ID, Log_Date) order and each habit's dates
+        are processed as one NumPy array; the read and the write share one
+        transaction.
+
+        Args:
+            habit_ids: Habits to rebuild, or None for every habit
+
+        Returns:
+            int: Number of habits whose state was rebuilt
+        """
+        wanted = sorted(set(habit_ids)) if habit_ids is not None else None
+        states: Dict[int, StreakState] = {}
+        query = """
+            SELECT h.Habit_ID, h.Frequency, l.Log_Date
+            FROM Habits h JOIN Habit_Logs l ON l.Habit_ID = h.Habit_ID
+            WHERE l.Habit_Status = 1{filter}
+            ORDER BY h.Habit_ID, l.Log_Date
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # Clearing first makes this transaction the writer, so a log written meanwhile
+            # waits for the commit and then advances the recomputed state instead of being lost
+            if wanted is None:
+                cursor.execute("DELETE FROM Habit_Streaks")
+            else:
+                for chunk in _chunks(wanted, IN_CHUNK_SIZE):
+                    cursor.execute(f"DELETE FROM Habit_Streaks WHERE Habit_ID IN ({', '.join('?' for _ in chunk)})", chunk)
+            for chunk in _chunks(wanted, IN_CHUNK_SIZE) if wanted is not None else [None]:
+                habit_filter = f" AND h.Habit_ID IN ({', '.join('?' for _ in chunk)})" if chunk else ""
+                cursor.execute(query.format(filter=habit_filter), tuple(chunk or ()))
+                rows = chain.from_iterable(iter(lambda: cursor.fetchmany(5000), []))
+                for (habit_id, frequency), logs in groupby(rows, key=lambda row: (row[0], row[1])):
+                    states[habit_id] = compute_streaks(frequency, (row[2] for row in logs))
+            self._save_streak_states(cursor, states)
+            conn.commit()
+        if wanted is None:
+            self.scheduler = None  # rebuilt on the next due-habit query
+        else:
+            self._reschedule(wanted)
+        print(f"✅ Recomputed streaks for {len(states)} habits")
+        return len(states)
+
+    # === COMPLETION CALENDAR ===
+
+    def get_heatmap(self, habit_id: int, year: int) -> List[Tuple[date, bool]]:
+        """
+        A habit's completions over one year from its calendar bitmap (one row read)
+
+        Args:
+            habit_id: ID of the habit
+            year: Calendar year
+
+        Returns:
+            List of (first day of period, completed) for every day, week, month
+            or year of the habit's frequency starting in that year; [] if the
+            habit does not exist or on error
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                calendars = self._load_calendars(cursor, [habit_id], [year])
+            if habit_id not in calendars:
+                return []
+            frequency, years = calendars[habit_id]
+            return years.get(year, CompletionBitmap(frequency, year)).days()
+        except self.engine.Error as e:
+            print(f"❌ Error fetching heatmap: {e}")
+            return []
+
+    def get_completion_rate(self, habit_id: int, start: date, end: date) -> Optional[float]:
+        """
+        Share of a habit's periods from start to end (inclusive) that were completed
+
+        Returns:
+            Optional[float]: 0.0-1.0, or None if the habit does not exist or on error
+        """
+        start, end = _as_date(start), _as_date(end)
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                calendars = self._load_calendars(cursor, [habit_id], range(start.year - 1, end.year + 1))
+            if habit_id not in calendars:
+                return None
+            frequency, years = calendars[habit_id]
+            return completion_rate(frequency, years, start, end)
+        except self.engine.Error as e:
+            print(f"❌ Error fetching completion rate: {e}")
+            return None
+
+    def get_done_habits(self, user_id: int, day: Optional[date] = None) -> Set[int]:
+        """
+        Habits of a user already completed for the period containing day ("done today?")
+
+        A Weekly habit counts as done if any day of that week was completed,
+        a Monthly one if any day of that month was, and so on.
+
+        Returns:
+            Set[int]: Habit IDs (empty on error)
+        """
+        day = _as_date(day or date.today())
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT h.Habit_ID, h.Frequency, c.Calendar_Year, c.Bits
+                    FROM Habits h JOIN Habit_Calendar c ON c.Habit_ID = h.Habit_ID
+                    WHERE h.User_ID = ? AND c.Calendar_Year IN (?, ?)
+                """, (user_id, day.year - 1, day.year))  # a week can start in the previous December
+                rows = cursor.fetchall()
+            return {
+                habit_id for habit_id, frequency, year, bits in rows
+                if CompletionBitmap(frequency, year, bits).is_done(day)
+            }
+        except self.engine.Error as e:
+            print(f"❌ Error fetching completed habits: {e}")
+            return set()
+
+    def rebuild_calendars(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Rebuild completion calendars from the full log history (for backfills and migrations)
+
+        Args:
+            habit_ids: Habits to rebuild, or None for every habit
+
+        Returns:
+            int: Number of habits that have at least one completion
+        """
+        wanted = sorted(set(habit_ids)) if habit_ids is not None else None
+        rows: List[Tuple[int, int, bytes]] = []
+        habits = 0
+        query = """
+            SELECT h.Habit_ID, h.Frequency, l.Log_Date
+            FROM Habits h JOIN Habit_Logs l ON l.Habit_ID = h.Habit_ID
+            WHERE l.Habit_Status = 1{filter}
+            ORDER BY h.Habit_ID, l.Log_Date
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            # cleared first, read and written in one transaction (see recompute_streaks)
+            if wanted is None:
+                cursor.execute("DELETE FROM Habit_Calendar")
+            else:
+                for chunk in _chunks(wanted, IN_CHUNK_SIZE):
+                    cursor.execute(f"DELETE FROM Habit_Calendar WHERE Habit_ID IN ({', '.join('?' for _ in chunk)})", chunk)
+            for chunk in _chunks(wanted, IN_CHUNK_SIZE) if wanted is not None else [None]:
+                habit_filter = f" AND h.Habit_ID IN ({', '.join('?' for _ in chunk)})" if chunk else ""
+                cursor.execute(query.format(filter=habit_filter), tuple(chunk or ()))
+                logs = chain.from_iterable(iter(lambda: cursor.fetchmany(5000), []))
+                for (habit_id, frequency), habit_logs in groupby(logs, key=lambda row: (row[0], row[1])):
+                    calendars = build_calendars(frequency, (row[2] for row in habit_logs))
+                    rows += [(habit_id, year, bitmap.to_bytes()) for year, bitmap in calendars.items()]
+                    habits += 1
+            for chunk in _chunks(rows, 5000):
+                self.engine.executemany(cursor, CALENDAR_INSERT, chunk)
+            conn.commit()
+        print(f"✅ Rebuilt completion calendars for {habits} habits")
+        return habits
+
+    # === COMPLETION ROLLUPS ===
+
+    def get_habit_rollup(self, habit_id: int, grain: str = "week", start: Optional[date] = None,
+                         end: Optional[date] = None) -> List[Tuple[date, int, int]]:
+        """
+        A habit's completion counts per day, week or month, read from Habit_Rollup only
+
+        Args:
+            habit_id: ID of the habit
+            grain: 'day', 'week' (Monday-based) or 'month'
+            start: First day wanted (None for the whole history)
+            end: Last day wanted (None for the whole history)
+
+        Returns:
+            List of (first day of period, completed logs, all logs) for the
+            periods with logs, oldest first ([] on error)
+        """
+        rows = self._read_rollup("Habit_Rollup", "Habit_ID = ?", [habit_id], grain, start, end)
+        return [(grain_start(grain, period), completed, logged) for period, completed, logged in rows]
+
+    def get_category_rollup(self, user_id: int, grain: str = "week", start: Optional[date] = None,
+                            end: Optional[date] = None) -> Dict[str, List[Tuple[date, int, int]]]:
+        """
+        A user's completion counts per category and period, read from Category_Rollup only
+
+        Returns:
+            Dict: category ('' for habits without one) -> list as in get_habit_rollup ({} on error)
+        """
+        rows = self._read_rollup("Category_Rollup", "User_ID = ?", [user_id], grain, start, end, "Category")
+        categories: Dict[str, List[Tuple[date, int, int]]] = {}
+        for category, period, completed, logged in rows:
+            categories.setdefault(category, []).append((grain_start(grain, period), completed, logged))
+        return categories
+
+    def get_user_rollup(self, user_id: int, grain: str = "week", start: Optional[date] = None,
+                        end: Optional[date] = None) -> List[Tuple[date, int, int]]:
+        """A user's completion counts over all habits per period, read from User_Rollup only (see get_habit_rollup)"""
+        rows = self._read_rollup("User_Rollup", "User_ID = ?", [user_id], grain, start, end)
+        return [(grain_start(grain, period), completed, logged) for period, completed, logged in rows]
+
+    def rebuild_rollups(self, habit_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Rebuild the rollup tables from the full log history (for backfills and migrations)
+
+        Habit_Rollup is recounted from Habit_Logs a thousand habits at a time;
+        the category and user rollups of the habits' owners are then summed
+        from Habit_Rollup. Everything is replaced in one transaction.
+
+        Args:
+            habit_ids: Habits to rebuild, or None for every habit
+
+        Returns:
+            int: Number of habits that have at least one log
+        """
+        wanted = sorted(set(habit_ids)) if habit_ids is not None else None
+        insert = "INSERT INTO Habit_Rollup (Habit_ID, Grain, Period, Completed, Logged) VALUES (?, ?, ?, ?, ?)"
+        query = """
+            SELECT h.Habit_ID, l.Log_Date, l.Habit_Status
+            FROM Habits h JOIN Habit_Logs l ON l.Habit_ID = h.Habit_ID{filter}
+            ORDER BY h.Habit_ID
+        """
+        habits = 0
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            owners: Optional[Set[int]] = None
+            if wanted is None:
+                cursor.execute("SELECT Habit_ID FROM Habits ORDER BY Habit_ID")
+                wanted = [row[0] for row in cursor.fetchall()]
+                for table in ROLLUP_TABLES:
+                    cursor.execute(f"DELETE FROM {table}")
+            else:
+                owners = set()
+                for chunk in _chunks(wanted, IN_CHUNK_SIZE):
+                    marks = ", ".join("?" for _ in chunk)
+                    cursor.execute(f"SELECT DISTINCT User_ID FROM Habits WHERE Habit_ID IN ({marks})", chunk)
+                    owners.update(row[0] for row in cursor.fetchall())
+                    cursor.execute(f"DELETE FROM Habit_Rollup WHERE Habit_ID IN ({marks})", chunk)
+
+            for chunk in _chunks(wanted, IN_CHUNK_SIZE):
+                habit_filter = f" WHERE h.Habit_ID IN ({', '.join('?' for _ in chunk)})"
+                # read on this transaction's own cursor: a second pooled connection could wait on our locks
+                cursor.execute(query.format(filter=habit_filter), chunk)
+                logs = chain.from_iterable(iter(lambda: cursor.fetchmany(5000), []))
+                rows: List[tuple] = []
+                for habit_id, habit_logs in groupby(logs, key=lambda row: row[0]):
+                    changes = [(habit_id, _as_date(log_date), None, bool(status)) for _, log_date, status in habit_logs]
+                    counts = rollup_deltas(changes, {habit_id: (0, None)})["Habit_Rollup"]
+                    rows += [key + tuple(values) for key, values in counts.items()]
+                    habits += 1
+                # written once the chunk's read has finished, so no result set is open meanwhile
+                for batch in _chunks(rows, 5000):
+                    self.engine.executemany(cursor, insert, batch)
+
+            if owners is None:
+                for sql in ROLLUP_FROM_HABITS.values():
+                    cursor.execute(sql.format(filter=""))
+            else:
+                self._refresh_user_rollups(cursor, owners)
+            conn.commit()
+        print(f"✅ Rebuilt completion rollups for {habits} habits")
+        return habits
+
+    def _read_rollup(self, table: str, where: str, params: List[Any], grain: str, start: Optional[date],
+                     end: Optional[date], group_column: Optional[str] = None) -> List[tuple]:
+        """Private helper reading (group column,) period, Completed, Logged rows of one rollup owner"""
+        if grain not in GRAINS:
+            raise ValueError(f"grain must be one of {', '.join(GRAINS)}, got {grain!r}")
+        conditions = [where, "Grain = ?"]
+        params = list(params) + [grain]
+        if start is not None:
+            conditions.append("Period >= ?")
+            params.append(grain_period(grain, _as_date(start)))
+        if end is not None:
+            conditions.append("Period <= ?")
+            params.append(grain_period(grain, _as_date(end)))
+        columns = f"{group_column}, " if group_column else ""
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT {columns}Period, Completed, Logged FROM {table}
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY {columns}Period
+                """, params)
+                return [tuple(row) for row in cursor.fetchall()]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching completion rollup: {e}")
+            return []
+
+    def _update_rollups(self, cursor, changes: List[Tuple[int, date, Optional[bool], bool]]) -> None:
+        """Private helper adding the counter changes of written logs to the rollup tables"""
+        habit_ids = sorted({change[0] for change in changes})
+        owners: Dict[int, Tuple[int, Optional[str]]] = {}
+        for chunk in _chunks(habit_ids, IN_CHUNK_SIZE):
+            cursor.execute(
+                f"SELECT Habit_ID, User_ID, Category FROM Habits WHERE Habit_ID IN ({', '.join('?' for _ in chunk)})",
+                chunk,
+            )
+            owners.update((row[0], (row[1], row[2])) for row in cursor.fetchall())
+        for table, counts in rollup_deltas(changes, owners).items():
+            if counts:
+                self.engine.executemany(
+                    cursor,
+                    self.engine.increment_sql(table, ROLLUP_TABLES[table], ROLLUP_COUNTERS),
+                    [key + tuple(values) for key, values in sorted(counts.items())],
+                )
+
+    def _refresh_user_rollups(self, cursor, user_ids: Iterable[Optional[int]],
+                              tables: Sequence[str] = ("Category_Rollup", "User_Rollup")) -> None:
+        """Private helper re-summing users' category/user rollups from Habit_Rollup"""
+        users = sorted({user_id for user_id in user_ids if user_id is not None})
+        for chunk in _chunks(users, IN_CHUNK_SIZE):
+            marks = ", ".join("?" for _ in chunk)
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table} WHERE User_ID IN ({marks})", chunk)
+                cursor.execute(ROLLUP_FROM_HABITS[table].format(filter=f" WHERE h.User_ID IN ({marks})"), chunk)
+
+    def _habit_rollup_totals(self, cursor, habit_id: int) -> Optional[Tuple[int, str, List[tuple]]]:
+        """
+        Private helper reading what one habit adds to its owner's rollups
+
+        Returns:
+            Optional: (User_ID, Category or '', [(Grain, Period, Completed, Logged)])
+            from Habit_Rollup, None if the habit does not exist
+        """
+        cursor.execute("SELECT User_ID, Category FROM Habits WHERE Habit_ID = ?", (habit_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        cursor.execute("SELECT Grain, Period, Completed, Logged FROM Habit_Rollup WHERE Habit_ID = ?", (habit_id,))
+        return row[0], row[1] or "", [tuple(total) for total in cursor.fetchall()]
+
+    def _add_habit_totals(self, cursor, user_id: int, category: str, totals: List[tuple], sign: int,
+                          tables: Sequence[str] = ("Category_Rollup", "User_Rollup")) -> None:
+        """Private helper adding (sign=1) or taking away (sign=-1) one habit's totals from its owner's rollups"""
+        if not totals:
+            return
+        for table in tables:
+            owner = (user_id, category) if table == "Category_Rollup" else (user_id,)
+            keys = [owner + (grain, period) for grain, period, _, _ in totals]
+            self.engine.executemany(
+                cursor,
+                self.engine.increment_sql(table, ROLLUP_TABLES[table], ROLLUP_COUNTERS),
+                [key + (sign * completed, sign * logged) for key, (_, _, completed, logged) in zip(keys, totals)],
+            )
+            if sign < 0:  # periods no log counts towards any more
+                where = " AND ".join(f"{column} = ?" for column in ROLLUP_TABLES[table])
+                self.engine.executemany(cursor, f"DELETE FROM {table} WHERE {where} AND Logged = 0", keys)
+
+    # === USER STATISTICS ===
+
+    def get_user_stats(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        A user's statistics as last computed by the analytics job (analytics.py)
+
+        Returns:
+            Optional[Dict]: User_Stats columns by name (Habits, Completions,
+            Active_Streaks, Best_Current_Streak, Longest_Streak,
+            Completion_Rate_30d, Computed_At), or None if the job has not
+            covered the user yet or on error
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT Habits, Completions, Active_Streaks, Best_Current_Streak, Longest_Streak,
+                           Completion_Rate_30d, Computed_At
+                    FROM User_Stats WHERE User_ID = ?
+                """, (user_id,))
+                row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip(("Habits", "Completions", "Active_Streaks", "Best_Current_Streak", "Longest_Streak",
+                             "Completion_Rate_30d", "Computed_At"), row))
+        except self.engine.Error as e:
+            print(f"❌ Error fetching user statistics: {e}")
+            return None
+
+    # === DUE HABITS ===
+
+    def get_due_habits(self, user_id: int, day: Optional[date] = None) -> List[Tuple[int, str, str, str, str, datetime]]:
+        """
+        A user's habits that are due: started, and not yet completed for the current period
+
+        A Daily habit is due every day until it is logged, a Weekly one from
+        Monday until any day of that week is logged, and so on. Answered by
+        the in-process DueScheduler (built for all users on the first call).
+
+        Args:
+            user_id: ID of the user
+            day: Day to judge against (defaults to today)
+
+        Returns:
+            Habits, same shape as get_user_habits, in Habit_ID order ([] on error)
+        """
+        try:
+            due = set(self._get_scheduler().due_for_user(user_id, _as_date(day or date.today())))
+            if not due:
+                return []
+            return [habit for habit in self.get_user_habits(user_id) if habit[0] in due]
+        except self.engine.Error as e:
+            print(f"❌ Error fetching due habits: {e}")
+            return []
+
+    def get_all_due_habits(self, day: Optional[date] = None) -> Dict[int, List[int]]:
+        """
+        Every due habit across all users, e.g. for sending reminders
+
+        Costs the number of due habits, not the number of habits.
+
+        Returns:
+            Dict: User_ID -> Habit_IDs due ({} on error)
+        """
+        try:
+            return self._get_scheduler().due(_as_date(day or date.today()))
+        except self.engine.Error as e:
+            print(f"❌ Error fetching due habits: {e}")
+            return {}
+
+    def _get_scheduler(self) -> DueScheduler:
+        """
+        Private helper that builds the due-habit scheduler on first use
+
+        As with the search index, the scheduler lock is held while loading so
+        writes that commit meanwhile wait and are applied on top.
+        """
+        with self._scheduler_lock:
+            if self.scheduler is None:
+                scheduler = DueScheduler()
+                with scheduler.lock:
+                    self.scheduler = scheduler
+                    try:
+                        count = scheduler.load(self._schedule_rows())
+                    except Exception:
+                        self.scheduler = None
+                        raise
+                print(f"✅ Scheduled {count} habits")
+            return self.scheduler
+
+    def _schedule_rows(self, habit_ids: Optional[List[int]] = None) -> Iterator[Tuple[int, int, str, date, Optional[int]]]:
+        """Private helper streaming (habit_id, user_id, frequency, start_date, last_period) for the scheduler"""
+        query = """
+            SELECT h.Habit_ID, h.User_ID, h.Frequency, h.StartDate, h.CreatedAt, s.Last_Period
+            FROM Habits h LEFT JOIN Habit_Streaks s ON s.Habit_ID = h.Habit_ID{filter}
+        """
+        for chunk in _chunks(habit_ids, IN_CHUNK_SIZE) if habit_ids is not None else [None]:
+            habit_filter = f" WHERE h.Habit_ID IN ({', '.join('?' for _ in chunk)})" if chunk else ""
+            for habit_id, user_id, frequency, start_date, created_at, last_period in self._stream(
+                query.format(filter=habit_filter), tuple(chunk or ()), 5000
+            ):
+                # Habits added before StartDate was filled in count from their creation day;
+                # legacy rows with neither (or an unreadable one) count from today
+                start = start_date if start_date is not None else created_at
+                try:
+                    start = _as_date(str(start)[:10]) if start is not None else date.today()
+                except ValueError:
+                    start = date.today()
+                yield habit_id, user_id, frequency, start, last_period
+
+    def _reschedule(self, habit_ids: List[int]) -> None:
+        """Private helper that re-reads habits into the scheduler after their periods changed (after commit)"""
+        if self.scheduler is not None and habit_ids:
+            self.scheduler.load(self._schedule_rows(sorted(set(habit_ids))))
+
+    def _schedule_logs(self, changes: List[Tuple[int, date, Optional[bool], bool]]) -> None:
+        """Private helper moving logged habits to their next due day (after commit)"""
+        if self.scheduler is not None:
+            self._reschedule(self.scheduler.log_changes(changes))
+
+    def _on_logs_written(self, cursor, changes: List[Tuple[int, date, Optional[bool], bool]]) -> None:
+        """
+        Private hook keeping derived per-habit state in step with Habit_Logs
+
+        Runs inside the caller's transaction after logs were written.
+
+        Args:
+            changes: (habit_id, log_date, old_status, new_status) per written log;
+                old_status is None for a newly inserted log
+        """
+        self._update_streaks(cursor, changes)
+        self._update_calendars(cursor, changes)
+        self._update_rollups(cursor, changes)
+
+    def _on_frequency_changed(self, cursor, habit_id: int, frequency: str) -> None:
+        """Private hook rebuilding per-period state of a habit whose Frequency changed"""
+        self._refresh_streak(cursor, habit_id, frequency)
+        self._refresh_calendar(cursor, habit_id, frequency)
+
+    def _on_category_changed(self, cursor, habit_id: int, before: Optional[Tuple[int, str, List[tuple]]]) -> None:
+        """Private hook moving a habit's counts (before = _habit_rollup_totals ahead of the update) to its new category"""
+        if before is None:
+            return
+        user_id, old_category, totals = before
+        cursor.execute("SELECT Category FROM Habits WHERE Habit_ID = ?", (habit_id,))
+        new_category = cursor.fetchone()[0] or ""
+        if new_category != old_category:
+            self._add_habit_totals(cursor, user_id, old_category, totals, -1, ("Category_Rollup",))
+            self._add_habit_totals(cursor, user_id, new_category, totals, 1, ("Category_Rollup",))
+
+    def _on_habits_deleted(self, cursor, deleted: Iterable[Optional[Tuple[int, str, List[tuple]]]]) -> None:
+        """Private hook taking deleted habits (_habit_rollup_totals read before the delete) out of their owners' rollups"""
+        for before in deleted:
+            if before is not None:
+                self._add_habit_totals(cursor, *before, -1)
+
+    def _update_streaks(self, cursor, changes: List[Tuple[int, date, Optional[bool], bool]]) -> None:
+        """Private helper that advances streak state in O(1) per new completion"""
+        completed: Dict[int, List[date]] = {}
+        rebuild = set()
+        for habit_id, log_date, old_status, new_status in changes:
+            if new_status and not old_status:
+                completed.setdefault(habit_id, []).append(log_date)
+            elif old_status and not new_status:
+                rebuild.add(habit_id)  # a completion was taken back
+        if not completed and not rebuild:
+            return
+
+        states = self._load_streak_states(cursor, list(completed.keys() | rebuild))
+        new_states: Dict[int, StreakState] = {}
+        for habit_id, (frequency, state) in states.items():
+            if habit_id not in rebuild:
+                for log_date in sorted(completed[habit_id]):
+                    state = advance(state, period_index(frequency, log_date))
+                    if state is None:  # logged out of order, fall back to the history
+                        break
+            else:
+                state = None
+            if state is None:
+                cursor.execute(
+                    "SELECT Log_Date FROM Habit_Logs WHERE Habit_ID = ? AND Habit_Status = 1", (habit_id,)
+                )
+                state = compute_streaks(frequency, (row[0] for row in cursor.fetchall()))
+            new_states[habit_id] = state
+        self._save_streak_states(cursor, new_states)
+
+    def _refresh_streak(self, cursor, habit_id: int, frequency: str) -> None:
+        """Private helper that rebuilds one habit's streak after its frequency changed"""
+        cursor.execute("SELECT Log_Date FROM Habit_Logs WHERE Habit_ID = ? AND Habit_Status = 1", (habit_id,))
+        self._save_streak_states(cursor, {habit_id: compute_streaks(frequency, (row[0] for row in cursor.fetchall()))})
+
+    def _load_streak_states(self, cursor, habit_ids: List[int]) -> Dict[int, Tuple[str, StreakState]]:
+        """Private helper returning {habit_id: (frequency, state)} for existing habits"""
+        states = {}
+        for chunk in _chunks(habit_ids, IN_CHUNK_SIZE):
+            cursor.execute(f"{STREAK_SELECT} WHERE h.Habit_ID IN ({', '.join('?' for _ in chunk)})", chunk)
+            for habit_id, frequency, current, longest, last_period in cursor.fetchall():
+                states[habit_id] = (frequency, StreakState(current or 0, longest or 0, last_period))
+        return states
+
+    def _save_streak_states(self, cursor, states: Dict[int, StreakState]) -> None:
+        if not states:
+            return
+        now = datetime.now()
+        sql = self.engine.upsert_sql(
+            "Habit_Streaks", ("Habit_ID",), ("Habit_ID", "Current_Streak", "Longest_Streak", "Last_Period", "Updated_At")
+        )
+        rows = [(habit_id,) + state.as_tuple() + (now,) for habit_id, state in states.items()]
+        for chunk in _chunks(rows, 5000):
+            self.engine.executemany(cursor, sql, chunk)
+
+    def _update_calendars(self, cursor, changes: List[Tuple[int, date, Optional[bool], bool]]) -> None:
+        """Private helper that sets (or clears) the calendar bit of each logged period"""
+        changed = [(habit_id, log_date, bool(new)) for habit_id, log_date, old, new in changes if bool(old) != bool(new)]
+        if not changed:
+            return
+        calendars = self._load_calendars(cursor, list({habit_id for habit_id, _, _ in changed}))
+        dirty = set()
+        for habit_id, log_date, done in changed:
+            if habit_id not in calendars:
+                continue
+            frequency, years = calendars[habit_id]
+            period = period_index(frequency, log_date)
+            year = period_year(frequency, period)
+            if year not in years:
+                years[year] = CompletionBitmap(frequency, year)
+            if not done:  # a completion was taken back; another day may still complete the period
+                cursor.execute(
+                    "SELECT COUNT(*) FROM Habit_Logs WHERE Habit_ID = ? AND Habit_Status = 1 AND Log_Date >= ? AND Log_Date < ?",
+                    (habit_id, period_start(frequency, period), period_start(frequency, period + 1)),
+                )
+                done = cursor.fetchone()[0] > 0
+            years[year].set(period, done)
+            dirty.add((habit_id, year))
+        sql = self.engine.upsert_sql("Habit_Calendar", ("Habit_ID", "Calendar_Year"), ("Habit_ID", "Calendar_Year", "Bits"))
+        rows = [(habit_id, year, calendars[habit_id][1][year].to_bytes()) for habit_id, year in sorted(dirty)]
+        for chunk in _chunks(rows, 5000):
+            self.engine.executemany(cursor, sql, chunk)
+
+    def _refresh_calendar(self, cursor, habit_id: int, frequency: str) -> None:
+        """Private helper that rebuilds one habit's calendar after its frequency changed"""
+        cursor.execute("SELECT Log_Date FROM Habit_Logs WHERE Habit_ID = ? AND Habit_Status = 1", (habit_id,))
+        calendars = build_calendars(frequency, (row[0] for row in cursor.fetchall()))
+        cursor.execute("DELETE FROM Habit_Calendar WHERE Habit_ID = ?", (habit_id,))
+        rows = [(habit_id, year, bitmap.to_bytes()) for year, bitmap in calendars.items()]
+        if rows:
+            self.engine.executemany(cursor, CALENDAR_INSERT, rows)
+
+    def _load_calendars(self, cursor, habit_ids: List[int],
+                        years: Optional[Iterable[int]] = None) -> Dict[int, Tuple[str, Dict[int, CompletionBitmap]]]:
+        """Private helper returning {habit_id: (frequency, {year: bitmap})} for existing habits"""
+        year_filter, year_params = "", []
+        if years is not None:
+            year_params = list(years)
+            year_filter = f" AND c.Calendar_Year IN ({', '.join('?' for _ in year_params)})"
+        calendars: Dict[int, Tuple[str, Dict[int, CompletionBitmap]]] = {}
+        for chunk in _chunks(habit_ids, IN_CHUNK_SIZE):
+            cursor.execute(f"""
+                SELECT h.Habit_ID, h.Frequency, c.Calendar_Year, c.Bits
+                FROM Habits h LEFT JOIN Habit_Calendar c ON c.Habit_ID = h.Habit_ID{year_filter}
+                WHERE h.Habit_ID IN ({', '.join('?' for _ in chunk)})
+            """, year_params + list(chunk))
+            for habit_id, frequency, year, bits in cursor.fetchall():
+                frequency, years_found = calendars.setdefault(habit_id, (frequency, {}))
+                if year is not None:
+                    years_found[year] = CompletionBitmap(frequency, year, bits)
+        return calendars
+
+
+def habit_sort_key(habit: tuple, sort_by: str = "Habit_ID") -> Tuple[Any, int]:
+    """Keyset cursor of a habit row for query_user_habits(after=...)"""
+    return habit[SORTABLE_HABIT_COLUMNS.index(sort_by)], habit[0]
+
+
+def _escape_like(text: str) -> str:
+    """Make LIKE wildcards in user text match literally (with ESCAPE '\\'; [ is a wildcard on SQL Server)"""
+    for char in ("\\", "%", "_", "["):
+        text = text.replace(char, "\\" + char)
+    return text
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Split a list into consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _as_date(value) -> date:
+    """Accept a date, a datetime or an ISO 'YYYY-MM-DD' string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    raise TypeError(f"expected a date, got {type(value).__name__}")
+
+
+def connection_string_from_env() -> str:
+    """
+    Read DB_CONNECTION_STRING, loading .env first
+
+    Called by the entry points (app.py, scripts) rather than at import time,
+    so importing this module never touches the filesystem or environment.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()  # Loads variables from .env
+    connection_string = os.getenv("DB_CONNECTION_STRING")
+    if not connection_string:
+        raise ValueError("DB_CONNECTION_STRING environment variable is not set.")
+    return connection_string
+
 
 if __name__ == "__main__":
     # Try to fetch all habits for user_id=1
+    db = HabitDatabase(connection_string_from_env())
     habits = db.get_user_habits(user_id=1)
-    print("Habits for user 1:", habits)
\ No newline at end of file
+    print("Habits for user 1:", habits)
+    db.close()
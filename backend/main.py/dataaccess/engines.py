@@ -0,0 +1,806 @@
+"""Storage engines behind HabitDatabase: SQL Server (pyodbc) and embedded SQLite"""
+
+import itertools
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+SQLITE_PREFIX = "sqlite://"
+
+# Outcomes of a versioned single-statement write
+ADDED = "added"
+UPDATED = "updated"
+DELETED = "deleted"
+NOT_FOUND = "not_found"
+CONFLICT = "conflict"
+# Outcome of a log upsert that found the day already logged with the same values
+UNCHANGED = "unchanged"
+
+# The habit tuple every read returns
+HABIT_COLUMNS = ("Habit_ID", "Habit_Name_", "Description_", "Category", "Frequency", "CreatedAt")
+# Habit columns returned by versioned writes: the usual habit tuple plus Row_Version
+RETURNED_HABIT_COLUMNS = HABIT_COLUMNS + ("Row_Version",)
+
+# SQLite translation of database/create_table.sql. Each entry is one schema
+# version; PRAGMA user_version records how many have been applied so an
+# existing database file is upgraded in place.
+SQLITE_MIGRATIONS: List[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS Users (
+        User_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        First_Name VARCHAR(50) NOT NULL,
+        Email VARCHAR(50),
+        Created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS Habits (
+        Habit_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        User_ID INT NOT NULL,
+        Habit_Name_ VARCHAR(100),
+        Description_ TEXT,
+        Category VARCHAR(50),
+        Frequency VARCHAR(20),
+        StartDate DATE,
+        CreatedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS Habit_Logs (
+        Log_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Habit_ID VARCHAR(100),
+        Log_Date DATE,
+        Habit_Status BIT,
+        Note TEXT,
+        logged_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- The app defaults to user_id=1, same as the test user in create_table.sql
+    INSERT INTO Users (First_Name, Email)
+    SELECT 'testuser', 'test@example.com'
+    WHERE NOT EXISTS (SELECT 1 FROM Users);
+    """,
+    # database/migrations/001_habits_row_version.sql
+    """
+    ALTER TABLE Habits ADD COLUMN Row_Version INTEGER NOT NULL DEFAULT 1;
+    """,
+    # database/migrations/002_habits_user_index.sql
+    """
+    CREATE INDEX IF NOT EXISTS IX_Habits_User_ID ON Habits (User_ID, Habit_ID);
+    """,
+    # database/migrations/003_habit_logs_int_fk.sql (SQLite cannot alter a column
+    # type, so the table is rebuilt; unconvertible rows go to Habit_Logs_Rejected).
+    # CAST would read '1abc' as 1 and 'abc' as 0, so only all-digit ids are converted,
+    # like TRY_CONVERT on SQL Server.
+    """
+    ALTER TABLE Habit_Logs ADD COLUMN Habit_ID_Int INTEGER;
+    UPDATE Habit_Logs SET Habit_ID_Int = CAST(TRIM(Habit_ID) AS INTEGER)
+    WHERE TRIM(Habit_ID) GLOB '[0-9]*' AND TRIM(Habit_ID) NOT GLOB '*[^0-9]*';
+
+    CREATE TABLE Habit_Logs_Rejected AS
+    SELECT * FROM Habit_Logs l
+    WHERE l.Habit_ID_Int IS NULL
+       OR l.Habit_ID_Int NOT IN (SELECT Habit_ID FROM Habits)
+       OR l.Log_Date IS NULL
+       OR EXISTS (SELECT 1 FROM Habit_Logs newer
+                  WHERE newer.Habit_ID_Int = l.Habit_ID_Int
+                    AND newer.Log_Date = l.Log_Date
+                    AND newer.Log_ID > l.Log_ID);
+
+    CREATE TABLE Habit_Logs_New (
+        Log_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+        Habit_ID INT NOT NULL REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+        Log_Date DATE NOT NULL,
+        Habit_Status BIT NOT NULL DEFAULT 1,
+        Note TEXT,
+        logged_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT INTO Habit_Logs_New (Log_ID, Habit_ID, Log_Date, Habit_Status, Note, logged_At)
+    SELECT Log_ID, Habit_ID_Int, Log_Date, COALESCE(Habit_Status, 1), Note, logged_At
+    FROM Habit_Logs
+    WHERE Log_ID NOT IN (SELECT Log_ID FROM Habit_Logs_Rejected);
+    DROP TABLE Habit_Logs;
+    ALTER TABLE Habit_Logs_New RENAME TO Habit_Logs;
+
+    CREATE UNIQUE INDEX UX_Habit_Logs_Habit_Date ON Habit_Logs (Habit_ID, Log_Date);
+    """,
+    # database/migrations/004_habit_streaks.sql
+    """
+    CREATE TABLE Habit_Streaks (
+        Habit_ID INTEGER PRIMARY KEY REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+        Current_Streak INT NOT NULL DEFAULT 0,
+        Longest_Streak INT NOT NULL DEFAULT 0,
+        Last_Period INT,
+        Updated_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # database/migrations/005_habits_filter_index.sql
+    """
+    CREATE INDEX IF NOT EXISTS IX_Habits_User_Category_Frequency ON Habits (User_ID, Category, Frequency);
+    """,
+    # database/migrations/007_applied_writes.sql
+    """
+    CREATE TABLE Applied_Writes (
+        Write_Key VARCHAR(36) PRIMARY KEY,
+        Outcome VARCHAR(20) NOT NULL,
+        Habit_ID INT,
+        Row_Version INT,
+        Applied_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    # database/migrations/008_habit_calendar.sql
+    """
+    CREATE TABLE Habit_Calendar (
+        Habit_ID INTEGER NOT NULL REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+        Calendar_Year INT NOT NULL,
+        Bits BLOB NOT NULL,
+        PRIMARY KEY (Habit_ID, Calendar_Year)
+    ) WITHOUT ROWID;
+    """,
+    # database/migrations/009_completion_rollups.sql
+    """
+    CREATE TABLE Habit_Rollup (
+        Habit_ID INTEGER NOT NULL REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+        Grain VARCHAR(5) NOT NULL,
+        Period INT NOT NULL,
+        Completed INT NOT NULL DEFAULT 0,
+        Logged INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (Habit_ID, Grain, Period)
+    ) WITHOUT ROWID;
+    CREATE TABLE Category_Rollup (
+        User_ID INT NOT NULL,
+        Category VARCHAR(50) NOT NULL,
+        Grain VARCHAR(5) NOT NULL,
+        Period INT NOT NULL,
+        Completed INT NOT NULL DEFAULT 0,
+        Logged INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (User_ID, Category, Grain, Period)
+    ) WITHOUT ROWID;
+    CREATE TABLE User_Rollup (
+        User_ID INT NOT NULL,
+        Grain VARCHAR(5) NOT NULL,
+        Period INT NOT NULL,
+        Completed INT NOT NULL DEFAULT 0,
+        Logged INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (User_ID, Grain, Period)
+    ) WITHOUT ROWID;
+    """,
+    # database/migrations/010_user_stats.sql
+    """
+    CREATE TABLE User_Stats (
+        User_ID INTEGER PRIMARY KEY,
+        Habits INT NOT NULL,
+        Completions INT NOT NULL,
+        Active_Streaks INT NOT NULL,
+        Best_Current_Streak INT NOT NULL,
+        Longest_Streak INT NOT NULL,
+        Completion_Rate_30d REAL NOT NULL,
+        Computed_At DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+]
+
+# SQLite translation of database/migrations/006_full_text_search.sql. Not a
+# numbered migration because FTS5 is optional in SQLite builds; it is applied
+# on connect whenever FTS5 is available and the tables are missing. The FTS5
+# tables index the text of Habits/Habit_Logs rows (external content) and the
+# triggers keep them in step with every write, bulk loads included.
+SQLITE_FULL_TEXT_TABLES = ("Habits_FTS", "Habit_Logs_FTS")
+SQLITE_FULL_TEXT = """
+    CREATE VIRTUAL TABLE Habits_FTS USING fts5(Habit_Name_, Description_, content='Habits', content_rowid='Habit_ID');
+    CREATE VIRTUAL TABLE Habit_Logs_FTS USING fts5(Note, content='Habit_Logs', content_rowid='Log_ID');
+    INSERT INTO Habits_FTS (Habits_FTS) VALUES ('rebuild');
+    INSERT INTO Habit_Logs_FTS (Habit_Logs_FTS) VALUES ('rebuild');
+
+    CREATE TRIGGER Habits_FTS_Insert AFTER INSERT ON Habits BEGIN
+        INSERT INTO Habits_FTS (rowid, Habit_Name_, Description_) VALUES (new.Habit_ID, new.Habit_Name_, new.Description_);
+    END;
+    CREATE TRIGGER Habits_FTS_Delete AFTER DELETE ON Habits BEGIN
+        INSERT INTO Habits_FTS (Habits_FTS, rowid, Habit_Name_, Description_)
+        VALUES ('delete', old.Habit_ID, old.Habit_Name_, old.Description_);
+    END;
+    CREATE TRIGGER Habits_FTS_Update AFTER UPDATE OF Habit_Name_, Description_ ON Habits BEGIN
+        INSERT INTO Habits_FTS (Habits_FTS, rowid, Habit_Name_, Description_)
+        VALUES ('delete', old.Habit_ID, old.Habit_Name_, old.Description_);
+        INSERT INTO Habits_FTS (rowid, Habit_Name_, Description_) VALUES (new.Habit_ID, new.Habit_Name_, new.Description_);
+    END;
+
+    CREATE TRIGGER Habit_Logs_FTS_Insert AFTER INSERT ON Habit_Logs BEGIN
+        INSERT INTO Habit_Logs_FTS (rowid, Note) VALUES (new.Log_ID, new.Note);
+    END;
+    CREATE TRIGGER Habit_Logs_FTS_Delete AFTER DELETE ON Habit_Logs BEGIN
+        INSERT INTO Habit_Logs_FTS (Habit_Logs_FTS, rowid, Note) VALUES ('delete', old.Log_ID, old.Note);
+    END;
+    CREATE TRIGGER Habit_Logs_FTS_Update AFTER UPDATE OF Note ON Habit_Logs BEGIN
+        INSERT INTO Habit_Logs_FTS (Habit_Logs_FTS, rowid, Note) VALUES ('delete', old.Log_ID, old.Note);
+        INSERT INTO Habit_Logs_FTS (rowid, Note) VALUES (new.Log_ID, new.Note);
+    END;
+"""
+
+# Ranked habits from per-document matches ({matches} yields Habit_ID, Score rows);
+# a habit scores its best match and {where} filters the Habits row
+FULL_TEXT_SEARCH = """
+    h.Habit_ID, h.Habit_Name_, h.Description_, h.Category, h.Frequency, h.CreatedAt, m.Score
+    FROM (SELECT Habit_ID, MAX(Score) AS Score FROM ({matches}) s GROUP BY Habit_ID) m
+    JOIN Habits h ON h.Habit_ID = m.Habit_ID
+    WHERE {where}
+    ORDER BY m.Score DESC, h.Habit_ID
+"""
+
+
+class StorageEngine(ABC):
+    """Driver interface HabitDatabase talks to"""
+
+    name = "base"
+    full_text = True  # set False before first use to always search with the in-process index
+
+    @property
+    @abstractmethod
+    def Error(self) -> Type[Exception]:
+        """The DB-API exception base class raised by this driver"""
+        raise NotImplementedError
+
+    @property
+    def data_errors(self) -> Tuple[Type[Exception], ...]:
+        """Driver exceptions meaning the database refused the data itself, not that it could not be reached"""
+        driver = sys.modules[self.Error.__module__]
+        return tuple(getattr(driver, name) for name in ("IntegrityError", "DataError") if hasattr(driver, name))
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """Open a new DB-API connection"""
+        raise NotImplementedError
+
+    def ping(self, conn: Any) -> None:
+        """Raise if the connection is no longer usable"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    @abstractmethod
+    def limit_query(self, select_body: str, limit: int, offset: int = 0) -> str:
+        """
+        Build a row-limited query
+
+        Args:
+            select_body: Everything after the SELECT keyword, ORDER BY included
+            limit: Maximum rows to return (inlined as an integer literal)
+            offset: Rows to skip first (cost grows with the offset; prefer keyset filters)
+        """
+        raise NotImplementedError
+
+    def executemany(self, cursor: Any, sql: str, rows: Sequence[tuple]) -> None:
+        """Run a parameterised statement for every row in one call"""
+        cursor.executemany(sql, rows)
+
+    @abstractmethod
+    def upsert_sql(self, table: str, key_columns: Sequence[str], columns: Sequence[str]) -> str:
+        """
+        Build an insert-or-update statement for one row
+
+        Args:
+            table: Target table
+            key_columns: Columns identifying the row (must have a unique index)
+            columns: All columns written, keys included; parameters follow this order
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def increment_sql(self, table: str, key_columns: Sequence[str], counter_columns: Sequence[str]) -> str:
+        """
+        Build a statement adding to the counters of one row, creating it at zero first if missing
+
+        Args:
+            table: Target table
+            key_columns: Columns identifying the row (must have a unique index)
+            counter_columns: Columns incremented; parameters are the keys then the increments
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_habit(self, cursor: Any, values: tuple) -> tuple:
+        """
+        Insert one habit and return it exactly as stored
+
+        Args:
+            cursor: Cursor on a borrowed connection (caller commits)
+            values: (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate)
+
+        Returns:
+            tuple: The new habit row (HABIT_COLUMNS)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_habits(self, cursor: Any, rows: Sequence[tuple]) -> List[int]:
+        """
+        Insert a chunk of habits inside the caller's transaction
+
+        Args:
+            cursor: Cursor on a borrowed connection
+            rows: (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate) tuples
+
+        Returns:
+            List[int]: Generated Habit_IDs in the same order as rows
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert_logs(self, cursor: Any, rows: Sequence[tuple]) -> List[Tuple[str, Optional[bool]]]:
+        """
+        Insert or update habit logs keyed on (Habit_ID, Log_Date) inside the caller's transaction
+
+        Relies on UX_Habit_Logs_Habit_Date, so resending a row updates its day
+        instead of failing; rows already holding the same status and note are
+        left untouched.
+
+        Args:
+            cursor: Cursor on a borrowed connection
+            rows: (Habit_ID, Log_Date, Habit_Status, Note) tuples, at most one per habit and day
+
+        Returns:
+            List: per row, in order, (ADDED, None), (UPDATED, old status) or (UNCHANGED, status)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_habit_row(
+        self, cursor: Any, habit_id: int, set_fields: Sequence[str], values: Sequence[Any], expected_version: Optional[int]
+    ) -> Tuple[str, Optional[tuple]]:
+        """
+        Apply a SET clause to one habit and bump its Row_Version in a single statement
+
+        Args:
+            cursor: Cursor on a borrowed connection (caller commits)
+            habit_id: Habit to update
+            set_fields: "Column = ?" fragments from HabitDatabase._build_habit_set_clause
+            values: Parameters for set_fields
+            expected_version: Row_Version the caller last read, or None to skip the check
+
+        Returns:
+            Tuple: (UPDATED, row) or (NOT_FOUND, None) or (CONFLICT, None)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_habit_row(self, cursor: Any, habit_id: int, expected_version: Optional[int]) -> Tuple[str, Optional[tuple]]:
+        """Delete one habit in a single statement; returns (DELETED, row), (NOT_FOUND, None) or (CONFLICT, None)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_full_text(self, cursor: Any) -> bool:
+        """True if the database keeps full-text indexes of habit and log text"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def full_text_search_sql(self, terms: Sequence[str], where: str, limit: int) -> Tuple[str, list]:
+        """
+        Build a ranked full-text search over habit names, descriptions and log notes
+
+        Args:
+            terms: Words that must all match; the last one also matches as a prefix
+            where: Filter on the Habits row, e.g. from HabitDatabase._habit_filter
+            limit: Maximum habits to return
+
+        Returns:
+            Tuple: (sql, parameters that come before the where parameters); rows
+            are HABIT_COLUMNS plus a Score, best first
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _version_filter(expected_version: Optional[int]) -> Tuple[str, list]:
+        if expected_version is None:
+            return "", []
+        return " AND Row_Version = ?", [expected_version]
+
+
+class SqlServerEngine(StorageEngine):
+    """SQL Server over pyodbc; the schema is managed with the scripts in database/"""
+
+    name = "sqlserver"
+
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+
+    @property
+    def Error(self) -> Type[Exception]:
+        import pyodbc
+        return pyodbc.Error
+
+    def connect(self) -> Any:
+        import pyodbc  # loaded on first connect so SQLite-only setups never need it
+        return pyodbc.connect(self.connection_string)
+
+    def limit_query(self, select_body: str, limit: int, offset: int = 0) -> str:
+        if offset:
+            return f"SELECT {select_body} OFFSET {int(offset)} ROWS FETCH NEXT {int(limit)} ROWS ONLY"
+        return f"SELECT TOP ({int(limit)}) {select_body}"
+
+    def executemany(self, cursor: Any, sql: str, rows: Sequence[tuple]) -> None:
+        cursor.fast_executemany = True  # send the whole batch as one array-bound round trip
+        cursor.executemany(sql, rows)
+
+    def has_full_text(self, cursor: Any) -> bool:
+        # Created by database/migrations/006_full_text_search.sql (needs the Full-Text Search feature)
+        cursor.execute("""
+            SELECT COUNT(*) FROM sys.fulltext_indexes
+            WHERE object_id IN (OBJECT_ID('Habits'), OBJECT_ID('Habit_Logs'))
+        """)
+        return self.full_text and cursor.fetchone()[0] == 2
+
+    def full_text_search_sql(self, terms: Sequence[str], where: str, limit: int) -> Tuple[str, list]:
+        condition = " AND ".join(
+            [f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}*"']
+        )
+        matches = """
+            SELECT k.[KEY] AS Habit_ID, CAST(k.RANK AS FLOAT) AS Score
+            FROM CONTAINSTABLE(Habits, (Habit_Name_, Description_), ?) k
+            UNION ALL
+            SELECT l.Habit_ID, k.RANK * 0.5
+            FROM CONTAINSTABLE(Habit_Logs, Note, ?) k JOIN Habit_Logs l ON l.Log_ID = k.[KEY]
+        """
+        return self.limit_query(FULL_TEXT_SEARCH.format(matches=matches, where=where), limit), [condition, condition]
+
+    def upsert_sql(self, table: str, key_columns: Sequence[str], columns: Sequence[str]) -> str:
+        match = " AND ".join(f"target.{column} = src.{column}" for column in key_columns)
+        updates = ", ".join(f"{column} = src.{column}" for column in columns if column not in key_columns)
+        return f"""
+            MERGE INTO {table} WITH (HOLDLOCK) AS target
+            USING (VALUES ({', '.join('?' for _ in columns)})) AS src ({', '.join(columns)})
+            ON {match}
+            WHEN MATCHED THEN UPDATE SET {updates}
+            WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join('src.' + column for column in columns)});
+        """
+
+    def increment_sql(self, table: str, key_columns: Sequence[str], counter_columns: Sequence[str]) -> str:
+        columns = list(key_columns) + list(counter_columns)
+        match = " AND ".join(f"target.{column} = src.{column}" for column in key_columns)
+        updates = ", ".join(f"{column} = target.{column} + src.{column}" for column in counter_columns)
+        return f"""
+            MERGE INTO {table} WITH (HOLDLOCK) AS target
+            USING (VALUES ({', '.join('?' for _ in columns)})) AS src ({', '.join(columns)})
+            ON {match}
+            WHEN MATCHED THEN UPDATE SET {updates}
+            WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) VALUES ({', '.join('src.' + column for column in columns)});
+        """
+
+    def insert_habit(self, cursor: Any, values: tuple) -> tuple:
+        cursor.execute(f"""
+            INSERT INTO Habits (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate)
+            OUTPUT {', '.join('INSERTED.' + column for column in HABIT_COLUMNS)}
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, values)
+        return tuple(cursor.fetchone())
+
+    def insert_habits(self, cursor: Any, rows: Sequence[tuple]) -> List[int]:
+        # executemany cannot return identities, so stream the chunk into a temp
+        # table with fast_executemany (one round trip) and move it across with a
+        # single MERGE whose OUTPUT maps each row number to its new Habit_ID.
+        cursor.execute("""
+            IF OBJECT_ID('tempdb..#Habit_Import') IS NULL
+                CREATE TABLE #Habit_Import (
+                    Row_No INT NOT NULL PRIMARY KEY,
+                    User_ID INT NOT NULL,
+                    Habit_Name_ VARCHAR(100),
+                    Description_ VARCHAR(MAX),
+                    Category VARCHAR(50),
+                    Frequency VARCHAR(20),
+                    CreatedAt DATETIME,
+                    StartDate DATE
+                )
+            ELSE
+                TRUNCATE TABLE #Habit_Import
+        """)
+        cursor.fast_executemany = True
+        cursor.executemany(
+            "INSERT INTO #Habit_Import VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(row_no,) + tuple(row) for row_no, row in enumerate(rows)],
+        )
+        cursor.execute("""
+            MERGE INTO Habits USING #Habit_Import AS src ON 1 = 0
+            WHEN NOT MATCHED THEN
+                INSERT (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate)
+                VALUES (src.User_ID, src.Habit_Name_, src.Description_, src.Category, src.Frequency, src.CreatedAt,
+                        src.StartDate)
+            OUTPUT src.Row_No, INSERTED.Habit_ID;
+        """)
+        habit_ids = dict(cursor.fetchall())
+        return [habit_ids[row_no] for row_no in range(len(rows))]
+
+    def upsert_logs(self, cursor, rows):
+        # MERGE reports what it did to each row through OUTPUT, so telling an insert
+        # from an update never needs a read first. A single row travels inline; a
+        # chunk is streamed into a temp table the way insert_habits does it.
+        if len(rows) == 1:
+            source = "(VALUES (0, ?, ?, ?, ?)) AS src (Row_No, Habit_ID, Log_Date, Habit_Status, Note)"
+            params = list(rows[0])
+        else:
+            cursor.execute("""
+                IF OBJECT_ID('tempdb..#Log_Import') IS NULL
+                    CREATE TABLE #Log_Import (
+                        Row_No INT NOT NULL PRIMARY KEY,
+                        Habit_ID INT NOT NULL,
+                        Log_Date DATE NOT NULL,
+                        Habit_Status BIT NOT NULL,
+                        Note VARCHAR(MAX)
+                    )
+                ELSE
+                    TRUNCATE TABLE #Log_Import
+            """)
+            cursor.fast_executemany = True
+            cursor.executemany(
+                "INSERT INTO #Log_Import VALUES (?, ?, ?, ?, ?)",
+                [(row_no,) + tuple(row) for row_no, row in enumerate(rows)],
+            )
+            source, params = "#Log_Import AS src", []
+        # EXCEPT compares NULL notes as equal, which <> does not
+        cursor.execute(f"""
+            MERGE INTO Habit_Logs WITH (HOLDLOCK) AS target
+            USING {source}
+            ON target.Habit_ID = src.Habit_ID AND target.Log_Date = src.Log_Date
+            WHEN MATCHED AND EXISTS (SELECT target.Habit_Status, target.Note EXCEPT SELECT src.Habit_Status, src.Note) THEN
+                UPDATE SET Habit_Status = src.Habit_Status, Note = src.Note
+            WHEN NOT MATCHED THEN
+                INSERT (Habit_ID, Log_Date, Habit_Status, Note)
+                VALUES (src.Habit_ID, src.Log_Date, src.Habit_Status, src.Note)
+            OUTPUT src.Row_No, $action, DELETED.Habit_Status;
+        """, params)
+        written = {row_no: (action, old_status) for row_no, action, old_status in cursor.fetchall()}
+        outcomes = []
+        for row_no, row in enumerate(rows):
+            action, old_status = written.get(row_no, (None, None))
+            if action == "INSERT":
+                outcomes.append((ADDED, None))
+            elif action == "UPDATE":
+                outcomes.append((UPDATED, bool(old_status)))
+            else:
+                outcomes.append((UNCHANGED, bool(row[2])))
+        return outcomes
+
+    # The write and the "why did nothing match" lookup travel as one batch, so
+    # telling NOT_FOUND from CONFLICT never costs a second round trip.
+
+    def update_habit_row(self, cursor, habit_id, set_fields, values, expected_version):
+        version_sql, version_params = self._version_filter(expected_version)
+        output = ", ".join(f"INSERTED.{column}" for column in RETURNED_HABIT_COLUMNS)
+        cursor.execute(f"""
+            SET NOCOUNT ON;
+            UPDATE Habits
+            SET {', '.join(set_fields)}, Row_Version = Row_Version + 1
+            OUTPUT {output}
+            WHERE Habit_ID = ?{version_sql};
+            IF @@ROWCOUNT = 0
+                SELECT Row_Version FROM Habits WHERE Habit_ID = ?;
+        """, list(values) + [habit_id] + version_params + [habit_id])
+        return self._read_write_outcome(cursor, UPDATED)
+
+    def delete_habit_row(self, cursor, habit_id, expected_version):
+        version_sql, version_params = self._version_filter(expected_version)
+        output = ", ".join(f"DELETED.{column}" for column in RETURNED_HABIT_COLUMNS)
+        cursor.execute(f"""
+            SET NOCOUNT ON;
+            DELETE FROM Habits
+            OUTPUT {output}
+            WHERE Habit_ID = ?{version_sql};
+            IF @@ROWCOUNT = 0
+                SELECT Row_Version FROM Habits WHERE Habit_ID = ?;
+        """, [habit_id] + version_params + [habit_id])
+        return self._read_write_outcome(cursor, DELETED)
+
+    @staticmethod
+    def _read_write_outcome(cursor, success: str) -> Tuple[str, Optional[tuple]]:
+        row = cursor.fetchone()
+        if row is not None:
+            return success, tuple(row)
+        if cursor.nextset() and cursor.fetchone() is not None:
+            return CONFLICT, None
+        return NOT_FOUND, None
+
+
+class SqliteEngine(StorageEngine):
+    """Embedded SQLite in WAL mode, schema created on first connect"""
+
+    name = "sqlite"
+    _memory_ids = itertools.count(1)
+    _adapters_registered = False
+
+    def __init__(self, connection_string: str):
+        self.connection_string = connection_string
+        path = connection_string[len(SQLITE_PREFIX):]
+        if path.startswith("/"):
+            path = path[1:]  # sqlite:///relative.db and sqlite:////abs/path.db, as in SQLAlchemy
+        self._anchor = None
+        if path in ("", ":memory:"):
+            # Pooled connections must all see the same in-memory database, so use a
+            # named shared-cache database kept alive by an anchor connection.
+            self.database = f"file:habit_tracker_mem_{next(self._memory_ids)}?mode=memory&cache=shared"
+            self.is_memory = True
+        else:
+            self.database = path
+            self.is_memory = False
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        _register_sqlite_types()
+
+    @property
+    def Error(self) -> Type[Exception]:
+        return sqlite3.Error
+
+    def connect(self) -> Any:
+        conn = sqlite3.connect(
+            self.database,
+            uri=self.is_memory,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # the pool hands a connection to one thread at a time
+            timeout=30.0,
+        )
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self.is_memory:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")  # durable enough under WAL, far fewer fsyncs
+        if not self._schema_ready:
+            self._ensure_schema(conn)
+        return conn
+
+    def limit_query(self, select_body: str, limit: int, offset: int = 0) -> str:
+        if offset:
+            return f"SELECT {select_body} LIMIT {int(limit)} OFFSET {int(offset)}"
+        return f"SELECT {select_body} LIMIT {int(limit)}"
+
+    def has_full_text(self, cursor: Any) -> bool:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name IN (?, ?)", SQLITE_FULL_TEXT_TABLES)
+        return self.full_text and cursor.fetchone()[0] == len(SQLITE_FULL_TEXT_TABLES)
+
+    def full_text_search_sql(self, terms: Sequence[str], where: str, limit: int) -> Tuple[str, list]:
+        match = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        # bm25() is lower-is-better, so it is negated; names weigh twice descriptions, notes half
+        matches = """
+            SELECT rowid AS Habit_ID, -bm25(Habits_FTS, 2.0, 1.0) AS Score
+            FROM Habits_FTS WHERE Habits_FTS MATCH ?
+            UNION ALL
+            SELECT l.Habit_ID, -0.5 * bm25(Habit_Logs_FTS)
+            FROM Habit_Logs_FTS JOIN Habit_Logs l ON l.Log_ID = Habit_Logs_FTS.rowid WHERE Habit_Logs_FTS MATCH ?
+        """
+        return self.limit_query(FULL_TEXT_SEARCH.format(matches=matches, where=where), limit), [match, match]
+
+    def upsert_sql(self, table: str, key_columns: Sequence[str], columns: Sequence[str]) -> str:
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in key_columns)
+        return f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}
+        """
+
+    def increment_sql(self, table: str, key_columns: Sequence[str], counter_columns: Sequence[str]) -> str:
+        columns = list(key_columns) + list(counter_columns)
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in counter_columns)
+        return f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}
+        """
+
+    def insert_habit(self, cursor: Any, values: tuple) -> tuple:
+        cursor.execute(f"""
+            INSERT INTO Habits (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            RETURNING {', '.join(HABIT_COLUMNS)}
+        """, values)
+        row = tuple(cursor.fetchone())
+        cursor.fetchall()  # step RETURNING to completion so the insert is finished
+        return row
+
+    def insert_habits(self, cursor: Any, rows: Sequence[tuple]) -> List[int]:
+        # Statements are in-process calls here, so a loop inside one transaction
+        # costs about the same as executemany and gives us every rowid.
+        habit_ids = []
+        for row in rows:
+            cursor.execute("""
+                INSERT INTO Habits (User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt, StartDate)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, row)
+            habit_ids.append(cursor.lastrowid)
+        return habit_ids
+
+    def upsert_logs(self, cursor, rows):
+        # In-process, so looking up each day's current row is not a round trip;
+        # the WHERE keeps rows that already hold these values from being rewritten.
+        outcomes = []
+        for habit_id, log_date, status, note in rows:
+            cursor.execute(
+                "SELECT Habit_Status, Note FROM Habit_Logs WHERE Habit_ID = ? AND Log_Date = ?", (habit_id, log_date)
+            )
+            current = cursor.fetchone()
+            if current is None:
+                outcomes.append((ADDED, None))
+            elif (bool(current[0]), current[1]) == (bool(status), note):
+                outcomes.append((UNCHANGED, bool(status)))
+            else:
+                outcomes.append((UPDATED, bool(current[0])))
+        cursor.executemany("""
+            INSERT INTO Habit_Logs (Habit_ID, Log_Date, Habit_Status, Note) VALUES (?, ?, ?, ?)
+            ON CONFLICT (Habit_ID, Log_Date) DO UPDATE SET Habit_Status = excluded.Habit_Status, Note = excluded.Note
+            WHERE Habit_Status IS NOT excluded.Habit_Status OR Note IS NOT excluded.Note
+        """, rows)
+        return outcomes
+
+    def update_habit_row(self, cursor, habit_id, set_fields, values, expected_version):
+        version_sql, version_params = self._version_filter(expected_version)
+        cursor.execute(f"""
+            UPDATE Habits
+            SET {', '.join(set_fields)}, Row_Version = Row_Version + 1
+            WHERE Habit_ID = ?{version_sql}
+            RETURNING {', '.join(RETURNED_HABIT_COLUMNS)}
+        """, list(values) + [habit_id] + version_params)
+        return self._write_outcome(cursor, habit_id, UPDATED)
+
+    def delete_habit_row(self, cursor, habit_id, expected_version):
+        version_sql, version_params = self._version_filter(expected_version)
+        cursor.execute(f"""
+            DELETE FROM Habits
+            WHERE Habit_ID = ?{version_sql}
+            RETURNING {', '.join(RETURNED_HABIT_COLUMNS)}
+        """, [habit_id] + version_params)
+        return self._write_outcome(cursor, habit_id, DELETED)
+
+    @staticmethod
+    def _write_outcome(cursor, habit_id: int, success: str) -> Tuple[str, Optional[tuple]]:
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.fetchall()  # step RETURNING to completion so the write is finished
+            return success, tuple(row)
+        # In-process, so this follow-up lookup is not an extra network round trip
+        cursor.execute("SELECT 1 FROM Habits WHERE Habit_ID = ?", (habit_id,))
+        return (CONFLICT if cursor.fetchone() else NOT_FOUND), None
+
+    def _ensure_schema(self, conn: Any) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            if self.is_memory and self._anchor is None:
+                self._anchor = sqlite3.connect(self.database, uri=True, check_same_thread=False)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(SQLITE_MIGRATIONS[version:], start=version + 1):
+                # the script and its version bump commit together, so a crash never leaves a half-applied migration
+                try:
+                    conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;")
+                except sqlite3.Error:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    raise
+            if self.full_text and self._fts5_available(conn) and not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'Habits_FTS'"
+            ).fetchone():
+                conn.executescript(SQLITE_FULL_TEXT)
+            conn.commit()
+            self._schema_ready = True
+
+    @staticmethod
+    def _fts5_available(conn: Any) -> bool:
+        return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def create_engine(connection_string: str) -> StorageEngine:
+    """
+    Pick a storage engine from the connection string
+
+    'sqlite:///habits.db' (or 'sqlite:///:memory:') selects embedded SQLite;
+    anything else is treated as an ODBC connection string for SQL Server.
+    """
+    if connection_string.lower().startswith(SQLITE_PREFIX):
+        return SqliteEngine(connection_string)
+    return SqlServerEngine(connection_string)
+
+
+def _register_sqlite_types() -> None:
+    """Store dates as ISO text and read DATE/DATETIME columns back as Python objects"""
+    if SqliteEngine._adapters_registered:
+        return
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+    sqlite3.register_adapter(date, lambda value: value.isoformat())
+    sqlite3.register_converter("DATETIME", lambda raw: datetime.fromisoformat(raw.decode()))
+    sqlite3.register_converter("DATE", lambda raw: date.fromisoformat(raw.decode()))
+    SqliteEngine._adapters_registered = True
@@ -0,0 +1,571 @@
+"""Offline write-behind journal: habit edits are saved locally at once and sent to the database in the background"""
+
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:  # imported as dataaccess.journal (tests)
+    from .data_access import HabitDatabase, _as_date
+    from .engines import ADDED, DELETED, UPDATED
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from data_access import HabitDatabase, _as_date
+    from engines import ADDED, DELETED, UPDATED
+
+JOURNAL_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS Pending_Writes (
+        Seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        Write_Key TEXT NOT NULL UNIQUE,
+        Operation TEXT NOT NULL,           -- add, update or delete
+        Habit_ID INTEGER NOT NULL,         -- negative for a habit added offline, until it is synced
+        User_ID INTEGER,
+        Habit_Name_ TEXT,
+        Description_ TEXT,
+        Category TEXT,
+        Frequency TEXT,
+        Start_Date TEXT,                   -- first day an added habit is due (the day it was added offline)
+        Expected_Version INTEGER,          -- Row_Version the edit was based on
+        Created_At TEXT NOT NULL,
+        Error TEXT                         -- set when the database rejected the write
+    );
+"""
+JOURNAL_COLUMNS = (
+    "Seq", "Write_Key", "Operation", "Habit_ID", "User_ID", "Habit_Name_", "Description_", "Category", "Frequency",
+    "Start_Date", "Expected_Version", "Created_At", "Error",
+)
+ENTRY_KEYS = (
+    "seq", "write_key", "operation", "habit_id", "user_id", "habit_name", "description", "category", "frequency",
+    "start_date", "expected_version", "created_at", "error",
+)
+# Where each editable field sits in a habit row (HABIT_COLUMNS)
+FIELD_POSITIONS = {"habit_name": 1, "description": 2, "category": 3, "frequency": 4}
+
+
+class WriteJournal:
+    def __init__(self, path: str = "habit_journal.db"):
+        """
+        Append-only local log of habit writes waiting to reach the database
+
+        The journal is a SQLite file in WAL mode with synchronous=FULL, so a
+        write is on disk before add_habit returns and survives a crash or a
+        restart while offline. Writes to a habit that has not been sent yet
+        are merged into its queued entry (an update after an add becomes part
+        of the add, a delete cancels an unsent add), so a long offline session
+        replays as few statements as possible.
+
+        Args:
+            path: Journal file (":memory:" keeps it in memory, for tests)
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = FULL")  # an accepted write exists nowhere else
+        self._conn.executescript(JOURNAL_SCHEMA)
+        if "Start_Date" not in {row[1] for row in self._conn.execute("PRAGMA table_info(Pending_Writes)")}:
+            self._conn.execute("ALTER TABLE Pending_Writes ADD COLUMN Start_Date TEXT")  # journal from an older version
+        self._lock = threading.RLock()
+        self._pending: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # Seq -> entry, oldest first
+        self._in_flight: set = set()  # Seqs handed out by next_batch() and not yet completed
+        self._synced_ids: Dict[int, int] = {}  # temporary Habit_ID -> Habit_ID the database gave it
+        journaled_ids = []
+        for row in self._conn.execute(f"SELECT {', '.join(JOURNAL_COLUMNS)} FROM Pending_Writes ORDER BY Seq"):
+            entry = dict(zip(ENTRY_KEYS, row))
+            entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+            if entry["start_date"] is not None:
+                entry["start_date"] = date.fromisoformat(entry["start_date"])
+            if entry["error"] is None:
+                self._pending[entry["seq"]] = entry
+            journaled_ids.append(entry["habit_id"])  # rejected entries too, so temporary ids are never reused
+        self._next_temp_id = min([0] + journaled_ids) - 1
+
+    def __len__(self) -> int:
+        """Number of writes waiting to be sent"""
+        with self._lock:
+            return len(self._pending)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # === QUEUEING ===
+
+    def append(self, operation: str, habit_id: Optional[int] = None, user_id: Optional[int] = None,
+               expected_version: Optional[int] = None, **fields: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Record a write, merging it into an unsent write of the same habit when possible
+
+        Args:
+            operation: 'add', 'update' or 'delete'
+            habit_id: Habit to update/delete (temporary ids of offline adds work too)
+            user_id: Owner of the habit
+            expected_version: Row_Version the edit was based on, or None
+            fields: habit_name, description, category, frequency (None leaves a field alone),
+                and start_date for adds
+
+        Returns:
+            The queued entry (a dict in HabitDatabase.apply_writes form), or None
+            when a delete cancelled an add that was never sent
+        """
+        with self._lock:
+            if operation == "add":
+                habit_id = self._next_temp_id
+                self._next_temp_id -= 1
+                return self._insert(operation, habit_id, user_id, None, fields)
+
+            habit_id = self.resolve(habit_id)
+            last = self._last_unsent(habit_id)
+            if operation == "update" and last is not None and last["operation"] != "delete":
+                last.update((field, value) for field, value in fields.items() if value is not None)
+                self._save(last)
+                return last
+            if operation == "delete" and last is not None:
+                if last["operation"] == "add":  # never reached the database, so nothing to delete there
+                    self._remove(last)
+                    return None
+                for field in FIELD_POSITIONS:
+                    last[field] = None
+                last["operation"] = "delete"
+                self._save(last)
+                return last
+            if user_id is None:
+                user_id = next((e["user_id"] for e in self._pending.values() if e["habit_id"] == habit_id), None)
+            return self._insert(operation, habit_id, user_id, expected_version, fields)
+
+    def resolve(self, habit_id: int) -> int:
+        """The current id of a habit, for temporary ids that have since been synced"""
+        with self._lock:
+            return self._synced_ids.get(habit_id, habit_id)
+
+    def _last_unsent(self, habit_id: int) -> Optional[Dict[str, Any]]:
+        """Newest queued write of a habit, if it is not being sent right now"""
+        for seq in reversed(self._pending):
+            entry = self._pending[seq]
+            if entry["habit_id"] == habit_id:
+                return entry if seq not in self._in_flight else None
+        return None
+
+    def _insert(self, operation: str, habit_id: int, user_id: Optional[int], expected_version: Optional[int],
+                fields: Dict[str, Optional[str]]) -> Dict[str, Any]:
+        entry = {key: None for key in ENTRY_KEYS}
+        entry.update(fields)
+        entry.update(
+            write_key=str(uuid.uuid4()), operation=operation, habit_id=habit_id, user_id=user_id,
+            expected_version=expected_version, created_at=datetime.now(),
+        )
+        cursor = self._conn.execute(
+            f"INSERT INTO Pending_Writes ({', '.join(JOURNAL_COLUMNS[1:])}) VALUES ({', '.join('?' * (len(JOURNAL_COLUMNS) - 1))})",
+            self._values(entry)[1:],
+        )
+        entry["seq"] = cursor.lastrowid
+        self._pending[entry["seq"]] = entry
+        return entry
+
+    def _save(self, entry: Dict[str, Any]) -> None:
+        self._conn.execute(
+            f"REPLACE INTO Pending_Writes ({', '.join(JOURNAL_COLUMNS)}) VALUES ({', '.join('?' * len(JOURNAL_COLUMNS))})",
+            self._values(entry),
+        )
+
+    def _remove(self, entry: Dict[str, Any]) -> None:
+        self._conn.execute("DELETE FROM Pending_Writes WHERE Seq = ?", (entry["seq"],))
+        self._pending.pop(entry["seq"], None)
+
+    @staticmethod
+    def _values(entry: Dict[str, Any]) -> tuple:
+        values = [entry[key] for key in ENTRY_KEYS]
+        values[ENTRY_KEYS.index("created_at")] = entry["created_at"].isoformat()
+        if entry["start_date"] is not None:
+            values[ENTRY_KEYS.index("start_date")] = entry["start_date"].isoformat()
+        return tuple(values)
+
+    # === SENDING ===
+
+    def next_batch(self, size: int) -> List[Dict[str, Any]]:
+        """The oldest size unsent writes, marked as in flight until completed or released"""
+        with self._lock:
+            batch = []
+            for seq, entry in self._pending.items():
+                if len(batch) == size:
+                    break
+                if seq not in self._in_flight:
+                    self._in_flight.add(seq)
+                    batch.append(dict(entry))
+            return batch
+
+    def release(self, batch: List[Dict[str, Any]]) -> None:
+        """The batch could not be sent; queue it again as it was"""
+        with self._lock:
+            self._in_flight.difference_update(entry["seq"] for entry in batch)
+
+    def complete(self, entry: Dict[str, Any], outcome: str, habit_id: Optional[int], row_version: Optional[int]) -> None:
+        """
+        Record the database's answer to a sent write
+
+        Applied writes leave the journal; later writes of the same habit are
+        pointed at its real id (after an add) or its new Row_Version (after
+        an update). Rejected writes (NOT_FOUND, CONFLICT) are kept with the
+        reason, see failures().
+        """
+        with self._lock:
+            self._in_flight.discard(entry["seq"])
+            if outcome not in (ADDED, UPDATED, DELETED):
+                self.reject(entry, outcome)
+                return
+            self._remove(entry)
+            if outcome == ADDED:
+                self._synced_ids[entry["habit_id"]] = habit_id
+                self._conn.execute("UPDATE Pending_Writes SET Habit_ID = ? WHERE Habit_ID = ?", (habit_id, entry["habit_id"]))
+                for other in self._pending.values():
+                    if other["habit_id"] == entry["habit_id"]:
+                        other["habit_id"] = habit_id
+            elif outcome == UPDATED and entry["expected_version"] is not None:
+                for other in self._pending.values():
+                    if other["habit_id"] == habit_id and other["expected_version"] == entry["expected_version"]:
+                        other["expected_version"] = row_version
+                        self._save(other)
+
+    def reject(self, entry: Dict[str, Any], error: str) -> None:
+        """Stop sending a write and keep it, with the reason, for failures()"""
+        with self._lock:
+            self._in_flight.discard(entry["seq"])
+            entry = self._pending.pop(entry["seq"], entry)
+            entry["error"] = error
+            self._save(entry)
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Writes the database rejected (conflicts, deleted habits, invalid data), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(JOURNAL_COLUMNS)} FROM Pending_Writes WHERE Error IS NOT NULL ORDER BY Seq"
+            ).fetchall()
+        return [dict(zip(ENTRY_KEYS, row)) for row in rows]
+
+    def clear_failures(self) -> int:
+        """Forget rejected writes, e.g. once the user has been told; returns how many"""
+        with self._lock:
+            return self._conn.execute("DELETE FROM Pending_Writes WHERE Error IS NOT NULL").rowcount
+
+    # === LOCAL VIEW ===
+
+    def changes(self, user_id: Optional[int]) -> Tuple[Dict[int, Optional[Dict[str, str]]], Dict[int, tuple]]:
+        """
+        Net effect of the queued writes
+
+        Returns:
+            Tuple: ({habit_id: changed fields, or None if deleted}, {temporary id: row of a habit
+            this user added offline}), rows in the HABIT_COLUMNS shape
+        """
+        changed: Dict[int, Optional[Dict[str, str]]] = {}
+        added: Dict[int, tuple] = {}
+        with self._lock:
+            for entry in self._pending.values():
+                habit_id = entry["habit_id"]
+                fields = {field: entry[field] for field in FIELD_POSITIONS if entry[field] is not None}
+                if entry["operation"] == "add":
+                    if entry["user_id"] == user_id:
+                        added[habit_id] = (habit_id, None, None, None, None, entry["created_at"])
+                        added[habit_id] = apply_fields(added[habit_id], fields)
+                elif entry["operation"] == "delete":
+                    added.pop(habit_id, None)
+                    changed[habit_id] = None
+                elif habit_id in added:
+                    added[habit_id] = apply_fields(added[habit_id], fields)
+                elif changed.get(habit_id, {}) is not None:
+                    changed[habit_id] = dict(changed.get(habit_id, {}), **fields)
+        return changed, added
+
+    def added_habit(self, habit_id: int) -> Optional[tuple]:
+        """Row of a habit added offline that has not been synced yet"""
+        with self._lock:
+            user_id = next((entry["user_id"] for entry in self._pending.values()
+                            if entry["habit_id"] == habit_id and entry["operation"] == "add"), None)
+            return self.changes(user_id)[1].get(habit_id) if user_id is not None else None
+
+    def overlay(self, user_id: Optional[int], rows: List[tuple], include_added: bool = True,
+                matches: Optional[Callable[[tuple], bool]] = None) -> List[tuple]:
+        """
+        Rows as they will be once the queue is synced: queued edits applied, deleted habits dropped
+
+        Args:
+            user_id: Owner of the rows
+            rows: Habit rows from the database (extra columns after Frequency are kept)
+            include_added: Append the habits added offline (e.g. only on the last page of a list)
+            matches: Filter the rows must still pass after the edits, if any
+        """
+        changed, added = self.changes(user_id)
+        if not changed and not added:
+            return rows
+        result = []
+        for row in rows:
+            fields = changed.get(row[0], {})
+            if fields is None:
+                continue
+            row = apply_fields(row, fields)
+            if matches is None or matches(row):
+                result.append(row)
+        if include_added:
+            result += [row for row in added.values() if matches is None or matches(row)]
+        return result
+
+    def count_change(self, user_id: int, matches: Callable[[tuple], bool], known_rows: Dict[int, tuple]) -> int:
+        """How many more (or fewer) of a user's habits pass matches once the queue is synced"""
+        changed, added = self.changes(user_id)
+        delta = sum(1 for row in added.values() if matches(row))
+        for habit_id, fields in changed.items():
+            before = known_rows.get(habit_id)
+            if before is None:  # never shown, so it cannot have been edited from this view
+                continue
+            after = apply_fields(before, fields) if fields is not None else None
+            delta += (after is not None and matches(after)) - matches(before)
+        return delta
+
+
+class OfflineHabitDatabase:
+    def __init__(self, db: HabitDatabase, journal: WriteJournal, batch_size: int = 100, retry_delay: float = 1.0,
+                 max_retry_delay: float = 60.0, start: bool = True):
+        """
+        HabitDatabase front end whose add/update/delete never wait on the server
+
+        add_habit, update_habit and delete_habit only append to the local
+        journal and return; reads go to the database and come back with the
+        queued edits applied, so the app shows its own changes at once. A
+        background thread sends the journal in batches through
+        HabitDatabase.apply_writes, backing off while the server is
+        unreachable. Every other method is passed straight to db.
+
+        Conflicts are detected with Row_Version: an edit carries the version
+        of the habit as it was last read here, and the database refuses it
+        if another client has changed the habit since. Refused writes are
+        listed by failed_writes().
+
+        Args:
+            db: The HabitDatabase writes are sent to
+            journal: Local WriteJournal
+            batch_size: Writes sent per transaction
+            retry_delay: Seconds before the first retry after a failed sync (doubles each time)
+            max_retry_delay: Longest wait between retries
+            start: Start the background sync thread (tests call sync_now() instead)
+        """
+        self.db = db
+        self.journal = journal
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._known: Dict[int, Tuple[tuple, Optional[int]]] = {}  # Habit_ID -> (row, Row_Version) as last read
+        self._sync_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name="habit-journal-sync", daemon=True)
+            self._thread.start()
+            self._wake.set()  # send whatever a previous session left behind
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    def close(self) -> None:
+        """Stop syncing and close the journal and the database (unsent writes stay in the journal file)"""
+        self._closing.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self.journal.close()
+        self.db.close()
+
+    def pending_count(self) -> int:
+        """Writes not yet confirmed by the database"""
+        return len(self.journal)
+
+    def failed_writes(self) -> List[Dict[str, Any]]:
+        """Writes the database refused, each with an 'error' of 'conflict', 'not_found' or a database message"""
+        return self.journal.failures()
+
+    # === WRITES (journaled) ===
+
+    def add_habit(self, user_id: int, habit_name: str, description: str, category: str, frequency: str,
+                  start_date: Optional[date] = None) -> bool:
+        """Queue a new habit; it shows up in reads at once with a temporary negative Habit_ID"""
+        try:
+            HabitDatabase._habit_row_values((user_id, habit_name, description, category, frequency))
+            start_date = _as_date(start_date or date.today())  # recorded now, so a later sync keeps the day it was added
+        except (TypeError, ValueError) as e:
+            print(f"❌ Error adding habit: {e}")
+            return False
+        self.journal.append("add", user_id=user_id, habit_name=habit_name, description=description,
+                            category=category, frequency=frequency, start_date=start_date)
+        self._wake.set()
+        print(f"✅ Saved habit: {habit_name} (syncing in the background)")
+        return True
+
+    def update_habit(self, habit_id: int, user_id: int, habit_name: str, description: str, category: str, frequency: str,
+                     expected_version: Optional[int] = None) -> bool:
+        """Queue an update; expected_version defaults to the Row_Version last read for the habit"""
+        try:
+            HabitDatabase._habit_row_values((user_id, habit_name, description, category, frequency))
+        except (TypeError, ValueError) as e:
+            print(f"❌ Error updating habit: {e}")
+            return False
+        habit_id = self.journal.resolve(int(habit_id))
+        if expected_version is None:
+            expected_version = self._known.get(habit_id, (None, None))[1]
+        self.journal.append("update", habit_id, user_id, expected_version, habit_name=habit_name,
+                            description=description, category=category, frequency=frequency)
+        self._wake.set()
+        print(f"✅ Saved changes to habit with ID {habit_id} (syncing in the background)")
+        return True
+
+    def delete_habit(self, habit_id: int, expected_version: Optional[int] = None) -> bool:
+        """Queue a delete; expected_version defaults to the Row_Version last read for the habit"""
+        habit_id = self.journal.resolve(int(habit_id))
+        if expected_version is None:
+            expected_version = self._known.get(habit_id, (None, None))[1]
+        self.journal.append("delete", habit_id, expected_version=expected_version)
+        self._wake.set()
+        print(f"✅ Deleted habit with ID {habit_id} (syncing in the background)")
+        return True
+
+    # === READS (with queued writes applied) ===
+
+    def get_user_habits(self, user_id: int) -> List[tuple]:
+        return self.journal.overlay(user_id, self._remember(self.db.get_user_habits(user_id)))
+
+    def get_habit_by_id(self, habit_id: int) -> Optional[tuple]:
+        habit_id = self.journal.resolve(int(habit_id))
+        if habit_id < 0:  # added offline and not synced yet
+            return self.journal.added_habit(habit_id)
+        habit = self.db.get_habit_by_id(habit_id)
+        if habit is None:
+            return None
+        self._remember([habit])
+        rows = self.journal.overlay(None, [habit], include_added=False)
+        return rows[0] if rows else None
+
+    def count_user_habits(self, user_id: int, category: Optional[str] = None, frequency: Optional[str] = None,
+                          search: Optional[str] = None) -> int:
+        count = self.db.count_user_habits(user_id, category, frequency, search)
+        known = {habit_id: row for habit_id, (row, _) in self._known.items()}
+        return count + self.journal.count_change(user_id, habit_filter(category, frequency, search), known)
+
+    def query_user_habits(self, user_id: int, category: Optional[str] = None, frequency: Optional[str] = None,
+                          search: Optional[str] = None, sort_by: str = "Habit_ID", descending: bool = False,
+                          after: Optional[Tuple[Any, int]] = None, limit: int = 100, offset: int = 0) -> List[tuple]:
+        """
+        query_user_habits with queued edits applied
+
+        Habits added offline come after the database's rows (on the last
+        page), whatever the sort, until they are synced.
+        """
+        if after is not None and after[1] < 0:  # paging on from an offline habit: nothing follows it
+            return []
+        rows = self._remember(self.db.query_user_habits(
+            user_id, category, frequency, search, sort_by, descending, after, limit, offset
+        ))
+        return self.journal.overlay(user_id, rows, include_added=len(rows) < limit,
+                                    matches=habit_filter(category, frequency, search))
+
+    def search_habits(self, user_id: int, query: str, category: Optional[str] = None, frequency: Optional[str] = None,
+                      limit: int = 50) -> List[tuple]:
+        """search_habits with queued edits applied (offline adds are found once synced)"""
+        rows = self.db.search_habits(user_id, query, category, frequency, limit)
+        return self.journal.overlay(user_id, rows, include_added=False, matches=habit_filter(category, frequency, None))
+
+    def get_habit_categories(self, user_id: int) -> List[str]:
+        categories = set(self.db.get_habit_categories(user_id))
+        changed, added = self.journal.changes(user_id)
+        categories.update(row[3] for row in added.values() if row[3])
+        categories.update(fields["category"] for fields in changed.values() if fields and fields.get("category"))
+        return sorted(categories)
+
+    def _remember(self, rows: List[tuple]) -> List[tuple]:
+        """Keep the rows and their current Row_Version, the base of any edit made from this view"""
+        if rows:
+            versions = self.db.get_habit_versions(row[0] for row in rows)
+            for row in rows:
+                self._known[row[0]] = (row[:6], versions.get(row[0]))
+        return rows
+
+    # === SYNC ===
+
+    def sync_now(self) -> int:
+        """
+        Send every queued write on the calling thread
+
+        Returns:
+            int: Writes the database answered (applied or rejected); errors
+            reaching the database are raised and the writes stay queued
+        """
+        with self._sync_lock:
+            sent = 0
+            size = self.batch_size
+            while True:
+                batch = self.journal.next_batch(size)
+                if not batch:
+                    return sent
+                try:
+                    results = self.db.apply_writes(batch)
+                except Exception as e:
+                    self.journal.release(batch)
+                    if not self._is_rejection(e):
+                        raise
+                    if len(batch) == 1:
+                        print(f"❌ Dropping a queued {batch[0]['operation']} the database refused: {e}")
+                        self.journal.reject(batch[0], str(e))
+                        sent += 1
+                    size = max(1, len(batch) // 2)  # narrow down to the write that is refused
+                    continue
+                for entry, (outcome, habit_id, row_version) in zip(batch, results):
+                    self.journal.complete(entry, outcome, habit_id, row_version)
+                    known = self._known.get(habit_id)
+                    if outcome == UPDATED and known is not None:
+                        self._known[habit_id] = (known[0], row_version)
+                    elif outcome == DELETED:
+                        self._known.pop(habit_id, None)
+                sent += len(batch)
+
+    def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            self._wake.wait()
+            if self._closing.is_set():
+                return
+            self._wake.clear()
+            try:
+                self.sync_now()
+                delay = self.retry_delay
+            except Exception as e:
+                print(f"⚠️ Could not sync {len(self.journal)} saved changes, retrying in {delay:.0f}s: {e}")
+                self._closing.wait(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                self._wake.set()
+
+    def _is_rejection(self, error: Exception) -> bool:
+        """True when the database refused the data (retrying cannot help) rather than being unreachable"""
+        # anything else (a missing table or permission, a lost connection) may be fixed later, so it stays queued
+        return isinstance(error, (TypeError, ValueError) + self.db.engine.data_errors)
+
+
+def apply_fields(row: tuple, fields: Dict[str, Optional[str]]) -> tuple:
+    """A habit row with some of its editable fields replaced"""
+    if not fields:
+        return row
+    row = list(row)
+    for field, value in fields.items():
+        row[FIELD_POSITIONS[field]] = value
+    return tuple(row)
+
+
+def habit_filter(category: Optional[str], frequency: Optional[str], search: Optional[str]) -> Callable[[tuple], bool]:
+    """Python version of HabitDatabase._habit_filter (search is case-insensitive, like LIKE on both engines)"""
+    needle = search.lower() if search else None
+
+    def matches(row: tuple) -> bool:
+        if category is not None and row[3] != category:
+            return False
+        if frequency is not None and row[4] != frequency:
+            return False
+        return not needle or needle in (row[1] or "").lower() or needle in (row[2] or "").lower()
+
+    return matches
@@ -0,0 +1,314 @@
+"""Query timing instrumentation for HabitDatabase
+
+When HabitDatabase is given a QueryMetrics, every borrowed connection is
+wrapped so connect (pool checkout), execute and fetch times plus row counts
+are recorded per HabitDatabase method, and statements slower than a
+threshold are logged with their SQL and parameters. Without one, nothing is
+wrapped and the only cost is a None check per connection checkout.
+"""
+
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+# Upper bounds in seconds, Prometheus-style; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("connect", "execute", "fetch")
+MAX_LOGGED_PARAMS = 10  # executemany batches are logged as their first rows only
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        """Fixed-bucket histogram of durations in seconds"""
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = self.bounds[index] if index < len(self.bounds) else self.bounds[-1]
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.50),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], self.counts)),
+        }
+
+
+class _MethodStats:
+    __slots__ = ("calls", "rows", "phases")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.calls = 0
+        self.rows = 0
+        self.phases = {phase: Histogram(bounds) for phase in PHASES}
+
+
+class QueryMetrics:
+    def __init__(self, slow_query_threshold: Optional[float] = 0.5, slow_query_log_size: int = 100,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 on_slow_query: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        In-process query timings for HabitDatabase(..., metrics=QueryMetrics())
+
+        Args:
+            slow_query_threshold: Seconds (execute + fetch) after which a statement is logged, None to never log
+            slow_query_log_size: Most recent slow statements kept for snapshot()
+            buckets: Histogram bucket upper bounds in seconds
+            on_slow_query: Called with each slow-query record (defaults to printing it)
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.buckets = tuple(buckets)
+        self.on_slow_query = on_slow_query if on_slow_query is not None else _print_slow_query
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_query_log_size)
+        self._methods: Dict[str, _MethodStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, phase: str, seconds: float, rows: int = 0) -> None:
+        """Add one connect/execute/fetch timing (a connect counts as one call of the method)"""
+        with self._lock:
+            stats = self._stats(method)
+            if phase == "connect":
+                stats.calls += 1
+            stats.phases[phase].observe(seconds)
+            stats.rows += rows
+
+    def add_rows(self, method: str, rows: int) -> None:
+        with self._lock:
+            self._stats(method).rows += rows
+
+    def _stats(self, method: str) -> _MethodStats:
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = self._methods[method] = _MethodStats(self.buckets)
+        return stats
+
+    def statement_done(self, method: str, sql: str, params: Any, seconds: float, rows: int) -> None:
+        """Log a finished statement if it was slow"""
+        if self.slow_query_threshold is None or seconds < self.slow_query_threshold:
+            return
+        entry = {
+            "method": method,
+            "sql": " ".join(sql.split()),
+            "params": _loggable_params(params),
+            "seconds": seconds,
+            "rows": rows,
+            "at": time.time(),
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+        self.on_slow_query(entry)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self.slow_queries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-method calls, rows and connect/execute/fetch histograms, plus recent slow queries"""
+        with self._lock:
+            methods = {
+                method: {
+                    "calls": stats.calls,
+                    "rows": stats.rows,
+                    **{phase: histogram.snapshot() for phase, histogram in stats.phases.items()},
+                }
+                for method, stats in sorted(self._methods.items())
+            }
+            return {"methods": methods, "slow_queries": list(self.slow_queries)}
+
+    def prometheus_text(self, prefix: str = "habit_db") -> str:
+        """Export in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_query_seconds Time spent per HabitDatabase method and phase",
+            f"# TYPE {prefix}_query_seconds histogram",
+        ]
+        calls = [f"# TYPE {prefix}_calls_total counter"]
+        rows = [f"# TYPE {prefix}_rows_total counter"]
+        with self._lock:
+            for method, stats in sorted(self._methods.items()):
+                for phase, histogram in stats.phases.items():
+                    labels = f'method="{method}",phase="{phase}"'
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f'{prefix}_query_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f"{prefix}_query_seconds_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{prefix}_query_seconds_count{{{labels}}} {histogram.count}")
+                calls.append(f'{prefix}_calls_total{{method="{method}"}} {stats.calls}')
+                rows.append(f'{prefix}_rows_total{{method="{method}"}} {stats.rows}')
+            slow = len(self.slow_queries)
+        return "\n".join(lines + calls + rows + [f"# TYPE {prefix}_slow_queries gauge", f"{prefix}_slow_queries {slow}"]) + "\n"
+
+
+def caller_method(owner: Any) -> str:
+    """
+    Name of the innermost public method of owner on the call stack
+
+    Only called when metrics are enabled; this is how each checkout is
+    attributed to a HabitDatabase method without touching every method.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_code.co_name
+        if not name.startswith("_") and frame.f_locals.get("self") is owner:
+            return name
+        frame = frame.f_back
+    return "other"
+
+
+class InstrumentedConnection:
+    """Connection proxy that times statements for one HabitDatabase method"""
+
+    def __init__(self, conn: Any, metrics: QueryMetrics, method: str):
+        self._conn = conn
+        self._metrics = metrics
+        self._method = method
+        self._cursors: List[InstrumentedCursor] = []
+
+    def cursor(self) -> "InstrumentedCursor":
+        cursor = InstrumentedCursor(self._conn.cursor(), self._metrics, self._method)
+        self._cursors.append(cursor)
+        return cursor
+
+    def finish(self) -> None:
+        """Close out the last statement of every cursor before the connection goes back to the pool"""
+        for cursor in self._cursors:
+            cursor._finish_statement()
+        self._cursors.clear()
+
+    def execute(self, sql: str, params: Any = ()) -> "InstrumentedCursor":
+        """sqlite3-style shortcut"""
+        cursor = self.cursor()
+        cursor.execute(sql, params)
+        return cursor
+
+    def commit(self) -> None:
+        started = time.perf_counter()
+        self._conn.commit()
+        self._metrics.record(self._method, "execute", time.perf_counter() - started)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing execute()/executemany() and fetch*() calls"""
+
+    def __init__(self, cursor: Any, metrics: QueryMetrics, method: str):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_metrics", metrics)
+        object.__setattr__(self, "_method", method)
+        object.__setattr__(self, "_statement", None)  # [sql, params, seconds, rows] until the next execute
+
+    def execute(self, sql: str, params: Any = ()) -> "InstrumentedCursor":
+        return self._run(self._cursor.execute, sql, params)
+
+    def executemany(self, sql: str, rows: Sequence[Any]) -> "InstrumentedCursor":
+        return self._run(self._cursor.executemany, sql, rows)
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        self._count(1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        rows = self._fetch(self._cursor.fetchmany, size) if size is not None else self._fetch(self._cursor.fetchmany)
+        self._count(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        self._count(len(rows))
+        return rows
+
+    def close(self) -> None:
+        self._finish_statement()
+        self._cursor.close()
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(self._cursor.arraysize or 100)
+            if not rows:
+                return
+            yield from rows
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._cursor, name, value)  # arraysize, fast_executemany, ...
+
+    def _run(self, call: Callable, sql: str, params: Any) -> "InstrumentedCursor":
+        self._finish_statement()
+        started = time.perf_counter()
+        call(sql, params)
+        seconds = time.perf_counter() - started
+        affected = max(getattr(self._cursor, "rowcount", -1) or 0, 0)  # -1 for SELECTs
+        self._metrics.record(self._method, "execute", seconds, affected)
+        object.__setattr__(self, "_statement", [sql, params, seconds, affected])
+        return self
+
+    def _fetch(self, call: Callable, *args):
+        started = time.perf_counter()
+        result = call(*args)
+        seconds = time.perf_counter() - started
+        self._metrics.record(self._method, "fetch", seconds)
+        if self._statement is not None:
+            self._statement[2] += seconds
+        return result
+
+    def _count(self, rows: int) -> None:
+        if rows:
+            self._metrics.add_rows(self._method, rows)
+            if self._statement is not None:
+                self._statement[3] += rows
+
+    def _finish_statement(self) -> None:
+        statement = self._statement
+        if statement is not None:
+            object.__setattr__(self, "_statement", None)
+            self._metrics.statement_done(self._method, *statement)
+
+
+def _loggable_params(params: Any) -> Any:
+    if isinstance(params, (list, tuple)) and params and isinstance(params[0], (list, tuple)):
+        shown = [list(row) for row in params[:MAX_LOGGED_PARAMS]]
+        return {"rows": len(params), "first_rows": shown}  # executemany
+    if isinstance(params, (list, tuple)):
+        return list(params)
+    return params
+
+
+def _print_slow_query(entry: Dict[str, Any]) -> None:
+    print(f"🐢 Slow query in {entry['method']} ({entry['seconds'] * 1000:.1f} ms, {entry['rows']} rows): "
+          f"{entry['sql']} params={entry['params']}")
@@ -0,0 +1,238 @@
+"""Thread-safe connection pool used by HabitDatabase"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        checkout_timeout: float = 30.0,
+        ping_after: float = 5.0,
+        ping: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Create a pool of reusable database connections
+
+        Args:
+            connect: Callable that opens a brand-new connection
+            min_size: Connections kept open even when idle (opened by warm_up)
+            max_size: Upper bound on open connections, idle plus checked out
+            idle_timeout: Seconds an idle connection above min_size is kept before closing
+            checkout_timeout: Seconds acquire() waits for a free connection before raising PoolTimeout
+            ping_after: Connections idle longer than this are liveness-checked on checkout
+            ping: Callable that raises if a connection is dead (defaults to running SELECT 1)
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self._ping = ping or _select_one
+
+        self._idle: Deque[Tuple[Any, float]] = deque()  # (connection, last returned at)
+        self._size = 0  # open connections, idle plus checked out
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "creations": 0,
+            "discards": 0,
+            "ping_failures": 0,
+            "idle_closed": 0,
+        }
+
+    # === CHECKOUT / CHECKIN ===
+
+    def acquire(self) -> Any:
+        """Borrow a connection, reusing an idle one when possible"""
+        deadline = time.monotonic() + self.checkout_timeout
+        expired = []
+        try:
+            with self._cond:
+                # A quiet pool sees no release() calls, so expire idle connections here too
+                # rather than hand out one the server has already timed out
+                expired = self._collect_expired()
+                conn, last_used = self._checkout(deadline)
+        finally:
+            for stale in expired:
+                _close_quietly(stale)
+
+        if conn is None:
+            return self._create()
+        if time.monotonic() - last_used > self.ping_after and not self._is_alive(conn):
+            self._discard(conn)
+            with self._cond:
+                self._size += 1
+            return self._create()
+        return conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a borrowed connection; broken connections should be discarded"""
+        if not discard:
+            try:
+                conn.rollback()  # never hand out a connection with a half-finished transaction
+            except Exception:
+                discard = True
+        if discard or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            expired = self._collect_expired()
+            self._cond.notify()
+        for stale in expired:
+            _close_quietly(stale)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a with-block"""
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = _is_disconnect(e)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    # === LIFECYCLE ===
+
+    def warm_up(self) -> None:
+        """Open connections until min_size are available"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._create()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Close every idle connection; checked-out ones are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters and current occupancy"""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self._size
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._size - len(self._idle)
+        return snapshot
+
+    # === INTERNALS ===
+
+    def _checkout(self, deadline: float) -> Tuple[Any, Optional[float]]:
+        """Take an idle connection, or reserve a slot for a new one (None, None), waiting until deadline (lock held)"""
+        waited_since = None
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._idle:
+                conn, last_used = self._idle.pop()  # LIFO keeps the hottest connections busy
+                break
+            if self._size < self.max_size:
+                self._size += 1  # reserve the slot before connecting outside the lock
+                conn, last_used = None, None
+                break
+            if waited_since is None:
+                waited_since = time.monotonic()
+                self._stats["waits"] += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._cond.wait(remaining):
+                if not self._idle and self._size >= self.max_size:
+                    raise PoolTimeout(f"No connection available after {self.checkout_timeout}s")
+        if waited_since is not None:
+            self._stats["wait_time"] += time.monotonic() - waited_since
+        self._stats["checkouts"] += 1
+        return conn, last_used
+
+    def _create(self) -> Any:
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["creations"] += 1
+        return conn
+
+    def _discard(self, conn: Any) -> None:
+        _close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._stats["discards"] += 1
+            self._cond.notify()
+
+    def _is_alive(self, conn: Any) -> bool:
+        try:
+            self._ping(conn)
+            return True
+        except Exception:
+            with self._cond:
+                self._stats["ping_failures"] += 1
+            return False
+
+    def _collect_expired(self) -> list:
+        """Pop idle connections past idle_timeout while keeping min_size open (lock held)"""
+        expired = []
+        now = time.monotonic()
+        # The oldest idle connections sit at the left end of the deque
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            expired.append(conn)
+            self._size -= 1
+            self._stats["idle_closed"] += 1
+        return expired
+
+
+def _select_one(conn: Any) -> None:
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def _close_quietly(conn: Any) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _is_disconnect(error: Exception) -> bool:
+    """Best-effort check for errors that leave the connection unusable"""
+    # ODBC SQLSTATE class 08 is "connection exception"
+    args = getattr(error, "args", ())
+    return bool(args) and isinstance(args[0], str) and args[0].startswith("08")
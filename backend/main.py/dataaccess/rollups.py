@@ -0,0 +1,87 @@
+"""Completion counts per habit, per category and per user by day, week and month
+
+The rollup tables (database/migrations/009_completion_rollups.sql) hold one
+row per owner and period with two counters: Completed (logs marked done) and
+Logged (every log, done or not). Periods use the streaks.py numbering, so a
+week is Monday-based and a month is a calendar month. Log writes turn into
+counter deltas here; HabitDatabase adds them to the tables in the same
+transaction, so dashboards read a few rollup rows instead of Habit_Logs.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+try:  # imported as dataaccess.rollups (tests)
+    from .calendar_bits import period_start
+    from .streaks import period_index
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from calendar_bits import period_start
+    from streaks import period_index
+
+# Grain name -> the frequency whose period numbering it uses
+GRAINS = {"day": "Daily", "week": "Weekly", "month": "Monthly"}
+
+# Rollup table -> its key columns; the counters are always Completed, Logged
+ROLLUP_TABLES = {
+    "Habit_Rollup": ("Habit_ID", "Grain", "Period"),
+    "Category_Rollup": ("User_ID", "Category", "Grain", "Period"),
+    "User_Rollup": ("User_ID", "Grain", "Period"),
+}
+ROLLUP_COUNTERS = ("Completed", "Logged")
+
+
+def grain_period(grain: str, day: date) -> int:
+    """Period number of a day at a grain ('day', 'week' or 'month')"""
+    return period_index(_frequency(grain), day)
+
+
+def grain_start(grain: str, period: int) -> date:
+    """First day of a period number at a grain"""
+    return period_start(_frequency(grain), period)
+
+
+def rollup_deltas(
+    changes: Iterable[Tuple[int, date, Optional[bool], bool]],
+    owners: Mapping[int, Tuple[int, Optional[str]]],
+) -> Dict[str, Dict[tuple, list]]:
+    """
+    Counter changes caused by written logs, summed per rollup row
+
+    Args:
+        changes: (habit_id, log_date, old_status, new_status) per written log;
+            old_status is None for a newly inserted log
+        owners: Habit_ID -> (User_ID, Category); habits missing here are skipped
+
+    Returns:
+        Dict: rollup table -> {key tuple (ROLLUP_TABLES order): [completed delta, logged delta]},
+        rows whose counters do not change left out
+    """
+    deltas: Dict[str, Dict[tuple, list]] = {table: {} for table in ROLLUP_TABLES}
+    for habit_id, log_date, old_status, new_status in changes:
+        if habit_id not in owners:
+            continue
+        completed = int(bool(new_status)) - int(bool(old_status))
+        logged = 1 if old_status is None else 0
+        if not completed and not logged:
+            continue
+        user_id, category = owners[habit_id]
+        category = category or ""  # part of the key, so never NULL
+        for grain in GRAINS:
+            period = grain_period(grain, log_date)
+            for table, key in (
+                ("Habit_Rollup", (habit_id, grain, period)),
+                ("Category_Rollup", (user_id, category, grain, period)),
+                ("User_Rollup", (user_id, grain, period)),
+            ):
+                counts = deltas[table].setdefault(key, [0, 0])
+                counts[0] += completed
+                counts[1] += logged
+    for table in deltas:
+        deltas[table] = {key: counts for key, counts in deltas[table].items() if counts != [0, 0]}
+    return deltas
+
+
+def _frequency(grain: str) -> str:
+    if grain not in GRAINS:
+        raise ValueError(f"grain must be one of {', '.join(GRAINS)}, got {grain!r}")
+    return GRAINS[grain]
@@ -0,0 +1,212 @@
+"""Due-habit scheduler: every habit's next due day on a timing wheel
+
+A habit is due from the first day of each period (streaks.py numbering) it
+has not completed yet, starting with the period containing its StartDate.
+Habits that are not due yet sit in a bucket keyed by the day they fall due,
+and a min-heap of those days lets advance() move whole buckets into the due
+sets as the clock passes them. Each habit moves at most once per period, so
+asking what is due now costs the size of the answer, not the number of habits.
+"""
+
+import heapq
+import threading
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:  # imported as dataaccess.scheduler (tests)
+    from .calendar_bits import period_start
+    from .streaks import normalize_frequency, period_index
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from calendar_bits import period_start
+    from streaks import normalize_frequency, period_index
+
+
+def next_due(frequency: Optional[str], start_date: date, last_period: Optional[int]) -> Tuple[int, date]:
+    """
+    The period a habit is due in next and the day it becomes due
+
+    Args:
+        frequency: The habit's Frequency
+        start_date: Day the habit started (periods before it are never due)
+        last_period: Newest completed period (Habit_Streaks.Last_Period), None if never completed
+
+    Returns:
+        Tuple: (period number, first day it is due)
+    """
+    first = period_index(frequency, start_date)
+    period = first if last_period is None else max(first, last_period + 1)
+    return period, max(period_start(frequency, period), start_date)
+
+
+class DueScheduler:
+    def __init__(self, today: Optional[date] = None):
+        """
+        Track when every habit of every user is next due
+
+        Fill it with load(), keep it current with add()/remove()/log_changes()
+        (HabitDatabase does this from its write methods once it has built
+        one), and call due()/due_for_user()/advance() to read it.
+
+        Args:
+            today: Day the scheduler starts at (defaults to today)
+        """
+        self.today = today or date.today()
+        self.lock = threading.RLock()
+        self._habits: Dict[int, list] = {}  # habit_id -> [user_id, frequency, start_date, period, due_date]
+        self._wheel: Dict[date, Set[int]] = {}  # habits not due yet, by the day they fall due
+        self._days: List[date] = []  # min-heap of the wheel's days (may hold days already emptied)
+        self._due: Dict[int, Set[int]] = {}  # user_id -> habits due as of self.today
+
+    def __len__(self) -> int:
+        return len(self._habits)
+
+    def load(self, rows: Iterable[Tuple[int, int, Optional[str], date, Optional[int]]]) -> int:
+        """Schedule (habit_id, user_id, frequency, start_date, last_period) rows; returns how many"""
+        count = 0
+        with self.lock:
+            for row in rows:
+                self.add(*row)
+                count += 1
+        return count
+
+    def add(self, habit_id: int, user_id: int, frequency: Optional[str], start_date: date,
+            last_period: Optional[int] = None) -> date:
+        """
+        Schedule a habit, replacing what was known about it
+
+        Returns:
+            date: The day the habit is (or was) next due
+        """
+        frequency = normalize_frequency(frequency)
+        period, due_date = next_due(frequency, start_date, last_period)
+        with self.lock:
+            self._unplace(habit_id)
+            self._habits[habit_id] = [user_id, frequency, start_date, period, due_date]
+            self._place(habit_id)
+        return due_date
+
+    def remove(self, habit_id: int) -> bool:
+        """Stop tracking a (deleted) habit; False if it was not scheduled"""
+        with self.lock:
+            if habit_id not in self._habits:
+                return False
+            self._unplace(habit_id)
+            del self._habits[habit_id]
+            return True
+
+    def complete(self, habit_id: int, day: date) -> Optional[date]:
+        """
+        Record a completion on day; finishing the due period moves the habit to the next one
+
+        Returns:
+            Optional[date]: The habit's next due day, None if it is not scheduled
+        """
+        with self.lock:
+            entry = self._habits.get(habit_id)
+            if entry is None:
+                return None
+            user_id, frequency, start_date, period, due_date = entry
+            completed = period_index(frequency, day)
+            if completed < period:  # backfill of an older period
+                return due_date
+            return self.add(habit_id, user_id, frequency, start_date, completed)
+
+    def log_changes(self, changes: Iterable[Tuple[int, date, Optional[bool], bool]]) -> List[int]:
+        """
+        Apply committed log writes (the HabitDatabase._on_logs_written changes)
+
+        Args:
+            changes: (habit_id, log_date, old_status, new_status) per written log
+
+        Returns:
+            List[int]: Habits whose completion was taken back; only the database
+            knows their newest remaining completion, so reschedule them with add()
+        """
+        taken_back = []
+        with self.lock:
+            for habit_id, log_date, old_status, new_status in changes:
+                if new_status and not old_status:
+                    self.complete(habit_id, log_date)
+                elif old_status and not new_status and habit_id in self._habits:
+                    taken_back.append(habit_id)
+        return taken_back
+
+    def advance(self, today: Optional[date] = None) -> List[Tuple[int, int]]:
+        """
+        Move the clock forward to today
+
+        Returns:
+            List: (user_id, habit_id) of the habits that became due, e.g. for reminders
+        """
+        today = today or date.today()
+        became_due = []
+        with self.lock:
+            if today < self.today:  # clock moved back: rare, so simply place everything again
+                for habit_id in self._habits:
+                    self._unplace(habit_id)
+                self.today = today
+                for habit_id in self._habits:
+                    self._place(habit_id)
+                return []
+            self.today = today
+            while self._days and self._days[0] <= today:
+                for habit_id in self._wheel.pop(heapq.heappop(self._days), ()):
+                    user_id = self._habits[habit_id][0]
+                    self._due.setdefault(user_id, set()).add(habit_id)
+                    became_due.append((user_id, habit_id))
+        return became_due
+
+    def due(self, today: Optional[date] = None) -> Dict[int, List[int]]:
+        """Every habit due now, across all users: user_id -> sorted Habit_IDs"""
+        with self.lock:
+            self.advance(today)
+            return {user_id: sorted(habits) for user_id, habits in self._due.items() if habits}
+
+    def due_for_user(self, user_id: int, today: Optional[date] = None) -> List[int]:
+        """Habit_IDs of one user that are due now, sorted"""
+        with self.lock:
+            self.advance(today)
+            return sorted(self._due.get(user_id, ()))
+
+    def due_count(self, today: Optional[date] = None) -> int:
+        """Number of habits due now across all users"""
+        with self.lock:
+            self.advance(today)
+            return sum(len(habits) for habits in self._due.values())
+
+    def next_due_date(self, habit_id: int) -> Optional[date]:
+        """First day of the habit's next period to complete (today or earlier when it is due), None if unknown"""
+        with self.lock:
+            entry = self._habits.get(habit_id)
+            return entry[4] if entry is not None else None
+
+    def _place(self, habit_id: int) -> None:
+        """Put a habit in its user's due set or its wheel bucket (lock held)"""
+        user_id, _, _, _, due_date = self._habits[habit_id]
+        if due_date <= self.today:
+            self._due.setdefault(user_id, set()).add(habit_id)
+            return
+        bucket = self._wheel.get(due_date)
+        if bucket is None:
+            bucket = self._wheel[due_date] = set()
+            heapq.heappush(self._days, due_date)
+        bucket.add(habit_id)
+
+    def _unplace(self, habit_id: int) -> None:
+        """Take a habit out of wherever _place put it (lock held)"""
+        entry = self._habits.get(habit_id)
+        if entry is None:
+            return
+        user_id, due_date = entry[0], entry[4]
+        if due_date <= self.today:
+            habits = self._due.get(user_id)
+            if habits is not None:
+                habits.discard(habit_id)
+                if not habits:
+                    del self._due[user_id]
+        else:
+            bucket = self._wheel.get(due_date)
+            if bucket is not None:
+                bucket.discard(habit_id)
+                if not bucket:
+                    del self._wheel[due_date]  # its day stays on the heap and is skipped by advance()
@@ -0,0 +1,197 @@
+"""Ranked text search over habit names, descriptions and log notes
+
+HabitDatabase.search_habits uses the database's own full-text index when
+there is one (SQLite FTS5, SQL Server full-text). InvertedIndex is the
+fallback: an in-process index built on the first search and then kept up to
+date by the HabitDatabase write methods.
+"""
+
+import math
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Tokens are runs of letters and digits, the same split as FTS5's unicode61 tokenizer
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+# Field weights: a name match ranks above a description match, which ranks above a note
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+NOTE_WEIGHT = 0.5
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased words of a text (empty for None)"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class _UserIndex:
+    """Postings of one user's documents, so a search never looks at other users"""
+
+    __slots__ = ("postings", "terms", "lengths", "total_length")
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[Hashable, int]] = {}  # term -> {document key: term count}
+        self.terms: Optional[List[str]] = []  # sorted postings keys for prefix lookups, None when stale
+        self.lengths: Dict[Hashable, int] = {}
+        self.total_length = 0
+
+    def expand(self, term: str, prefix: bool) -> List[str]:
+        """Indexed terms equal to term, or starting with it"""
+        if not prefix:
+            return [term] if term in self.postings else []
+        if self.terms is None:
+            self.terms = sorted(self.postings)
+        matches = []
+        for index in range(bisect_left(self.terms, term), len(self.terms)):
+            if not self.terms[index].startswith(term):
+                break
+            matches.append(self.terms[index])
+        return matches
+
+
+class InvertedIndex:
+    def __init__(self):
+        """
+        In-process inverted index of habit text, ranked with BM25
+
+        Documents are a habit's name, its description and each log note,
+        keyed by ("name", habit_id), ("description", habit_id) and
+        ("note", habit_id, log_date). Postings are kept per user. All
+        methods are thread-safe; hold `lock` to apply a series of changes
+        atomically (e.g. while loading from the database).
+        """
+        self.lock = threading.RLock()
+        self._users: Dict[int, _UserIndex] = {}
+        self._documents: Dict[Hashable, Tuple[int, int, float, Set[str]]] = {}  # key -> (user, habit, weight, terms)
+        self._habit_users: Dict[int, int] = {}
+        self._habit_documents: Dict[int, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add_habit(self, user_id: int, habit_id: int, habit_name: Optional[str], description: Optional[str]) -> None:
+        """Index a new habit, or re-index a changed one (its notes are kept)"""
+        with self.lock:
+            self._habit_users[habit_id] = user_id
+            self._put(("name", habit_id), user_id, habit_id, NAME_WEIGHT, habit_name)
+            self._put(("description", habit_id), user_id, habit_id, DESCRIPTION_WEIGHT, description)
+
+    def update_habit(self, habit_id: int, habit_name: Optional[str], description: Optional[str]) -> None:
+        """Re-index a changed habit; habits the index has not seen are ignored"""
+        with self.lock:
+            user_id = self._habit_users.get(habit_id)
+            if user_id is not None:
+                self.add_habit(user_id, habit_id, habit_name, description)
+
+    def add_note(self, habit_id: int, log_date: Any, note: Optional[str]) -> None:
+        """Index a log note; notes of habits the index has not seen are ignored"""
+        with self.lock:
+            user_id = self._habit_users.get(habit_id)
+            if user_id is not None:
+                self._put(("note", habit_id, log_date), user_id, habit_id, NOTE_WEIGHT, note)
+
+    def remove_habit(self, habit_id: int) -> None:
+        """Drop a habit and all of its notes"""
+        with self.lock:
+            for key in self._habit_documents.pop(habit_id, set()):
+                self._drop(key)
+            self._habit_users.pop(habit_id, None)
+
+    def search(self, user_id: int, query: str, limit: Optional[int] = 50) -> List[Tuple[int, float]]:
+        """
+        Rank a user's habits against a query
+
+        Every word of the query must match (AND); the last word also matches
+        as a prefix so results appear while it is still being typed.
+
+        Returns:
+            (habit_id, score) pairs, best first; a habit scores its best document
+        """
+        terms = tokenize(query)
+        with self.lock:
+            index = self._users.get(user_id)
+            if not terms or index is None or not index.lengths:
+                return []
+            documents = len(index.lengths)
+            average_length = index.total_length / documents
+            scores: Optional[Dict[Hashable, float]] = None
+            for position, term in enumerate(terms):
+                term_scores: Dict[Hashable, float] = {}
+                for indexed in index.expand(term, prefix=position == len(terms) - 1):
+                    postings = index.postings[indexed]
+                    idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, count in postings.items():
+                        norm = count + K1 * (1 - B + B * index.lengths[key] / average_length)
+                        term_scores[key] = term_scores.get(key, 0.0) + idf * count * (K1 + 1) / norm
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+                if not scores:
+                    return []
+
+            best: Dict[int, float] = {}
+            for key, score in scores.items():
+                _, habit_id, weight, _ = self._documents[key]
+                best[habit_id] = max(best.get(habit_id, 0.0), score * weight)
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def _put(self, key: Hashable, user_id: int, habit_id: int, weight: float, text: Optional[str]) -> None:
+        self._drop(key)
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        index = self._users.get(user_id)
+        if index is None:
+            index = self._users[user_id] = _UserIndex()
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, count in counts.items():
+            postings = index.postings.get(term)
+            if postings is None:
+                postings = index.postings[term] = {}
+                index.terms = None
+            postings[key] = count
+        index.lengths[key] = len(tokens)
+        index.total_length += len(tokens)
+        self._documents[key] = (user_id, habit_id, weight, set(counts))
+        self._habit_documents.setdefault(habit_id, set()).add(key)
+
+    def _drop(self, key: Hashable) -> None:
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+        user_id, habit_id, _, terms = document
+        index = self._users[user_id]
+        for term in terms:
+            postings = index.postings[term]
+            del postings[key]
+            if not postings:
+                del index.postings[term]
+                index.terms = None
+        index.total_length -= index.lengths.pop(key)
+        keys = self._habit_documents.get(habit_id)
+        if keys is not None:  # already detached when the whole habit is being removed
+            keys.discard(key)
+
+
+def build_index(habits: Iterable[Tuple[int, int, Optional[str], Optional[str]]],
+                notes: Iterable[Tuple[int, Any, Optional[str]]], index: Optional[InvertedIndex] = None) -> InvertedIndex:
+    """
+    Fill an index from (habit_id, user_id, name, description) and (habit_id, log_date, note) rows
+
+    Habits must come first so notes can be attributed to their user.
+    """
+    index = index if index is not None else InvertedIndex()
+    with index.lock:
+        for habit_id, user_id, habit_name, description in habits:
+            index.add_habit(user_id, habit_id, habit_name, description)
+        for habit_id, log_date, note in notes:
+            index.add_note(habit_id, log_date, note)
+    return index
@@ -0,0 +1,478 @@
+"""High-speed bulk loader for Users, Habits and Habit_Logs
+
+Fills a database with millions of rows for load tests and demos, from the
+synthetic generator or from CSV files. Rows are streamed, never held in
+memory as a whole:
+
+- SQL Server: rows are written to tab-delimited data files with an XML
+  (bcp) format file and loaded with INSERT ... SELECT FROM OPENROWSET(BULK ...)
+  under a table lock, one file per batch.
+- SQLite: executemany() in large batched transactions with foreign key
+  checks and fsyncs off while loading.
+
+Secondary indexes are dropped/disabled for the load and rebuilt once at the
+end, and streak state is recomputed for the loaded habits.
+
+Usage (from backend/main.py/dataaccess, DB_CONNECTION_STRING taken from .env):
+    python seed_loader.py --size 100000x10x30
+    python seed_loader.py --csv ./seed_csv      # users.csv, habits.csv, habit_logs.csv with header rows
+    python seed_loader.py --size 1000x5x60 --connection sqlite:///habit_tracker.db
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:  # imported as dataaccess.seed_loader (tests)
+    from .data_access import HabitDatabase, connection_string_from_env
+    from .engines import SQLITE_FULL_TEXT_TABLES
+    from .synthetic import SyntheticDataset, parse_size
+except ImportError:  # run from inside dataaccess/ (python seed_loader.py)
+    from data_access import HabitDatabase, connection_string_from_env
+    from engines import SQLITE_FULL_TEXT_TABLES
+    from synthetic import SyntheticDataset, parse_size
+
+# Columns the loader fills, in load order; ids are given explicitly so logs can
+# reference habits without a round trip per row
+TABLE_COLUMNS = {
+    "Users": ("User_ID", "First_Name", "Email"),
+    "Habits": ("Habit_ID", "User_ID", "Habit_Name_", "Description_", "Category", "Frequency", "StartDate"),
+    "Habit_Logs": ("Habit_ID", "Log_Date", "Habit_Status", "Note"),
+}
+IDENTITY_TABLES = ("Users", "Habits")
+CSV_FILES = {"Users": "users.csv", "Habits": "habits.csv", "Habit_Logs": "habit_logs.csv"}
+# Secondary indexes rebuilt once after the load instead of row by row
+DEFERRED_INDEXES = {
+    "Habits": {
+        "IX_Habits_User_ID": "CREATE INDEX IX_Habits_User_ID ON Habits (User_ID, Habit_ID)",
+        "IX_Habits_User_Category_Frequency": "CREATE INDEX IX_Habits_User_Category_Frequency ON Habits (User_ID, Category, Frequency)",
+    },
+    "Habit_Logs": {"UX_Habit_Logs_Habit_Date": "CREATE UNIQUE INDEX UX_Habit_Logs_Habit_Date ON Habit_Logs (Habit_ID, Log_Date)"},
+}
+# With the unique index off, a source can repeat a habit/day; the newest row wins
+# (same rule as database/migrations/003_habit_logs_int_fk.sql), found in one
+# grouped pass since there is no index to seek on yet
+DELETE_DUPLICATE_LOGS = """
+    DELETE FROM Habit_Logs
+    WHERE Log_ID NOT IN (SELECT MAX(Log_ID) FROM Habit_Logs GROUP BY Habit_ID, Log_Date)
+"""
+
+
+class Progress:
+    def __init__(self, table: str, every: float = 1.0, verb: str = "loaded"):
+        """Prints running row counts and rows/sec for one table at most every `every` seconds"""
+        self.table = table
+        self.every = every
+        self.verb = verb
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last_print = self.started
+
+    def update(self, rows: int) -> None:
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_print >= self.every:
+            self._last_print = now
+            print(f"⏳ {self.table}: {self.rows:,} rows ({self.rows / (now - self.started):,.0f} rows/s)")
+
+    def finish(self) -> Dict[str, Any]:
+        seconds = time.perf_counter() - self.started
+        rows_per_sec = self.rows / seconds if seconds else 0.0
+        print(f"✅ {self.table}: {self.verb} {self.rows:,} rows in {seconds:.1f}s ({rows_per_sec:,.0f} rows/s)")
+        return {"rows": self.rows, "seconds": seconds, "rows_per_sec": rows_per_sec}
+
+
+class SeedLoader(ABC):
+    def __init__(self, db: HabitDatabase, batch_size: int = 50000, defer_indexes: bool = True,
+                 progress_every: float = 1.0):
+        """
+        Bulk loader bound to a HabitDatabase (use create_seed_loader to get the right one)
+
+        Args:
+            db: Database to fill
+            batch_size: Rows per transaction (SQLite) or per data file (SQL Server)
+            defer_indexes: Drop/disable secondary indexes during the load and rebuild them after
+            progress_every: Seconds between progress lines
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.defer_indexes = defer_indexes
+        self.progress_every = progress_every
+
+    def next_ids(self) -> Tuple[int, int]:
+        """First free (User_ID, Habit_ID), where generated rows start"""
+        with self.db._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(User_ID), 0) + 1 FROM Users")
+            first_user_id = cursor.fetchone()[0]
+            cursor.execute("SELECT COALESCE(MAX(Habit_ID), 0) + 1 FROM Habits")
+            first_habit_id = cursor.fetchone()[0]
+        return first_user_id, first_habit_id
+
+    def load(self, sources: Dict[str, Iterable[tuple]],
+             columns: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, Any]:
+        """
+        Load rows for each table present in sources, in Users, Habits, Habit_Logs order
+
+        Args:
+            sources: Table name -> iterable of tuples in TABLE_COLUMNS order
+            columns: Table name -> columns of its rows, for sources that differ
+                from TABLE_COLUMNS (e.g. an export that includes timestamps)
+
+        Returns:
+            Dict: Per-table {"rows", "seconds", "rows_per_sec"}, plus "duplicate_logs" dropped
+        """
+        figures: Dict[str, Any] = {}
+        loaded_habits: Set[int] = set()
+        with self.db._get_connection() as conn:
+            self._begin(conn)
+            deferred = self._drop_indexes(conn) if self.defer_indexes else []
+            try:
+                for table in TABLE_COLUMNS:
+                    if table not in sources:
+                        continue
+                    rows = sources[table]
+                    if table == "Habit_Logs":
+                        rows = _track_habits(rows, loaded_habits)
+                    progress = Progress(table, self.progress_every)
+                    self._load_table(conn, table, (columns or TABLE_COLUMNS).get(table, TABLE_COLUMNS[table]), rows, progress)
+                    figures[table] = progress.finish()
+            finally:
+                started = time.perf_counter()
+                figures["duplicate_logs"] = self._restore_indexes(conn, deferred)
+                self._end(conn)
+                if deferred:
+                    print(f"✅ Rebuilt {len(deferred)} deferred indexes/triggers in {time.perf_counter() - started:.1f}s")
+        if figures["duplicate_logs"]:
+            print(f"⚠️ Dropped {figures['duplicate_logs']:,} logs that repeated a habit/day")
+
+        if self.db.cache is not None:
+            self.db.cache.clear()
+        self.db.search_index = None  # an in-process search index is rebuilt on the next search
+        self.db.scheduler = None  # so is the due-habit scheduler
+        if loaded_habits:
+            self.db.recompute_streaks(loaded_habits)
+            self.db.rebuild_calendars(loaded_habits)
+            self.db.rebuild_rollups(loaded_habits)
+        return figures
+
+    def load_synthetic(self, dataset: SyntheticDataset) -> Dict[str, Any]:
+        """Generate a dataset with ids following the existing rows and load it"""
+        first_user_id, first_habit_id = self.next_ids()
+        return self.load(synthetic_sources(dataset, first_user_id, first_habit_id))
+
+    def load_csv(self, directory: str) -> Dict[str, Any]:
+        """Load users.csv, habits.csv and habit_logs.csv (whichever exist) from a directory"""
+        return self.load(csv_sources(directory))
+
+    # === DIALECT HOOKS ===
+
+    def _begin(self, conn) -> None:
+        pass
+
+    def _end(self, conn) -> None:
+        pass
+
+    @abstractmethod
+    def _load_table(self, conn, table: str, columns: Sequence[str], rows: Iterable[tuple], progress: Progress) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _drop_indexes(self, conn) -> List[Tuple[str, str]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _restore_indexes(self, conn, deferred: List[Tuple[str, str]]) -> int:
+        raise NotImplementedError
+
+
+class SqliteSeedLoader(SeedLoader):
+    def _begin(self, conn) -> None:
+        conn.execute("PRAGMA foreign_keys = OFF")  # checked once at the end instead
+        conn.execute("PRAGMA synchronous = OFF")
+
+    def _end(self, conn) -> None:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM Habit_Logs WHERE Habit_ID NOT IN (SELECT Habit_ID FROM Habits)"
+        ).fetchone()[0]
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if count:
+            print(f"⚠️ {count:,} logs point at habits that do not exist")
+
+    def _load_table(self, conn, table: str, columns: Sequence[str], rows: Iterable[tuple], progress: Progress) -> None:
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        cursor = conn.cursor()
+        row_iter = iter(rows)
+        while True:
+            batch = list(islice(row_iter, self.batch_size))
+            if not batch:
+                break
+            cursor.executemany(sql, batch)
+            conn.commit()
+            progress.update(len(batch))
+
+    def _drop_indexes(self, conn) -> List[Tuple[str, str]]:
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        deferred = [(name, ddl) for indexes in DEFERRED_INDEXES.values() for name, ddl in indexes.items()
+                    if name in existing]
+        for name, _ in deferred:
+            conn.execute(f"DROP INDEX {name}")
+        # The full-text triggers would index every row as it lands; one FTS rebuild afterwards is far cheaper
+        triggers = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('Habits', 'Habit_Logs')"
+            " AND name LIKE '%FTS%'"
+        ).fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.commit()
+        return deferred + [(name, ddl) for name, ddl in triggers]
+
+    def _restore_indexes(self, conn, deferred: List[Tuple[str, str]]) -> int:
+        duplicates = 0
+        if any(name == "UX_Habit_Logs_Habit_Date" for name, _ in deferred):
+            duplicates = conn.execute(DELETE_DUPLICATE_LOGS).rowcount
+        if any(ddl.startswith("CREATE TRIGGER") for _, ddl in deferred):
+            for table in SQLITE_FULL_TEXT_TABLES:
+                conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        for _, ddl in deferred:
+            conn.execute(ddl)
+        conn.commit()
+        return duplicates
+
+
+class SqlServerSeedLoader(SeedLoader):
+    def __init__(self, db: HabitDatabase, batch_size: int = 500000, defer_indexes: bool = True,
+                 progress_every: float = 1.0, data_dir: Optional[str] = None, server_data_dir: Optional[str] = None):
+        """
+        Args:
+            data_dir: Where data/format files are written (a temporary directory by default)
+            server_data_dir: The same directory as the SQL Server service sees it, if the
+                server runs on another machine (e.g. a UNC share); defaults to data_dir
+        """
+        super().__init__(db, batch_size, defer_indexes, progress_every)
+        self.data_dir = data_dir
+        self.server_data_dir = server_data_dir
+
+    def load(self, sources: Dict[str, Iterable[tuple]],
+             columns: Optional[Dict[str, Sequence[str]]] = None) -> Dict[str, Any]:
+        owns_dir = self.data_dir is None
+        if owns_dir:
+            self.data_dir = tempfile.mkdtemp(prefix="habit_seed_")
+        try:
+            return super().load(sources, columns)
+        finally:
+            if owns_dir:
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+                self.data_dir = None
+
+    def _load_table(self, conn, table: str, columns: Sequence[str], rows: Iterable[tuple], progress: Progress) -> None:
+        format_path = os.path.join(self.data_dir, f"{table}.xml")
+        with open(format_path, "w", encoding="utf-8") as f:
+            f.write(bcp_format_file(table, columns))
+        cursor = conn.cursor()
+        column_list = ", ".join(columns)
+        row_iter = iter(rows)
+        part = 0
+        while True:
+            batch = list(islice(row_iter, self.batch_size))
+            if not batch:
+                break
+            part += 1
+            data_path = os.path.join(self.data_dir, f"{table}_{part}.dat")
+            write_bcp_data(data_path, batch)
+            if table in IDENTITY_TABLES:
+                cursor.execute(f"SET IDENTITY_INSERT {table} ON")
+            cursor.execute(f"""
+                INSERT INTO {table} WITH (TABLOCK) ({column_list})
+                SELECT {column_list}
+                FROM OPENROWSET(BULK N'{self._server_path(data_path)}',
+                                FORMATFILE = N'{self._server_path(format_path)}', CODEPAGE = '65001') AS src
+            """)
+            if table in IDENTITY_TABLES:
+                cursor.execute(f"SET IDENTITY_INSERT {table} OFF")
+            conn.commit()
+            os.remove(data_path)
+            progress.update(len(batch))
+
+    def _server_path(self, path: str) -> str:
+        if self.server_data_dir:
+            path = os.path.join(self.server_data_dir, os.path.basename(path))
+        return path.replace("'", "''")
+
+    def _drop_indexes(self, conn) -> List[Tuple[str, str]]:
+        cursor = conn.cursor()
+        deferred = []
+        for table, indexes in DEFERRED_INDEXES.items():
+            for name, ddl in indexes.items():
+                cursor.execute("SELECT 1 FROM sys.indexes WHERE name = ? AND object_id = OBJECT_ID(?) AND is_disabled = 0",
+                               (name, table))
+                if cursor.fetchone():
+                    cursor.execute(f"ALTER INDEX {name} ON {table} DISABLE")
+                    deferred.append((name, f"ALTER INDEX {name} ON {table} REBUILD"))
+        conn.commit()
+        return deferred
+
+    def _restore_indexes(self, conn, deferred: List[Tuple[str, str]]) -> int:
+        cursor = conn.cursor()
+        duplicates = 0
+        if any(name == "UX_Habit_Logs_Habit_Date" for name, _ in deferred):
+            cursor.execute(DELETE_DUPLICATE_LOGS)
+            duplicates = cursor.rowcount
+        for _, ddl in deferred:
+            cursor.execute(ddl)
+        conn.commit()
+        return duplicates
+
+
+def create_seed_loader(db: HabitDatabase, **options) -> SeedLoader:
+    """Pick the bulk path for the database's engine"""
+    if db.engine.name == "sqlite":
+        options.pop("data_dir", None)
+        options.pop("server_data_dir", None)
+        return SqliteSeedLoader(db, **options)
+    return SqlServerSeedLoader(db, **options)
+
+
+# === SOURCES ===
+
+def synthetic_sources(dataset: SyntheticDataset, first_user_id: int = 1, first_habit_id: int = 1) -> Dict[str, Iterator[tuple]]:
+    """Loader sources for a synthetic dataset whose ids start at the given values"""
+    user_ids = range(first_user_id, first_user_id + dataset.users)
+    habit_ids = range(first_habit_id, first_habit_id + dataset.habit_count)
+    users = ((user_id,) + row for user_id, row in zip(user_ids, dataset.user_rows()))
+    habits = ((habit_id,) + row + (dataset.start_date,) for habit_id, row in zip(habit_ids, dataset.habit_rows(user_ids)))
+    return {"Users": users, "Habits": habits, "Habit_Logs": dataset.log_rows(habit_ids)}
+
+
+def csv_sources(directory: str) -> Dict[str, Iterator[tuple]]:
+    """
+    Loader sources for CSV files with a header row naming the table columns
+
+    Columns missing from a file (other than the ids) are loaded as NULL and
+    empty fields become NULL.
+    """
+    sources = {}
+    for table, filename in CSV_FILES.items():
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            sources[table] = _read_csv(path, TABLE_COLUMNS[table])
+    if not sources:
+        raise FileNotFoundError(f"none of {', '.join(CSV_FILES.values())} found in {directory}")
+    return sources
+
+
+def _read_csv(path: str, columns: Tuple[str, ...]) -> Iterator[tuple]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in columns if column.endswith("_ID") and column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path} needs the column(s) {', '.join(missing)}")
+        for record in reader:
+            yield tuple(record.get(column) or None for column in columns)
+
+
+def _track_habits(rows: Iterable[tuple], seen: Set[int]) -> Iterator[tuple]:
+    """Pass log rows through while noting which habits got logs (for the streak recompute)"""
+    for row in rows:
+        seen.add(int(row[0]))
+        yield row
+
+
+# === SQL SERVER FILES ===
+
+BCP_TYPES = {
+    "User_ID": "SQLINT", "Habit_ID": "SQLINT", "Habit_Status": "SQLBIT",
+    "Log_Date": "SQLDATE", "StartDate": "SQLDATE",
+    "Created_at": "SQLDATETIME", "CreatedAt": "SQLDATETIME", "logged_At": "SQLDATETIME",
+}
+
+
+def bcp_format_file(table: str, columns: Optional[Sequence[str]] = None) -> str:
+    """XML format file describing write_bcp_data() output for a table (TABLE_COLUMNS unless given)"""
+    columns = columns or TABLE_COLUMNS[table]
+    terminators = ["\\t"] * (len(columns) - 1) + ["\\n"]  # written as the escapes bcp expects
+    fields = "\n".join(
+        f'    <FIELD ID="{number}" xsi:type="CharTerm" TERMINATOR="{terminator}"/>'
+        for number, terminator in enumerate(terminators, start=1)
+    )
+    row = "\n".join(
+        f'    <COLUMN SOURCE="{number}" NAME="{column}" xsi:type="{BCP_TYPES.get(column, "SQLVARYCHAR")}"/>'
+        for number, column in enumerate(columns, start=1)
+    )
+    return f"""<?xml version="1.0"?>
+<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format"
+           xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <RECORD>
+{fields}
+  </RECORD>
+  <ROW>
+{row}
+  </ROW>
+</BCPFORMAT>
+"""
+
+
+def write_bcp_data(path: str, rows: Iterable[tuple]) -> None:
+    """Write rows as UTF-8, tab-separated, newline-terminated text (NULL as an empty field)"""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for row in rows:
+            f.write("\t".join(_bcp_value(value) for value in row))
+            f.write("\n")
+
+
+def _bcp_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, datetime):
+        return value.isoformat(" ", "milliseconds")  # DATETIME takes at most 3 fractional digits
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk load users, habits and logs")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--size", help="Generate USERSxHABITSxLOGS synthetic rows, e.g. 100000x10x30")
+    source.add_argument("--csv", help="Directory with users.csv, habits.csv and/or habit_logs.csv")
+    parser.add_argument("--category-skew", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--connection", help="Connection string (defaults to DB_CONNECTION_STRING)")
+    parser.add_argument("--batch-size", type=int, help="Rows per transaction / data file")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the load")
+    parser.add_argument("--data-dir", help="SQL Server: where data files are written")
+    parser.add_argument("--server-data-dir", help="SQL Server: data-dir as seen by the server")
+    args = parser.parse_args(argv)
+
+    connection_string = args.connection or connection_string_from_env()
+    options: Dict[str, Any] = {"defer_indexes": not args.keep_indexes,
+                               "data_dir": args.data_dir, "server_data_dir": args.server_data_dir}
+    if args.batch_size:
+        options["batch_size"] = args.batch_size
+
+    db = HabitDatabase(connection_string)
+    try:
+        loader = create_seed_loader(db, **options)
+        if args.size:
+            users, habits, logs = parse_size(args.size)
+            loader.load_synthetic(SyntheticDataset(users, habits, logs, category_skew=args.category_skew, seed=args.seed))
+        else:
+            loader.load_csv(args.csv)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Streak calculations for Daily/Weekly/Monthly/Yearly habits
+
+Every log date is mapped to an integer period number for its habit's
+frequency (days, Monday-based weeks, months or years since 1970-01-01), so a
+streak is simply a run of consecutive period numbers. The same numbering is
+used by the O(1) incremental update and the vectorized NumPy recompute.
+"""
+
+from datetime import date
+from typing import Iterable, Optional, Tuple
+
+FREQUENCIES = ("Daily", "Weekly", "Monthly", "Yearly")
+_EPOCH = date(1970, 1, 1)
+
+
+class StreakState:
+    """Persisted per-habit streak state (one Habit_Streaks row)"""
+
+    __slots__ = ("current", "longest", "last_period")
+
+    def __init__(self, current: int = 0, longest: int = 0, last_period: Optional[int] = None):
+        self.current = current  # length of the run ending at last_period
+        self.longest = longest
+        self.last_period = last_period  # newest completed period, None if never completed
+
+    def as_tuple(self) -> Tuple[int, int, Optional[int]]:
+        return self.current, self.longest, self.last_period
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, StreakState) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return f"StreakState(current={self.current}, longest={self.longest}, last_period={self.last_period})"
+
+
+def normalize_frequency(frequency: Optional[str]) -> str:
+    """Map the free-text Frequency column onto one of FREQUENCIES (Daily if unknown)"""
+    value = (frequency or "").strip().capitalize()
+    return value if value in FREQUENCIES else "Daily"
+
+
+def period_index(frequency: Optional[str], day: date) -> int:
+    """Period number of a day for a habit frequency"""
+    frequency = normalize_frequency(frequency)
+    if frequency == "Daily":
+        return (day - _EPOCH).days
+    if frequency == "Weekly":
+        return ((day - _EPOCH).days + 3) // 7  # 1970-01-01 was a Thursday
+    if frequency == "Monthly":
+        return (day.year - 1970) * 12 + day.month - 1
+    return day.year - 1970
+
+
+def advance(state: StreakState, period: int) -> Optional[StreakState]:
+    """
+    Apply one newly completed period in O(1)
+
+    Returns:
+        The new state, or None if the period is older than the newest one
+        already counted (a backfill), in which case recompute from history
+    """
+    if state.last_period is None or period > state.last_period + 1:
+        current = 1
+    elif period == state.last_period + 1:
+        current = state.current + 1
+    elif period == state.last_period:
+        return state  # same period logged twice (e.g. two days of a weekly habit)
+    else:
+        return None
+    return StreakState(current, max(state.longest, current), period)
+
+
+def compute_streaks(frequency: Optional[str], completed_dates: Iterable[date]) -> StreakState:
+    """
+    Recompute a habit's streak state from its whole completion history
+
+    Vectorized: dates become a datetime64 array, are bucketed into periods,
+    and runs of consecutive periods are found from the array differences.
+    """
+    import numpy as np  # only needed for backfills and batch jobs
+
+    days = np.fromiter((d.toordinal() for d in completed_dates), dtype=np.int64)
+    if days.size == 0:
+        return StreakState()
+    days -= _EPOCH.toordinal()
+    periods = np.unique(periods_from_days(frequency, days))  # sorted, one entry per period
+
+    # A new run starts wherever the gap to the previous period is not exactly 1
+    breaks = np.flatnonzero(np.diff(periods) != 1) + 1
+    run_starts = np.concatenate(([0], breaks))
+    run_lengths = np.diff(np.concatenate((run_starts, [periods.size])))
+    return StreakState(int(run_lengths[-1]), int(run_lengths.max()), int(periods[-1]))
+
+
+def periods_from_days(frequency: Optional[str], days):
+    """Vectorized period_index for a NumPy array of days since 1970-01-01"""
+    import numpy as np
+
+    frequency = normalize_frequency(frequency)
+    if frequency == "Daily":
+        return days
+    if frequency == "Weekly":
+        return (days + 3) // 7
+    as_dates = days.astype("datetime64[D]")
+    if frequency == "Monthly":
+        return as_dates.astype("datetime64[M]").astype(np.int64)
+    return as_dates.astype("datetime64[Y]").astype(np.int64)
+
+
+def current_streak(frequency: Optional[str], state: StreakState, today: Optional[date] = None) -> int:
+    """
+    The streak as of today
+
+    A streak stays alive through the current period (it is not over until
+    the period ends without a log) and is 0 once a whole period was missed.
+    """
+    if state.last_period is None:
+        return 0
+    if period_index(frequency, today or date.today()) - state.last_period > 1:
+        return 0
+    return state.current
@@ -0,0 +1,101 @@
+"""Reproducible synthetic Users/Habits/Habit_Logs data for benchmarks and load tests"""
+
+import random
+from datetime import date, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+CATEGORIES = ("Health", "Productivity", "Personal", "Fitness", "Learning", "Finance", "Social", "Mindfulness")
+FREQUENCY_WEIGHTS = (("Daily", 0.6), ("Weekly", 0.3), ("Monthly", 0.08), ("Yearly", 0.02))
+HABIT_NAMES = (
+    "Drink water", "Read", "Meditate", "Walk", "Stretch", "Journal", "Budget review", "Call family",
+    "Practice guitar", "Learn Spanish", "Run", "Cook at home", "No sugar", "Plan the week", "Tidy desk",
+)
+FIRST_NAMES = ("Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn")
+
+
+class SyntheticDataset:
+    def __init__(self, users: int = 100, habits_per_user: int = 10, logs_per_habit: int = 30,
+                 category_skew: float = 1.0, completion_rate: float = 0.85, seed: int = 42,
+                 end_date: Optional[date] = None):
+        """
+        Describe a synthetic dataset; rows are generated lazily and identically for the same arguments
+
+        Args:
+            users: Number of Users rows
+            habits_per_user: Habits created for every user
+            logs_per_habit: Habit_Logs rows per habit, on distinct days ending at end_date
+            category_skew: Zipf exponent for category popularity (0 = uniform, 1+ = a few dominate)
+            completion_rate: Share of logs marked as completed
+            seed: Random seed
+            end_date: Newest log date (defaults to today)
+        """
+        self.users = users
+        self.habits_per_user = habits_per_user
+        self.logs_per_habit = logs_per_habit
+        self.category_skew = category_skew
+        self.completion_rate = completion_rate
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.category_weights = [1 / (rank ** category_skew) for rank in range(1, len(CATEGORIES) + 1)]
+
+    def __repr__(self) -> str:
+        return f"{self.users}x{self.habits_per_user}x{self.logs_per_habit}"
+
+    @property
+    def habit_count(self) -> int:
+        return self.users * self.habits_per_user
+
+    @property
+    def log_count(self) -> int:
+        return self.habit_count * self.logs_per_habit
+
+    @property
+    def log_window(self) -> int:
+        """Days the logs of a habit are spread over, leaving a few gaps"""
+        return max(self.logs_per_habit, int(self.logs_per_habit * 1.25))
+
+    @property
+    def start_date(self) -> date:
+        """First day any log can fall on, used as the habits' StartDate"""
+        return self.end_date - timedelta(days=self.log_window - 1)
+
+    def user_rows(self) -> Iterator[Tuple[str, str]]:
+        """Yield (First_Name, Email) for every user"""
+        for number in range(1, self.users + 1):
+            name = FIRST_NAMES[number % len(FIRST_NAMES)]
+            yield name, f"{name.lower()}{number}@example.com"
+
+    def habit_rows(self, user_ids: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, str, str, str, str]]:
+        """
+        Yield (user_id, habit_name, description, category, frequency) rows, the add_habits() format
+
+        Args:
+            user_ids: IDs the users were given by the database (defaults to 1..users)
+        """
+        rng = random.Random(self.seed)
+        frequencies, frequency_weights = zip(*FREQUENCY_WEIGHTS)
+        for user_id in user_ids if user_ids is not None else range(1, self.users + 1):
+            categories = rng.choices(CATEGORIES, weights=self.category_weights, k=self.habits_per_user)
+            for number, category in enumerate(categories, start=1):
+                name = f"{rng.choice(HABIT_NAMES)} #{number}"
+                frequency = rng.choices(frequencies, weights=frequency_weights)[0]
+                yield user_id, name, f"{name} ({category.lower()})", category, frequency
+
+    def log_rows(self, habit_ids: Iterable[int]) -> Iterator[Tuple[int, date, bool, Optional[str]]]:
+        """Yield (habit_id, log_date, status, note) rows, the bulk_log() format, oldest first per habit"""
+        rng = random.Random(self.seed + 1)
+        for habit_id in habit_ids:
+            offsets: List[int] = sorted(rng.sample(range(self.log_window), self.logs_per_habit), reverse=True)
+            for offset in offsets:
+                status = rng.random() < self.completion_rate
+                note = "skipped" if not status and rng.random() < 0.3 else None
+                yield habit_id, self.end_date - timedelta(days=offset), status, note
+
+
+def parse_size(text: str) -> Tuple[int, int, int]:
+    """Parse "USERSxHABITSxLOGS" (e.g. "100x10x30") as used on benchmark/loader command lines"""
+    parts = text.lower().split("x")
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"expected USERSxHABITSxLOGS, got {text!r}")
+    users, habits, logs = (int(part) for part in parts)
+    return users, habits, logs
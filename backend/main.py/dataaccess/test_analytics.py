@@ -0,0 +1,78 @@
+"""Test suite for the parallel analytics job."""
+
+# to run the test 'pytest test_analytics.py' in the terminal
+
+from datetime import date, timedelta
+from dataaccess.analytics import plan_shards, run_analytics
+from dataaccess.data_access import HabitDatabase
+from dataaccess.seed_loader import create_seed_loader
+from dataaccess.streaks import compute_streaks, current_streak, period_index
+from dataaccess.synthetic import SyntheticDataset
+
+
+def expected_stats(db, user_id, today):
+    """The same statistics worked out one habit at a time with the streaks.py functions."""
+    habits = db.get_user_habits(user_id)
+    completions, active, best_current, longest, done, total = 0, 0, 0, 0, 0, 0
+    window_start = today - timedelta(days=29)
+    for habit_id, _, _, _, frequency, _ in habits:
+        dates = [log[2] for log in db.get_logs(habit_id) if log[3]]
+        state = compute_streaks(frequency, dates)
+        current = current_streak(frequency, state, today)
+        completions += len(dates)
+        active += current > 0
+        best_current, longest = max(best_current, current), max(longest, state.longest)
+        first, last = period_index(frequency, window_start), period_index(frequency, today)
+        done += len({period_index(frequency, day) for day in dates} & set(range(first, last + 1)))
+        total += last - first + 1
+    return len(habits), completions, active, best_current, longest, round(done / total, 4)
+
+
+def test_job_matches_per_habit_maths(tmp_path):
+    """Test the vectorized shards give the same numbers as the per-habit streak functions, in and out of process."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    dataset = SyntheticDataset(12, 4, 40, seed=7)
+    create_seed_loader(db).load_synthetic(dataset)
+    today = dataset.end_date
+    with db._get_connection() as conn:
+        users = [row[0] for row in conn.execute("SELECT DISTINCT User_ID FROM Habits ORDER BY User_ID")]
+
+    ranges = plan_shards(db, 5)
+    assert len(ranges) == 5 and ranges[0][0] == users[0] and ranges[-1][1] == users[-1]
+    assert all(low <= high and high + 1 == following for (low, high), (following, _) in zip(ranges, ranges[1:]))
+
+    summary = run_analytics(db, workers=1, shards=5, today=today)
+    assert summary["users"] == 12 and summary["habits"] == 48 and len(summary["shards"]) == 5
+    for user_id in (users[0], users[5], users[-1]):
+        stats = db.get_user_stats(user_id)
+        assert tuple(stats[column] for column in ("Habits", "Completions", "Active_Streaks", "Best_Current_Streak",
+                                                   "Longest_Streak", "Completion_Rate_30d")) == \
+            expected_stats(db, user_id, today)
+
+    first_run = [db.get_user_stats(user_id)["Completions"] for user_id in users]
+    assert run_analytics(db, workers=2, shards=3, today=today)["users"] == 12  # worker processes
+    assert [db.get_user_stats(user_id)["Completions"] for user_id in users] == first_run
+    assert db.get_user_stats(999) is None
+
+    # users whose habits are all gone lose their statistics on the next run
+    db.delete_habits([habit[0] for habit in db.get_user_habits(users[-1])])
+    run_analytics(db, workers=1, today=today)
+    assert db.get_user_stats(users[-1]) is None and db.get_user_stats(users[0]) is not None
+    db.delete_habits([habit[0] for user_id in users for habit in db.get_user_habits(user_id)])
+    assert run_analytics(db, workers=1, today=today)["users"] == 0
+    assert db.get_user_stats(users[0]) is None
+    db.close()
+
+
+def test_in_memory_database_runs_in_process():
+    """Test an in-memory database is read through itself rather than reopened empty by the shards."""
+    db = HabitDatabase("sqlite:///:memory:")
+    try:
+        dataset = SyntheticDataset(3, 2, 10, seed=3)
+        create_seed_loader(db).load_synthetic(dataset)
+        assert run_analytics(db, workers=1, today=dataset.end_date)["users"] == 3
+        assert run_analytics(db, workers=4, today=dataset.end_date)["users"] == 3
+        with db._get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM User_Stats").fetchone()[0] == 3
+    finally:
+        db.close()
@@ -0,0 +1,66 @@
+"""Test suite for the background executor used by the UI (no display required)."""
+
+# to run the test 'pytest test_background.py' in the terminal
+
+import threading
+import time
+from dataaccess.background import BackgroundExecutor
+
+
+class FakeRoot:
+    """Collects after() callbacks so the test can play the Tk main loop"""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def run_until_idle(self, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            callback = self.scheduled.pop(0)
+            time.sleep(0.005)
+            callback()
+
+
+def test_results_delivered_on_main_thread():
+    """Test that results come back through after() and the busy flag toggles."""
+    root = FakeRoot()
+    busy = []
+    executor = BackgroundExecutor(root, on_busy_change=busy.append)
+    delivered = []
+    executor.submit("load", lambda x: x * 2, 21,
+                    on_success=lambda value: delivered.append((value, threading.current_thread())))
+    root.run_until_idle()
+    assert delivered == [(42, threading.current_thread())]
+    assert busy == [True, False]
+    executor.shutdown()
+
+
+def test_stale_requests_are_dropped():
+    """Test that a newer request or cancel() on the same channel drops older results."""
+    root = FakeRoot()
+    executor = BackgroundExecutor(root, max_workers=1)
+    release = threading.Event()
+    delivered = []
+    executor.submit("load", lambda: release.wait(1) and "old", on_success=delivered.append)
+    executor.submit("load", lambda: "new", on_success=delivered.append)
+    executor.submit("other", lambda: "cancelled", on_success=delivered.append)
+    executor.cancel("other")
+    executor.submit(None, lambda: "write", on_success=delivered.append)
+    release.set()
+    root.run_until_idle()
+    assert delivered == ["new", "write"]
+    assert not executor.is_busy()
+    executor.shutdown()
+
+
+def test_errors_go_to_on_error():
+    """Test that an exception in the worker is handed to on_error."""
+    root = FakeRoot()
+    executor = BackgroundExecutor(root)
+    errors = []
+    executor.submit("load", lambda: 1 / 0, on_error=errors.append)
+    root.run_until_idle()
+    assert isinstance(errors[0], ZeroDivisionError)
+    executor.shutdown()
@@ -0,0 +1,44 @@
+"""Test suite for the DataLoader-style habit loader."""
+
+# to run the test 'pytest test_batch_loader.py' in the terminal
+
+import threading
+from dataaccess.batch_loader import HabitLoader
+
+
+class FakeDatabase:
+    """Records each batched call instead of querying."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_habits_for_users(self, user_ids):
+        self.calls.append(sorted(user_ids))
+        return {user_id: [(user_id * 10, f"Habit of {user_id}")] for user_id in user_ids}
+
+
+def test_concurrent_loads_share_batches():
+    """Test requests from many threads become one query and repeated users are fetched once."""
+    db = FakeDatabase()
+    loader = HabitLoader(db, window=0.05)
+    results = {}
+    threads = [
+        threading.Thread(target=lambda n=n: results.__setitem__(n, loader.get(n % 5)))
+        for n in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert db.calls == [[0, 1, 2, 3, 4]]
+    assert results[7] == [(20, "Habit of 2")]
+    assert loader.stats() == {"requests": 20, "deduplicated": 15, "batches": 1}
+
+
+def test_full_batches_go_at_once():
+    """Test a batch is sent as soon as it is full, without waiting for the window."""
+    db = FakeDatabase()
+    loader = HabitLoader(db, window=60.0, max_batch=3)
+    habits = loader.get_many([1, 2, 3], timeout=5)
+    assert db.calls == [[1, 2, 3]] and habits[3] == [(30, "Habit of 3")]
@@ -0,0 +1,48 @@
+"""Test suite for the synthetic data generator and the benchmark harness."""
+
+# to run the test 'pytest test_benchmark.py' in the terminal
+
+import json
+from collections import Counter
+from datetime import date
+from dataaccess import benchmark
+from dataaccess.synthetic import SyntheticDataset, parse_size
+
+
+def test_synthetic_dataset_is_reproducible_and_skewed():
+    """Test dataset sizes, determinism, distinct log days and category skew."""
+    dataset = SyntheticDataset(users=50, habits_per_user=8, logs_per_habit=5, category_skew=2.0,
+                               end_date=date(2025, 5, 31))
+    habits = list(dataset.habit_rows())
+    assert len(habits) == dataset.habit_count == 400
+    assert habits == list(SyntheticDataset(50, 8, 5, category_skew=2.0, end_date=date(2025, 5, 31)).habit_rows())
+    categories = Counter(row[3] for row in habits)
+    assert categories.most_common(1)[0][0] == "Health"  # rank 1 dominates with a steep skew
+
+    logs = list(dataset.log_rows([1, 2]))
+    assert len(logs) == 10
+    assert len({(habit_id, day) for habit_id, day, _, _ in logs}) == 10
+    assert max(day for _, day, _, _ in logs) <= date(2025, 5, 31)
+    assert parse_size("100x10x30") == (100, 10, 30)
+
+
+def test_every_method_has_a_benchmark():
+    """Test that new HabitDatabase methods get a benchmark case."""
+    assert benchmark.uncovered_methods() == []
+
+
+def test_benchmark_run_writes_results(tmp_path):
+    """Test a tiny end-to-end run and the baseline comparison."""
+    output = tmp_path / "results.json"
+    assert benchmark.main(["--sizes", "3x4x5", "--iterations", "3", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    run = results["runs"][0]
+    assert run["load"]["logs"]["rows"] == 60
+    assert set(run["methods"]) == {case.method for case in benchmark.CASES}
+    assert run["methods"]["get_user_habits"]["calls"] == 3
+
+    slower = json.loads(output.read_text())
+    for figures in slower["runs"][0]["methods"].values():
+        figures["p50_ms"] *= 10
+    assert benchmark.compare(results, results) == []
+    assert benchmark.compare(slower, results) != []
@@ -0,0 +1,55 @@
+"""Test suite for the per-user habit cache (no database required)."""
+
+# to run the test 'pytest test_cache.py' in the terminal
+
+from datetime import datetime
+from dataaccess.cache import HabitCache
+
+
+def habit(habit_id, category="Health"):
+    return (habit_id, f"Habit {habit_id}", "", category, "Daily", datetime(2025, 5, 1))
+
+
+def test_patches_and_lookups():
+    """Test that cached lists are patched in place and serve id/category lookups."""
+    cache = HabitCache()
+    assert cache.get_user_habits(1) is None
+    cache.put_user_habits(1, [habit(1), habit(2, "Work")])
+
+    cache.add_habit(1, habit(3))
+    cache.update_habit(habit(2, "Health"))
+    cache.remove_habit(1)
+    assert [h[0] for h in cache.get_user_habits(1)] == [2, 3]
+    assert cache.get_habit(2) == (True, habit(2, "Health"))
+    assert cache.get_habit(1) == (False, None)  # owner unknown once deleted
+    assert [h[0] for h in cache.get_habits_by_category(1, "Health")] == [2, 3]
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_lru_eviction_and_ttl():
+    """Test that the least recently used user is evicted first and entries expire."""
+    cache = HabitCache(max_users=2)
+    cache.put_user_habits(1, [habit(1)])
+    cache.put_user_habits(2, [habit(2)])
+    cache.get_user_habits(1)  # user 2 is now least recently used
+    cache.put_user_habits(3, [habit(3)])
+    assert cache.get_user_habits(2) is None
+    assert cache.get_user_habits(1) is not None
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl = -1
+    assert cache.get_user_habits(1) is None
+
+
+def test_byte_budget_and_stale_loads():
+    """Test the memory bound and that loads racing a write are not cached."""
+    cache = HabitCache(max_bytes=1)
+    cache.put_user_habits(1, [habit(1)])
+    assert cache.stats()["users"] == 0
+
+    cache = HabitCache()
+    token = cache.load_token()
+    cache.remove_habit(5)  # a write lands while the load is in flight
+    cache.put_user_habits(1, [habit(5)], token)
+    assert cache.get_user_habits(1) is None
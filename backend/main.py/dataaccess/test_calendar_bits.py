@@ -0,0 +1,29 @@
+"""Test suite for the bitset completion calendars."""
+
+# to run the test 'pytest test_calendar_bits.py' in the terminal
+
+from datetime import date
+from dataaccess.calendar_bits import CompletionBitmap, build_calendars, completion_rate, period_start, year_periods
+from dataaccess.streaks import period_index
+
+
+def test_periods_per_year():
+    """Test each year holds the periods that start in it, weeks starting on Monday."""
+    assert year_periods("Daily", 2024)[1] == 366 and year_periods("Daily", 2025)[1] == 365
+    first, weeks = year_periods("Weekly", 2025)
+    assert period_start("Weekly", first) == date(2025, 1, 6) and weeks == 52
+    assert year_periods("Monthly", 2025)[1] == 12 and year_periods("Yearly", 2025)[1] == 1
+    for frequency in ("Daily", "Weekly", "Monthly", "Yearly"):
+        period = period_index(frequency, date(2025, 7, 16))
+        assert period_index(frequency, period_start(frequency, period)) == period
+
+
+def test_bits_round_trip_and_count():
+    """Test set/clear, counting over a range and the stored bytes."""
+    calendars = build_calendars("Daily", [date(2025, 1, 1), date(2025, 1, 3), date(2025, 12, 31), date(2024, 6, 1)])
+    year = calendars[2025]
+    assert len(year.to_bytes()) == 46 and year.count() == 3
+    assert year.is_done(date(2025, 1, 3)) and not year.is_done(date(2025, 1, 2))
+    year.set(period_index("Daily", date(2025, 1, 3)), False)
+    assert CompletionBitmap("Daily", 2025, year.to_bytes()).count() == 2
+    assert completion_rate("Daily", calendars, date(2024, 12, 31), date(2025, 1, 4)) == 0.2
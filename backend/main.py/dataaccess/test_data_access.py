@@ -3,21 +3,23 @@
 # to run the test 'pytest test_data_access.py' in the terminal
 # to run the test and see success messages, use 'pytest -s test_data_access.py'
 
+# by default the tests run against a throwaway SQLite database; to run them against
+# SQL Server set TEST_DB_CONNECTION_STRING, e.g.
+#   DRIVER={ODBC Driver 17 for SQL Server};SERVER=LAPTOP-1K4FMAFS\SQLEXPRESS;DATABASE=TestHabitTrackerDB;Trusted_Connection=yes;
+
+import os
 import pytest
 from dataaccess.data_access import HabitDatabase
 
 # Test database connection string (update if your server/database name changes)
-TEST_CONNECTION_STRING = (
-    "DRIVER={ODBC Driver 17 for SQL Server};"
-    "SERVER=LAPTOP-1K4FMAFS\\SQLEXPRESS;"
-    "DATABASE=TestHabitTrackerDB;"
-    "Trusted_Connection=yes;"
-)
+TEST_CONNECTION_STRING = os.getenv("TEST_DB_CONNECTION_STRING")
 
 @pytest.fixture
-def db():
+def db(tmp_path):
     """Provides a HabitDatabase instance connected to the test database."""
-    return HabitDatabase(TEST_CONNECTION_STRING)
+    database = HabitDatabase(TEST_CONNECTION_STRING or f"sqlite:///{tmp_path / 'test_habits.db'}")
+    yield database
+    database.close()
 
 def test_add_habit(db):
     """Test adding a habit to the database and verifying its existence."""
@@ -123,3 +125,505 @@ def test_get_habit_by_category(db):
     assert any(h[1] == "Category Test Habit" for h in habits) # assert that the habit exists in the list of habits
     print("✅ Habits retrieved by category successfully from test database.")
     
+
+def test_add_habits_bulk(db):
+    """Test bulk adding habits from a generator, including rows that fail validation."""
+    def rows():
+        for i in range(25):
+            yield (1, f"Bulk Habit {i}", "Imported", "Bulk", "Daily")
+        yield (1, "", "Missing name", "Bulk", "Daily")
+        yield {"user_id": 1, "habit_name": "Dict Habit", "description": None, "category": "Bulk", "frequency": "Weekly"}
+        yield (1, "Too frequent", "", "Bulk", "x" * 21)
+
+    habit_ids, failures = db.add_habits(rows(), chunk_size=10)
+    print("Bulk add failures:", failures)
+    assert len(habit_ids) == 28
+    assert [index for index, _ in failures] == [25, 27]
+    assert habit_ids[25] is None and habit_ids[27] is None
+    assert all(isinstance(habit_id, int) for habit_id in habit_ids[:25] + [habit_ids[26]])
+
+    habits = {h[0]: h for h in db.get_habits_by_category(user_id=1, category="Bulk")}
+    assert len(habits) == 26
+    assert habits[habit_ids[3]][1] == "Bulk Habit 3"
+    assert habits[habit_ids[26]][1] == "Dict Habit"
+    print("✅ Habits bulk added successfully and verified in test database.")
+
+def test_add_habits_reports_rows_left_when_the_pool_fails(db, monkeypatch):
+    """Test a batch stops at a pool timeout and reports the rows not added instead of raising."""
+    from dataaccess.pool import PoolTimeout
+
+    real_connection = db._get_connection
+    calls = []
+
+    def flaky_connection():
+        calls.append(1)
+        if len(calls) > 1:
+            raise PoolTimeout("No free connection")
+        return real_connection()
+
+    monkeypatch.setattr(db, "_get_connection", flaky_connection)
+    habit_ids, failures = db.add_habits(((2, f"Habit {i}", "", "Pool", "Daily") for i in range(25)), chunk_size=10)
+    assert all(isinstance(habit_id, int) for habit_id in habit_ids[:10]) and habit_ids[10:] == [None] * 15
+    assert [index for index, _ in failures] == list(range(10, 25))
+    assert len(calls) == 2  # no row-by-row retries against an unusable pool
+
+def test_bulk_log_reports_rows_left_when_the_pool_fails(db, monkeypatch):
+    """Test bulk_log stops at a pool timeout and reports the logs not written instead of raising."""
+    from datetime import date, timedelta
+    from dataaccess.pool import PoolTimeout
+
+    db.add_habit(user_id=1, habit_name="Pool Log", description="", category="Pool", frequency="Daily")
+    habit_id = db.get_user_habits(user_id=1)[-1][0]
+    real_connection = db._get_connection
+    calls = []
+
+    def flaky_connection():
+        calls.append(1)
+        if len(calls) > 1:
+            raise PoolTimeout("No free connection")
+        return real_connection()
+
+    monkeypatch.setattr(db, "_get_connection", flaky_connection)
+    inserted, failures = db.bulk_log(((habit_id, date(2025, 1, 1) + timedelta(days=i)) for i in range(25)), chunk_size=10)
+    assert inserted == 10
+    assert [index for index, _ in failures] == list(range(10, 25))
+    assert len(calls) == 2  # no row-by-row retries against an unusable pool
+
+def test_update_and_delete_detect_conflicts(db):
+    """Test versioned update/delete telling 'not found' apart from 'conflict'."""
+    from dataaccess.data_access import CONFLICT, DELETED, NOT_FOUND, UPDATED
+
+    (habit_id,), _ = db.add_habits([(1, "Versioned Habit", "v1", "Test", "Daily")])
+
+    status, row = db.update_habit_returning(habit_id, habit_name="Versioned Habit 2", expected_version=1)
+    print("Versioned update:", status, row)
+    assert status == UPDATED
+    assert row[0] == habit_id and row[1] == "Versioned Habit 2" and row[-1] == 2
+
+    # A second writer still holding version 1 is refused
+    assert db.update_habit_returning(habit_id, habit_name="Stale", expected_version=1) == (CONFLICT, None)
+    assert db.delete_habit_returning(habit_id, expected_version=1) == (CONFLICT, None)
+    assert db.update_habit_returning(999999, habit_name="Ghost") == (NOT_FOUND, None)
+
+    status, row = db.delete_habit_returning(habit_id, expected_version=2)
+    assert status == DELETED and row[1] == "Versioned Habit 2"
+    assert db.delete_habit_returning(habit_id) == (NOT_FOUND, None)
+    print("✅ Versioned update and delete verified in test database.")
+
+
+def test_batch_update_and_delete(db):
+    """Test update_habits/delete_habits applying many changes in one transaction."""
+    from dataaccess.data_access import DELETED, NOT_FOUND, UPDATED
+
+    habit_ids, _ = db.add_habits([(1, f"Batch {i}", "", "Batch", "Daily") for i in range(3)])
+
+    # atomic batches roll back entirely when one change cannot be applied
+    results = db.update_habits(
+        [{"habit_id": habit_ids[0], "category": "Moved"}, {"habit_id": 999999, "category": "Moved"}], atomic=True
+    )
+    assert [status for status, _ in results] == [UPDATED, NOT_FOUND]
+    assert db.get_habits_by_category(user_id=1, category="Moved") == []
+
+    results = db.update_habits([{"habit_id": habit_id, "category": "Moved"} for habit_id in habit_ids])
+    assert [status for status, _ in results] == [UPDATED] * 3
+    assert len(db.get_habits_by_category(user_id=1, category="Moved")) == 3
+
+    results = db.delete_habits([habit_ids[0], (habit_ids[1], 2), (habit_ids[2], 1)])
+    assert [status for status, _ in results] == [DELETED, DELETED, "conflict"]
+    assert [h[0] for h in db.get_habits_by_category(user_id=1, category="Moved")] == [habit_ids[2]]
+    print("✅ Batch update and delete verified in test database.")
+
+def test_cached_reads_follow_writes(tmp_path):
+    """Test that a cached HabitDatabase serves repeat reads and stays correct after writes."""
+    from dataaccess.cache import HabitCache
+
+    db = HabitDatabase(TEST_CONNECTION_STRING or f"sqlite:///{tmp_path / 'cached.db'}", cache=HabitCache())
+    db.add_habit(user_id=1, habit_name="Cached Habit", description="", category="Cache", frequency="Daily")
+    first = db.get_user_habits(user_id=1)
+    assert db.get_user_habits(user_id=1) == first
+    habit_id = first[-1][0]
+
+    db.add_habit(user_id=1, habit_name="Second Cached", description="", category="Cache", frequency="Weekly")
+    db.update_habit(habit_id=habit_id, user_id=1, habit_name="Renamed", description=None, category=None, frequency=None)
+    habits = db.get_user_habits(user_id=1)
+    assert [h[1] for h in habits[-2:]] == ["Renamed", "Second Cached"]
+    assert db.get_habit_by_id(habit_id)[1] == "Renamed"
+    assert len(db.get_habits_by_category(user_id=1, category="Cache")) == 2
+
+    db.delete_habit(habit_id)
+    assert db.get_habit_by_id(habit_id) is None
+    stats = db.cache_stats()
+    print("Cache stats:", stats)
+    assert stats["misses"] == 2  # first load, then the deleted habit lookup
+    assert stats["hits"] == 4
+
+    # and the cache agrees with the database
+    db.cache.clear()
+    assert db.get_user_habits(user_id=1) == habits[:-2] + [habits[-1]]
+    db.close()
+    print("✅ Cached reads verified against test database.")
+
+def test_string_habit_ids_reach_the_cache(tmp_path):
+    """Test writes given a Treeview iid (a str) update the int-keyed cache too."""
+    from dataaccess.cache import HabitCache
+
+    db = HabitDatabase(TEST_CONNECTION_STRING or f"sqlite:///{tmp_path / 'cached.db'}", cache=HabitCache())
+    db.add_habit(user_id=1, habit_name="Keep", description="", category="Cache", frequency="Daily")
+    db.add_habit(user_id=1, habit_name="Drop", description="", category="Cache", frequency="Daily")
+    keep, drop = (habit[0] for habit in db.get_user_habits(user_id=1)[-2:])
+
+    db.update_habit_returning(str(keep), habit_name="Kept")
+    assert db.delete_habit(str(drop)) is True
+    assert [habit[1] for habit in db.get_user_habits(user_id=1)[-1:]] == ["Kept"]
+    db.close()
+
+
+def test_streaming_and_keyset_pages(db):
+    """Test the fetchmany generators and keyset pagination return every habit exactly once."""
+    habit_ids, _ = db.add_habits(
+        [(7, f"Stream {i}", "", "Even" if i % 2 == 0 else "Odd", "Daily") for i in range(23)]
+    )
+
+    streamed = list(db.iter_user_habits(user_id=7, arraysize=5))
+    assert [h[0] for h in streamed] == habit_ids
+    assert [h[0] for h in db.iter_habits_by_category(user_id=7, category="Odd", arraysize=4)] == habit_ids[1::2]
+
+    first_page = db.get_user_habits_page(user_id=7, limit=10)
+    second_page = db.get_user_habits_page(user_id=7, after_habit_id=first_page[-1][0], limit=10)
+    assert [h[0] for h in first_page + second_page] == habit_ids[:20]
+
+    pages = list(db.iter_user_habits_pages(user_id=7, page_size=10, category="Even"))
+    assert [len(page) for page in pages] == [10, 2]
+    assert [h[0] for page in pages for h in page] == habit_ids[0::2]
+    print("✅ Streaming and keyset pagination verified in test database.")
+
+def test_counts_and_offset_pages(db):
+    """Test the row counts and offset pages used by the virtualized habit list."""
+    from datetime import date
+
+    habit_ids, _ = db.add_habits([(8, f"Page {i}", "", "Even" if i % 2 == 0 else "Odd", "Daily") for i in range(12)])
+    assert db.count_user_habits(8) == 12
+    assert db.count_user_habits(8, category="Odd") == 6
+    assert db.count_user_habits(999) == 0
+    assert [h[0] for h in db.get_user_habits_page(8, limit=5, offset=5)] == habit_ids[5:10]
+    assert [h[0] for h in db.get_user_habits_page(8, limit=5, offset=10)] == habit_ids[10:]
+
+    db.bulk_log([(habit_ids[0], date(2025, 5, day)) for day in range(1, 8)])
+    assert db.count_logs(habit_ids[0]) == 7
+    first = db.get_logs_page(habit_ids[0], limit=3)
+    after = db.get_logs_page(habit_ids[0], after_log_date=first[-1][2], limit=3)
+    assert [log[2].day for log in first + after] == [1, 2, 3, 4, 5, 6]
+    assert [log[2].day for log in db.get_logs_page(habit_ids[0], limit=3, offset=6)] == [7]
+    print("✅ Counts and offset pages verified in test database.")
+
+def test_sorted_and_filtered_queries(db):
+    """Test database-side sorting, filtering and keyset paging on a sort column."""
+    rows = [
+        (9, "Walk", "Around the park", "Health", "Daily"),
+        (9, "Read", "50% of a chapter", "Learning", "Daily"),
+        (9, "Stretch", None, "Health", "Weekly"),
+        (9, "Budget", "Monthly review", None, "Monthly"),
+        (9, "Run", "Park run", "Health", "Weekly"),
+        (10, "Walk", "Other user", "Health", "Daily"),
+    ]
+    habit_ids, _ = db.add_habits(rows)
+    names = lambda habits: [h[1] for h in habits]
+
+    assert names(db.query_user_habits(9, sort_by="Habit_Name_")) == ["Budget", "Read", "Run", "Stretch", "Walk"]
+    assert names(db.query_user_habits(9, category="Health", frequency="Weekly")) == ["Stretch", "Run"]
+    assert db.count_user_habits(9, category="Health", frequency="Weekly") == 2
+    assert names(db.query_user_habits(9, search="park")) == ["Walk", "Run"]
+    assert names(db.query_user_habits(9, search="50%")) == ["Read"]  # % matched literally
+    assert db.count_user_habits(9, search="_") == 0
+    assert db.get_habit_categories(9) == ["Health", "Learning"]
+    assert db.query_user_habits(9, sort_by="Habit_ID; DROP TABLE Habits") == []
+
+    # keyset pages over a sort column with NULLs and ties, both directions
+    from dataaccess.data_access import habit_sort_key
+    for column in ("Category", "Description_", "Frequency"):
+        for descending in (False, True):
+            expected = db.query_user_habits(9, sort_by=column, descending=descending)
+            paged, after = [], None
+            while True:
+                page = db.query_user_habits(9, sort_by=column, descending=descending, after=after, limit=2)
+                paged += page
+                if len(page) < 2:
+                    break
+                after = habit_sort_key(page[-1], column)
+            assert paged == expected and len(paged) == 5
+    print("✅ Sorted and filtered queries verified in test database.")
+
+def test_get_habits_for_users(db, monkeypatch):
+    """Test habits of many users come back grouped per user from chunked queries."""
+    import dataaccess.data_access as data_access
+
+    habit_ids, _ = db.add_habits([(user_id, f"Habit {user_id}", None, "Health", "Daily") for user_id in (21, 22, 22, 23)])
+    monkeypatch.setattr(data_access, "IN_CHUNK_SIZE", 2)
+    habits = db.get_habits_for_users([23, 21, 22, 24, 21])
+    assert list(habits) == [23, 21, 22, 24]
+    assert [h[0] for h in habits[22]] == habit_ids[1:3] and habits[24] == []
+    assert habits[21] == db.get_user_habits(21)
+    print("✅ Batched habit lookup verified in test database.")
+
+def test_log_completion_and_get_logs(db):
+    """Test logging habits, the one-log-per-day rule and date-range reads."""
+    from datetime import date
+
+    (habit_id,), _ = db.add_habits([(1, "Logged Habit", "", "Logs", "Daily")])
+    assert db.log_completion(habit_id, date(2025, 5, 1), note="first") is True
+    assert db.log_completion(habit_id, date(2025, 5, 1)) is False  # already logged that day
+    assert db.log_completion(habit_id, "2025-05-03", status=False) is True
+
+    inserted, failures = db.bulk_log(
+        [(habit_id, date(2025, 5, day)) for day in range(2, 11)]
+        + [{"habit_id": habit_id, "log_date": date(2025, 6, 1), "note": "dict"}, (habit_id, None)],
+        chunk_size=4,
+    )
+    print("Bulk log failures:", failures)
+    assert inserted == 9  # May 3 was already logged
+    assert [index for index, _ in failures] == [1, 10]
+
+    logs = db.get_logs(habit_id)
+    assert [log[2] for log in logs] == [date(2025, 5, day) for day in range(1, 11)] + [date(2025, 6, 1)]
+    assert logs[2][3] is False and logs[0][4] == "first"
+    window = db.get_logs(habit_id, (date(2025, 5, 4), date(2025, 5, 6)))
+    assert [log[2].day for log in window] == [4, 5, 6]
+    assert len(db.get_logs(habit_id, (date(2025, 5, 10), None))) == 2
+
+    # logs go with their habit
+    db.delete_habit(habit_id)
+    assert db.get_logs(habit_id) == []
+    print("✅ Habit logs verified in test database.")
+
+def test_streaks_follow_logs(db):
+    """Test incremental streak updates, backfills, frequency changes and full recompute."""
+    from datetime import date
+
+    (habit_id,), _ = db.add_habits([(1, "Streak Habit", "", "Logs", "Daily")])
+    assert db.get_streak(habit_id, today=date(2025, 5, 1)) == (0, 0)
+
+    for day in (1, 2, 3, 5, 6):
+        db.log_completion(habit_id, date(2025, 5, day))
+    assert db.get_streak(habit_id, today=date(2025, 5, 6)) == (2, 3)
+
+    # a backfilled day joins both runs
+    inserted, _ = db.bulk_log([(habit_id, date(2025, 5, 4)), (habit_id, date(2025, 4, 30), False)])
+    assert inserted == 2
+    assert db.get_streak(habit_id, today=date(2025, 5, 7)) == (6, 6)
+    assert db.get_streak(habit_id, today=date(2025, 5, 8)) == (0, 6)
+
+    # weekly: May 1-6 spans two Monday-based weeks
+    db.update_habit_returning(habit_id, frequency="Weekly")
+    assert db.get_user_streaks(1, today=date(2025, 5, 6)) == {habit_id: (2, 2)}
+
+    assert db.recompute_streaks() == 1
+    assert db.get_streak(habit_id, today=date(2025, 5, 6)) == (2, 2)
+    assert db.get_streak(999999) is None
+    print("✅ Habit streaks verified in test database.")
+
+
+def test_recompute_streaks_keeps_a_log_written_meanwhile(db, monkeypatch):
+    """Test a log written while streaks are recomputed is not lost when the new state is saved."""
+    import threading
+    from datetime import date
+    from dataaccess import data_access
+
+    (habit_id,), _ = db.add_habits([(1, "Busy Habit", "", "Logs", "Daily")])
+    db.log_completion(habit_id, date(2025, 5, 1))
+    writer = threading.Thread(target=db.log_completion, args=(habit_id, date(2025, 5, 2)))
+    real_compute = data_access.compute_streaks
+
+    def compute_while_logging(frequency, dates):
+        dates = list(dates)
+        if writer.ident is None:  # first habit only
+            writer.start()
+            writer.join(1.0)  # waits for the recompute to commit when it holds the write lock
+        return real_compute(frequency, dates)
+
+    monkeypatch.setattr(data_access, "compute_streaks", compute_while_logging)
+    db.recompute_streaks([habit_id])
+    writer.join()
+    assert db.get_streak(habit_id, today=date(2025, 5, 2)) == (2, 2)
+
+def test_completion_calendar_follows_logs(db):
+    """Test the calendar bitmaps answer heatmaps, rates and done-today checks as logs are written."""
+    from datetime import date
+
+    (daily, weekly), _ = db.add_habits([(3, "Daily", "", "Logs", "Daily"), (3, "Weekly", "", "Logs", "Weekly")])
+    db.bulk_log([(daily, date(2025, 1, day)) for day in (1, 2, 4)] + [(daily, date(2025, 1, 3), False)])
+    db.log_completion(weekly, date(2024, 12, 31))  # week of Monday 2024-12-30, stored in 2024
+
+    heatmap = db.get_heatmap(daily, 2025)
+    assert len(heatmap) == 365 and [done for _, done in heatmap[:5]] == [True, True, False, True, False]
+    assert db.get_completion_rate(daily, date(2025, 1, 1), date(2025, 1, 10)) == 0.3
+    assert db.get_done_habits(3, date(2025, 1, 2)) == {daily, weekly}
+    assert db.get_done_habits(3, date(2025, 1, 6)) == set()
+    assert db.get_heatmap(weekly, 2024)[-1] == (date(2024, 12, 30), True)
+
+    # the weekly period ends up in other years' blobs once it is a monthly habit
+    db.update_habit_returning(weekly, frequency="Monthly")
+    assert [done for _, done in db.get_heatmap(weekly, 2024)][-1] is True
+    assert db.get_done_habits(3, date(2025, 1, 2)) == {daily}
+
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM Habit_Calendar")
+        conn.commit()
+    assert db.rebuild_calendars() == 2
+    assert db.get_completion_rate(daily, date(2025, 1, 1), date(2025, 1, 10)) == 0.3
+    assert db.get_heatmap(999999, 2025) == [] and db.get_completion_rate(999999, date(2025, 1, 1), date(2025, 1, 2)) is None
+    print("✅ Completion calendars verified in test database.")
+
+def test_upsert_logs_are_idempotent(db):
+    """Test upserts insert, update or skip each day, keep derived state right and survive a resent batch."""
+    from datetime import date
+
+    (habit_id,), _ = db.add_habits([(5, "Upsert Habit", "", "Logs", "Daily")])
+    assert db.upsert_log(habit_id, date(2025, 5, 1), note="first") == "added"
+    assert db.upsert_log(habit_id, date(2025, 5, 1), note="first") == "unchanged"
+    assert db.upsert_log(habit_id, date(2025, 5, 1), status=False) == "updated"
+    assert db.upsert_log(999999, date(2025, 5, 1)) is None  # no such habit
+
+    batch = [(habit_id, date(2025, 5, day)) for day in range(1, 5)] + [
+        (habit_id, date(2025, 5, 2), False),  # a later row for the same day wins
+        (999999, date(2025, 5, 1)),
+        (habit_id, None),
+    ]
+    counts, failures = db.bulk_upsert_logs(batch, chunk_size=10)
+    print("Bulk upsert failures:", failures)
+    assert counts == {"added": 3, "updated": 1, "unchanged": 0, "superseded": 1}
+    assert [index for index, _ in failures] == [5, 6]
+
+    # resending the same batch writes nothing
+    counts, failures = db.bulk_upsert_logs(batch, chunk_size=10)
+    assert counts == {"added": 0, "updated": 0, "unchanged": 4, "superseded": 1} and len(failures) == 2
+
+    logs = db.get_logs(habit_id)
+    assert [(log[2].day, log[3], log[4]) for log in logs] == [
+        (1, True, None), (2, False, None), (3, True, None), (4, True, None)
+    ]
+    assert db.get_streak(habit_id, today=date(2025, 5, 4)) == (2, 2)
+    assert [done for _, done in db.get_heatmap(habit_id, 2025)[120:124]] == [True, False, True, True]
+    assert db.get_habit_rollup(habit_id, "month") == [(date(2025, 5, 1), 3, 4)]
+    print("✅ Habit log upserts verified in test database.")
+
+def test_bulk_upsert_reports_rows_left_when_the_pool_fails(db, monkeypatch):
+    """Test bulk_upsert_logs stops at a pool timeout and reports the logs not written instead of raising."""
+    from datetime import date, timedelta
+    from dataaccess.data_access import ADDED
+    from dataaccess.pool import PoolTimeout
+
+    db.add_habit(user_id=1, habit_name="Pool Upsert", description="", category="Pool", frequency="Daily")
+    habit_id = db.get_user_habits(user_id=1)[-1][0]
+    real_connection = db._get_connection
+    calls = []
+
+    def flaky_connection():
+        calls.append(1)
+        if len(calls) > 1:
+            raise PoolTimeout("No free connection")
+        return real_connection()
+
+    monkeypatch.setattr(db, "_get_connection", flaky_connection)
+    counts, failures = db.bulk_upsert_logs(((habit_id, date(2025, 1, 1) + timedelta(days=i)) for i in range(25)),
+                                           chunk_size=10)
+    assert counts[ADDED] == 10
+    assert [index for index, _ in failures] == list(range(10, 25))
+    assert len(calls) == 2  # no row-by-row retries against an unusable pool
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """Test that importing the data layer prints nothing, needs no .env and loads no drivers."""
+    import subprocess
+    import sys
+
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {key: value for key, value in os.environ.items() if key != "DB_CONNECTION_STRING"}
+    env["PYTHONPATH"] = backend_dir
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, dataaccess.data_access; "
+         "print(sorted(m for m in ('pyodbc', 'numpy', 'dotenv', 'customtkinter') if m in sys.modules))"],
+        cwd=tmp_path, env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+@pytest.mark.parametrize("full_text", [True, False])
+def test_search_habits(tmp_path, full_text):
+    """Test ranked search with the database's full-text index and with the in-process fallback."""
+    from datetime import date
+
+    database = HabitDatabase(TEST_CONNECTION_STRING or f"sqlite:///{tmp_path / 'search.db'}")
+    database.engine.full_text = full_text
+    try:
+        habit_ids, _ = database.add_habits([
+            (11, "Evening walk", "Around the block", "Health", "Daily"),
+            (11, "Stretch", "After the walk", "Health", "Weekly"),
+            (11, "Journal", None, "Mind", "Daily"),
+            (12, "Walk", "Other user", "Health", "Daily"),
+        ])
+        database.log_completion(habit_ids[2], date(2025, 5, 1), note="Wrote about a long walk")
+        ids = lambda results: [habit[0] for habit in results]
+
+        results = database.search_habits(11, "walk")
+        assert ids(results) == habit_ids[:3]  # name, then description, then a log note
+        assert results[0][1] == "Evening walk" and results[0][-1] > results[1][-1]
+        assert ids(database.search_habits(11, "evening wa")) == habit_ids[:1]  # prefix as you type
+        assert ids(database.search_habits(11, "walk", frequency="Weekly")) == [habit_ids[1]]
+        assert database.search_habits(11, "swim") == [] and database.search_habits(11, "  ") == []
+
+        # writes after the first search are found without a rebuild
+        database.update_habit_returning(habit_ids[1], habit_name="Yoga", description="Mat")
+        database.log_completion(habit_ids[1], date(2025, 5, 2), note="Sunrise session")
+        assert ids(database.search_habits(11, "walk")) == [habit_ids[0], habit_ids[2]]
+        assert ids(database.search_habits(11, "sunrise")) == [habit_ids[1]]
+        database.delete_habit(habit_ids[0])
+        assert ids(database.search_habits(11, "walk")) == [habit_ids[2]]
+        assert (database.search_index is None) == full_text
+    finally:
+        database.close()
+    print("✅ Habit search verified in test database.")
+
+def test_rollups_follow_logs_and_habit_edits(db):
+    """Test the rollup tables count completions per habit, category and user as habits are logged and edited."""
+    from datetime import date
+
+    (walk, run, read), _ = db.add_habits([
+        (4, "Walk", "", "Health", "Daily"), (4, "Run", "", "Health", "Daily"), (4, "Read", "", None, "Weekly"),
+    ])
+    db.bulk_log([(walk, date(2025, 1, day)) for day in (6, 7, 13)] + [(run, date(2025, 1, 7)), (run, date(2025, 1, 8), False)])
+    db.log_completion(read, date(2025, 2, 1))
+
+    assert db.get_habit_rollup(walk, "week") == [(date(2025, 1, 6), 2, 2), (date(2025, 1, 13), 1, 1)]
+    assert db.get_habit_rollup(run, "day", date(2025, 1, 8), date(2025, 1, 31)) == [(date(2025, 1, 8), 0, 1)]
+    assert db.get_user_rollup(4, "month") == [(date(2025, 1, 1), 4, 5), (date(2025, 2, 1), 1, 1)]
+    assert db.get_category_rollup(4, "month") == {"": [(date(2025, 2, 1), 1, 1)], "Health": [(date(2025, 1, 1), 4, 5)]}
+
+    db.update_habit_returning(run, category="Fitness")
+    db.delete_habit(walk)
+    assert db.get_category_rollup(4, "month") == {
+        "": [(date(2025, 2, 1), 1, 1)], "Fitness": [(date(2025, 1, 1), 1, 2)],
+    }
+    assert db.get_user_rollup(4, "month", end=date(2025, 1, 31)) == [(date(2025, 1, 1), 1, 2)]
+
+    expected = db.get_category_rollup(4, "week"), db.get_user_rollup(4, "day")
+    with db._get_connection() as conn:
+        for table in ("Habit_Rollup", "Category_Rollup", "User_Rollup"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
+    assert db.rebuild_rollups() == 2 and (db.get_category_rollup(4, "week"), db.get_user_rollup(4, "day")) == expected
+    assert db.rebuild_rollups([run]) == 1 and db.get_user_rollup(4, "day") == expected[1]
+    print("✅ Completion rollups verified in test database.")
+
+def test_rebuild_rollups_needs_one_connection(tmp_path):
+    """Test a rollup rebuild reads and writes on the one connection it holds."""
+    from datetime import date
+
+    database = HabitDatabase(f"sqlite:///{tmp_path / 'one.db'}", pool_max_size=1, pool_checkout_timeout=1.0)
+    try:
+        (habit_id,), _ = database.add_habits([(1, "Walk", "", "Health", "Daily")])
+        database.bulk_log([(habit_id, date(2025, 1, day)) for day in range(1, 4)])
+        assert database.rebuild_rollups() == 1
+        assert database.rebuild_rollups([habit_id]) == 1
+        assert database.get_user_rollup(1, "month") == [(date(2025, 1, 1), 3, 3)]
+    finally:
+        database.close()
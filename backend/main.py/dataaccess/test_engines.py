@@ -0,0 +1,91 @@
+"""Test suite for storage engine selection and the embedded SQLite backend."""
+
+# to run the test 'pytest test_engines.py' in the terminal
+
+from datetime import datetime
+import pytest
+from dataaccess.engines import SqliteEngine, SqlServerEngine, StorageEngine, create_engine
+
+
+def test_engine_chosen_from_connection_string():
+    """Test that sqlite:/// URLs pick SQLite and anything else picks SQL Server."""
+    assert isinstance(create_engine("sqlite:///:memory:"), SqliteEngine)
+    odbc = "DRIVER={ODBC Driver 17 for SQL Server};SERVER=localhost;DATABASE=HabitTrackerDB;Trusted_Connection=yes;"
+    assert isinstance(create_engine(odbc), SqlServerEngine)
+
+
+def test_sqlite_file_uses_wal_and_schema(tmp_path):
+    """Test that a new SQLite file is created in WAL mode with the habit tables."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'habits.db'}")
+    conn = engine.connect()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"Users", "Habits", "Habit_Logs"} <= tables
+    # the default user the app logs in as is seeded
+    assert conn.execute("SELECT User_ID FROM Users").fetchall() == [(1,)]
+    conn.close()
+
+
+def test_sqlite_memory_shared_between_connections():
+    """Test that pooled connections to sqlite:///:memory: see the same database."""
+    engine = create_engine("sqlite:///:memory:")
+    first, second = engine.connect(), engine.connect()
+    first.execute("INSERT INTO Habits (User_ID, Habit_Name_, CreatedAt) VALUES (1, 'Read', ?)", (datetime(2025, 5, 1, 9, 30),))
+    first.commit()
+    assert second.execute("SELECT Habit_Name_, CreatedAt FROM Habits").fetchall() == [("Read", datetime(2025, 5, 1, 9, 30))]
+
+
+def test_sqlite_upgrade_converts_habit_logs(tmp_path):
+    """Test that an old database with VARCHAR Habit_Logs ids is migrated in place."""
+    import sqlite3
+    from dataaccess.engines import SQLITE_MIGRATIONS
+
+    path = tmp_path / "old.db"
+    old = sqlite3.connect(path)
+    old.executescript(SQLITE_MIGRATIONS[0])
+    old.execute("PRAGMA user_version = 1")
+    old.execute("INSERT INTO Habits (User_ID, Habit_Name_) VALUES (1, 'Drink Water')")
+    old.executemany(
+        "INSERT INTO Habit_Logs (Habit_ID, Log_Date, Habit_Status) VALUES (?, ?, 1)",
+        [("1", "2025-05-28"), ("1", "2025-05-28"), ("1", "2025-05-29"), ("42", "2025-05-28"), ("abc", "2025-05-28"),
+         ("1abc", "2025-05-30"), ("1abc", "2025-05-29")],  # not ids, so never attached to habit 1
+    )
+    old.commit()
+    old.close()
+
+    conn = create_engine(f"sqlite:///{path}").connect()
+    assert conn.execute("SELECT Log_ID, Habit_ID FROM Habit_Logs ORDER BY Log_ID").fetchall() == [(2, 1), (3, 1)]
+    assert conn.execute("SELECT COUNT(*) FROM Habit_Logs_Rejected").fetchone()[0] == 5
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'UX_Habit_Logs_Habit_Date'"
+    ).fetchone() is not None
+    conn.close()
+
+
+def test_sqlite_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    """Test a migration that fails part-way leaves neither its tables nor a new user_version behind."""
+    import sqlite3
+    from dataaccess import engines
+
+    path = tmp_path / "habits.db"
+    create_engine(f"sqlite:///{path}").connect().close()
+    monkeypatch.setattr(engines, "SQLITE_MIGRATIONS", engines.SQLITE_MIGRATIONS + [
+        "CREATE TABLE Half_Done (Id INTEGER); INSERT INTO No_Such_Table VALUES (1);",
+    ])
+    with pytest.raises(sqlite3.OperationalError):
+        create_engine(f"sqlite:///{path}").connect()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(engines.SQLITE_MIGRATIONS) - 1
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Half_Done'").fetchone() is None
+    conn.close()
+
+
+def test_engine_must_implement_every_driver_method():
+    """Test an engine missing a driver method fails when created, not on first use."""
+    class Incomplete(StorageEngine):
+        def connect(self):
+            return None
+
+    with pytest.raises(TypeError, match="upsert_logs"):
+        Incomplete()
@@ -0,0 +1,134 @@
+"""Test suite for the offline write-behind journal."""
+
+# to run the test 'pytest test_journal.py' in the terminal
+
+import sqlite3
+from datetime import date
+import pytest
+from dataaccess.data_access import HabitDatabase
+from dataaccess.engines import ADDED, CONFLICT, UPDATED
+from dataaccess.journal import OfflineHabitDatabase, WriteJournal
+
+
+@pytest.fixture
+def offline(tmp_path):
+    """An OfflineHabitDatabase over a throwaway SQLite database, synced by hand."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    database = OfflineHabitDatabase(db, WriteJournal(str(tmp_path / "journal.db")), start=False)
+    yield database
+    database.close()
+
+
+def names(rows):
+    return sorted(row[1] for row in rows)
+
+
+def test_writes_show_at_once_and_sync_later(offline):
+    """Test queued writes are visible before they reach the database and merge while unsent."""
+    offline.db.add_habit(1, "Walk", "", "Health", "Daily")
+    walk = offline.get_user_habits(1)[0]
+
+    assert offline.add_habit(1, "Read", "Ten pages", "Learning", "Daily") is True
+    temp_id = next(row[0] for row in offline.get_user_habits(1) if row[1] == "Read")
+    assert temp_id < 0 and offline.db.get_user_habits(1) == [walk]
+    assert offline.update_habit(temp_id, 1, "Read more", "Ten pages", "Learning", "Daily")
+    assert offline.update_habit(walk[0], 1, "Walk far", "", "Health", "Weekly")
+    assert offline.pending_count() == 2  # the rename was merged into the unsent add
+
+    assert names(offline.get_user_habits(1)) == ["Read more", "Walk far"]
+    assert offline.count_user_habits(1, frequency="Daily") == 1
+    assert [row[1] for row in offline.query_user_habits(1, frequency="Daily")] == ["Read more"]
+    assert offline.get_habit_by_id(temp_id)[1] == "Read more"
+
+    assert offline.sync_now() == 2
+    assert offline.pending_count() == 0
+    assert names(offline.db.get_user_habits(1)) == ["Read more", "Walk far"]
+    new_id = next(row[0] for row in offline.db.get_user_habits(1) if row[1] == "Read more")
+    assert offline.delete_habit(temp_id)  # the temporary id still works after the sync
+    offline.sync_now()
+    assert offline.db.get_habit_by_id(new_id) is None
+
+    offline.add_habit(1, "Stretch", "", "Health", "Daily")
+    stretch = next(row[0] for row in offline.get_user_habits(1) if row[1] == "Stretch")
+    offline.delete_habit(stretch)
+    assert offline.pending_count() == 0  # never reached the database, so nothing to send
+
+
+def test_conflicts_and_idempotent_replay(offline):
+    """Test an edit based on an old Row_Version is refused and a resent batch is not applied twice."""
+    offline.db.add_habit(1, "Walk", "", "Health", "Daily")
+    habit_id = offline.get_user_habits(1)[0][0]
+    offline.db.update_habit_returning(habit_id, habit_name="Changed elsewhere")
+
+    offline.update_habit(habit_id, 1, "Walk far", "", "Health", "Daily")
+    offline.sync_now()
+    assert [entry["error"] for entry in offline.failed_writes()] == [CONFLICT]
+    assert offline.get_user_habits(1)[0][1] == "Changed elsewhere"
+    assert offline.journal.clear_failures() == 1
+
+    offline.get_user_habits(1)  # reads the current version
+    offline.update_habit(habit_id, 1, "Walk far", "", "Health", "Daily")
+    batch = offline.journal.next_batch(10)
+    assert offline.db.apply_writes(batch)[0][0] == UPDATED
+    assert offline.db.apply_writes(batch) == offline.db.apply_writes(batch)  # acknowledgement lost, sent again
+    offline.journal.complete(batch[0], *offline.db.apply_writes(batch)[0])
+    assert offline.db.get_habit_by_id(habit_id)[1] == "Walk far"
+    assert offline.db.get_habit_versions([habit_id]) == {habit_id: 3}
+
+
+def test_journal_survives_restart_and_outage(tmp_path):
+    """Test queued writes are kept on disk and wait while the database cannot be reached."""
+    path = str(tmp_path / "journal.db")
+    journal = WriteJournal(path)
+    entry = journal.append("add", user_id=1, habit_name="Read", description="", category="Learning", frequency="Daily")
+    journal.close()
+
+    journal = WriteJournal(path)
+    assert len(journal) == 1 and journal.added_habit(entry["habit_id"])[1] == "Read"
+
+    class Unreachable:
+        engine = HabitDatabase("sqlite://").engine
+
+        error = sqlite3.OperationalError("unable to open database")
+
+        def apply_writes(self, writes):
+            raise self.error
+
+        def close(self):
+            pass
+
+    offline = OfflineHabitDatabase(Unreachable(), journal, start=False)
+    with pytest.raises(sqlite3.OperationalError):
+        offline.sync_now()
+    assert offline.pending_count() == 1 and offline.failed_writes() == []
+
+    # a database missing a migration is not a rejection of the data either
+    Unreachable.error = sqlite3.ProgrammingError("no such table: Applied_Writes")
+    with pytest.raises(sqlite3.ProgrammingError):
+        offline.sync_now()
+    assert offline.pending_count() == 1 and offline.failed_writes() == []
+    assert journal.next_batch(10)[0]["operation"] == "add"
+    journal.complete(entry, ADDED, 5, 1)
+    assert len(journal) == 0 and journal.resolve(entry["habit_id"]) == 5
+    offline.close()
+
+
+def test_offline_add_keeps_its_start_date(tmp_path):
+    """Test a queued add reaches the database with the day it was added, not the day it synced."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    path = str(tmp_path / "journal.db")
+    journal = WriteJournal(path)
+    journal._conn.execute("ALTER TABLE Pending_Writes DROP COLUMN Start_Date")  # a journal from before start dates
+    journal.close()
+
+    offline = OfflineHabitDatabase(db, WriteJournal(path), start=False)
+    assert offline.add_habit(1, "Read", "", "Learning", "Daily", start_date=date(2025, 3, 1))
+    assert offline.add_habit(1, "Walk", "", "Health", "Daily")
+    offline.journal.close()
+
+    offline = OfflineHabitDatabase(db, WriteJournal(path), start=False)  # still queued after a restart
+    assert offline.sync_now() == 2
+    with db._get_connection() as conn:
+        start_dates = dict(conn.execute("SELECT Habit_Name_, StartDate FROM Habits").fetchall())
+    assert start_dates == {"Read": date(2025, 3, 1), "Walk": date.today()}
+    offline.close()
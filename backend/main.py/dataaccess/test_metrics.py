@@ -0,0 +1,56 @@
+"""Test suite for query timing instrumentation."""
+
+# to run the test 'pytest test_metrics.py' in the terminal
+
+from dataaccess.data_access import HabitDatabase
+from dataaccess.metrics import Histogram, QueryMetrics
+
+
+def test_histogram_quantiles():
+    """Test bucket counting and interpolated quantiles."""
+    histogram = Histogram((0.1, 0.2, 0.4))
+    for value in (0.05, 0.15, 0.15, 0.3, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.count == 5 and round(histogram.sum, 2) == 5.65
+    assert 0.1 < histogram.quantile(0.5) <= 0.2
+    assert histogram.quantile(0.99) == 0.4  # +Inf bucket reports the largest bound
+
+
+def test_metrics_per_method_and_slow_queries(tmp_path):
+    """Test per-method timings, row counts, the slow-query log and Prometheus export."""
+    slow = []
+    metrics = QueryMetrics(slow_query_threshold=0.0, on_slow_query=slow.append)
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'metrics.db'}", metrics=metrics)
+    try:
+        db.add_habits([(1, f"Habit {n}", "", "Health", "Daily") for n in range(3)])
+        assert len(db.get_user_habits(1)) == 3
+        assert len(list(db.iter_user_habits(1, arraysize=2))) == 3
+
+        snapshot = db.metrics_snapshot()
+        reads = snapshot["methods"]["get_user_habits"]
+        assert reads["calls"] == 1 and reads["rows"] == 3
+        assert reads["connect"]["count"] == 1 and reads["execute"]["count"] == 1 and reads["fetch"]["count"] >= 1
+        assert snapshot["methods"]["iter_user_habits"]["rows"] == 3  # streamed through _stream
+        assert "add_habits" in snapshot["methods"]
+
+        select = next(entry for entry in slow if entry["method"] == "get_user_habits")
+        assert select["sql"].startswith("SELECT Habit_ID") and select["params"] == [1] and select["rows"] == 3
+        assert snapshot["slow_queries"][-1] == slow[-1]
+
+        text = metrics.prometheus_text()
+        assert 'habit_db_query_seconds_count{method="get_user_habits",phase="execute"} 1' in text
+        assert 'habit_db_rows_total{method="get_user_habits"} 3' in text
+    finally:
+        db.close()
+
+
+def test_metrics_off_by_default(tmp_path):
+    """Test that connections are not wrapped without a QueryMetrics."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'plain.db'}")
+    try:
+        with db._get_connection() as conn:
+            assert type(conn).__name__ == "Connection"
+        assert db.metrics_snapshot() == {}
+    finally:
+        db.close()
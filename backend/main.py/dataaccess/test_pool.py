@@ -0,0 +1,126 @@
+"""Test suite for the HabitDatabase connection pool (no database required)."""
+
+# to run the test 'pytest test_pool.py' in the terminal
+
+import threading
+import pytest
+from dataaccess.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stands in for a pyodbc connection"""
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, *args):
+        if not self.alive:
+            raise RuntimeError("connection is dead")
+
+    def fetchone(self):
+        return (1,)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections():
+    """Records every connection the pool opens."""
+    return []
+
+
+@pytest.fixture
+def pool(connections):
+    def connect():
+        conn = FakeConnection()
+        connections.append(conn)
+        return conn
+    return ConnectionPool(connect, min_size=1, max_size=2, checkout_timeout=0.2, ping_after=0)
+
+
+def test_connections_are_reused(pool, connections):
+    """Test that a returned connection is handed out again instead of reconnecting."""
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(connections) == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["creations"] == 1
+    assert first.rollbacks == 2  # reset on every checkin
+
+
+def test_max_size_blocks_then_times_out(pool):
+    """Test that checkouts beyond max_size wait and eventually raise PoolTimeout."""
+    a = pool.acquire()
+    b = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()["waits"] == 1
+
+    # A waiter is woken as soon as a connection comes back
+    threading.Timer(0.05, pool.release, args=(a,)).start()
+    c = pool.acquire()
+    assert c is a
+    pool.release(b)
+    pool.release(c)
+
+
+def test_dead_connection_replaced_on_checkout(pool, connections):
+    """Test that the liveness check discards a dead idle connection."""
+    with pool.connection() as conn:
+        pass
+    conn.alive = False
+    with pool.connection() as replacement:
+        pass
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()["ping_failures"] == 1
+    assert pool.stats()["size"] == 1
+
+
+def test_idle_connections_above_min_size_are_closed(connections):
+    """Test that idle_timeout trims the pool back down to min_size."""
+    pool = ConnectionPool(lambda: connections.append(FakeConnection()) or connections[-1],
+                          min_size=1, max_size=3, idle_timeout=0)
+    a, b, c = pool.acquire(), pool.acquire(), pool.acquire()
+    for conn in (a, b, c):
+        pool.release(conn)
+    assert pool.stats()["size"] == 1
+    assert sum(conn.closed for conn in connections) == 2
+
+
+def test_quiet_pool_expires_idle_connections_on_checkout(connections):
+    """Test that acquire() closes connections idle past idle_timeout instead of handing them out."""
+    import time
+
+    pool = ConnectionPool(lambda: connections.append(FakeConnection()) or connections[-1],
+                          min_size=0, max_size=2, idle_timeout=0.05)
+    a, b = pool.acquire(), pool.acquire()
+    pool.release(a)
+    pool.release(b)
+    time.sleep(0.1)  # nothing is released meanwhile
+    fresh = pool.acquire()
+    assert fresh not in (a, b) and a.closed and b.closed
+    assert pool.stats()["size"] == 1
+    pool.release(fresh)
+
+
+def test_warm_up_opens_min_size(connections):
+    """Test that warm_up pre-opens min_size connections."""
+    pool = ConnectionPool(lambda: connections.append(FakeConnection()) or connections[-1],
+                          min_size=2, max_size=4)
+    pool.warm_up()
+    assert pool.stats()["idle"] == 2
+    pool.close()
+    assert all(conn.closed for conn in connections)
@@ -0,0 +1,35 @@
+"""Test suite for the completion rollup counters."""
+
+# to run the test 'pytest test_rollups.py' in the terminal
+
+from datetime import date
+import pytest
+from dataaccess.rollups import grain_period, grain_start, rollup_deltas
+
+
+def test_grains_share_the_streak_numbering():
+    """Test days, Monday-based weeks and months map to periods and back."""
+    assert grain_start("week", grain_period("week", date(2025, 1, 8))) == date(2025, 1, 6)
+    assert grain_start("month", grain_period("month", date(2025, 2, 28))) == date(2025, 2, 1)
+    assert grain_start("day", grain_period("day", date(2025, 2, 28))) == date(2025, 2, 28)
+    with pytest.raises(ValueError):
+        grain_period("year", date(2025, 1, 1))
+
+
+def test_deltas_sum_per_rollup_row():
+    """Test new logs, status changes and unknown habits turn into the right counter changes."""
+    owners = {1: (7, "Health"), 2: (7, None)}
+    deltas = rollup_deltas([
+        (1, date(2025, 1, 6), None, True),
+        (1, date(2025, 1, 7), None, False),
+        (2, date(2025, 1, 7), True, False),   # a completion taken back
+        (2, date(2025, 1, 8), True, True),    # rewritten unchanged
+        (9, date(2025, 1, 8), None, True),    # habit gone
+    ], owners)
+    week = grain_period("week", date(2025, 1, 6))
+    assert deltas["Habit_Rollup"][(1, "week", week)] == [1, 2]
+    assert deltas["Habit_Rollup"][(2, "day", grain_period("day", date(2025, 1, 7)))] == [-1, 0]
+    assert (2, "day", grain_period("day", date(2025, 1, 8))) not in deltas["Habit_Rollup"]
+    assert deltas["Category_Rollup"][(7, "", "week", week)] == [-1, 0]
+    assert deltas["User_Rollup"][(7, "week", week)] == [0, 2]
+    assert not any(key[0] == 9 for key in deltas["Habit_Rollup"])
@@ -0,0 +1,96 @@
+"""Test suite for the due-habit scheduler."""
+
+# to run the test 'pytest test_scheduler.py' in the terminal
+
+from datetime import date
+from dataaccess.data_access import DELETED, HabitDatabase
+from dataaccess.scheduler import DueScheduler, next_due
+from dataaccess.streaks import period_index
+
+
+def test_next_due_per_frequency():
+    """Test a habit is due from its start, then from the period after its newest completion."""
+    start = date(2025, 1, 8)  # a Wednesday
+    assert next_due("Daily", start, None)[1] == start
+    assert next_due("Weekly", start, None)[1] == start  # not the Monday before it started
+    assert next_due("Weekly", start, period_index("Weekly", start))[1] == date(2025, 1, 13)
+    assert next_due("Monthly", start, period_index("Monthly", date(2025, 3, 2)))[1] == date(2025, 4, 1)
+    assert next_due("yearly", start, period_index("Yearly", start))[1] == date(2026, 1, 1)
+
+
+def test_wheel_moves_habits_as_days_pass():
+    """Test completions, the clock moving on, edits and deletes keep the due sets right."""
+    monday = date(2025, 1, 6)
+    scheduler = DueScheduler(today=monday)
+    scheduler.load([
+        (1, 10, "Daily", date(2025, 1, 1), None),
+        (2, 10, "Weekly", date(2025, 1, 1), None),
+        (3, 20, "Monthly", date(2025, 2, 1), None),  # starts next month
+    ])
+    assert scheduler.due(monday) == {10: [1, 2]}
+
+    scheduler.complete(1, monday)
+    scheduler.log_changes([(2, date(2025, 1, 7), None, True), (2, date(2025, 1, 2), None, True)])
+    assert scheduler.due(monday) == {} and scheduler.next_due_date(2) == date(2025, 1, 13)
+    assert scheduler.advance(date(2025, 1, 7)) == [(10, 1)]
+    assert sorted(scheduler.advance(date(2025, 2, 1))) == [(10, 2), (20, 3)]
+    assert scheduler.due_for_user(20, date(2025, 2, 1)) == [3] and scheduler.due_count(date(2025, 2, 1)) == 3
+
+    assert scheduler.log_changes([(3, date(2025, 2, 1), True, False)]) == [3]
+    scheduler.add(1, 10, "Weekly", date(2025, 1, 1), period_index("Weekly", date(2025, 2, 1)))
+    assert scheduler.due_for_user(10, date(2025, 2, 1)) == [2] and scheduler.remove(2) and not scheduler.remove(2)
+    assert scheduler.due(date(2025, 2, 3)) == {10: [1], 20: [3]}
+    assert scheduler.due(date(2025, 1, 10)) == {}  # clock moved back
+    assert scheduler.due(date(2025, 2, 3)) == {10: [1], 20: [3]}
+    assert len(scheduler) == 2
+
+
+def test_database_keeps_scheduler_current(tmp_path):
+    """Test due habits follow adds, logs, frequency edits and deletes once the scheduler is built."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    today = date.today()
+    db.add_habit(1, "Walk", "", "Health", "Daily")
+    db.add_habit(2, "Review", "", "Work", "Weekly")
+    db.add_habit(1, "Later", "", "Health", "Daily", start_date=date(today.year + 1, 1, 1))
+    walk, later = (habit[0] for habit in db.get_user_habits(1))
+    review = db.get_user_habits(2)[0][0]
+
+    assert [habit[0] for habit in db.get_due_habits(1)] == [walk]
+    assert db.get_all_due_habits() == {1: [walk], 2: [review]}
+
+    (stretch,), _ = db.add_habits([(1, "Stretch", "", "Health", "Daily")])
+    db.log_completion(walk)
+    db.bulk_log([(review, today)])
+    assert db.get_all_due_habits() == {1: [stretch]}
+
+    db.update_habit_returning(walk, frequency="Monthly")  # still done for this month
+    db.delete_habit(stretch)
+    assert db.get_all_due_habits() == {}
+    assert db.get_all_due_habits(date(today.year + 1, 2, 1)) == {1: [walk, later], 2: [review]}
+    db.close()
+
+
+def test_legacy_habit_without_dates_is_due_from_today(tmp_path):
+    """Test a habit with neither StartDate nor CreatedAt is scheduled instead of breaking the scheduler."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    db.add_habit(1, "Walk", "", "Health", "Daily")
+    with db._get_connection() as conn:
+        conn.execute("INSERT INTO Habits (User_ID, Habit_Name_, Frequency, StartDate, CreatedAt) "
+                     "VALUES (1, 'Legacy', 'Daily', NULL, NULL)")
+        conn.commit()
+    assert sorted(habit[1] for habit in db.get_due_habits(1)) == ["Legacy", "Walk"]
+    db.close()
+
+
+def test_string_habit_id_delete_leaves_the_schedule(tmp_path):
+    """Test deleting by a Treeview iid (a str) drops the habit from the int-keyed scheduler."""
+    db = HabitDatabase(f"sqlite:///{tmp_path / 'habits.db'}")
+    db.add_habit(1, "Walk", "", "Health", "Daily")
+    db.add_habit(1, "Read", "", "Learning", "Daily")
+    walk, read = (habit[0] for habit in db.get_user_habits(1))
+    assert [habit[0] for habit in db.get_due_habits(1)] == [walk, read]
+
+    assert db.delete_habit(str(walk)) is True
+    assert db.delete_habits([str(read)])[0][0] == DELETED
+    assert db.get_due_habits(1) == []
+    db.close()
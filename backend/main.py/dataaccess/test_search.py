@@ -0,0 +1,46 @@
+"""Test suite for the in-process search index used when the database has no full-text index."""
+
+# to run the test 'pytest test_search.py' in the terminal
+
+from datetime import date
+from dataaccess.search import InvertedIndex, build_index, tokenize
+
+
+def test_tokenize():
+    """Test words are lower-cased runs of letters and digits."""
+    assert tokenize("Drink 2L water_daily!") == ["drink", "2l", "water", "daily"]
+    assert tokenize(None) == [] and tokenize("  ") == []
+
+
+def test_ranking_prefix_and_users():
+    """Test name matches outrank descriptions and notes, AND matching and prefix search as you type."""
+    index = build_index(
+        [(1, 7, "Morning run", "Easy pace"), (2, 7, "Stretch", "After the run"), (3, 7, "Read", None),
+         (4, 8, "Run", "Other user")],
+        [(3, date(2025, 5, 1), "Read about running shoes"), (99, date(2025, 5, 1), "unknown habit")],
+    )
+    assert [habit_id for habit_id, _ in index.search(7, "run")] == [1, 2, 3]  # name, description, note ("running")
+    assert [habit_id for habit_id, _ in index.search(7, "morning ru")] == [1]
+    assert index.search(7, "morning swim") == []
+    assert index.search(7, "!!") == [] and index.search(9, "run") == []
+    assert [habit_id for habit_id, _ in index.search(8, "run")] == [4]
+    assert len(index.search(7, "r", limit=2)) == 2
+
+
+def test_incremental_updates():
+    """Test re-indexing, notes and removal keep postings exact."""
+    index = InvertedIndex()
+    index.add_habit(1, 10, "Guitar practice", "Scales")
+    index.add_note(10, date(2025, 5, 1), "Learned a new chord")
+    assert [h for h, _ in index.search(1, "chord")] == [10]
+
+    index.update_habit(10, "Piano practice", "Scales")
+    assert index.search(1, "guitar") == [] and [h for h, _ in index.search(1, "piano")] == [10]
+    assert [h for h, _ in index.search(1, "chord")] == [10]  # notes survive a rename
+    index.update_habit(11, "Never indexed", None)  # ignored
+    assert index.search(1, "never") == []
+
+    index.add_note(10, date(2025, 5, 1), "Rested")  # same day replaces the note
+    assert index.search(1, "chord") == []
+    index.remove_habit(10)
+    assert index.search(1, "piano") == [] and index.search(1, "rested") == [] and len(index) == 0
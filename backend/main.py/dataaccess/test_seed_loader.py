@@ -0,0 +1,71 @@
+"""Test suite for the bulk seed loader (SQLite path; SQL Server files are checked offline)."""
+
+# to run the test 'pytest test_seed_loader.py' in the terminal
+
+from datetime import date
+import pytest
+from dataaccess.data_access import HabitDatabase
+from dataaccess.seed_loader import SqliteSeedLoader, bcp_format_file, create_seed_loader, write_bcp_data
+from dataaccess.synthetic import SyntheticDataset
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = HabitDatabase(f"sqlite:///{tmp_path / 'seed.db'}")
+    yield database
+    database.close()
+
+
+def count(db, sql):
+    with db._get_connection() as conn:
+        return conn.execute(sql).fetchone()[0]
+
+
+def test_synthetic_load_appends_and_rebuilds_indexes(db):
+    """Test loading generated rows twice, index rebuild and streak state."""
+    loader = create_seed_loader(db, batch_size=100, progress_every=0)
+    assert isinstance(loader, SqliteSeedLoader)
+    dataset = SyntheticDataset(users=20, habits_per_user=5, logs_per_habit=12, end_date=date(2025, 5, 31))
+
+    figures = loader.load_synthetic(dataset)
+    assert figures["Users"]["rows"] == 20 and figures["Habits"]["rows"] == 100
+    assert figures["Habit_Logs"]["rows"] == 1200 and figures["duplicate_logs"] == 0
+    loader.load_synthetic(dataset)  # ids continue after the existing rows
+
+    assert count(db, "SELECT COUNT(*) FROM Users") == 41  # plus the seeded test user
+    assert count(db, "SELECT COUNT(*) FROM Habit_Logs") == 2400
+    assert count(db, "SELECT COUNT(*) FROM sqlite_master WHERE name IN ('IX_Habits_User_ID', 'UX_Habit_Logs_Habit_Date')") == 2
+    assert count(db, "SELECT COUNT(*) FROM Habit_Streaks") == 200
+    assert count(db, "SELECT COUNT(DISTINCT Habit_ID) FROM Habit_Calendar") == count(
+        db, "SELECT COUNT(*) FROM Habit_Streaks WHERE Last_Period IS NOT NULL")
+    user_habits = db.get_user_habits(2)
+    assert len(user_habits) == 5 and db.get_logs(user_habits[0][0])
+
+
+def test_csv_load_drops_repeated_days(db, tmp_path):
+    """Test CSV input with NULL handling and duplicate habit/day logs."""
+    (tmp_path / "habits.csv").write_text(
+        "Habit_ID,User_ID,Habit_Name_,Category,Frequency\n500,1,Imported,Health,Daily\n"
+    )
+    (tmp_path / "habit_logs.csv").write_text(
+        "Habit_ID,Log_Date,Habit_Status,Note\n"
+        "500,2025-05-01,1,\n500,2025-05-02,1,first\n500,2025-05-02,0,second\n"
+    )
+    figures = create_seed_loader(db).load_csv(str(tmp_path))
+    assert figures["duplicate_logs"] == 1
+
+    logs = db.get_logs(500)
+    assert [(log[2], log[3], log[4]) for log in logs] == [
+        (date(2025, 5, 1), True, None), (date(2025, 5, 2), False, "second"),
+    ]
+    assert db.get_habit_by_id(500)[2] is None
+    assert db.add_habit(1, "After import", "", "Health", "Daily") is True  # identity continues past 500
+
+
+def test_bcp_files(tmp_path):
+    """Test the data file and XML format file written for SQL Server."""
+    path = tmp_path / "logs.dat"
+    write_bcp_data(str(path), [(1, date(2025, 5, 1), True, "tab\there"), (2, date(2025, 5, 2), False, None)])
+    assert path.read_text(encoding="utf-8") == "1\t2025-05-01\t1\ttab here\n2\t2025-05-02\t0\t\n"
+    fmt = bcp_format_file("Habit_Logs")
+    assert fmt.count("<FIELD ") == 4 and 'TERMINATOR="\\n"' in fmt and 'NAME="Log_Date" xsi:type="SQLDATE"' in fmt
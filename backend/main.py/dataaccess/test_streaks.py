@@ -0,0 +1,41 @@
+"""Test suite for the streak calculations (no database required)."""
+
+# to run the test 'pytest test_streaks.py' in the terminal
+
+import random
+from datetime import date, timedelta
+from dataaccess.streaks import StreakState, advance, compute_streaks, current_streak, period_index
+
+
+def test_period_index_buckets():
+    """Test that days fall into the right daily/weekly/monthly/yearly periods."""
+    monday, sunday = date(2025, 5, 5), date(2025, 5, 11)
+    assert period_index("Weekly", monday) == period_index("Weekly", sunday)
+    assert period_index("Weekly", sunday) + 1 == period_index("Weekly", sunday + timedelta(days=1))
+    assert period_index("monthly", date(2024, 12, 31)) + 1 == period_index("Monthly", date(2025, 1, 1))
+    assert period_index("Yearly", date(2025, 1, 1)) == period_index("Yearly", date(2025, 12, 31))
+    assert period_index("every so often", monday) == period_index("Daily", monday)  # unknown -> Daily
+
+
+def test_incremental_matches_recompute():
+    """Test that applying dates one by one gives the same state as the vectorized recompute."""
+    rng = random.Random(7)
+    start = date(2024, 1, 1)
+    for frequency in ("Daily", "Weekly", "Monthly", "Yearly"):
+        days = sorted({start + timedelta(days=rng.randrange(0, 900)) for _ in range(300)})
+        state = StreakState()
+        for day in days:
+            state = advance(state, period_index(frequency, day))
+        assert state == compute_streaks(frequency, days), frequency
+
+
+def test_streak_values():
+    """Test current/longest streak lengths, backfill detection and expiry."""
+    days = [date(2025, 5, d) for d in (1, 2, 3, 5, 6)]
+    state = compute_streaks("Daily", days)
+    assert (state.current, state.longest) == (2, 3)
+    assert advance(state, period_index("Daily", date(2025, 5, 4))) is None  # out of order
+    assert compute_streaks("Daily", []) == StreakState()
+
+    assert current_streak("Daily", state, today=date(2025, 5, 7)) == 2  # today not logged yet
+    assert current_streak("Daily", state, today=date(2025, 5, 8)) == 0  # a whole day was missed
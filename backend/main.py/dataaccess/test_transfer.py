@@ -0,0 +1,104 @@
+"""Test suite for streaming export/import (SQLite; Parquet only when pyarrow is installed)."""
+
+# to run the test 'pytest test_transfer.py' in the terminal
+
+from datetime import date, datetime
+import pytest
+from dataaccess.data_access import HabitDatabase
+from dataaccess import transfer
+from dataaccess.seed_loader import SqlServerSeedLoader
+from dataaccess.transfer import FORMATS, export_data, import_data
+
+
+def make_db(path):
+    return HabitDatabase(f"sqlite:///{path}")
+
+
+def rows(db, sql):
+    # exports keep timestamps to the millisecond, as SQL Server's DATETIME does
+    millis = lambda value: value.replace(microsecond=value.microsecond // 1000 * 1000) if isinstance(value, datetime) else value
+    with db._get_connection() as conn:
+        return [tuple(millis(value) for value in row) for row in conn.execute(sql).fetchall()]
+
+
+@pytest.fixture
+def source(tmp_path):
+    database = make_db(tmp_path / "source.db")
+    with database._get_connection() as conn:
+        conn.execute("INSERT INTO Users (First_Name, Email) VALUES ('Mover', 'mover@example.com')")
+        conn.commit()
+    habit_ids, _ = database.add_habits([
+        (1, "Walk", "Around, \"the\" park", "Health", "Daily"),
+        (2, "Read", None, "Learning", "Weekly"),
+        (2, "Journal", "Line one\nline two", "Mind", "Daily"),
+    ])
+    database.bulk_log([(habit_ids[0], date(2025, 5, 1), True, "ok"), (habit_ids[1], date(2025, 5, 2), False),
+                       (habit_ids[2], date(2025, 5, 3), True, "ünïcode")])
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_and_restore(source, tmp_path, fmt):
+    """Test a full export restores into an empty database with the same ids, text and timestamps."""
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    figures = export_data(source, str(tmp_path / fmt), fmt, chunk_size=2, progress_every=0)
+    assert [figures[table]["rows"] for table in ("Users", "Habits", "Habit_Logs")] == [2, 3, 3]
+
+    target = make_db(tmp_path / f"target_{fmt}.db")
+    try:
+        with target._get_connection() as conn:
+            conn.execute("DELETE FROM Users")  # drop the seeded test user so ids are free
+            conn.commit()
+        import_data(target, str(tmp_path / fmt), chunk_size=2, progress_every=0)
+        for sql in ("SELECT User_ID, First_Name, Email, Created_at FROM Users ORDER BY User_ID",
+                    "SELECT Habit_ID, User_ID, Habit_Name_, Description_, Category, Frequency, CreatedAt FROM Habits ORDER BY Habit_ID",
+                    "SELECT Habit_ID, Log_Date, Habit_Status, Note FROM Habit_Logs ORDER BY Habit_ID"):
+            assert rows(target, sql) == rows(source, sql)
+        assert target.get_streak(1, today=date(2025, 5, 1)) == (1, 1)  # derived state rebuilt
+    finally:
+        target.close()
+
+
+def test_export_users_and_import_with_new_ids(source, tmp_path):
+    """Test moving one user into an instance that already has users and habits."""
+    export_data(source, str(tmp_path / "move"), "jsonl", user_ids=[2], progress_every=0)
+
+    target = make_db(tmp_path / "target.db")
+    try:
+        target.add_habit(1, "Existing", "", "Health", "Daily")
+        import_data(target, str(tmp_path / "move"), remap_ids=True, progress_every=0)
+        assert rows(target, "SELECT User_ID, First_Name FROM Users ORDER BY User_ID") == [(1, "testuser"), (3, "Mover")]
+        moved = rows(target, "SELECT Habit_ID, User_ID, Habit_Name_ FROM Habits WHERE User_ID = 3 ORDER BY Habit_ID")
+        assert moved == [(3, 3, "Read"), (4, 3, "Journal")]  # habits 2 and 3 shifted past habit 1
+        assert rows(target, "SELECT Habit_ID, Note FROM Habit_Logs ORDER BY Habit_ID") == [(3, None), (4, "ünïcode")]
+        assert [habit[0] for habit in target.search_habits(3, "journal")] == [4]
+    finally:
+        target.close()
+
+
+def test_import_needs_files(tmp_path):
+    """Test a directory without export files is reported."""
+    with pytest.raises(FileNotFoundError):
+        import_data(make_db(tmp_path / "empty.db"), str(tmp_path))
+
+
+def test_import_through_sql_server_loader(source, tmp_path, monkeypatch):
+    """Test import_data hands the export's columns to the SQL Server loader."""
+    export_data(source, str(tmp_path / "out"), "csv", progress_every=0)
+    loaded = {}
+
+    def load_table(self, conn, table, columns, rows, progress):
+        loaded[table] = (tuple(columns), len(list(rows)))
+
+    monkeypatch.setattr(SqlServerSeedLoader, "_load_table", load_table)
+    monkeypatch.setattr(transfer, "create_seed_loader",
+                        lambda db, **options: SqlServerSeedLoader(db, defer_indexes=False, progress_every=0))
+    target = make_db(tmp_path / "target.db")
+    try:
+        import_data(target, str(tmp_path / "out"))
+    finally:
+        target.close()
+    assert [loaded[table][1] for table in ("Users", "Habits", "Habit_Logs")] == [2, 3, 3]
+    assert "CreatedAt" in loaded["Habits"][0]  # export columns, not the loader defaults
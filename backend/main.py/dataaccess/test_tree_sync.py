@@ -0,0 +1,120 @@
+"""Test suite for the diff-based Treeview refresh (no display required)."""
+
+# to run the test 'pytest test_tree_sync.py' in the terminal
+
+from datetime import datetime
+from dataaccess.tree_sync import TreeviewSync
+
+
+class FakeTree:
+    """The ttk.Treeview item methods TreeviewSync uses, with a call log"""
+    def __init__(self):
+        self.children = []
+        self.values = {}
+        self.selected = ()
+        self.top = 0.0
+        self.calls = []
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def insert(self, parent, index, iid, values):
+        self.calls.append("insert")
+        self.children.insert(len(self.children) if index == "end" else index, iid)
+        self.values[iid] = values
+
+    def delete(self, *iids):
+        self.calls.append("delete")
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+        self.selected = tuple(iid for iid in self.selected if iid not in iids)
+
+    def item(self, iid, values):
+        self.calls.append("item")
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        self.calls.append("move")
+        if iid in self.children:  # a detached item is reattached
+            self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def detach(self, *iids):
+        self.calls.append("detach")
+        for iid in iids:
+            self.children.remove(iid)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iids):
+        self.selected = tuple(iids)
+
+    def yview(self):
+        return (self.top, 1.0)
+
+    def yview_moveto(self, fraction):
+        self.top = fraction
+
+    def identify_row(self, y):
+        return self.children[int(self.top * len(self.children))] if self.children else ""
+
+
+def habit(habit_id, name=None):
+    return (habit_id, name or f"Habit {habit_id}", "", "Health", "Daily", datetime(2025, 5, 1))
+
+
+def test_only_changes_are_applied():
+    """Test that a refresh touches only inserted, updated and deleted rows."""
+    tree = FakeTree()
+    sync = TreeviewSync(tree)
+    sync.apply([habit(i) for i in range(1, 101)])
+    assert tree.children == [str(i) for i in range(1, 101)]
+
+    tree.calls.clear()
+    tree.selected = ("50",)
+    tree.top = 0.4  # row 41 at the top
+    changes = sync.apply([habit(i, "Renamed" if i == 50 else None) for i in range(1, 101) if i != 3] + [habit(101)])
+    assert (changes.inserts, changes.updates, changes.deletes, changes.moves) == (["101"], ["50"], ["3"], 0)
+    assert sorted(tree.calls) == ["delete", "insert", "item"]
+    assert tree.values["50"][0] == "Renamed"
+    assert tree.selected == ("50",)
+    assert tree.identify_row(1) == "41"  # same row still at the top
+
+    tree.calls.clear()
+    assert sync.apply([habit(i, "Renamed" if i == 50 else None) for i in range(1, 101) if i != 3] + [habit(101)]) == ([], [], [], 0)
+    assert tree.calls == []
+
+
+def test_reorder_and_single_row_changes():
+    """Test moves for a new order plus upsert/remove without a full refresh."""
+    tree = FakeTree()
+    sync = TreeviewSync(tree)
+    sync.apply([habit(i) for i in (1, 2, 3, 4)])
+    changes = sync.apply([habit(i) for i in (4, 1, 2, 5, 3)])
+    assert tree.children == ["4", "1", "2", "5", "3"] and changes.moves == 1
+
+    sync.upsert(habit(6))
+    sync.upsert(habit(1, "Changed"))
+    sync.remove(2)
+    assert tree.children == ["4", "1", "5", "3", "6"] and tree.values["1"][0] == "Changed"
+    assert sync.apply([habit(i, "Changed" if i == 1 else None) for i in (4, 1, 5, 3, 6)]) == ([], [], [], 0)
+
+
+def test_reorder_moves_only_rows_out_of_place():
+    """Test a reorder moves the fewest rows and a large shuffle ends in the right order."""
+    import random
+
+    tree = FakeTree()
+    sync = TreeviewSync(tree)
+    sync.apply([habit(i) for i in range(1, 1001)])
+    changes = sync.apply([habit(i) for i in range(2, 1001)] + [habit(1)])  # first row sorted to the end
+    assert changes.moves == 1 and tree.children == [str(i) for i in range(2, 1001)] + ["1"]
+
+    order = list(range(1, 2001))
+    random.Random(3).shuffle(order)
+    tree.selected = (str(order[0]),)
+    changes = sync.apply([habit(i) for i in order])
+    assert tree.children == [str(i) for i in order] and tree.selected == (str(order[0]),)
+    assert changes.moves < 1000 and len(changes.inserts) == 1000
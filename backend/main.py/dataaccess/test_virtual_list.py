@@ -0,0 +1,98 @@
+"""Test suite for the paging behind the virtualized Treeview (no display required)."""
+
+# to run the test 'pytest test_virtual_list.py' in the terminal
+
+from dataaccess.virtual_list import PageCache, is_placeholder, visible_window
+
+
+def page_rows(page, size=10):
+    return [(page * size + i, f"Habit {page * size + i}") for i in range(size)]
+
+
+def test_rows_and_missing_pages():
+    """Test rows are None until their page arrives and only unrequested pages are missing."""
+    cache = PageCache(page_size=10, max_pages=4)
+    cache.reset(35)
+    assert cache.missing_pages(5, 25) == [0, 1, 2]
+    assert cache.request(0) == (0, None)
+    assert cache.missing_pages(5, 25) == [1, 2]
+
+    assert cache.store(0, page_rows(0), cache.generation) is True
+    rows = cache.rows(8, 12)
+    assert rows[:2] == [(8, "Habit 8"), (9, "Habit 9")] and rows[2:] == [None, None]
+    assert cache.missing_pages(0, 0) == []
+
+
+def test_keyset_request_after_full_page():
+    """Test a page after a full loaded page is fetched by key, others by offset."""
+    cache = PageCache(page_size=10)
+    cache.reset(100)
+    cache.store(0, page_rows(0), cache.generation)
+    assert cache.request(1) == (0, 9)  # after the last key of page 0
+    assert cache.request(5) == (50, None)
+
+    cache.store(2, page_rows(2)[:3], cache.generation)  # short page: end of the list
+    assert cache.request(3) == (30, None)
+
+
+def test_lru_eviction():
+    """Test the least recently read page is evicted first."""
+    cache = PageCache(page_size=10, max_pages=2)
+    cache.reset(50)
+    cache.store(0, page_rows(0), cache.generation)
+    cache.store(1, page_rows(1), cache.generation)
+    cache.rows(0, 1)  # page 0 is now the most recently used
+    cache.store(2, page_rows(2), cache.generation)
+    assert cache.missing_pages(0, 30) == [1]
+
+
+def test_reset_keeps_stale_rows_and_drops_old_pages():
+    """Test a refresh shows the previous rows until fresh pages arrive and ignores late old ones."""
+    cache = PageCache(page_size=10)
+    cache.reset(20)
+    old = cache.generation
+    cache.store(0, page_rows(0), old)
+    cache.request(1)
+
+    cache.reset(20)
+    assert cache.rows(0, 2) == [(0, "Habit 0"), (1, "Habit 1")]  # stale, still shown
+    assert cache.missing_pages(0, 20) == [0, 1]  # but fetched again
+    assert cache.store(1, page_rows(1), old) is False  # answer to the old request
+
+    cache.store(0, [(0, "Renamed")], cache.generation)
+    assert cache.rows(0, 2) == [(0, "Renamed"), None]
+
+    cache.forget(1, old)  # a failed old fetch does not touch the new generation
+    cache.request(1)
+    cache.forget(1, cache.generation)
+    assert cache.missing_pages(10, 20) == [1]
+
+
+def test_stale_pages_never_repeat_a_key_after_a_delete():
+    """Test a partly refreshed list shows each key once after rows shifted between pages."""
+    cache = PageCache(page_size=4)
+    cache.reset(8)
+    cache.store(0, [(key,) for key in (1, 2, 3, 4)], cache.generation)
+    cache.store(1, [(key,) for key in (5, 6, 7, 8)], cache.generation)
+    cache.store(2, [(key,) for key in (9, 10)], cache.generation)
+
+    cache.reset(7)  # key 2 was deleted, so 5 moves up to page 0
+    cache.store(0, [(key,) for key in (1, 3, 4, 5)], cache.generation)
+    assert cache.rows(0, 10) == [(1,), (3,), (4,), (5,), None, None, None, None, (9,), (10,)]
+
+    # rows inserted ahead push stale page 0's keys two pages on, past the neighbour rule
+    cache = PageCache(page_size=2)
+    cache.reset(2)
+    cache.store(0, [(10,), (11,)], cache.generation)
+    cache.reset(6)
+    cache.store(2, [(10,), (11,)], cache.generation)
+    assert cache.rows(0, 6) == [None, None, None, None, (10,), (11,)]
+
+
+def test_visible_window_and_placeholders():
+    """Test the materialized window is clamped to the list."""
+    assert visible_window(0, 10, 5, 100) == (0, 15)
+    assert visible_window(50, 10, 5, 100) == (45, 65)
+    assert visible_window(95, 10, 5, 100) == (90, 100)
+    assert visible_window(0, 10, 5, 0) == (0, 0)
+    assert is_placeholder("~12") and not is_placeholder("12")
@@ -0,0 +1,318 @@
+"""Streaming export and import of users, habits and logs
+
+For backups and for moving users between Habit Tracker instances. Tables
+are written to / read from one file per table (users, habits, habit_logs)
+in CSV, JSON Lines or Parquet, a chunk of rows at a time, so memory stays
+flat however large the tables are. Imports go through the bulk seed loader.
+
+Usage (from backend/main.py/dataaccess, DB_CONNECTION_STRING taken from .env):
+    python transfer.py export ./backup                          # CSV, every user
+    python transfer.py export ./move --format jsonl --user 3 --user 7
+    python transfer.py import ./backup                          # restore with the same ids
+    python transfer.py import ./move --remap-ids                # add to an instance that has its own users
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:  # imported as dataaccess.transfer (tests)
+    from .data_access import IN_CHUNK_SIZE, HabitDatabase, connection_string_from_env
+    from .seed_loader import TABLE_COLUMNS, Progress, create_seed_loader
+except ImportError:  # run from inside dataaccess/ (python transfer.py)
+    from data_access import IN_CHUNK_SIZE, HabitDatabase, connection_string_from_env
+    from seed_loader import TABLE_COLUMNS, Progress, create_seed_loader
+
+# Everything the seed loader writes plus the creation timestamps, so a restore keeps them
+EXPORT_COLUMNS = {
+    "Users": TABLE_COLUMNS["Users"] + ("Created_at",),
+    "Habits": TABLE_COLUMNS["Habits"] + ("CreatedAt",),
+    "Habit_Logs": TABLE_COLUMNS["Habit_Logs"] + ("logged_At",),
+}
+FILE_NAMES = {"Users": "users", "Habits": "habits", "Habit_Logs": "habit_logs"}
+FORMATS = ("csv", "jsonl", "parquet")
+# Rows selected per table; {users} is replaced by a chunk of placeholders for a per-user export
+EXPORT_QUERIES = {
+    "Users": "SELECT {columns} FROM Users{where} ORDER BY User_ID",
+    "Habits": "SELECT {columns} FROM Habits{where} ORDER BY Habit_ID",
+    "Habit_Logs": "SELECT {columns} FROM Habit_Logs{where} ORDER BY Habit_ID, Log_Date",
+}
+USER_FILTERS = {
+    "Users": " WHERE User_ID IN ({users})",
+    "Habits": " WHERE User_ID IN ({users})",
+    "Habit_Logs": " WHERE Habit_ID IN (SELECT Habit_ID FROM Habits WHERE User_ID IN ({users}))",
+}
+
+
+def file_path(directory: str, table: str, fmt: str) -> str:
+    return os.path.join(directory, f"{FILE_NAMES[table]}.{fmt}")
+
+
+# === EXPORT ===
+
+def export_data(db: HabitDatabase, directory: str, fmt: str = "csv", user_ids: Optional[Sequence[int]] = None,
+                chunk_size: int = 10000, progress_every: float = 1.0) -> Dict[str, Any]:
+    """
+    Write Users, Habits and Habit_Logs to one file each, streaming chunk_size rows at a time
+
+    Args:
+        db: Database to read
+        directory: Where users/habits/habit_logs.<fmt> are written (created if needed)
+        fmt: 'csv', 'jsonl' or 'parquet' (needs pyarrow)
+        user_ids: Only these users and their habits/logs (None for everyone)
+        chunk_size: Rows fetched and written per step
+        progress_every: Seconds between progress lines
+
+    Returns:
+        Dict: Per-table {"rows", "seconds", "rows_per_sec"}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    figures = {}
+    for table, columns in EXPORT_COLUMNS.items():
+        progress = Progress(table, progress_every, verb="exported")
+        with _open_writer(file_path(directory, table, fmt), fmt, columns) as writer:
+            for chunk in _chunked(_export_rows(db, table, columns, user_ids, chunk_size), chunk_size):
+                writer.write(chunk)
+                progress.update(len(chunk))
+        figures[table] = progress.finish()
+    return figures
+
+
+def _export_rows(db: HabitDatabase, table: str, columns: Sequence[str], user_ids: Optional[Sequence[int]],
+                 chunk_size: int) -> Iterator[tuple]:
+    if user_ids is None:
+        sql = EXPORT_QUERIES[table].format(columns=", ".join(columns), where="")
+        yield from db._stream(sql, (), chunk_size)
+        return
+    for users in _chunked(user_ids, IN_CHUNK_SIZE):
+        where = USER_FILTERS[table].format(users=", ".join("?" for _ in users))
+        yield from db._stream(EXPORT_QUERIES[table].format(columns=", ".join(columns), where=where), tuple(users), chunk_size)
+
+
+def _chunked(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    row_iter = iter(rows)
+    while True:
+        chunk = list(islice(row_iter, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _text(value: Any) -> Any:
+    """Dates as ISO text; DATETIME keeps milliseconds, which is all SQL Server stores"""
+    if isinstance(value, datetime):
+        return value.isoformat(" ", "milliseconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class _CsvWriter:
+    def __init__(self, path: str, columns: Sequence[str]):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, rows: List[tuple]) -> None:
+        self.writer.writerows(
+            ["" if value is None else int(value) if isinstance(value, bool) else _text(value) for value in row]
+            for row in rows
+        )
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _JsonLinesWriter:
+    def __init__(self, path: str, columns: Sequence[str]):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write(self, rows: List[tuple]) -> None:
+        self.file.writelines(
+            json.dumps({column: _text(value) for column, value in zip(self.columns, row)}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, columns: Sequence[str]):
+        pa, pq = _import_pyarrow()
+        types = {"User_ID": pa.int64(), "Habit_ID": pa.int64(), "Habit_Status": pa.bool_()}
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: List[tuple]) -> None:
+        data = {
+            column: [None if value is None else bool(value) if column == "Habit_Status" else _text(value)
+                     for value in values]
+            for column, values in zip(self.columns, zip(*rows))
+        }
+        self.writer.write_table(self.pa.Table.from_pydict(data, schema=self.schema))  # one row group per chunk
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+@contextmanager
+def _open_writer(path: str, fmt: str, columns: Sequence[str]):
+    writer = {"csv": _CsvWriter, "jsonl": _JsonLinesWriter, "parquet": _ParquetWriter}[fmt](path, columns)
+    try:
+        yield writer
+    finally:
+        writer.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+# === IMPORT ===
+
+def import_data(db: HabitDatabase, directory: str, fmt: Optional[str] = None, remap_ids: bool = False,
+                chunk_size: int = 10000, **loader_options) -> Dict[str, Any]:
+    """
+    Load files written by export_data through the bulk seed loader
+
+    Files are read chunk_size rows at a time; columns missing from a file
+    (e.g. the timestamps) get their database defaults.
+
+    Args:
+        db: Database to fill
+        directory: Folder holding users/habits/habit_logs.<fmt> (missing tables are skipped)
+        fmt: 'csv', 'jsonl' or 'parquet'; found from the file names if None
+        remap_ids: Shift every User_ID/Habit_ID past the ids already in db, so
+            users can be moved into an instance that has its own; otherwise
+            ids are kept (restoring a backup into an empty database)
+        chunk_size: Rows read per step
+        loader_options: Passed to create_seed_loader (batch_size, defer_indexes, progress_every, ...)
+
+    Returns:
+        Dict: Per-table {"rows", "seconds", "rows_per_sec"}, plus "duplicate_logs" dropped
+    """
+    fmt = fmt or detect_format(directory)
+    sources, columns = {}, {}
+    for table in EXPORT_COLUMNS:
+        path = file_path(directory, table, fmt)
+        if os.path.exists(path):
+            columns[table], sources[table] = _read_rows(path, fmt, table, chunk_size)
+    if not sources:
+        raise FileNotFoundError(f"no {fmt} export files found in {directory}")
+
+    loader = create_seed_loader(db, **loader_options)
+    if remap_ids:
+        first_user_id, first_habit_id = loader.next_ids()
+        offsets = {"User_ID": first_user_id - 1, "Habit_ID": first_habit_id - 1}
+        for table in sources:
+            sources[table] = _shift_ids(sources[table], columns[table], offsets)
+    return loader.load(sources, columns)
+
+
+def detect_format(directory: str) -> str:
+    """The format of the export files in a directory"""
+    for fmt in FORMATS:
+        if any(os.path.exists(file_path(directory, table, fmt)) for table in EXPORT_COLUMNS):
+            return fmt
+    raise FileNotFoundError(f"no export files found in {directory}")
+
+
+def _read_rows(path: str, fmt: str, table: str, chunk_size: int) -> Tuple[Tuple[str, ...], Iterator[tuple]]:
+    """(columns present in the file, row iterator) keeping only known columns"""
+    if fmt == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        reader = _csv_rows
+    elif fmt == "jsonl":
+        with open(path, encoding="utf-8") as f:
+            first = f.readline()
+        header = list(json.loads(first)) if first.strip() else []
+        reader = _jsonl_rows
+    else:
+        _, pq = _import_pyarrow()
+        header = pq.ParquetFile(path).schema_arrow.names
+        reader = _parquet_rows
+    columns = tuple(column for column in EXPORT_COLUMNS[table] if column in header)
+    missing = [column for column in TABLE_COLUMNS[table] if column.endswith("_ID") and column not in columns]
+    if missing:
+        raise ValueError(f"{path} needs the column(s) {', '.join(missing)}")
+    return columns, reader(path, columns, chunk_size)
+
+
+def _csv_rows(path: str, columns: Sequence[str], chunk_size: int) -> Iterator[tuple]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for record in csv.DictReader(f):
+            yield tuple(record.get(column) or None for column in columns)
+
+
+def _jsonl_rows(path: str, columns: Sequence[str], chunk_size: int) -> Iterator[tuple]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield tuple(record.get(column) for column in columns)
+
+
+def _parquet_rows(path: str, columns: Sequence[str], chunk_size: int) -> Iterator[tuple]:
+    _, pq = _import_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(columns)):
+        yield from zip(*(batch.column(column).to_pylist() for column in columns))
+
+
+def _shift_ids(rows: Iterable[tuple], columns: Sequence[str], offsets: Dict[str, int]) -> Iterator[tuple]:
+    positions = [(index, offsets[column]) for index, column in enumerate(columns) if column in offsets]
+    for row in rows:
+        row = list(row)
+        for index, offset in positions:
+            row[index] = int(row[index]) + offset
+        yield tuple(row)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export or import users, habits and logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write users/habits/habit_logs files")
+    export.add_argument("directory")
+    export.add_argument("--format", choices=FORMATS, default="csv")
+    export.add_argument("--user", type=int, action="append", dest="users", help="Only this user (repeatable)")
+    load = commands.add_parser("import", help="Bulk load files written by export")
+    load.add_argument("directory")
+    load.add_argument("--format", choices=FORMATS, help="Defaults to the format of the files found")
+    load.add_argument("--remap-ids", action="store_true", help="Give imported users/habits new ids")
+    load.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the load")
+    for command in (export, load):
+        command.add_argument("--connection", help="Connection string (defaults to DB_CONNECTION_STRING)")
+        command.add_argument("--chunk-size", type=int, default=10000, help="Rows read and written per step")
+    args = parser.parse_args(argv)
+
+    db = HabitDatabase(args.connection or connection_string_from_env())
+    try:
+        if args.command == "export":
+            export_data(db, args.directory, args.format, args.users, args.chunk_size)
+        else:
+            import_data(db, args.directory, args.format, args.remap_ids, args.chunk_size,
+                        defer_indexes=not args.keep_indexes)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Keeps a ttk.Treeview in step with a list of rows by applying only what changed"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+
+class ChangeSet(NamedTuple):
+    inserts: List[str]
+    updates: List[str]
+    deletes: List[str]
+    moves: int
+
+
+class TreeviewSync:
+    def __init__(self, tree, key_index: int = 0, value_slice: slice = slice(1, 5)):
+        """
+        Diff-based refresh for a Treeview whose item ids are a row key (Habit_ID)
+
+        Rather than deleting and reinserting every item, apply() compares the
+        new rows with what is shown and only inserts, updates, deletes or
+        moves the items that differ, so selection and scroll position survive
+        and an edit to one habit costs one Tk call.
+
+        Args:
+            tree: ttk.Treeview (or anything with the same item methods)
+            key_index: Position of the key in each row; used as the item id
+            value_slice: Part of each row shown in the columns
+        """
+        self.tree = tree
+        self.key_index = key_index
+        self.value_slice = value_slice
+        self.shown: Dict[str, Tuple[Any, ...]] = {}  # item id -> displayed values
+        self.order: List[str] = []
+
+    def apply(self, rows: Iterable[tuple]) -> ChangeSet:
+        """Make the tree show exactly rows, in order"""
+        new_order = []
+        new_values = {}
+        for row in rows:
+            iid = str(row[self.key_index])
+            new_order.append(iid)
+            new_values[iid] = tuple(row[self.value_slice])
+
+        deletes = [iid for iid in self.order if iid not in new_values]
+        updates = [iid for iid in new_order if iid in self.shown and self.shown[iid] != new_values[iid]]
+        inserts = [iid for iid in new_order if iid not in self.shown]
+
+        first_visible = self.tree.yview()[0]
+        top_item = self.tree.identify_row(1) if self.order else ""  # row at the top edge of the view
+        selection = tuple(self.tree.selection())
+
+        if deletes:
+            self.tree.delete(*deletes)
+        for iid in updates:
+            self.tree.item(iid, values=new_values[iid])
+
+        # Surviving items in a longest run that is already in the new order stay
+        # put; the others are detached, then everything missing is placed while
+        # walking the target order once, so position i always holds new_order[i]
+        staying = _in_order(self.order, new_order, new_values)
+        moved = [iid for iid in new_order if iid in self.shown and iid not in staying]
+        if moved:
+            self.tree.detach(*moved)
+        for index, iid in enumerate(new_order):
+            if iid in staying:
+                continue
+            if iid in self.shown:
+                self.tree.move(iid, "", index)
+            else:
+                self.tree.insert("", index, iid=iid, values=new_values[iid])
+        moves = len(moved)
+
+        self.shown = new_values
+        self.order = new_order
+
+        kept = tuple(iid for iid in selection if iid in new_values)
+        if kept != selection or (moved and tuple(self.tree.selection()) != kept):  # detaching may deselect
+            self.tree.selection_set(kept)
+        if deletes or inserts or moves:
+            if top_item in new_values:  # keep the same row at the top
+                self.tree.yview_moveto(new_order.index(top_item) / len(new_order))
+            else:
+                self.tree.yview_moveto(first_visible)
+        return ChangeSet(inserts, updates, deletes, moves)
+
+    def upsert(self, row: tuple) -> None:
+        """Show one added or changed row without a full refresh (new rows go last)"""
+        iid = str(row[self.key_index])
+        values = tuple(row[self.value_slice])
+        if iid in self.shown:
+            if self.shown[iid] != values:
+                self.tree.item(iid, values=values)
+        else:
+            self.tree.insert("", "end", iid=iid, values=values)
+            self.order.append(iid)
+        self.shown[iid] = values
+
+    def remove(self, key: Any) -> None:
+        """Drop one row without a full refresh"""
+        iid = str(key)
+        if iid in self.shown:
+            self.tree.delete(iid)
+            del self.shown[iid]
+            self.order.remove(iid)
+
+
+def _in_order(old_order: List[str], new_order: List[str], new_values: Dict[str, Any]) -> Set[str]:
+    """Largest set of surviving items whose old order already matches new_order (a longest increasing subsequence)"""
+    old_position = {iid: index for index, iid in enumerate(old_order) if iid in new_values}
+    survivors = [iid for iid in new_order if iid in old_position]
+    tails: List[int] = []  # tails[k]: index in survivors ending the best run of length k + 1
+    tail_positions: List[int] = []  # old positions of those items, increasing
+    previous: List[int] = []
+    for index, iid in enumerate(survivors):
+        length = bisect_left(tail_positions, old_position[iid])
+        previous.append(tails[length - 1] if length else -1)
+        if length == len(tails):
+            tails.append(index)
+            tail_positions.append(old_position[iid])
+        else:
+            tails[length] = index
+            tail_positions[length] = old_position[iid]
+    staying = set()
+    index = tails[-1] if tails else -1
+    while index >= 0:
+        staying.add(survivors[index])
+        index = previous[index]
+    return staying
@@ -0,0 +1,264 @@
+"""Virtualized Treeview: only the rows around the visible window exist as Tk items"""
+
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:  # imported as dataaccess.virtual_list (tests)
+    from .tree_sync import TreeviewSync
+except ImportError:  # run from inside dataaccess/ (python app.py)
+    from tree_sync import TreeviewSync
+
+PLACEHOLDER_PREFIX = "~"  # item ids of rows whose page has not arrived yet
+
+
+class PageCache:
+    def __init__(self, page_size: int = 200, max_pages: int = 16, key_index: int = 0,
+                 cursor: Optional[Callable[[tuple], Any]] = None):
+        """
+        Fixed-size pages of a long row list, loaded on demand with LRU eviction
+
+        Memory stays at max_pages pages however long the list is. After
+        reset() the old pages are kept as stale copies and shown until fresh
+        ones arrive, so a refresh does not flash placeholders. Rows may have
+        moved between pages since (e.g. after a delete), so a stale page is
+        dropped once a neighbour is fresh and never repeats a key already shown.
+
+        Args:
+            page_size: Rows per page (one data layer call each)
+            max_pages: Most pages kept in memory
+            key_index: Position of the row key used for keyset paging
+            cursor: Builds the keyset cursor from a row, for lists not ordered
+                by the key (defaults to row[key_index])
+        """
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.key_index = key_index
+        self.cursor = cursor if cursor is not None else (lambda row: row[key_index])
+        self.total = 0
+        self.generation = 0  # bumped by reset(); pages from older generations are ignored
+        self._pages: "OrderedDict[int, List[tuple]]" = OrderedDict()  # least recently used first
+        self._stale: Dict[int, List[tuple]] = {}
+        self._pending: Set[int] = set()
+
+    def reset(self, total: int) -> None:
+        """Start a new generation, e.g. after the data changed"""
+        self.generation += 1
+        if self._pages:  # a second reset before any page arrived keeps the older copies
+            self._stale = dict(self._pages)
+        self._pages.clear()
+        self._pending.clear()
+        self.total = total
+
+    def rows(self, start: int, end: int) -> List[Optional[tuple]]:
+        """Rows start..end-1, None where the page is not loaded"""
+        result: List[Optional[tuple]] = []
+        stale_positions = []
+        for page in range(start // self.page_size, (end - 1) // self.page_size + 1 if end > start else 0):
+            rows = self._pages.get(page)
+            if rows is not None:
+                self._pages.move_to_end(page)
+            else:
+                rows = self._stale.get(page, [])
+            first = page * self.page_size
+            for index in range(max(start, first), min(end, first + self.page_size)):
+                offset = index - first
+                if page not in self._pages and offset < len(rows):
+                    stale_positions.append(len(result))
+                result.append(rows[offset] if offset < len(rows) else None)
+        if stale_positions:
+            # Item ids must be unique: a stale row whose key is shown elsewhere waits for its fresh page
+            stale = set(stale_positions)
+            seen = {row[self.key_index] for position, row in enumerate(result) if row is not None and position not in stale}
+            for position in stale_positions:
+                key = result[position][self.key_index]
+                if key in seen:
+                    result[position] = None
+                seen.add(key)
+        return result
+
+    def missing_pages(self, start: int, end: int) -> List[int]:
+        """Pages covering start..end-1 that are neither loaded nor being fetched"""
+        if end <= start:
+            return []
+        return [
+            page for page in range(start // self.page_size, (end - 1) // self.page_size + 1)
+            if page not in self._pages and page not in self._pending
+        ]
+
+    def request(self, page: int) -> Tuple[int, Any]:
+        """
+        Mark a page as being fetched and return (offset, after_key) for the data layer
+
+        When the previous page is loaded and full, the page is fetched by key
+        after its last row (an index seek); otherwise by offset.
+        """
+        self._pending.add(page)
+        previous = self._pages.get(page - 1)
+        if previous is not None and len(previous) == self.page_size:
+            return 0, self.cursor(previous[-1])
+        return page * self.page_size, None
+
+    def store(self, page: int, rows: Sequence[tuple], generation: int) -> bool:
+        """Keep a fetched page; False if it belongs to an older generation"""
+        if generation != self.generation:
+            return False
+        self._pending.discard(page)
+        for near in (page - 1, page, page + 1):  # their rows may have shifted across the shared edge
+            self._stale.pop(near, None)
+        self._pages[page] = list(rows)
+        self._pages.move_to_end(page)
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+        return True
+
+    def forget(self, page: int, generation: int) -> None:
+        """A fetch failed; allow it to be requested again"""
+        if generation == self.generation:
+            self._pending.discard(page)
+
+
+def visible_window(first: int, visible: int, buffer: int, total: int) -> Tuple[int, int]:
+    """Row range to materialize: the visible rows plus buffer rows on each side"""
+    return max(0, first - buffer), min(total, first + visible + buffer)
+
+
+class VirtualTreeview(ttk.Frame):
+    def __init__(self, master, columns: Sequence[Tuple[str, str]], count: Callable[[], int],
+                 fetch_page: Callable[[int, int, Any], List[tuple]], executor, page_size: int = 200,
+                 buffer: int = 20, row_height: int = 50, key_index: int = 0, value_slice: slice = slice(1, 5),
+                 max_pages: int = 16, channel: str = "load", cursor: Optional[Callable[[tuple], Any]] = None,
+                 on_heading: Optional[Callable[[str], None]] = None):
+        """
+        A Treeview over any number of rows that keeps Tk item count flat
+
+        Args:
+            master: Parent widget
+            columns: (column id, heading text) pairs
+            count: Returns the total number of rows (runs on a worker thread)
+            fetch_page: fetch_page(limit, offset, after_key) -> rows (runs on a worker thread)
+            executor: BackgroundExecutor used for count/fetch calls
+            page_size: Rows fetched per call
+            buffer: Extra rows kept as items above and below the visible ones
+            row_height: Treeview row height in pixels, to work out how many rows fit
+            key_index: Position of the key in each row; becomes the item id
+            value_slice: Part of each row shown in the columns
+            max_pages: Pages kept in memory
+            channel: Executor channel for count calls (a newer refresh supersedes an older one)
+            cursor: Keyset cursor of a row passed to fetch_page as after_key (see PageCache)
+            on_heading: Called with the column id when a heading is clicked, e.g. to sort
+        """
+        super().__init__(master)
+        self.count = count
+        self.fetch_page = fetch_page
+        self.executor = executor
+        self.buffer = buffer
+        self.row_height = row_height
+        self.key_index = key_index
+        self.value_slice = value_slice
+        self.channel = channel
+        self.cache = PageCache(page_size, max_pages, key_index, cursor)
+        self.first = 0  # index of the row at the top of the view
+        self.visible = 1
+
+        self.tree = ttk.Treeview(self, columns=[column for column, _ in columns], show="headings")
+        for column, heading in columns:
+            if on_heading is not None:
+                self.tree.heading(column, text=heading, command=lambda column=column: on_heading(column))
+            else:
+                self.tree.heading(column, text=heading)
+            self.tree.column(column, anchor="center", stretch=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", expand=True, fill="both")
+        self.sync = TreeviewSync(self.tree, key_index=0, value_slice=slice(1, None))
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", self.on_mouse_wheel)  # X11 reports the wheel as buttons 4/5
+        self.tree.bind("<Button-5>", self.on_mouse_wheel)
+
+    # ---- Data ----
+
+    def refresh(self, to_top: bool = False) -> None:
+        """Reload the row count and the visible pages (rows stay on screen until replaced)"""
+        if to_top:  # a new sort or filter starts from the first row
+            self.first = 0
+        self.executor.submit(self.channel, self.count, on_success=self.on_count)
+
+    def on_count(self, total: int) -> None:
+        self.cache.reset(total)
+        self.first = min(self.first, max(0, total - self.visible))
+        self.render()
+
+    def on_page(self, page: int, generation: int, rows: List[tuple]) -> None:
+        if self.cache.store(page, rows, generation):
+            self.render()
+
+    # ---- Scrolling ----
+
+    def on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.cache.total))
+        elif unit == "pages":
+            self.scroll_to(self.first + int(amount) * self.visible)
+        else:
+            self.scroll_to(self.first + int(amount))
+
+    def on_mouse_wheel(self, event) -> str:
+        if event.num in (4, 5):
+            steps = 1 if event.num == 4 else -1
+        else:
+            steps = int(event.delta / 120) or (1 if event.delta > 0 else -1)
+        self.scroll_to(self.first - steps * 3)
+        return "break"  # the Treeview must not scroll itself
+
+    def on_resize(self, event) -> None:
+        visible = max(1, event.height // self.row_height - 1)  # minus the heading row
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def scroll_to(self, first: int) -> None:
+        first = max(0, min(first, self.cache.total - self.visible))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    # ---- Rendering ----
+
+    def render(self) -> None:
+        """Show rows around self.first and fetch any pages they need"""
+        total = self.cache.total
+        start, end = visible_window(self.first, self.visible, self.buffer, total)
+        display = []
+        for index, row in zip(range(start, end), self.cache.rows(start, end)):
+            if row is None:
+                display.append((f"{PLACEHOLDER_PREFIX}{index}", "Loading..."))
+            else:
+                display.append((str(row[self.key_index]),) + tuple(row[self.value_slice]))
+        self.sync.apply(display)
+        if end > start:
+            self.tree.yview_moveto((self.first - start) / (end - start))
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        generation = self.cache.generation
+        for page in self.cache.missing_pages(start, end):
+            offset, after_key = self.cache.request(page)
+            self.executor.submit(
+                None,
+                self.fetch_page,
+                self.cache.page_size,
+                offset,
+                after_key,
+                on_success=lambda rows, page=page: self.on_page(page, generation, rows),
+                on_error=lambda error, page=page: self.cache.forget(page, generation),
+            )
+
+
+def is_placeholder(iid: str) -> bool:
+    """True for the stand-in items shown while a page loads"""
+    return str(iid).startswith(PLACEHOLDER_PREFIX)
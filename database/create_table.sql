@@ -12,24 +12,116 @@ CREATE TABLE Habits (
     Habit_ID INT PRIMARY KEY IDENTITY(1,1), -- Habit ID 
     User_ID INT NOT NULL, -- Foreign key that links from the Users table
     Habit_Name_ VARCHAR(100), -- Name of the habit
-    Description_ TEXT -- Description of the habit 
-	Category VARCHAR(50) -- What category the habit falls in to 
-	Frequency VARCHAR(20) -- Frequency the habit is done
-	StartDate DATE -- The date the habit started 
-	CreatedAt DATETIME DEFAULT GETDATE()-- The date and time that the habit was created within the application 
+    Description_ VARCHAR(MAX), -- Description of the habit 
+	Category VARCHAR(50), -- What category the habit falls in to 
+	Frequency VARCHAR(20), -- Frequency the habit is done
+	StartDate DATE, -- The date the habit started 
+	CreatedAt DATETIME DEFAULT GETDATE(), -- The date and time that the habit was created within the application 
+	Row_Version INT NOT NULL DEFAULT 1 -- Bumped on every update for optimistic concurrency
 );
 
+-- Per-user reads and keyset pagination seek on this index
+CREATE INDEX IX_Habits_User_ID ON Habits (User_ID, Habit_ID);
+
+-- Category/frequency filters and sorts in the habits view seek on this index
+CREATE INDEX IX_Habits_User_Category_Frequency ON Habits (User_ID, Category, Frequency);
+
 
 -- Creating the Habit Logs Table
 CREATE TABLE Habit_Logs (
     Log_ID INT IDENTITY(1,1) PRIMARY KEY, -- Auto-incrementing Log ID
-    Habit_ID VARCHAR(100),             -- Foreign ID to link to Habits table
-    Log_Date DATE,                      -- Log date of the Habit
-    Habit_Status BIT,                     -- Status code of the Habit
-	Note TEXT,                         -- Optional note each time a habit is logged
+    Habit_ID INT NOT NULL                 -- Foreign ID to link to Habits table
+        CONSTRAINT FK_Habit_Logs_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Log_Date DATE NOT NULL,               -- Log date of the Habit
+    Habit_Status BIT NOT NULL CONSTRAINT DF_Habit_Logs_Status DEFAULT 1, -- Status code of the Habit
+	Note VARCHAR(MAX),                   -- Optional note each time a habit is logged
 	logged_At DATETIME DEFAULT GETDATE()-- Example with a default value
 );
 
+-- One log per habit per day; also serves date-range scans of a habit's history
+CREATE UNIQUE INDEX UX_Habit_Logs_Habit_Date ON Habit_Logs (Habit_ID, Log_Date)
+    INCLUDE (Habit_Status, logged_At);
+
+
+-- Creating the Habit Streaks table (kept up to date as habits are logged)
+CREATE TABLE Habit_Streaks (
+    Habit_ID INT PRIMARY KEY          -- One row per habit
+        CONSTRAINT FK_Habit_Streaks_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Current_Streak INT NOT NULL DEFAULT 0, -- Length of the run ending at Last_Period
+    Longest_Streak INT NOT NULL DEFAULT 0, -- Best run ever
+    Last_Period INT NULL,             -- Newest completed period (days/weeks/months/years since 1970)
+    Updated_At DATETIME DEFAULT GETDATE()
+);
+
+
+-- Creating the Habit Calendar table (one bit per completed period, kept up to date as habits are logged)
+CREATE TABLE Habit_Calendar (
+    Habit_ID INT NOT NULL
+        CONSTRAINT FK_Habit_Calendar_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Calendar_Year INT NOT NULL,       -- Year the periods start in
+    Bits VARBINARY(46) NOT NULL,      -- Bit i set = i-th day/week/month of the year completed
+    CONSTRAINT PK_Habit_Calendar PRIMARY KEY (Habit_ID, Calendar_Year)
+);
+
+
+-- Creating the Applied Writes table (outcomes of journaled writes, so a resent batch is not applied twice)
+CREATE TABLE Applied_Writes (
+    Write_Key VARCHAR(36) PRIMARY KEY, -- Idempotency key from the app's offline journal
+    Outcome VARCHAR(20) NOT NULL,      -- added, updated, deleted, not_found or conflict
+    Habit_ID INT NULL,
+    Row_Version INT NULL,
+    Applied_At DATETIME DEFAULT GETDATE()
+);
+
+
+-- Creating the rollup tables (completion counts per habit, category and user by day/week/month,
+-- kept up to date as habits are logged; Period uses the streak numbering, Category is '' when unset)
+CREATE TABLE Habit_Rollup (
+    Habit_ID INT NOT NULL
+        CONSTRAINT FK_Habit_Rollup_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Grain VARCHAR(5) NOT NULL,        -- 'day', 'week' or 'month'
+    Period INT NOT NULL,              -- Days/weeks/months since 1970
+    Completed INT NOT NULL DEFAULT 0, -- Logs marked done
+    Logged INT NOT NULL DEFAULT 0,    -- All logs, done or not
+    CONSTRAINT PK_Habit_Rollup PRIMARY KEY (Habit_ID, Grain, Period)
+);
+
+CREATE TABLE Category_Rollup (
+    User_ID INT NOT NULL,
+    Category VARCHAR(50) NOT NULL,
+    Grain VARCHAR(5) NOT NULL,
+    Period INT NOT NULL,
+    Completed INT NOT NULL DEFAULT 0,
+    Logged INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_Category_Rollup PRIMARY KEY (User_ID, Category, Grain, Period)
+);
+
+CREATE TABLE User_Rollup (
+    User_ID INT NOT NULL,
+    Grain VARCHAR(5) NOT NULL,
+    Period INT NOT NULL,
+    Completed INT NOT NULL DEFAULT 0,
+    Logged INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_User_Rollup PRIMARY KEY (User_ID, Grain, Period)
+);
+
+
+-- Creating the User Stats table (filled in bulk by the analytics job, backend/main.py/dataaccess/analytics.py)
+CREATE TABLE User_Stats (
+    User_ID INT PRIMARY KEY,
+    Habits INT NOT NULL,                -- Habits the user has
+    Completions INT NOT NULL,           -- Logs marked done, all time
+    Active_Streaks INT NOT NULL,        -- Habits whose streak is still alive
+    Best_Current_Streak INT NOT NULL,
+    Longest_Streak INT NOT NULL,
+    Completion_Rate_30d FLOAT NOT NULL, -- Share of the last 30 days' periods completed
+    Computed_At DATETIME DEFAULT GETDATE()
+);
+
+
+-- Full-text search over habit names, descriptions and log notes needs the Full-Text Search
+-- feature; if it is installed, run migrations/006_full_text_search.sql after this script.
+
 
 -- Inserting a test user to check that the Users table is working as it should 
 INSERT INTO Users (First_Name, Email)
@@ -54,3 +146,4 @@ FROM Users u
 JOIN Habits h ON u.User_ID = h.User_ID
 JOIN Habit_Logs l ON h.Habit_ID = l.Habit_ID;
 
+
@@ -0,0 +1,10 @@
+-- Migration 001: optimistic concurrency for Habits
+-- Adds a Row_Version counter that every update bumps, so update_habit/delete_habit
+-- can refuse to overwrite a habit that changed since the caller read it.
+
+ALTER TABLE Habits ADD Row_Version INT NOT NULL
+    CONSTRAINT DF_Habits_Row_Version DEFAULT 1; -- Existing rows start at version 1
+
+-- TEXT is deprecated and cannot be returned through an OUTPUT clause, which the
+-- single-statement update/delete relies on
+ALTER TABLE Habits ALTER COLUMN Description_ VARCHAR(MAX);
@@ -0,0 +1,5 @@
+-- Migration 002: index for per-user habit reads
+-- get_user_habits and the keyset-paginated reads (WHERE User_ID = ? AND Habit_ID > ?
+-- ORDER BY Habit_ID) become an index seek instead of a scan of every habit.
+
+CREATE INDEX IX_Habits_User_ID ON Habits (User_ID, Habit_ID);
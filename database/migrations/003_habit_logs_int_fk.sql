@@ -0,0 +1,47 @@
+-- Migration 003: integer foreign key and per-day uniqueness for Habit_Logs
+-- Habit_Logs.Habit_ID was VARCHAR(100), so every join to Habits.Habit_ID INT needed an
+-- implicit conversion and could not use an index. This converts it to INT with a real
+-- foreign key and adds a unique (Habit_ID, Log_Date) index that serves both the
+-- "one log per habit per day" rule and date-range scans for a habit.
+-- Run once against an existing database; new databases get this from create_table.sql.
+
+BEGIN TRANSACTION;
+
+-- 1. Convert the ids into a new INT column
+ALTER TABLE Habit_Logs ADD Habit_ID_Int INT NULL;
+GO
+UPDATE Habit_Logs SET Habit_ID_Int = TRY_CONVERT(INT, Habit_ID);
+
+-- 2. Park rows that cannot satisfy the new constraints instead of losing them:
+--    ids that are not numbers, point at no habit, have no date, or repeat a day
+SELECT l.*
+INTO Habit_Logs_Rejected
+FROM Habit_Logs l
+WHERE l.Habit_ID_Int IS NULL
+   OR l.Log_Date IS NULL
+   OR NOT EXISTS (SELECT 1 FROM Habits h WHERE h.Habit_ID = l.Habit_ID_Int)
+   OR EXISTS (SELECT 1 FROM Habit_Logs newer
+              WHERE newer.Habit_ID_Int = l.Habit_ID_Int
+                AND newer.Log_Date = l.Log_Date
+                AND newer.Log_ID > l.Log_ID); -- keep the latest log of a day
+
+DELETE FROM Habit_Logs WHERE Log_ID IN (SELECT Log_ID FROM Habit_Logs_Rejected);
+
+-- 3. Swap the columns and tighten the definitions
+ALTER TABLE Habit_Logs DROP COLUMN Habit_ID;
+EXEC sp_rename 'Habit_Logs.Habit_ID_Int', 'Habit_ID', 'COLUMN';
+GO
+ALTER TABLE Habit_Logs ALTER COLUMN Habit_ID INT NOT NULL;
+ALTER TABLE Habit_Logs ALTER COLUMN Log_Date DATE NOT NULL;
+UPDATE Habit_Logs SET Habit_Status = 1 WHERE Habit_Status IS NULL;
+ALTER TABLE Habit_Logs ALTER COLUMN Habit_Status BIT NOT NULL;
+ALTER TABLE Habit_Logs ADD CONSTRAINT DF_Habit_Logs_Status DEFAULT 1 FOR Habit_Status;
+ALTER TABLE Habit_Logs ALTER COLUMN Note VARCHAR(MAX); -- TEXT is deprecated
+
+-- 4. Constraints and indexes
+ALTER TABLE Habit_Logs ADD CONSTRAINT FK_Habit_Logs_Habits
+    FOREIGN KEY (Habit_ID) REFERENCES Habits (Habit_ID) ON DELETE CASCADE;
+CREATE UNIQUE INDEX UX_Habit_Logs_Habit_Date ON Habit_Logs (Habit_ID, Log_Date)
+    INCLUDE (Habit_Status, logged_At);
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Migration 004: persisted streak state per habit
+-- Current/longest streaks are kept up to date as logs are written, so views read one
+-- row per habit instead of recomputing from the whole Habit_Logs history.
+-- Last_Period is the newest completed period number (days, Monday-based weeks, months
+-- or years since 1970-01-01, depending on the habit's Frequency).
+-- Existing logs: run HabitDatabase.recompute_streaks() once after applying this.
+
+CREATE TABLE Habit_Streaks (
+    Habit_ID INT PRIMARY KEY
+        CONSTRAINT FK_Habit_Streaks_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Current_Streak INT NOT NULL DEFAULT 0, -- Length of the run ending at Last_Period
+    Longest_Streak INT NOT NULL DEFAULT 0,
+    Last_Period INT NULL,
+    Updated_At DATETIME DEFAULT GETDATE()
+);
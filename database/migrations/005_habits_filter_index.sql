@@ -0,0 +1,6 @@
+-- Migration 005: index for filtered and sorted habit lists
+-- The habits view filters by category and/or frequency and sorts by a column header;
+-- with (User_ID, Category, Frequency) those filters are an index seek, and sorting by
+-- Category within a user reads the index in order instead of sorting every habit.
+
+CREATE INDEX IX_Habits_User_Category_Frequency ON Habits (User_ID, Category, Frequency);
@@ -0,0 +1,22 @@
+-- Migration 006: full-text search over habit names, descriptions and log notes
+-- HabitDatabase.search_habits ranks matches with CONTAINSTABLE when these indexes exist;
+-- without them (e.g. SQL Server Express without Advanced Services) it falls back to an
+-- in-process index, so this migration is optional. CHANGE_TRACKING AUTO keeps the
+-- indexes up to date as rows are written. Full-text statements cannot run inside a
+-- transaction, so run this script on its own.
+
+-- A full-text index needs a named, single-column unique key index
+CREATE UNIQUE INDEX UX_Habits_Habit_ID ON Habits (Habit_ID);
+CREATE UNIQUE INDEX UX_Habit_Logs_Log_ID ON Habit_Logs (Log_ID);
+GO
+
+CREATE FULLTEXT CATALOG HabitSearch;
+GO
+
+CREATE FULLTEXT INDEX ON Habits (Habit_Name_, Description_)
+    KEY INDEX UX_Habits_Habit_ID ON HabitSearch
+    WITH CHANGE_TRACKING AUTO;
+
+CREATE FULLTEXT INDEX ON Habit_Logs (Note)
+    KEY INDEX UX_Habit_Logs_Log_ID ON HabitSearch
+    WITH CHANGE_TRACKING AUTO;
@@ -0,0 +1,14 @@
+-- Migration 007: idempotency keys for writes replayed from an offline journal
+-- The app can queue habit writes in a local journal and send them later in batches
+-- (see backend/main.py/dataaccess/journal.py). Each queued write carries a unique
+-- key; the outcome is recorded here in the same transaction as the write, so a batch
+-- that is resent after a lost acknowledgement is answered from this table instead of
+-- being applied twice.
+
+CREATE TABLE Applied_Writes (
+    Write_Key VARCHAR(36) PRIMARY KEY,
+    Outcome VARCHAR(20) NOT NULL, -- added, updated, deleted, not_found or conflict
+    Habit_ID INT NULL,            -- Habit written (the new Habit_ID for an add)
+    Row_Version INT NULL,         -- Row_Version after the write
+    Applied_At DATETIME DEFAULT GETDATE()
+);
@@ -0,0 +1,15 @@
+-- Migration 008: bitset completion calendar per habit and year
+-- One bit per period of the habit's Frequency (day, Monday-based week, month or year),
+-- for the periods that start in Calendar_Year; bit i is the i-th such period, least
+-- significant bit of the first byte first. A Daily year is at most 46 bytes, so a
+-- heatmap, completion rate or "done today?" check reads one row instead of scanning
+-- Habit_Logs. The app keeps it in step with every log write.
+-- Existing logs: run HabitDatabase.rebuild_calendars() once after applying this.
+
+CREATE TABLE Habit_Calendar (
+    Habit_ID INT NOT NULL
+        CONSTRAINT FK_Habit_Calendar_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Calendar_Year INT NOT NULL,
+    Bits VARBINARY(46) NOT NULL,
+    CONSTRAINT PK_Habit_Calendar PRIMARY KEY (Habit_ID, Calendar_Year)
+);
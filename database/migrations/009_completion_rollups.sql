@@ -0,0 +1,36 @@
+-- Migration 009: completion rollups per habit, category and user
+-- One row per owner and period at three grains ('day', 'week', 'month'; Period is the
+-- day/Monday-based week/month number since 1970, the streak numbering), counting the
+-- logs marked done (Completed) and all logs (Logged). The app adds to them in the same
+-- transaction as every log write, so dashboards read a few rows here instead of
+-- scanning Habit_Logs. Category is '' for habits without one.
+-- Existing logs: run HabitDatabase.rebuild_rollups() once after applying this.
+
+CREATE TABLE Habit_Rollup (
+    Habit_ID INT NOT NULL
+        CONSTRAINT FK_Habit_Rollup_Habits REFERENCES Habits (Habit_ID) ON DELETE CASCADE,
+    Grain VARCHAR(5) NOT NULL,
+    Period INT NOT NULL,
+    Completed INT NOT NULL DEFAULT 0,
+    Logged INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_Habit_Rollup PRIMARY KEY (Habit_ID, Grain, Period)
+);
+
+CREATE TABLE Category_Rollup (
+    User_ID INT NOT NULL,
+    Category VARCHAR(50) NOT NULL,
+    Grain VARCHAR(5) NOT NULL,
+    Period INT NOT NULL,
+    Completed INT NOT NULL DEFAULT 0,
+    Logged INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_Category_Rollup PRIMARY KEY (User_ID, Category, Grain, Period)
+);
+
+CREATE TABLE User_Rollup (
+    User_ID INT NOT NULL,
+    Grain VARCHAR(5) NOT NULL,
+    Period INT NOT NULL,
+    Completed INT NOT NULL DEFAULT 0,
+    Logged INT NOT NULL DEFAULT 0,
+    CONSTRAINT PK_User_Rollup PRIMARY KEY (User_ID, Grain, Period)
+);
@@ -0,0 +1,15 @@
+-- Migration 010: per-user statistics written by the analytics job (analytics.py)
+-- One row per user with habits, recomputed in bulk by the job rather than on every
+-- write: habit and completion counts, how many habits have a live streak, the best
+-- current and longest streaks, and the share of the last 30 days' periods completed.
+
+CREATE TABLE User_Stats (
+    User_ID INT PRIMARY KEY,
+    Habits INT NOT NULL,
+    Completions INT NOT NULL,
+    Active_Streaks INT NOT NULL,
+    Best_Current_Streak INT NOT NULL,
+    Longest_Streak INT NOT NULL,
+    Completion_Rate_30d FLOAT NOT NULL,
+    Computed_At DATETIME DEFAULT GETDATE()
+);
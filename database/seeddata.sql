@@ -0,0 +1,6 @@
+-- Seed data is generated rather than stored here: millions of rows would not fit in a script.
+-- Load users, habits and logs with the bulk loader (from backend/main.py/dataaccess):
+--   python seed_loader.py --size 100000x10x30        -- synthetic data
+--   python seed_loader.py --csv path/to/csv_folder   -- users.csv, habits.csv, habit_logs.csv
+-- On SQL Server the loader writes bcp data/format files and loads them with OPENROWSET(BULK ...),
+-- so the SQL Server service account needs read access to the data directory (--data-dir / --server-data-dir).